@@ -66,6 +66,14 @@ class FashionistarDatabaseLayer:
         except Exception:
             pass
 
+    @staticmethod
+    def invalidate_many(cache_keys) -> None:
+        """Invalidate several cache keys in one round trip."""
+        try:
+            cache.delete_many(list(cache_keys))
+        except Exception:
+            pass
+
     # ─── USERS ─────────────────────────────────────────────────────────────────
 
     def get_user_full_context(self, user_id: str |int) -> dict:
@@ -373,18 +381,30 @@ class FashionistarDatabaseLayer:
 
     # ─── Cache invalidation helpers (called by signals) ───────────────────────
 
+    @staticmethod
+    def user_cache_keys(user_id) -> list[str]:
+        return [f"ai:user_ctx:{user_id}", f"ai:user_orders:{user_id}"]
+
+    @staticmethod
+    def product_cache_keys(product_id) -> list[str]:
+        return [f"ai:product:{product_id}", "ai:recent_products:50", "ai:trending:7d:20", "ai:inventory_levels"]
+
+    @staticmethod
+    def measurement_cache_keys(profile_id) -> list[str]:
+        return [f"ai:measurement_profile:{profile_id}"]
+
+    @staticmethod
+    def order_cache_keys(order_id=None) -> list[str]:
+        return ["ai:trending:7d:20", "ai:trending:30d:20", "ai:platform_stats:30d"]
+
     def invalidate_user_cache(self, user_id: int) -> None:
         """Invalidate all user-related AI cache entries."""
-        self.invalidate(f"ai:user_ctx:{user_id}")
-        self.invalidate(f"ai:user_orders:{user_id}")
+        self.invalidate_many(self.user_cache_keys(user_id))
 
     def invalidate_product_cache(self, product_id: int) -> None:
         """Invalidate product AI cache entries."""
-        self.invalidate(f"ai:product:{product_id}")
-        self.invalidate("ai:recent_products:50")
-        self.invalidate("ai:trending:7d:20")
-        self.invalidate("ai:inventory_levels")
+        self.invalidate_many(self.product_cache_keys(product_id))
 
     def invalidate_measurement_cache(self, profile_id: int) -> None:
         """Invalidate measurement profile AI cache."""
-        self.invalidate(f"ai:measurement_profile:{profile_id}")
+        self.invalidate_many(self.measurement_cache_keys(profile_id))
@@ -0,0 +1,153 @@
+# apps/ai/database/feature_store.py
+"""
+ProductFeatureStore — precomputed per-product ranking features for the
+recommendation contextual rerank.
+
+One float32 row per published product, columns = ``FEATURE_COLUMNS``:
+
+  trending     log1p(order lines in the last 7 days), scaled to 0..1
+  newness      exp(-age_days / 30) — 1.0 for a product listed today
+  vendor       vendor average rating / 5
+  in_stock     1.0 if sellable stock, else 0.0
+  conversion   orders_count / views, clipped to 0..1
+
+``refresh_product_feature_store`` (Celery beat) rebuilds the matrix with one
+product query and one order-line aggregate and publishes it to the shared
+cache as raw float32 bytes plus an id list. Workers keep the decoded matrix
+in-process and reload it only when the published version changes, so a
+rerank is a single vectorised gather + weighted sum with zero queries.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ("trending", "newness", "vendor", "in_stock", "conversion")
+
+# Used for products not in the published matrix (e.g. listed since the last refresh)
+DEFAULT_FEATURES = np.array([0.0, 1.0, 0.5, 1.0, 0.0], dtype=np.float32)
+
+SNAPSHOT_KEY = "ai:features:v1:snapshot"
+VERSION_KEY  = "ai:features:v1:version"
+
+_TRENDING_DAYS = 7
+_NEWNESS_DECAY_DAYS = 30.0
+
+
+class ProductFeatureStore:
+    """Per-process, read-mostly holder of the published feature matrix."""
+
+    def __init__(self, check_interval: float = 60.0):
+        self.check_interval = check_interval
+        self._matrix = np.zeros((0, len(FEATURE_COLUMNS)), dtype=np.float32)
+        self._row_of: dict[str, int] = {}
+        self._version: str | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def features_for(self, product_ids: list) -> np.ndarray:
+        """(len(product_ids), len(FEATURE_COLUMNS)) float32 — defaults for unknown ids."""
+        self._maybe_reload()
+        rows = np.fromiter(
+            (self._row_of.get(str(pid), -1) for pid in product_ids),
+            dtype=np.intp,
+            count=len(product_ids),
+        )
+        out = np.tile(DEFAULT_FEATURES, (len(product_ids), 1))
+        known = rows >= 0
+        if known.any():
+            out[known] = self._matrix[rows[known]]
+        return out
+
+    def install(self, ids: list[str], matrix: np.ndarray, version: str | None) -> None:
+        with self._lock:
+            self._row_of = {pid: i for i, pid in enumerate(ids)}
+            self._matrix = matrix
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            version = cache.get(VERSION_KEY)
+            if not version or version == self._version:
+                return
+            snapshot = cache.get(SNAPSHOT_KEY)
+            if not snapshot or snapshot.get("columns") != list(FEATURE_COLUMNS):
+                return
+            matrix = np.frombuffer(snapshot["matrix"], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+            self.install(snapshot["ids"], matrix, snapshot["version"])
+        except Exception as exc:
+            logger.warning("[ProductFeatureStore] reload failed: %s", exc)
+
+
+product_feature_store = ProductFeatureStore()
+
+
+def build_product_features() -> tuple[list[str], np.ndarray]:
+    """Compute the feature matrix: ONE product query + ONE order-line aggregate."""
+    from django.db.models import Count
+    from django.utils import timezone
+
+    from apps.order.models import CartOrderItem
+    from apps.product.models import Product, ProductStatus
+
+    now = timezone.now()
+    recent_orders = dict(
+        CartOrderItem.objects
+        .filter(created_at__gte=now - timedelta(days=_TRENDING_DAYS), product__isnull=False)
+        .values("product_id")
+        .annotate(n=Count("id"))
+        .values_list("product_id", "n")
+    )
+    max_recent = math.log1p(max(recent_orders.values(), default=0)) or 1.0
+
+    ids: list[str] = []
+    rows: list[tuple[float, ...]] = []
+    for p in (
+        Product.objects
+        .filter(status=ProductStatus.PUBLISHED, is_deleted=False)
+        .values("id", "created_at", "in_stock", "stock_qty", "orders_count", "views", "vendor__average_rating")
+        .iterator(chunk_size=5000)
+    ):
+        age_days = max((now - p["created_at"]).total_seconds() / 86400.0, 0.0)
+        rating = p["vendor__average_rating"]
+        ids.append(str(p["id"]))
+        rows.append((
+            math.log1p(recent_orders.get(p["id"], 0)) / max_recent,
+            math.exp(-age_days / _NEWNESS_DECAY_DAYS),
+            float(rating) / 5.0 if rating is not None else 0.5,
+            1.0 if p["in_stock"] and p["stock_qty"] > 0 else 0.0,
+            min((p["orders_count"] or 0) / max(p["views"] or 0, 1), 1.0),
+        ))
+
+    matrix = np.asarray(rows, dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    return ids, matrix
+
+
+def publish_product_features(ids: list[str], matrix: np.ndarray) -> str:
+    version = uuid.uuid4().hex
+    cache.set(SNAPSHOT_KEY, {
+        "version": version,
+        "columns": list(FEATURE_COLUMNS),
+        "ids":     ids,
+        "matrix":  np.ascontiguousarray(matrix, dtype=np.float32).tobytes(),
+    }, None)
+    cache.set(VERSION_KEY, version, None)
+    product_feature_store.install(ids, matrix, version)
+    return version
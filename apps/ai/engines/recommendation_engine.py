@@ -79,6 +79,32 @@ def _load_fashion_model():
         return False
 
 
+def _combine_vectors(
+    img_vec: list[float] | None,
+    text_vec: list[float] | None,
+) -> dict[str, list[float] | None]:
+    """60% image + 40% text, re-normalised; whichever vector exists otherwise."""
+    if text_vec and img_vec:
+        # 60% image + 40% text — visual primacy for fashion
+        combined_arr = np.array(img_vec) * 0.6 + np.array(text_vec) * 0.4
+        norm = np.linalg.norm(combined_arr)
+        if norm > 0:
+            combined_arr = combined_arr / norm
+        combined = combined_arr.tolist()
+    elif text_vec:
+        combined = text_vec
+    elif img_vec:
+        combined = img_vec
+    else:
+        combined = None
+
+    return {
+        "image_vector":    img_vec,
+        "text_vector":     text_vec,
+        "combined_vector": combined,
+    }
+
+
 class FashionEmbeddingEngine:
     """
     Generates 512-dimensional fashion embeddings using marqo-FashionSigLIP.
@@ -189,26 +215,78 @@ class FashionEmbeddingEngine:
         text = f"{title}. {description}".strip(". ")
         text_vec = self.embed_text(text)
         img_vec  = self.embed_image(image_bytes) if image_bytes else None
+        return _combine_vectors(img_vec, text_vec)
+
+    # ── Batched inference (backfills / bulk re-embeds) ────────────────────────
+
+    def embed_texts(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        Batched ``embed_text``: ONE tokenizer call + ONE ``encode_text`` forward
+        pass for the whole list. Returns one vector (or None) per input text.
+        """
+        if not texts or not self.is_available:
+            return [None] * len(texts)
+        try:
+            import torch
+
+            tokens = _fashion_tokenizer([t[:400] for t in texts]).to(_device)
+            with torch.no_grad(), torch.amp.autocast("cuda" if str(_device) == "cuda" else "cpu"):
+                features = _fashion_model.encode_text(tokens)
+                features = features / features.norm(dim=-1, keepdim=True)
+            return features.float().cpu().tolist()
+        except Exception as exc:
+            logger.warning("[FashionEngine] embed_texts failed (batch=%d): %s", len(texts), exc)
+            return [None] * len(texts)
+
+    def embed_images(self, images: list[bytes | None]) -> list[list[float] | None]:
+        """
+        Batched ``embed_image``: images are decoded/preprocessed individually
+        (a corrupt image only loses its own slot), then stacked into ONE
+        ``encode_image`` forward pass. ``None`` inputs yield ``None``.
+        """
+        out: list[list[float] | None] = [None] * len(images)
+        if not self.is_available:
+            return out
+        try:
+            import torch
+            from PIL import Image
+
+            tensors, slots = [], []
+            for i, image_bytes in enumerate(images):
+                if not image_bytes:
+                    continue
+                try:
+                    image = Image.open(BytesIO(image_bytes)).convert("RGB")
+                    tensors.append(_fashion_preprocess(image))
+                    slots.append(i)
+                except Exception as exc:
+                    logger.debug("[FashionEngine] embed_images: undecodable image in slot %d: %s", i, exc)
+            if not tensors:
+                return out
+
+            batch = torch.stack(tensors).to(_device)
+            with torch.no_grad(), torch.amp.autocast("cuda" if str(_device) == "cuda" else "cpu"):
+                features = _fashion_model.encode_image(batch)
+                features = features / features.norm(dim=-1, keepdim=True)
+            for slot, vec in zip(slots, features.float().cpu().tolist()):
+                out[slot] = vec
+        except Exception as exc:
+            logger.warning("[FashionEngine] embed_images failed (batch=%d): %s", len(images), exc)
+        return out
 
-        if text_vec and img_vec:
-            # 60% image + 40% text — visual primacy for fashion
-            combined_arr = np.array(img_vec) * 0.6 + np.array(text_vec) * 0.4
-            norm = np.linalg.norm(combined_arr)
-            if norm > 0:
-                combined_arr = combined_arr / norm
-            combined = combined_arr.tolist()
-        elif text_vec:
-            combined = text_vec
-        elif img_vec:
-            combined = img_vec
-        else:
-            combined = None
-
-        return {
-            "image_vector":    img_vec,
-            "text_vector":     text_vec,
-            "combined_vector": combined,
-        }
+    def embed_products(self, items: list[dict]) -> list[dict[str, list[float] | None]]:
+        """
+        Batched ``embed_product`` over ``[{"title", "description", "image_bytes"}, ...]``.
+
+        Two forward passes per mini-batch (text + image) instead of two per product.
+        """
+        texts = [
+            f"{item.get('title', '')}. {item.get('description', '')}".strip(". ")
+            for item in items
+        ]
+        text_vecs = self.embed_texts(texts)
+        img_vecs = self.embed_images([item.get("image_bytes") for item in items])
+        return [_combine_vectors(img, txt) for img, txt in zip(img_vecs, text_vecs)]
 
     def embed_measurement_query(self, measurements: dict) -> list[float] | None:
         """
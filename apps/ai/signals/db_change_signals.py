@@ -2,13 +2,23 @@
 """
 Django post_save signals → AI data ingestion pipeline.
 
-When any watched model is saved, two things happen:
-  1. FashionistarDatabaseLayer cache for that entity is invalidated (synchronous)
-  2. A DBChangeEvent row is created (synchronous, lightweight)
-  3. The ingestion Celery task is fired (async, non-blocking)
+When a watched model is saved, the (model, pk) pair is recorded in an
+in-process change buffer once the surrounding transaction commits.
+Repeated saves of the same object inside the coalescing window collapse
+into a single entry. When the window expires, or the buffer reaches
+AI_INGEST_MAX_BATCH entries, it is drained into ONE
+``ingest_db_changes`` Celery task. That task writes the DBChangeEvent
+rows, invalidates the FashionistarDatabaseLayer cache entries and
+dispatches the domain actions for the whole batch.
 
-The signal handler is deliberately lightweight — it does not call any
-external APIs or perform any computation. All heavy lifting is in Celery.
+The receiver is connected per watched sender, not globally. Saves of any
+other model never reach it: Django's per-sender receiver cache returns
+an empty list for them. The handler itself does no queries and no
+network calls.
+
+Settings:
+  AI_INGEST_COALESCE_WINDOW   seconds a change waits for duplicates (default 2.0)
+  AI_INGEST_MAX_BATCH         flush early once this many objects are pending (default 500)
 
 Watched models:
   - product.Product        → re-embed with FashionSigLIP, update product cache
@@ -22,10 +32,13 @@ Adding a new watched model:
   3. The ingestion task will pick it up automatically
 """
 
+import atexit
 import logging
+import threading
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
 
@@ -38,44 +51,103 @@ WATCHED_MODELS: list[tuple[str, str, str | None]] = [
     ("order",           "Order",                 None),  # invalidate platform stats
 ]
 
-# Build lookup set for O(1) signal dispatch
+# Lookup by "app_label.modelname" (lower-case model name, as in _meta.model_name)
 _WATCHED_LABELS: dict[str, str | None] = {
-    f"{app}.{model}": cache_method
+    f"{app}.{model.lower()}": cache_method
     for app, model, cache_method in WATCHED_MODELS
 }
 
 
-@receiver(post_save)
-def _ai_db_change_handler(sender, instance, created: bool, **kwargs) -> None:
+# ── Change buffer ──────────────────────────────────────────────────────────────
+
+class ChangeBuffer:
     """
-    Central post_save handler for all AI-watched models.
+    Thread-safe, per-process buffer of pending (app_label, model_name, pk)
+    changes.
 
-    Performance: This handler does a single dict lookup and spawns
-    one Celery task. No database queries, no network calls.
+    ``add()`` is O(1). The first change of an empty buffer arms a timer
+    for ``window`` seconds, so a burst of saves becomes one flush. The
+    event type of a merged entry stays "created" once any save in the
+    window created the object.
     """
-    model_label = f"{instance._meta.app_label}.{instance._meta.model_name}"
-    if model_label not in _WATCHED_LABELS:
-        return
 
-    # 1. Invalidate AI cache for this entity
-    cache_method = _WATCHED_LABELS[model_label]
-    if cache_method:
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[tuple[str, str, str], str] = {}
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, app_label: str, model_name: str, object_id: str, event_type: str) -> None:
+        key = (app_label, model_name, object_id)
+        with self._lock:
+            if self._pending.get(key) != "created":
+                self._pending[key] = event_type
+            if len(self._pending) >= self.max_batch:
+                batch = self._drain_locked()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            self._dispatch(batch)
+
+    def flush(self) -> int:
+        """Send everything pending as one ingestion task. Returns the batch size."""
+        with self._lock:
+            batch = self._drain_locked()
+        if batch:
+            self._dispatch(batch)
+        return len(batch)
+
+    def _drain_locked(self) -> list[list[str]]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [[app, model, pk, event] for (app, model, pk), event in self._pending.items()]
+        self._pending = {}
+        return batch
+
+    @staticmethod
+    def _dispatch(batch: list[list[str]]) -> None:
         try:
-            from apps.ai.database import FashionistarDatabaseLayer
-            db = FashionistarDatabaseLayer()
-            getattr(db, cache_method)(instance.pk)
+            from apps.ai.tasks.ingestion_tasks import ingest_db_changes
+            ingest_db_changes.delay(batch)
         except Exception as exc:
-            logger.debug("AI cache invalidation skipped: %s", exc)
-
-    # 2. Create DBChangeEvent and fire Celery ingestion task
-    try:
-        from apps.ai.tasks.ingestion_tasks import ingest_db_change
-        ingest_db_change.delay(
-            app_label=instance._meta.app_label,
-            model_name=instance._meta.model_name,
-            object_id=str(instance.pk),
-            event_type="created" if created else "updated",
-        )
-    except Exception as exc:
-        # Never let signal failure crash the main request
-        logger.warning("AI ingestion signal failed for %s#%s: %s", model_label, instance.pk, exc)
+            # Never let ingestion failure crash the caller
+            logger.warning("AI ingestion flush of %d change(s) failed: %s", len(batch), exc)
+
+
+change_buffer = ChangeBuffer(
+    window=float(getattr(settings, "AI_INGEST_COALESCE_WINDOW", 2.0)),
+    max_batch=int(getattr(settings, "AI_INGEST_MAX_BATCH", 500)),
+)
+atexit.register(change_buffer.flush)
+
+
+def _ai_db_change_handler(sender, instance, created: bool, **kwargs) -> None:
+    """
+    post_save handler for the AI-watched models (connected per sender below).
+
+    Performance: one on_commit registration per save; the buffered entry
+    costs a dict write. No database queries, no network calls.
+    """
+    if kwargs.get("raw"):
+        return  # fixture loading
+    meta = instance._meta
+    args = (meta.app_label, meta.model_name, str(instance.pk), "created" if created else "updated")
+    transaction.on_commit(lambda: change_buffer.add(*args))
+
+
+for _app_label, _model_name, _ in WATCHED_MODELS:
+    post_save.connect(
+        _ai_db_change_handler,
+        sender=f"{_app_label}.{_model_name}",
+        dispatch_uid=f"ai_db_change_{_app_label}_{_model_name.lower()}",
+        weak=False,
+    )
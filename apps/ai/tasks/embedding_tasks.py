@@ -4,7 +4,7 @@ Celery tasks for AI product embedding generation.
 
 Tasks:
   generate_product_embedding()    — Generate FashionSigLIP embedding for one product
-  batch_generate_embeddings()     — Bulk process a list of product IDs
+  batch_generate_embeddings()     — Bulk process a list of product IDs (mini-batched, resumable)
   backfill_missing_embeddings()   — Cron task: find products without embeddings and fill them
 
 Queue: "ai" (dedicated queue for ML-heavy tasks)
@@ -12,11 +12,15 @@ Worker: Start with: celery -A backend worker -Q ai --concurrency=1 --loglevel=in
 """
 
 import logging
+import uuid
 
 from celery import shared_task
 
 logger = logging.getLogger(__name__)
 
+MODEL_VERSION = "marqo-FashionSigLIP-B-16"
+VECTOR_DIM = 512
+
 
 @shared_task(
     bind=True,
@@ -32,15 +36,17 @@ def generate_product_embedding(self, product_id: int) -> dict:
     Generate and persist a FashionSigLIP embedding for a single product.
 
     Pipeline:
-    1. Load product with images + description from DB
+    1. Load product title/description/categories/tags + primary gallery image URL
     2. Download primary product image (JPEG)
-    3. Pass image + text through FashionSigLIP encoder → 512-dim vector
-    4. Upsert ProductEmbedding model with the new vector
+    3. Pass image + text through FashionSigLIP encoder → 512-dim vectors
+    4. Upsert ProductEmbedding with the new vectors
     5. pgvector HNSW index auto-updates on save
 
+    Shares its load / embed / persist steps with batch_generate_embeddings
+    (a batch of one), so both paths write identical rows.
+
     Called by:
     - post_save signal when a new product is created/updated (ingestion_tasks.py)
-    - batch_generate_embeddings() for bulk backfill
     - Vendor product publish flow (future hook)
 
     Args:
@@ -53,52 +59,25 @@ def generate_product_embedding(self, product_id: int) -> dict:
 
     try:
         from apps.ai.engines.recommendation_engine import FashionEmbeddingEngine
-        from apps.ai.models.product_embedding import ProductEmbedding
 
-        # Load product data
-        from django.apps import apps
-        Product = apps.get_model("product", "Product")
-
-        try:
-            product = Product.objects.select_related(
-                "category", "vendor"
-            ).prefetch_related("images").get(pk=product_id)
-        except Product.DoesNotExist:
+        pid = str(product_id)
+        inputs = _load_product_inputs([pid])
+        if pid not in inputs:
             logger.warning("[generate_product_embedding] Product %s not found", product_id)
             return {"product_id": product_id, "success": False, "error": "Product not found"}
 
-        # Build text description for embedding
-        text_desc = _build_product_text(product)
+        image_url = inputs[pid]["image_url"]
+        images = {pid: _fetch_image(image_url) if image_url else None}
 
-        # Get primary image URL
-        image_url = _get_product_image_url(product)
-
-        # Generate embedding
-        engine = FashionEmbeddingEngine()
-        if image_url:
-            embedding = engine.embed_product(image_url=image_url, text=text_desc)
-        else:
-            embedding = engine.embed_text(text_desc)
-
-        # Upsert ProductEmbedding
-        ProductEmbedding.objects.update_or_create(
-            product_id=product_id,
-            defaults={
-                "embedding":      embedding,
-                "text_used":      text_desc[:500],
-                "image_url_used": image_url or "",
-                "model_version":  engine.model_name,
-                "embedding_dim":  len(embedding),
-            },
-        )
+        embedded, _failed = _embed_chunk(FashionEmbeddingEngine(), [pid], inputs, images)
+        if not embedded:
+            logger.warning("[generate_product_embedding] No embedding generated for product %s", product_id)
+            return {"product_id": product_id, "success": False, "error": "No embedding generated"}
 
-        logger.info(
-            "[generate_product_embedding] SUCCESS product=%s dim=%d",
-            product_id, len(embedding),
-        )
+        logger.info("[generate_product_embedding] SUCCESS product=%s", product_id)
         return {
             "product_id":    product_id,
-            "embedding_dim": len(embedding),
+            "embedding_dim": VECTOR_DIM,
             "success":       True,
         }
 
@@ -111,46 +90,106 @@ def generate_product_embedding(self, product_id: int) -> dict:
     bind=True,
     name="apps.ai.tasks.embedding_tasks.batch_generate_embeddings",
     queue="ai",
-    max_retries=1,
-    soft_time_limit=3600,   # 1 hour max for large batch
+    max_retries=3,
+    default_retry_delay=60,
+    soft_time_limit=3600,   # 1 hour per run; the remainder is re-enqueued
     time_limit=3660,
 )
-def batch_generate_embeddings(self, product_ids: list[int]) -> dict:
+def batch_generate_embeddings(self, product_ids: list, checkpoint_key: str | None = None) -> dict:
     """
-    Generate embeddings for a batch of product IDs.
-
-    Processes sequentially (to avoid OOM on small servers), tracking
-    success/failure per product.
+    Generate embeddings for a list of product IDs in mini-batches.
+
+    Per mini-batch of AI_EMBEDDING_BATCH_SIZE products:
+      1. ONE product query (categories/tags prefetched) + ONE gallery-media query
+      2. Primary images downloaded on a bounded thread pool
+         (AI_EMBEDDING_FETCH_CONCURRENCY). The NEXT batch's downloads start
+         before the current batch's inference, so network and model overlap.
+      3. ONE text forward pass + ONE image forward pass
+      4. ONE ProductEmbedding upsert (bulk_create with update_conflicts)
+      5. Checkpoint — progress is saved to the cache after every committed batch
+
+    Resumable: a retry or redelivery of this task (same task id), or a
+    continuation with the same ``checkpoint_key``, skips batches that were
+    already committed. When the soft time limit is reached, the remainder
+    is re-enqueued under the same checkpoint instead of being lost.
 
     Args:
-        product_ids: List of Product PKs
+        product_ids:    List of Product PKs
+        checkpoint_key: Run identifier for resuming (defaults to the task id)
 
     Returns:
         dict: {total, success_count, failed_count, failed_ids}
     """
-    logger.info("[batch_generate_embeddings] batch_size=%d", len(product_ids))
+    from concurrent.futures import ThreadPoolExecutor
 
-    success_count = 0
-    failed_ids: list[int] = []
+    from celery.exceptions import SoftTimeLimitExceeded
+    from django.conf import settings
+    from django.core.cache import cache
 
-    for product_id in product_ids:
-        try:
-            # Call synchronously within this task (no nested Celery for ML)
-            generate_product_embedding.apply(args=[product_id])
-            success_count += 1
-        except Exception as exc:
-            logger.warning(
-                "[batch_generate_embeddings] product=%s failed: %s", product_id, exc
-            )
-            failed_ids.append(product_id)
+    from apps.ai.engines.recommendation_engine import FashionEmbeddingEngine
 
+    batch_size  = getattr(settings, "AI_EMBEDDING_BATCH_SIZE", 32)
+    concurrency = getattr(settings, "AI_EMBEDDING_FETCH_CONCURRENCY", 8)
+    ckpt_ttl    = getattr(settings, "AI_EMBEDDING_CHECKPOINT_TTL", 86400)
+
+    run_id = checkpoint_key or self.request.id or uuid.uuid4().hex
+    ckpt_key = f"ai:embed_batch:{run_id}"
+    ids = [str(pid) for pid in product_ids]
+
+    state = cache.get(ckpt_key) or {"done": 0, "success_count": 0, "failed_ids": []}
+    if state["done"]:
+        logger.info(
+            "[batch_generate_embeddings] resuming run=%s at %d/%d", run_id, state["done"], len(ids),
+        )
+    else:
+        logger.info("[batch_generate_embeddings] run=%s batch_size=%d total=%d", run_id, batch_size, len(ids))
+
+    chunks = [ids[i:i + batch_size] for i in range(state["done"], len(ids), batch_size)]
+    engine = FashionEmbeddingEngine()
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ai-embed-img")
+
+    try:
+        prepared = _prepare_chunk(chunks[0], pool) if chunks else None
+        for n, chunk in enumerate(chunks):
+            inputs, image_futures = prepared
+            # Overlap: next batch's DB read + downloads run during this batch's inference
+            prepared = _prepare_chunk(chunks[n + 1], pool) if n + 1 < len(chunks) else None
+
+            images = {pid: fut.result() for pid, fut in image_futures.items()}
+            embedded, failed = _embed_chunk(engine, chunk, inputs, images)
+
+            state["done"] += len(chunk)
+            state["success_count"] += embedded
+            state["failed_ids"].extend(failed)
+            cache.set(ckpt_key, state, ckpt_ttl)
+
+    except SoftTimeLimitExceeded:
+        logger.warning(
+            "[batch_generate_embeddings] soft time limit at %d/%d — continuing run=%s in a new task",
+            state["done"], len(ids), run_id,
+        )
+        batch_generate_embeddings.apply_async(args=[ids], kwargs={"checkpoint_key": run_id})
+        return {
+            "total":         len(ids),
+            "success_count": state["success_count"],
+            "failed_count":  len(state["failed_ids"]),
+            "failed_ids":    state["failed_ids"],
+            "continued":     True,
+        }
+    except Exception as exc:
+        logger.exception("[batch_generate_embeddings] run=%s failed at %d/%d", run_id, state["done"], len(ids))
+        raise self.retry(exc=exc, kwargs={"product_ids": ids, "checkpoint_key": run_id})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    cache.delete(ckpt_key)
     result = {
-        "total":         len(product_ids),
-        "success_count": success_count,
-        "failed_count":  len(failed_ids),
-        "failed_ids":    failed_ids,
+        "total":         len(ids),
+        "success_count": state["success_count"],
+        "failed_count":  len(state["failed_ids"]),
+        "failed_ids":    state["failed_ids"],
     }
-    logger.info("[batch_generate_embeddings] DONE: %s", result)
+    logger.info("[batch_generate_embeddings] DONE: %s", {k: v for k, v in result.items() if k != "failed_ids"})
     return result
 
 
@@ -161,56 +200,55 @@ def batch_generate_embeddings(self, product_ids: list[int]) -> dict:
     time_limit=7260,
     ignore_result=False,
 )
-def backfill_missing_embeddings(limit: int = 500) -> dict:
+def backfill_missing_embeddings(limit: int | None = 500, include_stale: bool = True) -> dict:
     """
-    Periodic cron task: find all active products that do NOT have a
-    ProductEmbedding record and generate their embeddings.
+    Periodic cron task: find published products that have no ProductEmbedding
+    (or, with ``include_stale``, whose embedding predates the product's last
+    edit) and enqueue batch_generate_embeddings for them.
+
+    Discovery is a DB-side anti-join — ``NOT EXISTS`` against
+    ai_productembedding — paged by primary key (keyset pagination, UUID7 PKs
+    are time-ordered). Each page of AI_EMBEDDING_BACKFILL_CHUNK ids is
+    enqueued as soon as it is read, so memory and SQL size stay constant no
+    matter how many products are already embedded.
 
     Designed to run:
     - Once after initial deployment (to backfill existing products)
     - Weekly thereafter (to catch any products that slipped through)
 
     Args:
-        limit: Maximum number of products to process in one run (default: 500)
+        limit:         Maximum number of products to enqueue in one run
+                       (default: 500; None = no cap)
+        include_stale: Also re-embed products edited after their embedding
 
     Returns:
-        dict: {found, submitted}
+        dict: {found, submitted, batches}
     """
-    logger.info("[backfill_missing_embeddings] Starting backfill (limit=%d)", limit)
+    logger.info(
+        "[backfill_missing_embeddings] Starting backfill (limit=%s, include_stale=%s)",
+        limit, include_stale,
+    )
 
+    found = 0
+    batches = 0
     try:
-        from django.apps import apps
-        from apps.ai.models.product_embedding import ProductEmbedding
-
-        Product = apps.get_model("product", "Product")
-
-        # Find products without an embedding
-        embedded_ids = set(
-            ProductEmbedding.objects.values_list("product_id", flat=True)
-        )
-        missing_ids = list(
-            Product.objects.filter(is_active=True)
-            .exclude(id__in=embedded_ids)
-            .values_list("id", flat=True)[:limit]
-        )
+        for chunk in _iter_unembedded_product_ids(limit=limit, include_stale=include_stale):
+            batch_generate_embeddings.delay(chunk)
+            found += len(chunk)
+            batches += 1
 
-        if not missing_ids:
+        if not found:
             logger.info("[backfill_missing_embeddings] No missing embeddings found.")
-            return {"found": 0, "submitted": 0}
-
-        logger.info(
-            "[backfill_missing_embeddings] Found %d products needing embeddings",
-            len(missing_ids),
-        )
-
-        # Submit as a single batch task
-        batch_generate_embeddings.delay(missing_ids)
-
-        return {"found": len(missing_ids), "submitted": len(missing_ids)}
+        else:
+            logger.info(
+                "[backfill_missing_embeddings] Enqueued %d products in %d batches",
+                found, batches,
+            )
+        return {"found": found, "submitted": found, "batches": batches}
 
     except Exception as exc:
-        logger.exception("[backfill_missing_embeddings] FAILED")
-        return {"found": 0, "submitted": 0, "error": str(exc)}
+        logger.exception("[backfill_missing_embeddings] FAILED after %d submitted", found)
+        return {"found": found, "submitted": found, "batches": batches, "error": str(exc)}
 
 
 # ── Private helpers ────────────────────────────────────────────────────────────
@@ -219,13 +257,15 @@ def _build_product_text(product) -> str:
     """Compose the text string used as input to the FashionSigLIP text encoder."""
     parts: list[str] = []
 
-    if hasattr(product, "name") and product.name:
-        parts.append(product.name)
+    title = getattr(product, "title", None) or getattr(product, "name", None)
+    if title:
+        parts.append(title)
 
-    if hasattr(product, "category") and product.category:
-        cat_name = getattr(product.category, "name", None)
-        if cat_name:
-            parts.append(cat_name)
+    if hasattr(product, "categories"):
+        # .all() is served from the prefetch cache in _load_product_inputs
+        category = next(iter(product.categories.all()), None)
+        if category is not None and getattr(category, "name", None):
+            parts.append(category.name)
 
     if hasattr(product, "description") and product.description:
         # Truncate to 200 chars — CLIP text encoder has a 77-token limit
@@ -233,27 +273,173 @@ def _build_product_text(product) -> str:
 
     if hasattr(product, "tags"):
         try:
-            tags = product.tags.values_list("name", flat=True)[:5]
-            parts.extend(list(tags))
+            parts.extend(tag.name for tag in product.tags.all()[:5])
         except Exception:
             pass
 
     return " | ".join(parts) if parts else "fashion clothing"
 
 
-def _get_product_image_url(product) -> str | None:
-    """Return the primary product image URL (Cloudinary URL preferred)."""
+def _load_product_inputs(product_ids: list[str]) -> dict[str, dict]:
+    """
+    ONE product query (+ two prefetches) and ONE gallery query for a whole batch.
+
+    Returns {product_id: {"text", "image_url"}}; ids that no longer exist are absent.
+    """
+    from django.apps import apps
+    from django.db.models import Prefetch
+
+    Product  = apps.get_model("product", "Product")
+    Tag      = apps.get_model("product", "ProductTag")
+    Category = apps.get_model("catalog", "Category")
+    Media    = apps.get_model("product", "ProductVariantGalleryMedia")
+
+    products = (
+        Product.objects
+        .filter(pk__in=product_ids)
+        .only("id", "title", "description")
+        .prefetch_related(
+            Prefetch("categories", queryset=Category.objects.only("id", "name")),
+            Prefetch("tags", queryset=Tag.objects.only("id", "name")),
+        )
+    )
+    inputs = {
+        str(p.pk): {"text": _build_product_text(p), "image_url": None}
+        for p in products
+    }
+
+    # Primary image first, then gallery order — first row per product wins
+    media_rows = (
+        Media.objects
+        .filter(product_id__in=list(inputs), media_type="image")
+        .exclude(media__isnull=True)
+        .exclude(media="")
+        .only("product_id", "media", "is_primary", "ordering")
+        .order_by("product_id", "-is_primary", "ordering")
+    )
+    for m in media_rows:
+        entry = inputs[str(m.product_id)]
+        if entry["image_url"] is None:
+            entry["image_url"] = getattr(m.media, "url", None) or str(m.media)
+
+    return inputs
+
+
+def _fetch_image(image_url: str) -> bytes | None:
+    """Download one product image; failures degrade to a text-only embedding."""
     try:
-        images = product.images.filter(is_primary=True).order_by("-created_at")
-        if images.exists():
-            img = images.first()
-            return getattr(img, "cloudinary_url", None) or getattr(img, "url", None)
-
-        # Fallback: any image
-        img = product.images.first()
-        if img:
-            return getattr(img, "cloudinary_url", None) or getattr(img, "url", None)
+        import urllib.request
+        req = urllib.request.Request(
+            image_url,
+            headers={
+                "User-Agent": "FASHIONISTAR-AI-Embedder/1.0",
+                "Accept":     "image/*",
+            },
+        )
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            return resp.read()
     except Exception as exc:
-        logger.debug("[_get_product_image_url] %s", exc)
+        logger.warning("[_fetch_image] %s — using text-only (%s)", image_url, exc)
+        return None
+
+
+def _prepare_chunk(chunk: list[str], pool) -> tuple[dict[str, dict], dict]:
+    """Load a batch's inputs and start its image downloads on ``pool``."""
+    inputs = _load_product_inputs(chunk)
+    futures = {
+        pid: pool.submit(_fetch_image, entry["image_url"])
+        for pid, entry in inputs.items()
+        if entry["image_url"]
+    }
+    return inputs, futures
+
+
+def _embed_chunk(
+    engine,
+    chunk: list[str],
+    inputs: dict[str, dict],
+    images: dict[str, bytes | None],
+) -> tuple[int, list[str]]:
+    """
+    Embed one batch with two forward passes and persist it with ONE upsert.
 
-    return None
+    Returns (embedded_count, failed_ids). Missing products and products the
+    model produced no vector for are reported as failed and not written.
+    """
+    from apps.ai.models.product_embedding import ProductEmbedding
+
+    present = [pid for pid in chunk if pid in inputs]
+    failed = [pid for pid in chunk if pid not in inputs]
+
+    vectors = engine.embed_products([
+        {"title": inputs[pid]["text"], "image_bytes": images.get(pid)}
+        for pid in present
+    ])
+
+    rows = []
+    for pid, vec in zip(present, vectors):
+        if not vec.get("combined_vector"):
+            failed.append(pid)
+            continue
+        rows.append(ProductEmbedding(
+            product_id=pid,
+            text_vector=vec["text_vector"],
+            image_vector=vec["image_vector"],
+            combined_vector=vec["combined_vector"],
+            model_version=MODEL_VERSION,
+            embedding_status="embedded",
+        ))
+
+    if rows:
+        ProductEmbedding.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=[
+                "text_vector", "image_vector", "combined_vector",
+                "model_version", "embedding_status", "last_embedded_at", "updated_at",
+            ],
+        )
+    return len(rows), failed
+
+
+def _iter_unembedded_product_ids(limit: int | None = None, include_stale: bool = True):
+    """
+    Yield lists of product ids (str) that need an embedding, keyset-paged by PK.
+
+    One indexed ``NOT EXISTS`` query per page; nothing proportional to the
+    number of already-embedded products is ever loaded into Python.
+    """
+    from django.conf import settings
+    from django.db.models import Exists, OuterRef
+
+    from apps.ai.models.product_embedding import ProductEmbedding
+    from apps.product.models import Product, ProductStatus
+
+    chunk_size = getattr(settings, "AI_EMBEDDING_BACKFILL_CHUNK", 256)
+
+    fresh = ProductEmbedding.objects.filter(product_id=OuterRef("pk"))
+    if include_stale:
+        fresh = fresh.filter(last_embedded_at__gte=OuterRef("updated_at"))
+
+    candidates = (
+        Product.objects
+        .filter(status=ProductStatus.PUBLISHED, is_deleted=False)
+        .filter(~Exists(fresh))
+        .order_by("pk")
+    )
+
+    remaining = limit
+    last_pk = None
+    while remaining is None or remaining > 0:
+        page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+        page = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+        ids = list(page.values_list("pk", flat=True)[:page_size])
+        if not ids:
+            return
+        last_pk = ids[-1]
+        if remaining is not None:
+            remaining -= len(ids)
+        yield [str(pk) for pk in ids]
+        if len(ids) < page_size:
+            return
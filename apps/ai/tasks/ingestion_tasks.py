@@ -3,7 +3,8 @@
 Celery tasks for the AI data ingestion pipeline.
 
 Tasks:
-  ingest_db_change()        — Process a DBChangeEvent (triggered by signals)
+  ingest_db_changes()       — Process a coalesced batch of DB changes (triggered by signals)
+  ingest_db_change()        — Process a single DB change
   refresh_trending_cache()  — Rebuild trending products cache hourly
 
 Queue: "ai_ingestion" (lightweight, high-frequency queue)
@@ -17,6 +18,91 @@ from celery import shared_task
 logger = logging.getLogger(__name__)
 
 
+# Model label → FashionistarDatabaseLayer key builder for that entity's cache entries
+_CACHE_KEYS_FOR = {
+    "product.product":                  "product_cache_keys",
+    "measurements.measurementprofile":  "measurement_cache_keys",
+    "authentication.unifieduser":       "user_cache_keys",
+    "order.order":                      "order_cache_keys",
+}
+
+
+@shared_task(
+    name="apps.ai.tasks.ingestion_tasks.ingest_db_changes",
+    queue="ai_ingestion",
+    ignore_result=True,
+    max_retries=3,
+    default_retry_delay=10,
+)
+def ingest_db_changes(changes: list) -> int:
+    """
+    Process a coalesced batch of DB change events.
+
+    Called by the change buffer in apps.ai.signals.db_change_signals once
+    per coalescing window. Each object appears at most once per batch.
+
+    Per batch, regardless of size:
+      - ONE bulk INSERT of DBChangeEvent audit rows
+      - ONE cache delete_many covering every affected AI cache key
+      - ONE batch_generate_embeddings task for all changed products
+      - ONE UPDATE marking the events processed
+
+    Args:
+        changes: [[app_label, model_name, object_id, event_type], ...]
+
+    Returns:
+        Number of events ingested.
+    """
+    if not changes:
+        return 0
+    try:
+        from django.utils import timezone
+
+        from apps.ai.database.access_layer import FashionistarDatabaseLayer
+        from apps.ai.models import DBChangeEvent
+
+        events = DBChangeEvent.objects.bulk_create([
+            DBChangeEvent(
+                app_label=app_label,
+                model_name=model_name,
+                object_id=str(object_id),
+                event_type=event_type,
+            )
+            for app_label, model_name, object_id, event_type in changes
+        ])
+
+        # Dispatch domain-specific processing
+        db = FashionistarDatabaseLayer()
+        cache_keys: set[str] = set()
+        product_ids: list[str] = []
+        for app_label, model_name, object_id, event_type in changes:
+            model_key = f"{app_label}.{model_name.lower()}"
+            key_builder = _CACHE_KEYS_FOR.get(model_key)
+            if key_builder:
+                cache_keys.update(getattr(db, key_builder)(object_id))
+            if model_key == "product.product" and event_type in ("created", "updated"):
+                product_ids.append(str(object_id))
+
+        if cache_keys:
+            db.invalidate_many(cache_keys)
+
+        if product_ids:
+            # Trigger re-embedding for all changed products in one mini-batched run
+            from apps.ai.tasks.embedding_tasks import batch_generate_embeddings
+            batch_generate_embeddings.delay(product_ids)
+
+        # Mark events as processed
+        DBChangeEvent.objects.filter(
+            event_id__in=[e.event_id for e in events],
+        ).update(is_processed=True, processed_at=timezone.now())
+
+        return len(events)
+
+    except Exception as exc:
+        logger.warning("[ingest_db_changes] batch of %d failed: %s", len(changes), exc)
+        return 0
+
+
 @shared_task(
     name="apps.ai.tasks.ingestion_tasks.ingest_db_change",
     queue="ai_ingestion",
@@ -31,15 +117,10 @@ def ingest_db_change(
     event_type: str = "updated",
 ) -> None:
     """
-    Process a DB change event from the AI ingestion pipeline.
-
-    Called by Django post_save signal via apps.ai.signals.db_change_signals.
-    Creates a DBChangeEvent audit row and dispatches domain-specific actions.
+    Process a single DB change event.
 
-    Domain actions:
-      - product.Product     → schedule embed_product.delay()
-      - measurements.*      → invalidate user recommendation cache
-      - order.Order         → invalidate platform stats cache
+    Kept for messages enqueued before the change buffer existed and for
+    ad-hoc use; signals now go through ingest_db_changes().
 
     Args:
         app_label:  Django app label (e.g., 'product')
@@ -47,56 +128,7 @@ def ingest_db_change(
         object_id:  Primary key of changed instance (as string)
         event_type: 'created' | 'updated' | 'deleted'
     """
-    try:
-        from apps.ai.models import DBChangeEvent
-        from django.utils import timezone
-
-        event = DBChangeEvent.objects.create(
-            app_label=app_label,
-            model_name=model_name,
-            object_id=object_id,
-            event_type=event_type,
-        )
-
-        # Dispatch domain-specific processing
-        model_key = f"{app_label}.{model_name.lower()}"
-
-        if model_key == "product.product" and event_type in ("created", "updated"):
-            # Trigger re-embedding for the changed product
-            from apps.ai.tasks.recommendation_tasks import embed_product
-            embed_product.delay(int(object_id))
-
-        elif model_key in ("measurements.measurementprofile",):
-            # Invalidate recommendation cache for this user's profile
-            from apps.ai.database.access_layer import FashionistarDatabaseLayer
-            db = FashionistarDatabaseLayer()
-            db.invalidate_measurement_cache(profile_id=int(object_id))
-
-        elif model_key == "authentication.unifieduser":
-            # Invalidate user context cache
-            from apps.ai.database.access_layer import FashionistarDatabaseLayer
-            db = FashionistarDatabaseLayer()
-            db.invalidate_user_cache(user_id=int(object_id))
-
-        elif model_key == "order.order":
-            # Invalidate trending products and platform stats cache
-            from apps.ai.database.access_layer import FashionistarDatabaseLayer
-            db = FashionistarDatabaseLayer()
-            db.invalidate("ai:trending:7d:20")
-            db.invalidate("ai:trending:30d:20")
-            db.invalidate("ai:platform_stats:30d")
-
-        # Mark event as processed
-        DBChangeEvent.objects.filter(pk=event.pk).update(
-            is_processed=True,
-            processed_at=timezone.now(),
-        )
-
-    except Exception as exc:
-        logger.warning(
-            "[ingest_db_change] %s.%s#%s failed: %s",
-            app_label, model_name, object_id, exc,
-        )
+    ingest_db_changes([[app_label, model_name, object_id, event_type]])
 
 
 @shared_task(
@@ -6,6 +6,7 @@ Tasks:
   run_profile_recommendations() — Generate recommendations for a MeasurementProfile
   embed_product()               — Embed a single product with FashionSigLIP
   embed_unembedded_products()   — Batch embed all products without embeddings
+  refresh_product_feature_store() — Rebuild the contextual-rerank feature matrix
 
 Queue: "ai" (dedicated queue for ML-heavy tasks)
 """
@@ -265,3 +266,29 @@ def embed_unembedded_products() -> None:
 
     except Exception as exc:
         logger.exception("[embed_unembedded_products] FAILED: %s", exc)
+
+
+@shared_task(
+    name="apps.ai.tasks.recommendation_tasks.refresh_product_feature_store",
+    queue="ai",
+    ignore_result=True,
+    soft_time_limit=600,
+)
+def refresh_product_feature_store() -> None:
+    """
+    Rebuild the ProductFeatureStore matrix (trending, newness, vendor rating,
+    stock, conversion) and publish it to the shared cache.
+
+    Called by: Celery Beat every 15 minutes.
+    Two queries total, regardless of catalogue size.
+    """
+    try:
+        from apps.ai.database.feature_store import build_product_features, publish_product_features
+
+        ids, matrix = build_product_features()
+        version = publish_product_features(ids, matrix)
+        logger.info(
+            "[refresh_product_feature_store] Published %d products (version=%s)", len(ids), version,
+        )
+    except Exception as exc:
+        logger.exception("[refresh_product_feature_store] FAILED: %s", exc)
@@ -0,0 +1,88 @@
+"""
+test_db_change_ingestion.py
+Coalesced DB-change capture (ChangeBuffer) and batch ingestion (ingest_db_changes).
+
+Tests:
+  - Repeated saves of one object inside the window become one entry
+  - "created" survives later "updated" saves of the same object
+  - The buffer flushes early at AI_INGEST_MAX_BATCH and sends ONE task per flush
+  - The post_save receiver is connected only to the watched senders
+  - A batch writes all events, invalidates the cache once and re-embeds products together
+
+Run: pytest apps/ai/tests/test_db_change_ingestion.py -v
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from apps.ai.signals.db_change_signals import ChangeBuffer
+from apps.ai.tasks import ingestion_tasks
+
+
+# ─── Change buffer ────────────────────────────────────────────────────────────
+
+def test_buffer_dedupes_by_model_and_pk():
+    buf = ChangeBuffer(window=3600, max_batch=100)
+    buf.add("product", "product", "1", "created")
+    buf.add("product", "product", "1", "updated")
+    buf.add("product", "product", "2", "updated")
+    buf.add("order", "order", "1", "updated")
+
+    with patch.object(ingestion_tasks.ingest_db_changes, "delay") as delay:
+        assert buf.flush() == 3
+
+    delay.assert_called_once()
+    assert sorted(delay.call_args.args[0]) == [
+        ["order", "order", "1", "updated"],
+        ["product", "product", "1", "created"],
+        ["product", "product", "2", "updated"],
+    ]
+    assert len(buf) == 0
+
+
+def test_buffer_flushes_early_at_max_batch():
+    buf = ChangeBuffer(window=3600, max_batch=3)
+    with patch.object(ingestion_tasks.ingest_db_changes, "delay") as delay:
+        for pk in range(7):
+            buf.add("product", "product", str(pk), "updated")
+        assert [len(c.args[0]) for c in delay.call_args_list] == [3, 3]
+        buf.flush()
+    assert [len(c.args[0]) for c in delay.call_args_list] == [3, 3, 1]
+
+
+def test_receiver_connected_only_to_watched_senders():
+    from django.apps import apps
+    from django.db.models.signals import post_save
+
+    from apps.ai.signals.db_change_signals import WATCHED_MODELS, _ai_db_change_handler
+
+    for app_label, model_name, _ in WATCHED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        assert _ai_db_change_handler in post_save._live_receivers(model)[0]
+
+    unwatched = apps.get_model("ai", "DBChangeEvent")
+    assert _ai_db_change_handler not in post_save._live_receivers(unwatched)[0]
+
+
+# ─── Batch ingestion task ─────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+def test_ingest_batch_is_set_based():
+    from apps.ai.models import DBChangeEvent
+
+    changes = [
+        ["product", "product", "11", "updated"],
+        ["product", "product", "12", "created"],
+        ["authentication", "unifieduser", "7", "updated"],
+    ]
+
+    with patch("apps.ai.database.access_layer.FashionistarDatabaseLayer.invalidate_many") as invalidate, \
+         patch("apps.ai.tasks.embedding_tasks.batch_generate_embeddings.delay") as embed:
+        assert ingestion_tasks.ingest_db_changes(changes) == 3
+
+    embed.assert_called_once_with(["11", "12"])
+    invalidate.assert_called_once()
+    keys = set(invalidate.call_args.args[0])
+    assert {"ai:product:11", "ai:product:12", "ai:user_ctx:7", "ai:trending:7d:20"} <= keys
+    assert DBChangeEvent.objects.filter(is_processed=True).count() == 3
@@ -0,0 +1,112 @@
+"""
+test_embedding_batch.py
+Batched embedding pipeline (batch_generate_embeddings).
+
+Tests:
+  - Products are embedded in mini-batches of AI_EMBEDDING_BATCH_SIZE
+  - Progress is checkpointed; a rerun with the same checkpoint resumes
+  - Failed ids are reported, the checkpoint is cleared on completion
+  - FashionEmbeddingEngine.embed_products combines vectors per item
+
+Run: pytest apps/ai/tests/test_embedding_batch.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.ai.engines.recommendation_engine import FashionEmbeddingEngine
+from apps.ai.tasks import embedding_tasks
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def _fake_prepare(chunk, pool):
+    return {pid: {"text": f"product {pid}", "image_url": None} for pid in chunk}, {}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+# ─── Batch pipeline ───────────────────────────────────────────────────────────
+
+@override_settings(AI_EMBEDDING_BATCH_SIZE=3)
+def test_batches_and_reports_failures():
+    calls = []
+
+    def fake_embed(engine, chunk, inputs, images):
+        calls.append(list(chunk))
+        return len([p for p in chunk if p != "5"]), [p for p in chunk if p == "5"]
+
+    with patch.object(embedding_tasks, "_prepare_chunk", side_effect=_fake_prepare), \
+         patch.object(embedding_tasks, "_embed_chunk", side_effect=fake_embed), \
+         patch("apps.ai.engines.recommendation_engine.FashionEmbeddingEngine", MagicMock()):
+        result = embedding_tasks.batch_generate_embeddings.apply(
+            args=[[1, 2, 3, 4, 5, 6, 7]], kwargs={"checkpoint_key": "t1"},
+        ).get()
+
+    assert calls == [["1", "2", "3"], ["4", "5", "6"], ["7"]]
+    assert result["success_count"] == 6
+    assert result["failed_ids"] == ["5"]
+    assert cache.get("ai:embed_batch:t1") is None
+
+
+@override_settings(AI_EMBEDDING_BATCH_SIZE=2)
+def test_resumes_from_checkpoint():
+    cache.set("ai:embed_batch:t2", {"done": 4, "success_count": 4, "failed_ids": []})
+    calls = []
+
+    def fake_embed(engine, chunk, inputs, images):
+        calls.append(list(chunk))
+        return len(chunk), []
+
+    with patch.object(embedding_tasks, "_prepare_chunk", side_effect=_fake_prepare), \
+         patch.object(embedding_tasks, "_embed_chunk", side_effect=fake_embed), \
+         patch("apps.ai.engines.recommendation_engine.FashionEmbeddingEngine", MagicMock()):
+        result = embedding_tasks.batch_generate_embeddings.apply(
+            args=[[1, 2, 3, 4, 5, 6]], kwargs={"checkpoint_key": "t2"},
+        ).get()
+
+    assert calls == [["5", "6"]]
+    assert result["success_count"] == 6
+
+
+# ─── Engine batch API ─────────────────────────────────────────────────────────
+
+def test_embed_products_combines_per_item():
+    engine = FashionEmbeddingEngine.__new__(FashionEmbeddingEngine)
+    engine._available = False
+    engine.embed_texts = MagicMock(return_value=[[1.0, 0.0], [0.0, 1.0]])
+    engine.embed_images = MagicMock(return_value=[[0.0, 1.0], None])
+
+    out = engine.embed_products([
+        {"title": "Agbada", "image_bytes": b"img"},
+        {"title": "Kaftan", "image_bytes": None},
+    ])
+
+    engine.embed_texts.assert_called_once_with(["Agbada", "Kaftan"])
+    assert out[0]["image_vector"] == [0.0, 1.0]
+    assert out[0]["combined_vector"][1] > out[0]["combined_vector"][0]  # 60% image weight
+    assert out[1]["combined_vector"] == [0.0, 1.0]
+    assert out[1]["image_vector"] is None
+
+
+# ─── Backfill discovery ───────────────────────────────────────────────────────
+
+@override_settings(AI_EMBEDDING_BACKFILL_CHUNK=2)
+def test_backfill_enqueues_keyset_pages():
+    pages = [["a", "b"], ["c", "d"], ["e"]]
+
+    with patch.object(embedding_tasks, "_iter_unembedded_product_ids", return_value=iter(pages)) as discover, \
+         patch.object(embedding_tasks.batch_generate_embeddings, "delay") as delay:
+        result = embedding_tasks.backfill_missing_embeddings.apply(kwargs={"limit": None}).get()
+
+    discover.assert_called_once_with(limit=None, include_stale=True)
+    assert [c.args[0] for c in delay.call_args_list] == pages
+    assert result == {"found": 5, "submitted": 5, "batches": 3}
@@ -0,0 +1,114 @@
+"""
+test_recommendation_rerank.py
+RecommendationWorkflow post-retrieval stages (size filter, contextual rerank).
+
+Tests:
+  - Size-guide strings parse into numeric envelopes
+  - Size filter loads envelopes for the whole candidate set at once
+  - Products without size data are kept; non-fitting products are dropped
+  - Feature store returns neutral defaults for unknown products
+  - Rerank scores all candidates from the feature store (stock penalty, trending flag)
+
+Run: pytest apps/ai/tests/test_recommendation_rerank.py -v
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from apps.ai.workflows.recommendation import RecommendationWorkflow, _parse_cm_range
+
+
+# ─── Fixtures ─────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def workflow():
+    """Workflow without compiling the LangGraph (nodes are called directly)."""
+    return RecommendationWorkflow.__new__(RecommendationWorkflow)
+
+
+def _envelope(bust, waist, hips):
+    return {
+        "size_bust_min": bust[0], "size_bust_max": bust[1],
+        "size_waist_min": waist[0], "size_waist_max": waist[1],
+        "size_hips_min": hips[0], "size_hips_max": hips[1],
+    }
+
+
+# ─── Size filter ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("raw,expected", [
+    ("86-92", (86.0, 92.0)),
+    ("86 – 92.5", (86.0, 92.5)),
+    ("88", (88.0, 88.0)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_cm_range(raw, expected):
+    assert _parse_cm_range(raw) == expected
+
+
+def test_size_filter_is_set_based(workflow):
+    state = {
+        "measurements": {"bust": 90, "waist": 72, "hips": 98},
+        "similar_products": [("fits", 0.9), ("too-small", 0.8), ("no-sizes", 0.7)],
+    }
+    envelopes = {
+        "fits": [_envelope((70, 75), (60, 62), (80, 84)), _envelope((86, 92), (70, 74), (96, 100))],
+        "too-small": [_envelope((70, 76), (55, 60), (80, 85))],
+    }
+
+    with patch.object(RecommendationWorkflow, "_load_size_envelopes", return_value=envelopes) as load:
+        out = workflow._apply_size_filter(state)
+
+    load.assert_called_once_with(["fits", "too-small", "no-sizes"])
+    assert out["filtered_products"] == [("fits", 0.9), ("no-sizes", 0.7)]
+
+
+def test_size_filter_without_measurements_keeps_all(workflow):
+    state = {"measurements": {}, "similar_products": [("a", 0.5)]}
+    with patch.object(RecommendationWorkflow, "_load_size_envelopes") as load:
+        out = workflow._apply_size_filter(state)
+    load.assert_not_called()
+    assert out["filtered_products"] == [("a", 0.5)]
+
+
+# ─── Contextual rerank (feature store) ────────────────────────────────────────
+
+def test_feature_store_defaults_for_unknown_ids():
+    import numpy as np
+
+    from apps.ai.database.feature_store import DEFAULT_FEATURES, ProductFeatureStore
+
+    store = ProductFeatureStore(check_interval=3600)
+    store.install(["a"], np.array([[1.0, 0.2, 0.8, 1.0, 0.1]], dtype=np.float32), "v1")
+
+    out = store.features_for(["a", "missing"])
+    assert out[0].tolist() == pytest.approx([1.0, 0.2, 0.8, 1.0, 0.1])
+    assert out[1].tolist() == pytest.approx(DEFAULT_FEATURES.tolist())
+
+
+def test_rerank_uses_feature_store_in_one_pass(workflow):
+    import numpy as np
+
+    from apps.ai.database.feature_store import ProductFeatureStore
+
+    store = ProductFeatureStore(check_interval=3600)
+    store.install(
+        ["hot", "stale", "sold-out"],
+        np.array([
+            [1.0, 1.0, 1.0, 1.0, 0.5],   # trending, new, top vendor
+            [0.0, 0.0, 0.2, 1.0, 0.0],
+            [1.0, 1.0, 1.0, 0.0, 0.5],   # same as "hot" but out of stock
+        ], dtype=np.float32),
+        "v1",
+    )
+    state = {"filtered_products": [("stale", 0.9), ("sold-out", 0.8), ("hot", 0.8)]}
+
+    with patch("apps.ai.database.feature_store.product_feature_store", store):
+        out = workflow._contextual_rerank(state)
+
+    ranked = [r["product_id"] for r in out["ranked_products"]]
+    assert ranked[0] == "hot"
+    assert ranked.index("sold-out") > ranked.index("hot")
+    assert out["ranked_products"][0]["trending"] is True
@@ -17,9 +17,9 @@ Graph:
       ↓
   pgvector_similarity_search      (HNSW <50ms p95)
       ↓
-  apply_size_filter               (filter products that fit the measurements)
+  apply_size_filter               (one query: size envelopes for all candidates)
       ↓
-  contextual_rerank               (boost: new arrivals, trending, vendor score)
+  contextual_rerank               (feature store: trending, newness, vendor, stock, conversion)
       ↓
   persist_recommendations         (Redis cache + SizeRecommendationRequest model)
       ↓
@@ -29,6 +29,7 @@ Graph:
 from __future__ import annotations
 
 import logging
+import re
 from typing import Any
 
 from django.utils import timezone
@@ -38,6 +39,28 @@ from typing import TypedDict, List, Dict, Tuple, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+_CM_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _parse_cm_range(value: str | None) -> tuple[float | None, float | None]:
+    """``"86-92"`` → (86.0, 92.0); ``"88"`` → (88.0, 88.0); blank → (None, None)."""
+    numbers = [float(n) for n in _CM_NUMBER.findall(value or "")]
+    if not numbers:
+        return None, None
+    return min(numbers), max(numbers)
+
+
+# Contextual rerank weights — keys other than "similarity" are feature-store columns
+RERANK_WEIGHTS: Dict[str, float] = {
+    "similarity": 0.55,
+    "trending":   0.15,
+    "newness":    0.10,
+    "vendor":     0.10,
+    "conversion": 0.10,
+}
+OUT_OF_STOCK_FACTOR = 0.5
+
+
 # ── State definition ───────────────────────────────────────────────────────────
 
 
@@ -72,7 +95,7 @@ class RecommendationWorkflow:
     4.  Embed user preferences → FashionSigLIP 512-dim vector
     5.  pgvector HNSW ANN search → top-K similar products
     6.  Size-fit filter → remove products that definitely won't fit
-    7.  Contextual re-rank → newness, trending score, vendor rating boost
+    7.  Contextual re-rank → precomputed trending / newness / vendor / stock / conversion
     8.  Persist ranked list → Redis (TTL 1 hour) + SizeRecommendationRequest model
 
     Usage (from Celery task):
@@ -376,58 +399,39 @@ class RecommendationWorkflow:
         """
         Filter products that are available in the user's size range.
 
-        For each product:
-        - Look up available size variants
-        - Check if any variant fits the user's measurements (±5cm tolerance)
-        - Discard products with no matching size
+        Set-based: ONE query loads the size-guide rows of every similar
+        product (gallery variant → ProductSizeAndMeasurementGuide), the
+        chest/waist/hip strings are parsed into numeric envelopes, and each
+        product is kept if any of its variants fits (±5cm tolerance).
 
         Products without size information are kept (conservative inclusion).
         """
         try:
             measurements = state["measurements"]
-            bust = measurements.get("bust")
-            waist = measurements.get("waist")
-            hips = measurements.get("hips")
+            bust, waist, hips = (
+                float(v) if v is not None else None
+                for v in (measurements.get("bust"), measurements.get("waist"), measurements.get("hips"))
+            )
 
             if not any([bust, waist, hips]):
                 # No measurements to filter on — keep all
                 state["filtered_products"] = state["similar_products"]
                 return state
 
-            from apps.product.models import ProductVariant
-
-            filtered: list[tuple[int, float]] = []
             TOLERANCE_CM = 5.0
+            envelopes = self._load_size_envelopes(
+                [product_id for product_id, _ in state["similar_products"]]
+            )
 
-            for product_id, score in state["similar_products"]:
-                try:
-                    # Check if any variant for this product fits
-                    variants = ProductVariant.objects.filter(
-                        product_id=product_id, is_active=True
-                    ).values(
-                        "size_bust_min", "size_bust_max",
-                        "size_waist_min", "size_waist_max",
-                        "size_hips_min", "size_hips_max",
-                    )
-
-                    if not variants.exists():
-                        filtered.append((product_id, score))
-                        continue
-
-                    fits = False
-                    for v in variants:
-                        fits = self._variant_fits(
-                            v, bust, waist, hips, TOLERANCE_CM
-                        )
-                        if fits:
-                            break
-
-                    if fits:
-                        filtered.append((product_id, score))
-
-                except Exception:
-                    # Error checking a single product — include it (safe default)
-                    filtered.append((product_id, score))
+            filtered: list[tuple[int, float]] = [
+                (product_id, score)
+                for product_id, score in state["similar_products"]
+                if not envelopes.get(str(product_id))
+                or any(
+                    self._variant_fits(v, bust, waist, hips, TOLERANCE_CM)
+                    for v in envelopes[str(product_id)]
+                )
+            ]
 
             state["filtered_products"] = filtered
             logger.info(
@@ -444,49 +448,50 @@ class RecommendationWorkflow:
 
     def _contextual_rerank(self, state: dict) -> dict:
         """
-        Re-rank products applying contextual boost signals:
+        Re-rank products applying contextual boost signals from the
+        precomputed ProductFeatureStore (no per-request queries):
 
-        Final score = (cosine_similarity * 0.6)
-                    + (trending_boost    * 0.2)
-                    + (newness_boost     * 0.1)
-                    + (vendor_score      * 0.1)
+        Final score = (cosine_similarity * 0.55)
+                    + (trending          * 0.15)
+                    + (newness           * 0.10)
+                    + (vendor_rating     * 0.10)
+                    + (conversion_rate   * 0.10)
 
-        Products with no size match get a 30% penalty.
+        Out-of-stock products are multiplied by OUT_OF_STOCK_FACTOR.
+        All candidates are scored in one vectorised pass.
         """
         try:
-            from apps.ai.database.access_layer import FashionistarDatabaseLayer
+            import numpy as np
 
-            db = FashionistarDatabaseLayer()
-            trending_ids: set[int] = {
-                p.get("id") for p in (db.get_trending_products(days=7) or [])
-            }
+            from apps.ai.database.feature_store import FEATURE_COLUMNS, product_feature_store
 
-            ranked: list[dict] = []
-            for product_id, sim_score in state["filtered_products"]:
-                trending_boost = 0.15 if product_id in trending_ids else 0.0
-                # Newness boost — decays over 30 days (simplified)
-                newness_boost = 0.05  # Requires created_at — simplified here
-                vendor_score  = 0.05  # Requires vendor rating — simplified here
-
-                final_score = (
-                    sim_score       * 0.6
-                    + trending_boost * 0.2
-                    + newness_boost  * 0.1
-                    + vendor_score   * 0.1
-                )
-                ranked.append({
-                    "product_id":    product_id,
-                    "final_score":   round(final_score, 4),
-                    "sim_score":     round(sim_score, 4),
-                    "trending":      product_id in trending_ids,
-                })
+            candidates = state["filtered_products"]
+            product_ids = [pid for pid, _ in candidates]
+            sims = np.fromiter((score for _, score in candidates), dtype=np.float32, count=len(candidates))
 
-            state["ranked_products"] = sorted(
-                ranked, key=lambda x: x["final_score"], reverse=True
+            features = product_feature_store.features_for(product_ids)
+            col = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+            weights = np.array(
+                [RERANK_WEIGHTS.get(name, 0.0) for name in FEATURE_COLUMNS], dtype=np.float32
             )
+
+            final = sims * RERANK_WEIGHTS["similarity"] + features @ weights
+            final = np.where(features[:, col["in_stock"]] > 0, final, final * OUT_OF_STOCK_FACTOR)
+            trending = features[:, col["trending"]] > 0
+
+            order = np.argsort(-final, kind="stable")
+            state["ranked_products"] = [
+                {
+                    "product_id":  product_ids[i],
+                    "final_score": round(float(final[i]), 4),
+                    "sim_score":   round(float(sims[i]), 4),
+                    "trending":    bool(trending[i]),
+                }
+                for i in order
+            ]
             logger.info(
-                "[RecommendationWorkflow] Re-ranked %d products",
-                len(ranked),
+                "[RecommendationWorkflow] Re-ranked %d products (feature store rows=%d)",
+                len(candidates), len(product_feature_store),
             )
         except Exception as exc:
             logger.warning("[RecommendationWorkflow] _contextual_rerank: %s", exc)
@@ -584,6 +589,40 @@ class RecommendationWorkflow:
 
         return ", ".join(parts)
 
+    @staticmethod
+    def _load_size_envelopes(product_ids: list) -> dict[str, list[dict]]:
+        """
+        Size envelopes for a whole candidate set in ONE query.
+
+        Returns {product_id: [{"size_bust_min", "size_bust_max", ...}, ...]},
+        one dict per sized variant. Guide values are free text such as
+        "86-92", "86 – 92" or "88"; a single number is a zero-width range and
+        blank/unparseable values become None (treated as "fits").
+        """
+        if not product_ids:
+            return {}
+
+        from apps.product.models import ProductVariantGalleryMedia
+
+        rows = (
+            ProductVariantGalleryMedia.objects
+            .filter(product_id__in=product_ids, size__isnull=False)
+            .values_list("product_id", "size__chest_cm", "size__waist_cm", "size__hip_cm")
+            .distinct()
+        )
+
+        envelopes: dict[str, list[dict]] = {}
+        for product_id, chest, waist, hip in rows:
+            bust_min, bust_max   = _parse_cm_range(chest)
+            waist_min, waist_max = _parse_cm_range(waist)
+            hips_min, hips_max   = _parse_cm_range(hip)
+            envelopes.setdefault(str(product_id), []).append({
+                "size_bust_min":  bust_min,  "size_bust_max":  bust_max,
+                "size_waist_min": waist_min, "size_waist_max": waist_max,
+                "size_hips_min":  hips_min,  "size_hips_max":  hips_max,
+            })
+        return envelopes
+
     @staticmethod
     def _variant_fits(
         variant: dict,
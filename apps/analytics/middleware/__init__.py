@@ -1 +1,15 @@
-# Middleware package
\ No newline at end of file
+# Middleware package
+"""
+``AnalyticsMiddleware`` is exposed lazily via ``__getattr__`` so importing a
+sibling module (e.g. ``middleware.user_activity``) does not pull in the
+metrics and realtime services.
+"""
+
+__all__ = ["AnalyticsMiddleware"]
+
+
+def __getattr__(name):
+    if name == "AnalyticsMiddleware":
+        from apps.analytics.middleware.analytics import AnalyticsMiddleware
+        return AnalyticsMiddleware
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
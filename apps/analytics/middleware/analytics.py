@@ -1,4 +1,4 @@
-# apps/analytics/middleware.py
+# apps/analytics/middleware/analytics.py
 """
 Analytics middleware for request/response performance tracking and real-time
 event publishing.
@@ -7,6 +7,19 @@ Can be enabled by adding `apps.analytics.middleware.AnalyticsMiddleware` to
 `MIDDLEWARE` after authentication middleware. It is safe to install in both sync
 and ASGI deployments: sync views will run the sync path, async views will run
 the async path.
+
+Recording never blocks the response: latency/status go to the in-process
+metrics registry and the real-time event is appended to the buffered
+publisher (``enqueue_analytics_event``), which a background thread flushes
+to the Redis stream in pipelined batches. Under ASGI the middleware is a
+native coroutine (``markcoroutinefunction``) — no sync_to_async hop — and
+it only reads a user that authentication has already resolved, so it
+never triggers a session/user query from the event loop.
+
+Metric labels use the matched route template (``GET:/api/v1/products/<slug:slug>/``),
+never the raw path, so product slugs and UUIDs do not each become a new
+series. Templates are cached per URL name; requests that match no route are
+labelled ``unmatched``.
 """
 
 from __future__ import annotations
@@ -15,13 +28,42 @@ import logging
 import time
 from typing import Callable, Optional
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpRequest, HttpResponse
+from django.utils.functional import LazyObject, empty
 
 from apps.analytics.services.metrics_service import get_metrics_service
-from apps.analytics.services.realtime_service import publish_analytics_event
+from apps.analytics.services.realtime_service import enqueue_analytics_event
 
 logger = logging.getLogger(__name__)
 
+UNMATCHED_ROUTE = "unmatched"
+
+# view_name (or route, for unnamed patterns) → "/route/template/" — bounded by
+# the number of URL patterns, so it needs no eviction.
+_route_templates: dict[str, str] = {}
+
+
+def route_label(request: HttpRequest) -> str:
+    """Low-cardinality route template for the request's resolved URL pattern."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    key = match.view_name or match.route
+    template = _route_templates.get(key)
+    if template is None:
+        template = "/" + (match.route or "").lstrip("^").rstrip("$")
+        _route_templates[key] = template
+    return template
+
+
+def _resolved_user(request: HttpRequest):
+    """The request user only if already evaluated — never forces a lazy lookup."""
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    return user
+
 
 class AnalyticsMiddleware:
     """
@@ -34,9 +76,9 @@ class AnalyticsMiddleware:
 
     def __init__(self, get_response: Optional[Callable] = None):
         self.get_response = get_response
-        self.is_async = False
-        if get_response is not None:
-            self.is_async = getattr(get_response, "is_async", False)
+        self.is_async = get_response is not None and iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
         self.metrics = get_metrics_service()
 
     def __call__(self, request: HttpRequest):
@@ -47,16 +89,16 @@ class AnalyticsMiddleware:
     def _process_request(self, request: HttpRequest) -> HttpResponse:
         start = time.perf_counter()
         response = self.get_response(request)
-        self._record(request, response, time.perf_counter() - start)
+        self._record(request, response, time.perf_counter() - start, getattr(request, "user", None))
         return response
 
     async def _aprocess_request(self, request: HttpRequest):
         start = time.perf_counter()
         response = await self.get_response(request)
-        self._record(request, response, time.perf_counter() - start)
+        self._record(request, response, time.perf_counter() - start, _resolved_user(request))
         return response
 
-    def _record(self, request: HttpRequest, response: HttpResponse, duration: float):
+    def _record(self, request: HttpRequest, response: HttpResponse, duration: float, user=None):
         try:
             status_code = getattr(response, "status_code", 0)
             endpoint = request.path
@@ -64,17 +106,16 @@ class AnalyticsMiddleware:
             duration_ms = int(duration * 1000)
 
             self.metrics.record_query(
-                query_type=f"{method}:{endpoint}",
+                query_type=f"{method}:{route_label(request)}",
                 duration_seconds=duration,
             )
 
-            user = getattr(request, "user", None)
             user_id = str(user.id) if user and user.is_authenticated else None
 
             if status_code >= 500:
                 self.metrics.record_error(source="http_5xx")
 
-            publish_analytics_event(
+            enqueue_analytics_event(
                 event_type="api_call",
                 user_id=user_id,
                 endpoint=endpoint,
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_rename_analytics_met_name_wind_timestamp_idx_analytics_m_name_334540_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performancemetricrollup',
+            name='latency_sketch',
+            field=models.JSONField(blank=True, default=dict, help_text='Mergeable response-time sketch for percentiles (see services/latency_sketch.py).', verbose_name='Latency Sketch'),
+        ),
+    ]
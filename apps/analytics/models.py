@@ -713,6 +713,12 @@ class PerformanceMetricRollup(models.Model):
         default=0,
         verbose_name='Total Requests',
     )
+    latency_sketch = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Latency Sketch',
+        help_text='Mergeable response-time sketch for percentiles (see services/latency_sketch.py).',
+    )
 
     class Meta:
         verbose_name = 'Performance Metric Rollup'
@@ -5,7 +5,7 @@ Internal observability dashboard service for analytics system health.
 
 Provides pre-computed metrics for admin-only dashboard endpoints:
   - Ingestion rate graph
-  - Query latency distribution
+  - Query latency distribution and p50/p95/p99 (from rollup sketches)
   - Storage growth by table
   - Error rate by endpoint
   - Cache hit/miss rates
@@ -16,6 +16,7 @@ All data is cached for 60 seconds for fast admin panel rendering.
 from __future__ import annotations
 
 import logging
+from bisect import bisect_right
 from datetime import timedelta
 from typing import Any
 
@@ -29,8 +30,10 @@ from apps.analytics.models import (
     BusinessMetric,
     Metric,
     PerformanceMetric,
+    PerformanceMetricRollup,
     UserActivity,
 )
+from apps.analytics.services.latency_sketch import LatencySketch
 
 logger = logging.getLogger(__name__)
 
@@ -166,10 +169,26 @@ class DashboardService:
     # Query Latency Distribution
     # ========================================================================
 
+    LATENCY_BUCKETS = [
+        (0, 50, "0-50ms"),
+        (50, 100, "50-100ms"),
+        (100, 250, "100-250ms"),
+        (250, 500, "250-500ms"),
+        (500, 1000, "500-1000ms"),
+        (1000, 5000, "1000-5000ms"),
+        (5000, 999999, "5000ms+"),
+    ]
+
     @classmethod
     async def aget_query_latency_distribution(cls, hours: int = 24) -> dict[str, Any]:
         """
-        Get query latency distribution from PerformanceMetric data.
+        Get query latency distribution from PerformanceMetricRollup data.
+
+        Reads rollups only, never raw PerformanceMetric rows: whole hours
+        from the 1h rollup, the current hour from 5m rows and the current
+        five minutes from 1m rows, in one query. The window is hour-aligned
+        (``hours`` back from the start of the current hour). Percentiles
+        and buckets come from the merged latency sketches, accurate to 1%.
 
         Args:
             hours: Number of hours to look back.
@@ -183,50 +202,53 @@ class DashboardService:
             return cached
 
         now = timezone.now()
-        since = now - timedelta(hours=hours)
-
-        # Get aggregated latency stats
-        from django.db.models import Max, Min, Avg
-
-        stats = await PerformanceMetric.objects.filter(timestamp__gte=since).aaggregate(
-            avg_latency=Avg("response_time_ms"),
-            max_latency=Max("response_time_ms"),
-            min_latency=Min("response_time_ms"),
-            total_requests=Count("id"),
-        )
-
-        # Get latency buckets
-        buckets = [
-            (0, 50, "0-50ms"),
-            (50, 100, "50-100ms"),
-            (100, 250, "100-250ms"),
-            (250, 500, "250-500ms"),
-            (500, 1000, "500-1000ms"),
-            (1000, 5000, "1000-5000ms"),
-            (5000, 999999, "5000ms+"),
-        ]
-
-        distribution = []
-        for low, high, label in buckets:
-            count = await PerformanceMetric.objects.filter(
-                timestamp__gte=since,
-                response_time_ms__gte=low,
-                response_time_ms__lt=high,
-            ).acount()
-            distribution.append({
+        hour_floor = now.replace(minute=0, second=0, microsecond=0)
+        five_floor = hour_floor.replace(minute=(now.minute // 5) * 5)
+        since = hour_floor - timedelta(hours=hours)
+
+        rollups = PerformanceMetricRollup.objects.filter(
+            Q(window="1h", timestamp__gte=since, timestamp__lt=hour_floor)
+            | Q(window="5m", timestamp__gte=hour_floor, timestamp__lt=five_floor)
+            | Q(window="1m", timestamp__gte=five_floor)
+        ).values_list("avg_response_time", "total", "latency_sketch")
+
+        sketch = LatencySketch()
+        total_requests = 0
+        weighted = 0.0
+        async for avg_response_time, total, latency_sketch in rollups:
+            sketch.merge(LatencySketch.from_dict(latency_sketch))
+            total_requests += total
+            weighted += avg_response_time * total
+
+        counts = [0] * len(cls.LATENCY_BUCKETS)
+        lows = [low for low, _, _ in cls.LATENCY_BUCKETS]
+        for value, n in sketch.items():
+            counts[max(bisect_right(lows, value) - 1, 0)] += n
+
+        distribution = [
+            {
                 "bucket": label,
                 "count": count,
-                "percentage": round((count / stats["total_requests"] * 100), 2) if stats["total_requests"] else 0,
-            })
+                "percentage": round((count / sketch.count * 100), 2) if sketch.count else 0,
+            }
+            for (_, _, label), count in zip(cls.LATENCY_BUCKETS, counts)
+        ]
+
+        def percentile(q: float) -> float:
+            value = sketch.quantile(q)
+            return round(value, 2) if value is not None else 0
 
         result = {
             "generated_at": now.isoformat(),
             "hours": hours,
             "stats": {
-                "avg_latency_ms": round(stats["avg_latency"], 2) if stats["avg_latency"] else 0,
-                "max_latency_ms": stats["max_latency"] or 0,
-                "min_latency_ms": stats["min_latency"] or 0,
-                "total_requests": stats["total_requests"],
+                "avg_latency_ms": round(weighted / total_requests, 2) if total_requests else 0,
+                "max_latency_ms": sketch.max or 0,
+                "min_latency_ms": sketch.min or 0,
+                "p50_latency_ms": percentile(0.50),
+                "p95_latency_ms": percentile(0.95),
+                "p99_latency_ms": percentile(0.99),
+                "total_requests": total_requests,
             },
             "distribution": distribution,
         }
@@ -0,0 +1,125 @@
+"""
+apps/analytics/services/latency_sketch.py
+==========================================
+Mergeable latency sketch for percentile queries over rollups.
+
+A log-bucketed histogram (DDSketch layout): a value v > 0 lands in bucket
+ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a), so every quantile is
+returned within relative accuracy ``a`` (1%) of the true value. Sketches
+merge by adding bucket counts — a 1d sketch is the exact sum of its 1h
+sketches — which is what lets dashboards answer p50/p95/p99 from
+PerformanceMetricRollup rows without touching raw PerformanceMetric data.
+
+Serialised form (PerformanceMetricRollup.latency_sketch):
+    {"n": count, "zero": count_of_zero_values, "min": ms, "max": ms,
+     "bins": {"<index>": count, ...}}
+
+A 1 ms – 10 min range needs at most ~660 buckets; a typical endpoint uses
+a few dozen.
+
+Usage:
+    from apps.analytics.services.latency_sketch import LatencySketch
+
+    sketch = LatencySketch()
+    sketch.add(120, n=3)
+    sketch.merge(LatencySketch.from_dict(rollup.latency_sketch))
+    p95 = sketch.quantile(0.95)
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Iterator
+
+
+class LatencySketch:
+    """Relative-error quantile sketch over non-negative latencies (ms)."""
+
+    RELATIVE_ACCURACY = 0.01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _LOG_GAMMA = math.log(GAMMA)
+
+    def __init__(self):
+        self.bins: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    # ---------- building ----------
+
+    @classmethod
+    def _index(cls, value: float) -> int:
+        return math.ceil(math.log(value) / cls._LOG_GAMMA)
+
+    @classmethod
+    def _value(cls, index: int) -> float:
+        """Representative value of a bucket (its midpoint in relative terms)."""
+        return 2 * cls.GAMMA ** index / (cls.GAMMA + 1)
+
+    def add(self, value: float, n: int = 1) -> None:
+        if n <= 0:
+            return
+        if value <= 0:
+            value = 0
+            self.zero += n
+        else:
+            index = self._index(value)
+            self.bins[index] = self.bins.get(index, 0) + n
+        self.count += n
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: LatencySketch) -> None:
+        if not other.count:
+            return
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    # ---------- querying ----------
+
+    def items(self) -> Iterator[tuple[float, int]]:
+        """(representative value, count) pairs in ascending value order."""
+        if self.zero:
+            yield 0.0, self.zero
+        for index in sorted(self.bins):
+            yield self._value(index), self.bins[index]
+
+    def quantile(self, q: float) -> float | None:
+        """Value at quantile ``q`` (0..1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, n in self.items():
+            seen += n
+            if seen > rank:
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    # ---------- serialisation ----------
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "n": self.count,
+            "zero": self.zero,
+            "min": self.min,
+            "max": self.max,
+            "bins": {str(index): n for index, n in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> LatencySketch:
+        sketch = cls()
+        if not data:
+            return sketch
+        sketch.bins = {int(index): int(n) for index, n in (data.get("bins") or {}).items()}
+        sketch.zero = int(data.get("zero") or 0)
+        sketch.count = int(data.get("n") or 0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
@@ -6,15 +6,27 @@ This service provides Counter, Gauge, and Histogram primitives and can render
 metrics in the Prometheus text exposition format without requiring the
 prometheus_client package. If prometheus_client is installed, its native types
 are used where convenient.
+
+Cardinality is bounded: each metric keeps at most ANALYTICS_METRICS_MAX_SERIES
+label series (default 500) per process. Once the limit is reached, new label
+combinations are folded into a single overflow series whose labels are all
+``__overflow__``, so a caller that leaks a high-cardinality value (raw paths,
+ids) cannot grow memory or render time without bound.
+
+Histograms record one per-bucket count per observation (bisect over the
+sorted bounds) and derive the cumulative ``le`` counts at render time.
 """
 
 from __future__ import annotations
 
 import logging
 import time
-from collections import defaultdict
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +37,13 @@ except ImportError:  # pragma: no cover
     PromCounter = PromGauge = PromHistogram = None
 
 
+OVERFLOW_LABEL = "__overflow__"
+
+
+def _max_series() -> int:
+    return int(getattr(settings, "ANALYTICS_METRICS_MAX_SERIES", 500))
+
+
 @dataclass
 class _MetricSeries:
     """Internal representation of a metric label series."""
@@ -32,7 +51,13 @@ class _MetricSeries:
     value: float = 0.0
     count: int = 0
     sum_value: float = 0.0
-    buckets: Dict[float, int] = field(default_factory=lambda: defaultdict(int))
+    bounds: Tuple[float, ...] = ()
+    bucket_counts: List[int] = field(default_factory=list)
+
+    @property
+    def buckets(self) -> Dict[float, int]:
+        """Cumulative (``le``) count per histogram bucket bound."""
+        return dict(zip(self.bounds, accumulate(self.bucket_counts)))
 
 
 class _BaseMetric:
@@ -43,18 +68,30 @@ class _BaseMetric:
         self.description = description
         self.labelnames = labelnames or []
         self.series: Dict[str, _MetricSeries] = {}
+        self.max_series = _max_series()
         self._prom_metric = None
 
     def _key(self, labels: Dict[str, str]) -> str:
         return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
 
+    def _new_series(self, labels: Dict[str, str]) -> _MetricSeries:
+        return _MetricSeries(labels=dict(labels))
+
     def _get_series(self, labels: Dict[str, str]) -> _MetricSeries:
         for name in self.labelnames:
             labels.setdefault(name, "")
         key = self._key(labels)
-        if key not in self.series:
-            self.series[key] = _MetricSeries(labels=dict(labels))
-        return self.series[key]
+        series = self.series.get(key)
+        if series is not None:
+            return series
+        if labels and len(self.series) >= self.max_series:
+            labels.update((name, OVERFLOW_LABEL) for name in labels)
+            key = self._key(labels)
+            series = self.series.get(key)
+            if series is not None:
+                return series
+        series = self.series[key] = self._new_series(labels)
+        return series
 
 
 class Counter(_BaseMetric):
@@ -71,6 +108,10 @@ class Counter(_BaseMetric):
             else:
                 self._prom_metric.inc(amount)
 
+    def set_total(self, labels: Optional[Dict[str, str]] = None, value: float = 0.0):
+        """Mirror a monotonic count kept elsewhere (collected at render time)."""
+        self._get_series(labels or {}).value = value
+
 
 class Gauge(_BaseMetric):
     """Gauge metric that can go up and down."""
@@ -109,15 +150,23 @@ class Histogram(_BaseMetric):
         super().__init__(name, description, labelnames)
         self.buckets = sorted(buckets or [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0])
         self.buckets.append(float("inf"))
+        self._bounds = tuple(self.buckets)
+
+    def _new_series(self, labels: Dict[str, str]) -> _MetricSeries:
+        return _MetricSeries(
+            labels=dict(labels),
+            bounds=self._bounds,
+            bucket_counts=[0] * len(self._bounds),
+        )
 
     def observe(self, labels: Optional[Dict[str, str]] = None, value: float = 0.0):
         labels = labels or {}
         series = self._get_series(labels)
         series.count += 1
         series.sum_value += value
-        for bucket in self.buckets:
-            if value <= bucket:
-                series.buckets[bucket] += 1
+        # First bound >= value — the single bucket this observation lands in.
+        index = bisect_left(self._bounds, value)
+        series.bucket_counts[min(index, len(self._bounds) - 1)] += 1
 
 
 class AnalyticsMetricsService:
@@ -181,6 +230,13 @@ class AnalyticsMetricsService:
                 labelnames=["source"],
             )
         )
+        self._register(
+            Counter(
+                "analytics_event_buffer_total",
+                "Real-time analytics events by buffer outcome (published, dropped, failed)",
+                labelnames=["outcome"],
+            )
+        )
         self._register(
             Gauge(
                 "analytics_realtime_events_active",
@@ -188,6 +244,34 @@ class AnalyticsMetricsService:
                 labelnames=[],
             )
         )
+        self._register(
+            Counter(
+                "provider_http_requests_total",
+                "Outbound provider HTTP requests (including retries)",
+                labelnames=["provider"],
+            )
+        )
+        self._register(
+            Counter(
+                "provider_http_connections_opened_total",
+                "New TCP connections opened to provider APIs",
+                labelnames=["provider"],
+            )
+        )
+        self._register(
+            Counter(
+                "provider_http_tls_handshakes_total",
+                "TLS handshakes performed with provider APIs",
+                labelnames=["provider"],
+            )
+        )
+        self._register(
+            Gauge(
+                "provider_http_pool_connections",
+                "Pooled provider HTTP connections by state (open, idle)",
+                labelnames=["base_url", "kind", "state"],
+            )
+        )
 
     def _register(self, metric: _BaseMetric):
         self.metrics[metric.name] = metric
@@ -209,6 +293,9 @@ class AnalyticsMetricsService:
     def record_error(self, source: str):
         self.metrics["analytics_errors_total"].inc(labels={"source": source})
 
+    def record_event_buffer(self, outcome: str, amount: int = 1):
+        self.metrics["analytics_event_buffer_total"].inc(labels={"outcome": outcome}, amount=amount)
+
     def set_rollup_cache_hit_ratio(self, window: str, ratio: float):
         self.metrics["analytics_rollup_cache_hit_ratio"].set(
             labels={"window": window}, value=ratio
@@ -217,8 +304,31 @@ class AnalyticsMetricsService:
     def set_realtime_consumers(self, count: int):
         self.metrics["analytics_realtime_events_active"].set(value=float(count))
 
+    def collect_provider_pools(self):
+        """Copy the provider HTTP pool counters of this process into the registry."""
+        from apps.common.http.pool import provider_pool_stats
+
+        stats = provider_pool_stats()
+        for provider, counters in stats["providers"].items():
+            for counter, value in counters.items():
+                self.metrics[f"provider_http_{counter}_total"].set_total(
+                    labels={"provider": provider}, value=float(value)
+                )
+        pool_gauge = self.metrics["provider_http_pool_connections"]
+        pool_gauge.series.clear()
+        for pool in stats["pools"]:
+            for state in ("open", "idle"):
+                pool_gauge.set(
+                    labels={"base_url": pool["base_url"], "kind": pool["kind"], "state": state},
+                    value=float(pool[state]),
+                )
+
     def render_prometheus(self) -> str:
         """Render all registered metrics in Prometheus text exposition format."""
+        try:
+            self.collect_provider_pools()
+        except Exception as exc:  # pragma: no cover - metrics must never break the export
+            logger.debug("provider pool metrics unavailable: %s", exc)
         lines: List[str] = []
         for metric in self.metrics.values():
             lines.append(f"# HELP {metric.name} {metric.description}")
@@ -230,10 +340,11 @@ class AnalyticsMetricsService:
                         f'{k}="{v}"' for k, v in sorted(series.labels.items())
                     ) + "}"
                 if isinstance(metric, Histogram):
-                    for bucket in metric.buckets:
+                    extra_labels = self._append_labels(label_str)
+                    for bucket, cumulative in series.buckets.items():
                         bucket_str = "+Inf" if bucket == float("inf") else str(bucket)
                         lines.append(
-                            f'{metric.name}_bucket{{le="{bucket_str}"{self._append_labels(label_str)}}} {series.buckets.get(bucket, 0)}'
+                            f'{metric.name}_bucket{{le="{bucket_str}"{extra_labels}}} {cumulative}'
                         )
                     lines.append(
                         f"{metric.name}_sum{label_str} {series.sum_value}"
@@ -5,13 +5,31 @@ Real-time analytics service using Redis Streams.
 Produces lightweight analytics events (page views, API calls, errors) to a
 Redis Stream and consumes them for dashboard aggregation. WebSocket consumers
 can subscribe to the aggregated stream for live updates.
+
+Request-path producers (AnalyticsMiddleware) use ``enqueue_analytics_event``:
+the event is appended to a bounded in-process buffer (no I/O, no lock held
+across the network) and a daemon flusher thread XADDs buffered events to the
+stream in pipelined batches. When the buffer is full — Redis slow or down —
+events are dropped according to ANALYTICS_EVENT_DROP_POLICY and counted in
+``analytics_event_buffer_total{outcome="dropped"}``; analytics never applies
+backpressure to API requests.
+
+Settings:
+    ANALYTICS_EVENT_BUFFER_SIZE      max buffered events per process (10000)
+    ANALYTICS_EVENT_BATCH_SIZE       events per pipelined flush (200)
+    ANALYTICS_EVENT_FLUSH_INTERVAL   max seconds an event waits (0.5)
+    ANALYTICS_EVENT_DROP_POLICY      "newest" (reject new events) or "oldest"
 """
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import os
+import threading
 import time
+from collections import deque
 from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional
 
@@ -53,16 +71,21 @@ class RealtimeAnalyticsService:
         redis_url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
         return Redis.from_url(redis_url, decode_responses=True)
 
+    @staticmethod
+    def _event_fields(event: RealtimeEvent) -> Dict[str, Any]:
+        # Redis stream fields cannot be None — send empty strings instead.
+        payload = asdict(event)
+        payload["metadata"] = json.dumps(payload.get("metadata") or {})
+        return {key: ("" if value is None else value) for key, value in payload.items()}
+
     def publish_event(self, event: RealtimeEvent) -> bool:
         """Publish a single analytics event to the Redis Stream."""
         if not self.redis:
             return False
         try:
-            payload = asdict(event)
-            payload["metadata"] = json.dumps(payload.get("metadata") or {})
             self.redis.xadd(
                 STREAM_KEY,
-                payload,
+                self._event_fields(event),
                 maxlen=MAX_STREAM_LEN,
                 approximate=True,
             )
@@ -71,6 +94,21 @@ class RealtimeAnalyticsService:
             logger.warning("[RealtimeAnalyticsService] publish failed: %s", exc)
             return False
 
+    def publish_events(self, events: List[RealtimeEvent]) -> int:
+        """Publish many events with one pipelined round trip. Returns the count sent."""
+        if not self.redis or not events:
+            return 0
+        pipe = self.redis.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(
+                STREAM_KEY,
+                self._event_fields(event),
+                maxlen=MAX_STREAM_LEN,
+                approximate=True,
+            )
+        pipe.execute()
+        return len(events)
+
     def ensure_consumer_group(self) -> None:
         """Create the consumer group if it does not exist."""
         if not self.redis:
@@ -194,3 +232,162 @@ def publish_analytics_event(
         metadata=metadata,
     )
     return service.publish_event(event)
+
+
+class AnalyticsEventBuffer:
+    """
+    Bounded per-process event buffer drained by a background flusher thread.
+
+    ``offer()`` is O(1) and never touches the network, so it is safe from
+    both sync and async request paths. The flusher wakes when a full batch
+    is waiting or every ``flush_interval`` seconds, and sends each batch as
+    one Redis pipeline. On a Redis error the batch is put back (as far as
+    capacity allows) and the flusher backs off; once the buffer is full,
+    the drop policy decides which events are lost.
+    """
+
+    _MAX_BACKOFF = 5.0
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float, drop_policy: str = "newest"):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_oldest = drop_policy == "oldest"
+        self.stats = {"enqueued": 0, "published": 0, "dropped": 0, "failed": 0}
+        self._events: deque = deque()
+        self._cond = threading.Condition()
+        self._service: Optional[RealtimeAnalyticsService] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def offer(self, event: RealtimeEvent) -> bool:
+        """Buffer one event. Returns False if an event had to be dropped."""
+        with self._cond:
+            dropped = len(self._events) >= self.max_size
+            if dropped:
+                self.stats["dropped"] += 1
+                if self.drop_oldest:
+                    self._events.popleft()
+            if not dropped or self.drop_oldest:
+                self._events.append(event)
+                self.stats["enqueued"] += 1
+            if len(self._events) >= self.batch_size:
+                self._cond.notify()
+        if dropped:
+            _record_buffer_outcome("dropped")
+        self._ensure_flusher()
+        return not dropped
+
+    def flush(self) -> int:
+        """Send everything buffered now. Returns the number of events published."""
+        published = 0
+        while True:
+            with self._cond:
+                batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+            if not batch:
+                return published
+            try:
+                sent = self._get_service().publish_events(batch)
+            except Exception as exc:
+                self._requeue(batch)
+                logger.debug("[AnalyticsEventBuffer] flush of %d events failed: %s", len(batch), exc)
+                raise
+            published += sent
+            with self._cond:
+                self.stats["published"] += sent
+            _record_buffer_outcome("published", sent)
+
+    def pending(self) -> int:
+        return len(self._events)
+
+    def _requeue(self, batch: List[RealtimeEvent]) -> None:
+        with self._cond:
+            room = max(self.max_size - len(self._events), 0)
+            keep = batch[:room]
+            self._events.extendleft(reversed(keep))
+            lost = len(batch) - len(keep)
+            self.stats["failed"] += lost
+        if lost:
+            _record_buffer_outcome("failed", lost)
+
+    def _get_service(self) -> RealtimeAnalyticsService:
+        if self._service is None:
+            self._service = RealtimeAnalyticsService()
+        return self._service
+
+    def _ensure_flusher(self) -> None:
+        # Restart after fork (gunicorn --preload): threads do not survive it.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._service = None
+            self._thread = threading.Thread(target=self._run, name="analytics-event-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._cond:
+                if len(self._events) < self.batch_size:
+                    self._cond.wait(self.flush_interval + backoff)
+            try:
+                self.flush()
+                backoff = 0.0
+            except Exception:
+                backoff = min(max(backoff * 2, self.flush_interval), self._MAX_BACKOFF)
+
+
+def _record_buffer_outcome(outcome: str, amount: int = 1) -> None:
+    try:
+        from apps.analytics.services.metrics_service import get_metrics_service
+        get_metrics_service().record_event_buffer(outcome, amount)
+    except Exception:
+        pass
+
+
+event_buffer = AnalyticsEventBuffer(
+    max_size=int(getattr(settings, "ANALYTICS_EVENT_BUFFER_SIZE", 10000)),
+    batch_size=int(getattr(settings, "ANALYTICS_EVENT_BATCH_SIZE", 200)),
+    flush_interval=float(getattr(settings, "ANALYTICS_EVENT_FLUSH_INTERVAL", 0.5)),
+    drop_policy=getattr(settings, "ANALYTICS_EVENT_DROP_POLICY", "newest"),
+)
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        event_buffer.flush()
+    except Exception:
+        pass
+
+
+def enqueue_analytics_event(
+    event_type: str,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    response_time_ms: Optional[int] = None,
+    status_code: Optional[int] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Non-blocking counterpart of ``publish_analytics_event`` for request paths.
+
+    Buffers the event for the background flusher and returns immediately.
+    Returns False only when the event was dropped because the buffer is full.
+    """
+    return event_buffer.offer(
+        RealtimeEvent(
+            event_type=event_type,
+            timestamp=time.time(),
+            user_id=user_id,
+            session_id=session_id,
+            endpoint=endpoint,
+            response_time_ms=response_time_ms,
+            status_code=status_code,
+            metadata=metadata,
+        )
+    )
@@ -4,6 +4,13 @@ Metric aggregation Celery tasks.
 
 Rolls up analytics metrics into coarser time windows and caches results for
 fast dashboard reads. Tasks are routed to the analytics queue.
+
+Only the 1m rollup reads raw rows; 5m, 1h and 1d fold the rollup one level
+down (1m → 5m → 1h → 1d), each with a single upsert per rollup table.
+Before folding, a coarse window re-rolls every finer slot it covers (the
+1m slots from one raw GROUP BY per minute bucket), so a missed 1m run or
+late raw rows heal at the next coarser run, as they did when every window
+read raw rows.
 """
 
 from __future__ import annotations
@@ -34,94 +41,225 @@ def _get_window_floor(interval_minutes: int) -> datetime:
     )
 
 
-async def _aggregate_metrics(window_start: datetime, window_end: datetime, window_label: str = "1m"):
-    """Aggregate Metric and PerformanceMetric records within a window.
+# Window length of each rollup and the finer rollup it is built from.
+# 1m reads raw Metric / PerformanceMetric rows; every coarser window folds
+# the rollup rows one level down after refreshing them (_refresh_rollups).
+_WINDOW_SPANS = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+_ROLLUP_SOURCES = {"5m": "1m", "1h": "5m", "1d": "1h"}
 
-    Persists results to MetricRollup and PerformanceMetricRollup models
-    for fast dashboard queries, in addition to caching.
+_METRIC_KEYS = ["name", "metric_type", "window", "timestamp"]
+_METRIC_FIELDS = ["avg", "min", "max", "count", "sum"]
+_PERF_KEYS = ["endpoint", "method", "window", "timestamp"]
+_PERF_FIELDS = ["avg_response_time", "max_response_time", "error_count", "total", "latency_sketch"]
+
+
+def _raw_groups(window_start: datetime, window_end: datetime):
+    """GROUP BY querysets over raw rows — the 1m source.
+
+    Rows are bucketed per minute (``slot``), so one pass rolls up every 1m
+    slot of a longer range. Performance rows are grouped down to the
+    distinct response time so the latency sketch is built from the same
+    single pass as the totals.
     """
-    from apps.analytics.models import Metric, PerformanceMetric, MetricRollup, PerformanceMetricRollup
+    from apps.analytics.models import Metric, PerformanceMetric
     from django.db.models import Avg, Count, Max, Min, Q, Sum
+    from django.db.models.functions import TruncMinute
 
-    # Aggregate metrics by name
     metric_groups = (
         Metric.objects.filter(timestamp__gte=window_start, timestamp__lt=window_end)
-        .values("name", "metric_type")
+        .order_by()
+        .annotate(slot=TruncMinute("timestamp"))
+        .values("slot", "name", "metric_type")
         .annotate(
             avg_value=Avg("value"),
             min_value=Min("value"),
             max_value=Max("value"),
-            count=Count("id"),
+            sample_count=Count("id"),
             sum_value=Sum("value"),
         )
     )
-
-    metric_rollups_created = 0
-    async for group in metric_groups:
-        await MetricRollup.objects.aupdate_or_create(
-            name=group["name"],
-            metric_type=group["metric_type"],
-            window=window_label,
-            timestamp=window_start,
-            defaults={
-                "avg": group["avg_value"] or 0,
-                "min": group["min_value"] or 0,
-                "max": group["max_value"] or 0,
-                "count": group["count"],
-                "sum": group["sum_value"] or 0,
-            },
-        )
-        metric_rollups_created += 1
-
-    # Aggregate performance metrics by endpoint + method
     perf_groups = (
         PerformanceMetric.objects.filter(timestamp__gte=window_start, timestamp__lt=window_end)
-        .values("endpoint", "method")
+        .order_by()
+        .annotate(slot=TruncMinute("timestamp"))
+        .values("slot", "endpoint", "method", "response_time_ms")
         .annotate(
-            avg_response_time=Avg("response_time_ms"),
-            max_response_time=Max("response_time_ms"),
-            error_count=Count("id", filter=~Q(status_code__range=(200, 299))),
-            total=Count("id"),
+            errors=Count("id", filter=~Q(status_code__range=(200, 299))),
+            requests=Count("id"),
         )
     )
+    return metric_groups, perf_groups
 
-    perf_rollups_created = 0
-    async for group in perf_groups:
-        await PerformanceMetricRollup.objects.aupdate_or_create(
-            endpoint=group["endpoint"],
-            method=group["method"],
-            window=window_label,
-            timestamp=window_start,
-            defaults={
-                "avg_response_time": group["avg_response_time"] or 0,
-                "max_response_time": group["max_response_time"] or 0,
-                "error_count": group["error_count"],
-                "total": group["total"],
-            },
+
+def _cascade_groups(window_start: datetime, window_end: datetime, source: str):
+    """Querysets folding the finer ``source`` rollup rows.
+
+    Counts, sums and errors add; min/max fold; averages are re-derived as
+    sum/count (metrics) and total-weighted means (response times), so a
+    cascaded rollup matches one computed from the raw rows. Performance
+    rows are read as-is — latency sketches merge in Python.
+    """
+    from apps.analytics.models import MetricRollup, PerformanceMetricRollup
+    from django.db.models import Max, Min, Sum
+
+    metric_groups = (
+        MetricRollup.objects.filter(window=source, timestamp__gte=window_start, timestamp__lt=window_end)
+        .order_by()
+        .values("name", "metric_type")
+        .annotate(
+            min_value=Min("min"),
+            max_value=Max("max"),
+            sample_count=Sum("count"),
+            sum_value=Sum("sum"),
+        )
+    )
+    perf_groups = (
+        PerformanceMetricRollup.objects.filter(window=source, timestamp__gte=window_start, timestamp__lt=window_end)
+        .order_by()
+        .values(
+            "endpoint", "method", "avg_response_time", "max_response_time",
+            "error_count", "total", "latency_sketch",
         )
-        perf_rollups_created += 1
-
-    # Overall stats for cache
-    metric_stats = await Metric.objects.filter(
-        timestamp__gte=window_start, timestamp__lt=window_end
-    ).aaggregate(count=Count('id'), avg_value=Avg('value'))
-
-    perf_stats = await PerformanceMetric.objects.filter(
-        timestamp__gte=window_start, timestamp__lt=window_end
-    ).aaggregate(
-        count=Count('id'),
-        avg_response_time=Avg('response_time_ms'),
-        error_count=Count('id', filter=~Q(status_code__range=(200, 299))),
     )
+    return metric_groups, perf_groups
+
+
+async def _refresh_rollups(window_label: str, range_start: datetime, range_end: datetime) -> None:
+    """Re-roll every ``window_label`` slot in [range_start, range_end), finest level first."""
+    source = _ROLLUP_SOURCES.get(window_label)
+    if source is None:
+        # 1m: one raw pass, bucketed per minute
+        await _aggregate_metrics(range_start, range_end, window_label=window_label, refresh=False)
+        return
+    await _refresh_rollups(source, range_start, range_end)
+    span = _WINDOW_SPANS[window_label]
+    slot = range_start
+    while slot < range_end:
+        await _aggregate_metrics(slot, slot + span, window_label=window_label, refresh=False)
+        slot += span
+
+
+async def _aggregate_metrics(
+    window_start: datetime, window_end: datetime, window_label: str = "1m", refresh: bool = True
+):
+    """Aggregate Metric and PerformanceMetric records within a window.
+
+    Persists results to MetricRollup and PerformanceMetricRollup models
+    for fast dashboard queries, in addition to caching. Each table costs
+    one GROUP BY read and one multi-row upsert (INSERT … ON CONFLICT DO
+    UPDATE via ``bulk_create(update_conflicts=True)``), so re-running a
+    window is idempotent. Performance rollups carry a LatencySketch so
+    percentiles can be answered from any window. The window summary is folded from the same
+    groups — no extra aggregate pass.
+
+    Windows coarser than 1m cascade from the rollup one level down (see
+    ``_ROLLUP_SOURCES``). With ``refresh`` every source slot in the window
+    is re-rolled first, down to the raw rows: a source task may have been
+    missed, failed, or run before late rows arrived. A 1m call spanning
+    several minutes writes one rollup per minute.
+    """
+    from apps.analytics.models import MetricRollup, PerformanceMetricRollup
+    from apps.analytics.services.latency_sketch import LatencySketch
+
+    source = _ROLLUP_SOURCES.get(window_label)
+    if source:
+        if refresh:
+            await _refresh_rollups(source, window_start, window_end)
+        metric_groups, perf_groups = _cascade_groups(window_start, window_end, source)
+    else:
+        metric_groups, perf_groups = _raw_groups(window_start, window_end)
+
+    metric_rollups = []
+    metric_count = 0
+    metric_sum = 0.0
+    async for group in metric_groups:
+        count = group["sample_count"] or 0
+        total = group["sum_value"] or 0
+        avg = group.get("avg_value")
+        if avg is None:
+            avg = total / count if count else 0
+        metric_rollups.append(MetricRollup(
+            name=group["name"],
+            metric_type=group["metric_type"],
+            window=window_label,
+            timestamp=group.get("slot") or window_start,
+            avg=avg,
+            min=group["min_value"] or 0,
+            max=group["max_value"] or 0,
+            count=count,
+            sum=total,
+        ))
+        metric_count += count
+        metric_sum += total
+
+    perf_acc: dict[tuple[datetime, str, str], dict] = {}
+    async for row in perf_groups:
+        key = (row.get("slot") or window_start, row["endpoint"], row["method"])
+        acc = perf_acc.get(key)
+        if acc is None:
+            acc = perf_acc[key] = {
+                "total": 0, "errors": 0, "weighted": 0.0, "max": 0, "sketch": LatencySketch(),
+            }
+        if source:
+            requests = row["total"] or 0
+            acc["weighted"] += (row["avg_response_time"] or 0) * requests
+            acc["max"] = max(acc["max"], row["max_response_time"] or 0)
+            acc["errors"] += row["error_count"] or 0
+            acc["sketch"].merge(LatencySketch.from_dict(row["latency_sketch"]))
+        else:
+            requests = row["requests"]
+            acc["weighted"] += row["response_time_ms"] * requests
+            acc["max"] = max(acc["max"], row["response_time_ms"])
+            acc["errors"] += row["errors"]
+            acc["sketch"].add(row["response_time_ms"], requests)
+        acc["total"] += requests
+
+    perf_rollups = [
+        PerformanceMetricRollup(
+            endpoint=endpoint,
+            method=method,
+            window=window_label,
+            timestamp=slot,
+            avg_response_time=acc["weighted"] / acc["total"] if acc["total"] else 0,
+            max_response_time=acc["max"],
+            error_count=acc["errors"],
+            total=acc["total"],
+            latency_sketch=acc["sketch"].to_dict(),
+        )
+        for (slot, endpoint, method), acc in perf_acc.items()
+    ]
+    request_count = sum(acc["total"] for acc in perf_acc.values())
+    error_count = sum(acc["errors"] for acc in perf_acc.values())
+    weighted_time = sum(acc["weighted"] for acc in perf_acc.values())
+
+    if metric_rollups:
+        await MetricRollup.objects.abulk_create(
+            metric_rollups,
+            update_conflicts=True,
+            unique_fields=_METRIC_KEYS,
+            update_fields=_METRIC_FIELDS,
+        )
+    if perf_rollups:
+        await PerformanceMetricRollup.objects.abulk_create(
+            perf_rollups,
+            update_conflicts=True,
+            unique_fields=_PERF_KEYS,
+            update_fields=_PERF_FIELDS,
+        )
 
     return {
-        "metric_count": metric_stats.get('count', 0),
-        "avg_metric_value": metric_stats.get('avg_value') or 0,
-        "request_count": perf_stats.get('count', 0),
-        "avg_response_time_ms": perf_stats.get('avg_response_time') or 0,
-        "error_count": perf_stats.get('error_count', 0),
-        "metric_rollups_created": metric_rollups_created,
-        "perf_rollups_created": perf_rollups_created,
+        "metric_count": metric_count,
+        "avg_metric_value": metric_sum / metric_count if metric_count else 0,
+        "request_count": request_count,
+        "avg_response_time_ms": weighted_time / request_count if request_count else 0,
+        "error_count": error_count,
+        "metric_rollups_created": len(metric_rollups),
+        "perf_rollups_created": len(perf_rollups),
         "window_start": window_start.isoformat(),
         "window_end": window_end.isoformat(),
     }
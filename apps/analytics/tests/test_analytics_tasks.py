@@ -230,3 +230,80 @@ def test_rollup_1d_caches_result():
     cache_key = f"analytics:rollup:1d:{end.strftime('%Y%m%d')}"
     cached = cache.get(cache_key)
     assert cached is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rollups_upsert_and_cascade_from_finer_windows():
+    """1m rollups upsert idempotently; 5m folds the 1m rows without rescanning raw data."""
+    from datetime import datetime, timedelta, timezone as dt_timezone
+
+    from asgiref.sync import async_to_sync
+
+    from apps.analytics.models import (
+        Metric,
+        MetricRollup,
+        PerformanceMetric,
+        PerformanceMetricRollup,
+    )
+    from apps.analytics.tasks import aggregation_tasks
+
+    start = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+    aggregate = async_to_sync(aggregation_tasks._aggregate_metrics)
+    for minute, values, timings in ((0, (1.0, 3.0), (100, 300)), (4, (10.0,), (50,))):
+        at = start + timedelta(minutes=minute, seconds=5)
+        Metric.objects.bulk_create([Metric(name="cart.add", value=v, timestamp=at) for v in values])
+        PerformanceMetric.objects.bulk_create([
+            PerformanceMetric(endpoint="/api/cart/", method="POST", response_time_ms=ms,
+                              status_code=500 if ms == 300 else 200, timestamp=at)
+            for ms in timings
+        ])
+
+    first = start, start + timedelta(minutes=1)
+    aggregate(*first, window_label="1m")
+    aggregate(*first, window_label="1m")
+    assert MetricRollup.objects.filter(window="1m").count() == 1
+
+    # The final 1m slot (minute 4) has not been rolled up yet; the 5m run refreshes it.
+    with patch.object(aggregation_tasks, "_raw_groups", wraps=aggregation_tasks._raw_groups) as raw:
+        result = aggregate(start, start + timedelta(minutes=5), window_label="5m")
+    assert raw.call_count == 1
+
+    rollup = MetricRollup.objects.get(window="5m")
+    assert (rollup.count, rollup.sum, rollup.min, rollup.max) == (3, 14.0, 1.0, 10.0)
+    assert rollup.avg == pytest.approx(14.0 / 3)
+
+    perf = PerformanceMetricRollup.objects.get(window="5m")
+    assert (perf.total, perf.error_count, perf.max_response_time) == (3, 1, 300)
+    assert perf.avg_response_time == pytest.approx(150.0)
+    assert perf.latency_sketch["n"] == 3
+    assert result["metric_count"] == 3
+    assert result["request_count"] == 3
+    assert result["avg_response_time_ms"] == pytest.approx(150.0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_coarse_rollups_heal_missed_and_late_minutes():
+    """A 1m run that never happened, or raw rows landing after their minute rolled up, still reach 5m/1h."""
+    from datetime import datetime, timedelta, timezone as dt_timezone
+
+    from asgiref.sync import async_to_sync
+
+    from apps.analytics.models import Metric, MetricRollup
+    from apps.analytics.tasks import aggregation_tasks
+
+    start = datetime(2026, 1, 1, 13, 0, tzinfo=dt_timezone.utc)
+    aggregate = async_to_sync(aggregation_tasks._aggregate_metrics)
+    Metric.objects.create(name="cart.add", value=2.0, timestamp=start + timedelta(seconds=5))
+    aggregate(start, start + timedelta(minutes=1), window_label="1m")
+
+    # Late row for the already rolled-up minute 0, and minute 17 whose 1m run was missed.
+    Metric.objects.create(name="cart.add", value=3.0, timestamp=start + timedelta(seconds=50))
+    Metric.objects.create(name="cart.add", value=5.0, timestamp=start + timedelta(minutes=17, seconds=1))
+
+    aggregate(start, start + timedelta(hours=1), window_label="1h")
+
+    minute_0 = MetricRollup.objects.get(window="1m", timestamp=start)
+    assert (minute_0.count, minute_0.sum) == (2, 5.0)
+    assert MetricRollup.objects.get(window="5m", timestamp=start + timedelta(minutes=15)).sum == 5.0
+    hour = MetricRollup.objects.get(window="1h", timestamp=start)
+    assert (hour.count, hour.sum, hour.max) == (3, 10.0, 5.0)
@@ -0,0 +1,83 @@
+"""
+Unit tests for apps.analytics.services.latency_sketch and the rollup-backed
+latency distribution in DashboardService.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+
+import pytest
+
+from apps.analytics.services.latency_sketch import LatencySketch
+
+
+def test_quantiles_within_relative_accuracy():
+    """p50/p95/p99 stay within the sketch's 1% relative error."""
+    rng = random.Random(7)
+    values = sorted(rng.randint(1, 8000) for _ in range(5000))
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.95, 0.99):
+        expected = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.02)
+    assert (sketch.min, sketch.max, sketch.count) == (values[0], values[-1], 5000)
+
+
+def test_merge_matches_single_sketch_and_survives_serialisation():
+    """Merging per-window sketches equals sketching all values at once."""
+    whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+    for value in range(0, 1000, 3):
+        whole.add(value)
+        (left if value % 2 else right).add(value)
+
+    merged = LatencySketch.from_dict(left.to_dict())
+    merged.merge(LatencySketch.from_dict(right.to_dict()))
+
+    assert merged.to_dict() == whole.to_dict()
+    assert LatencySketch().quantile(0.5) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_latency_distribution_reads_rollups_only():
+    """The dashboard merges rollup sketches and never queries raw PerformanceMetric."""
+    from unittest.mock import patch
+
+    from asgiref.sync import async_to_sync
+    from django.core.cache import cache
+    from django.utils import timezone
+
+    from apps.analytics.models import PerformanceMetricRollup
+    from apps.analytics.services.dashboard_service import DashboardService
+
+    cache.clear()
+    hour_floor = timezone.now().replace(minute=0, second=0, microsecond=0)
+    for offset, timings in ((2, [20] * 90), (5, [300] * 9 + [6000])):
+        sketch = LatencySketch()
+        for ms in timings:
+            sketch.add(ms)
+        PerformanceMetricRollup.objects.create(
+            endpoint="/api/products/",
+            method="GET",
+            window="1h",
+            timestamp=hour_floor - timedelta(hours=offset),
+            avg_response_time=sum(timings) / len(timings),
+            max_response_time=max(timings),
+            total=len(timings),
+            latency_sketch=sketch.to_dict(),
+        )
+
+    with patch("apps.analytics.services.dashboard_service.PerformanceMetric.objects") as raw:
+        result = async_to_sync(DashboardService.aget_query_latency_distribution)(hours=24)
+    raw.filter.assert_not_called()
+
+    stats = result["stats"]
+    assert stats["total_requests"] == 100
+    assert stats["p50_latency_ms"] == pytest.approx(20, rel=0.01)
+    assert stats["p95_latency_ms"] == pytest.approx(300, rel=0.01)
+    assert stats["max_latency_ms"] == 6000
+    counts = {row["bucket"]: row["count"] for row in result["distribution"]}
+    assert (counts["0-50ms"], counts["250-500ms"], counts["5000ms+"]) == (90, 9, 1)
@@ -5,7 +5,13 @@ from __future__ import annotations
 
 import pytest
 
-from apps.analytics.services.metrics_service import AnalyticsMetricsService, Counter, Gauge, Histogram
+from apps.analytics.services.metrics_service import (
+    OVERFLOW_LABEL,
+    AnalyticsMetricsService,
+    Counter,
+    Gauge,
+    Histogram,
+)
 
 
 @pytest.mark.django_db
@@ -56,3 +62,41 @@ def test_metrics_service_render_prometheus():
     assert "analytics_metric_ingested_total" in rendered
     assert "analytics_query_executed_total" in rendered
     assert "# TYPE" in rendered
+
+
+@pytest.mark.django_db
+def test_histogram_buckets_are_cumulative():
+    """Each observation lands in one bucket; rendered counts are cumulative (le)."""
+    histogram = Histogram("test_histogram_cumulative", "Test histogram", buckets=[0.1, 1.0])
+    for value in (0.1, 0.2, 3.0, 0.01):
+        histogram.observe(value=value)
+
+    series = histogram.series[histogram._key({})]
+    assert series.bucket_counts == [2, 1, 1]
+    assert series.buckets == {0.1: 2, 1.0: 3, float("inf"): 4}
+
+
+@pytest.mark.django_db
+def test_series_cardinality_is_bounded(settings):
+    """New label sets beyond the limit are folded into one overflow series."""
+    settings.ANALYTICS_METRICS_MAX_SERIES = 3
+    counter = Counter("test_bounded", "Test bounded counter", labelnames=["route"])
+    for i in range(10):
+        counter.inc(labels={"route": f"/products/{i}/"})
+    counter.inc(labels={"route": "/products/0/"})
+
+    assert len(counter.series) == 4
+    assert counter.series[counter._key({"route": "/products/0/"})].value == 2.0
+    assert counter.series[counter._key({"route": OVERFLOW_LABEL})].value == 7.0
+
+
+@pytest.mark.django_db
+def test_render_includes_provider_http_pool_metrics():
+    """Provider pool counters are collected into the export at render time."""
+    from apps.common.http.pool import record_request
+
+    record_request("metrics-test")
+    rendered = AnalyticsMetricsService().render_prometheus()
+
+    assert '# TYPE provider_http_requests_total counter' in rendered
+    assert 'provider_http_requests_total{provider="metrics-test"}' in rendered
@@ -1,5 +1,6 @@
 """
-Tests for apps.analytics.middleware.user_activity.UserActivityTrackingMiddleware.
+Tests for apps.analytics.middleware.user_activity.UserActivityTrackingMiddleware
+and apps.analytics.middleware.analytics.AnalyticsMiddleware.
 """
 from __future__ import annotations
 
@@ -99,3 +100,50 @@ def test_middleware_get_client_ip():
 
     ip = middleware._get_client_ip(request)
     assert ip == "10.0.0.1"
+
+
+@pytest.mark.django_db
+def test_analytics_middleware_labels_by_route_template():
+    """AnalyticsMiddleware should label metrics with the route template, not the raw path."""
+    from django.urls import ResolverMatch
+
+    from apps.analytics.middleware import AnalyticsMiddleware
+    from apps.analytics.middleware.analytics import UNMATCHED_ROUTE, route_label
+
+    factory = RequestFactory()
+    request = factory.get("/api/v1/products/red-agbada-0193/")
+    request.resolver_match = ResolverMatch(
+        func=lambda r: None, args=(), kwargs={"slug": "red-agbada-0193"},
+        url_name="product-detail", route="api/v1/products/<slug:slug>/",
+    )
+    request.user = MagicMock(is_authenticated=False)
+
+    middleware = AnalyticsMiddleware(get_response=MagicMock(return_value=HttpResponse(status=200)))
+    with patch.object(middleware, "metrics") as metrics, \
+         patch("apps.analytics.middleware.analytics.enqueue_analytics_event"):
+        middleware(request)
+
+    assert metrics.record_query.call_args.kwargs["query_type"] == "GET:/api/v1/products/<slug:slug>/"
+    assert route_label(factory.get("/no/such/route/")) == UNMATCHED_ROUTE
+
+
+async def test_analytics_middleware_async_path_does_not_block():
+    """Under ASGI the middleware is a coroutine and only buffers the event."""
+    from asgiref.sync import iscoroutinefunction
+
+    from apps.analytics.middleware import AnalyticsMiddleware
+
+    async def get_response(request):
+        return HttpResponse(status=200)
+
+    request = RequestFactory().get("/api/v1/test")
+    middleware = AnalyticsMiddleware(get_response=get_response)
+    assert iscoroutinefunction(middleware)
+
+    with patch("apps.analytics.middleware.analytics.enqueue_analytics_event") as enqueue, \
+         patch("apps.analytics.services.realtime_service.RealtimeAnalyticsService.publish_event") as publish:
+        response = await middleware(request)
+
+    assert response.status_code == 200
+    enqueue.assert_called_once()
+    publish.assert_not_called()
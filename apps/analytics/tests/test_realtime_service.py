@@ -8,6 +8,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from apps.analytics.services.realtime_service import (
+    AnalyticsEventBuffer,
     RealtimeAnalyticsService,
     RealtimeEvent,
     publish_analytics_event,
@@ -86,3 +87,70 @@ def test_realtime_service_consume_pending():
     assert len(events) == 1
     assert events[0].event_type == "api_call"
     assert events[0].response_time_ms == 50
+
+
+def _buffer(mock_redis, **kwargs):
+    """Event buffer wired to a mock Redis, with the background flusher disabled."""
+    options = {"max_size": 5, "batch_size": 2, "flush_interval": 60.0}
+    options.update(kwargs)
+    buffer = AnalyticsEventBuffer(**options)
+    buffer._service = RealtimeAnalyticsService(redis_client=mock_redis)
+    buffer._ensure_flusher = lambda: None
+    return buffer
+
+
+def _event(n: int) -> RealtimeEvent:
+    return RealtimeEvent(event_type="api_call", timestamp=float(n), endpoint=f"/e/{n}")
+
+
+@pytest.mark.django_db
+def test_event_buffer_flushes_in_pipelined_batches():
+    """Buffered events should be XADDed through one pipeline per batch."""
+    mock_redis = MagicMock()
+    buffer = _buffer(mock_redis)
+    for n in range(3):
+        assert buffer.offer(_event(n)) is True
+
+    assert buffer.flush() == 3
+    pipe = mock_redis.pipeline.return_value
+    assert pipe.xadd.call_count == 3
+    assert pipe.execute.call_count == 2
+    assert buffer.pending() == 0
+    assert "" == pipe.xadd.call_args.args[1]["user_id"]  # None is not a valid stream value
+
+
+@pytest.mark.django_db
+def test_event_buffer_drops_newest_when_full():
+    """A full buffer should reject new events and count the drops."""
+    buffer = _buffer(MagicMock())
+    results = [buffer.offer(_event(n)) for n in range(7)]
+
+    assert results == [True] * 5 + [False] * 2
+    assert buffer.stats["dropped"] == 2
+    assert [e.timestamp for e in buffer._events] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.django_db
+def test_event_buffer_drop_oldest_policy():
+    """With drop_policy='oldest' the newest events are kept."""
+    buffer = _buffer(MagicMock(), drop_policy="oldest")
+    for n in range(7):
+        buffer.offer(_event(n))
+
+    assert buffer.stats["dropped"] == 2
+    assert [e.timestamp for e in buffer._events] == [2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+@pytest.mark.django_db
+def test_event_buffer_requeues_batch_on_redis_error():
+    """A failed flush should put the batch back for the next attempt."""
+    mock_redis = MagicMock()
+    mock_redis.pipeline.return_value.execute.side_effect = ConnectionError("redis down")
+    buffer = _buffer(mock_redis)
+    buffer.offer(_event(0))
+    buffer.offer(_event(1))
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert buffer.pending() == 2
+    assert buffer.stats["published"] == 0
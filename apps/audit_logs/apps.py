@@ -16,7 +16,13 @@ class AuditLogsConfig(AppConfig):
 
         Registered here:
           E4 — django-auditlog LogEntry bridge (mirrors LogEntry → AuditEventLog)
+          System check for the offline GeoIP source (apps/audit_logs/geoip.py)
         """
+        from django.core import checks
+
+        from apps.audit_logs.geoip import check_geoip_source
+        checks.register(check_geoip_source)
+
         try:
             from apps.audit_logs.logentry_bridge import connect_logentry_bridge
             connect_logentry_bridge()
@@ -0,0 +1,124 @@
+# apps/audit_logs/buffer.py
+"""
+Micro-batched audit sink — Redis list buffer + bulk drain.
+
+Instead of one Celery task and one INSERT per ``AuditService.log()`` call,
+payloads are appended to a Redis list and written in batches:
+
+    AuditService._dispatch(payload)
+        └─ enqueue_audit_event()   RPUSH audit:buffer:v1 + SET NX flush flag
+                                   (one pipelined round trip, no retry loop)
+                └─ drain_audit_buffer task (scheduled once per flush interval,
+                   or immediately when the list reaches AUDIT_BUFFER_BATCH_SIZE;
+                   Celery beat also runs it as a safety net)
+                        └─ drain_audit_buffer_once()
+                               LRANGE head → bulk_create(ignore_conflicts) → LTRIM
+
+Delivery guarantees:
+    * At-least-once. Items leave the list (LTRIM) only AFTER their batch is
+      committed. A crash between INSERT and LTRIM re-delivers the batch on
+      the next drain.
+    * Idempotent. Every payload carries its ``id`` (UUID7), minted in
+      ``AuditService.log()`` next to the request's correlation_id. A
+      re-delivered event collides on the primary key and is skipped by
+      ``ignore_conflicts=True``, so redelivery never duplicates a row.
+    * A single drainer at a time (SET NX lock). Producers only RPUSH to the
+      tail, so trimming the head never drops an unwritten event.
+    * The lock is renewed before every batch and the LTRIM is owner-checked,
+      so a drainer that outlived its lock never trims another's head.
+
+Fallbacks (unchanged contract — audit events are NEVER silently dropped):
+    Redis unavailable → per-event ``write_audit_event`` Celery task →
+    ``_write_sync()`` direct INSERT.
+
+The list/lock mechanics live in ``apps.common.utils.redis_list_buffer``;
+this module configures the audit buffer and provides its batch writer.
+
+Settings:
+    AUDIT_BUFFER_ENABLED          default True
+    AUDIT_BUFFER_BATCH_SIZE       rows per INSERT batch (default 500)
+    AUDIT_BUFFER_FLUSH_INTERVAL   max seconds an event waits (default 2)
+"""
+
+from __future__ import annotations
+
+import logging
+
+from apps.common.utils.redis_list_buffer import RedisListBuffer
+
+logger = logging.getLogger(__name__)
+
+audit_buffer = RedisListBuffer(
+    "audit:buffer:v1",
+    drain_task="apps.audit_logs.tasks.drain_audit_buffer",
+    handler="apps.audit_logs.buffer.write_audit_batch",
+    enabled_setting="AUDIT_BUFFER_ENABLED",
+    batch_size_setting="AUDIT_BUFFER_BATCH_SIZE",
+    flush_interval_setting="AUDIT_BUFFER_FLUSH_INTERVAL",
+    batch_size=500,
+)
+
+BUFFER_KEY     = audit_buffer.key
+FLUSH_FLAG_KEY = audit_buffer.flush_flag_key
+DRAIN_LOCK_KEY = audit_buffer.drain_lock_key
+
+
+def enqueue_audit_event(payload: dict) -> bool:
+    """
+    Append one payload to the buffer. Returns False when buffering is disabled.
+
+    Raises on Redis errors so the caller can fall back to the per-event path.
+    """
+    return audit_buffer.enqueue(payload)
+
+
+def drain_audit_buffer_once(max_batches: int | None = None) -> int:
+    """
+    Write buffered events in batches until the list is empty (or
+    ``max_batches`` batches were written). Returns the number of events
+    consumed; 0 if another drainer holds the lock.
+    """
+    return audit_buffer.drain_once(max_batches)
+
+
+def write_audit_batch(payloads: list[dict]) -> int:
+    """
+    Insert a batch of payloads with one ``bulk_create``.
+
+    Geo enrichment is resolved once per distinct IP in the batch. If the
+    bulk INSERT fails (e.g. one malformed row), the batch is retried row
+    by row so a single bad event cannot block the buffer.
+    """
+    from django.db import IntegrityError
+
+    from apps.audit_logs.models import AuditEventLog
+    from apps.audit_logs.tasks import build_audit_event, enrich_geo
+
+    geo_by_ip: dict[str, dict] = {}
+    objs = []
+    for payload in payloads:
+        try:
+            enrich_geo(payload, geo_by_ip)
+            objs.append(build_audit_event(payload))
+        except Exception:
+            logger.exception("write_audit_batch: skipping unbuildable payload event_type=%s",
+                             payload.get("event_type"))
+    if not objs:
+        return 0
+
+    try:
+        AuditEventLog.objects.bulk_create(objs, batch_size=len(objs), ignore_conflicts=True)
+        return len(objs)
+    except Exception as exc:
+        logger.warning("write_audit_batch: bulk insert of %d failed (%s) — retrying row by row", len(objs), exc)
+
+    written = 0
+    for obj in objs:
+        try:
+            obj.save(force_insert=True)
+            written += 1
+        except IntegrityError:
+            pass  # already written by an earlier delivery
+        except Exception:
+            logger.exception("write_audit_batch: dropping event id=%s event_type=%s", obj.pk, obj.event_type)
+    return written
@@ -0,0 +1,324 @@
+# apps/audit_logs/geoip.py
+"""
+Offline GeoIP resolution for audit enrichment — no network I/O.
+
+Sources (GEOIP_DB_PATH setting or environment variable):
+
+    *.mmdb   MaxMind GeoLite2/GeoIP2 City or Country database, opened with
+             the ``maxminddb`` reader in MODE_MMAP.
+    *.csv    IP range CSV, read through its compiled table ``<path>.bin``.
+             Accepted columns:
+               network                          (CIDR)  — or —
+               start_ip, end_ip                 (inclusive range)
+             plus any of: country_code, country (or country_name), city, region
+    other    A compiled range table (e.g. written to a separate volume with
+             ``compile_geoip --output``).
+
+The request path only ever reads: CSVs are compiled ahead of time by
+``manage.py compile_geoip`` (run by entrypoint.sh before the servers
+start). A CSV without a compiled table disables offline lookups with an
+error in the log; a ``.mmdb`` path without ``maxminddb`` installed raises
+ImproperlyConfigured at first use.
+
+Compiled range table (``*.bin``):
+
+    MAGIC (8 bytes) | record count (u32) | pad (u32)
+    records         sorted by start — start (16B) | end (16B) | label (u32)
+    labels          UTF-8 JSON list of {country, country_code, city, region}
+
+    IPv4 addresses are stored IPv4-mapped (::ffff:a.b.c.d) so one table
+    covers both families. Fixed-width big-endian keys compare as bytes, so a
+    lookup is a binary search over the mmap — O(log n) page touches, no
+    parse, shared by every worker process through the page cache.
+
+In front of the table sits a per-process LRU (GEOIP_LRU_SIZE, default
+4096 addresses), so hot IPs (auth bursts, shared NAT) cost a dict lookup.
+
+Usage:
+    from apps.audit_logs.geoip import get_geoip_resolver
+
+    geo = get_geoip_resolver().lookup("102.89.1.1")
+    # {"country": "Nigeria", "country_code": "NG", "city": "Lagos", "region": "Lagos"}
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import ipaddress
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FSGEOIP1"
+_HEADER = struct.Struct(">8sII")
+_RECORD = struct.Struct(">16s16sI")
+_EMPTY: dict = {}
+
+
+def _ip_key(ip) -> bytes:
+    """16-byte big-endian key; IPv4 is mapped into ::ffff:0:0/96."""
+    if ip.version == 4:
+        ip = ipaddress.IPv6Address(b"\0" * 10 + b"\xff\xff" + ip.packed)
+    return ip.packed
+
+
+def is_public_ip(ip: str | None) -> bool:
+    """False for empty, malformed, private, loopback, link-local and reserved addresses."""
+    if not ip:
+        return False
+    try:
+        return ipaddress.ip_address(ip.strip()).is_global
+    except ValueError:
+        return False
+
+
+# ---------- LRU ----------
+
+class _LRU:
+    """Small thread-safe LRU (OrderedDict + lock)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# ---------- CSV → compiled range table ----------
+
+def _label(row: dict) -> dict:
+    return {
+        "country":      (row.get("country") or row.get("country_name") or "").strip(),
+        "country_code": (row.get("country_code") or row.get("country_iso_code") or "").strip().upper(),
+        "city":         (row.get("city") or row.get("city_name") or "").strip(),
+        "region":       (row.get("region") or row.get("subdivision") or "").strip(),
+    }
+
+
+def compile_csv(csv_path: str, out_path: str) -> int:
+    """Compile an IP-range CSV into the binary range table. Returns the record count."""
+    labels: list[dict] = []
+    label_index: dict[tuple, int] = {}
+    records = []
+    with open(csv_path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            try:
+                if row.get("network"):
+                    net = ipaddress.ip_network(row["network"].strip(), strict=False)
+                    first, last = net.network_address, net.broadcast_address
+                else:
+                    first = ipaddress.ip_address(row["start_ip"].strip())
+                    last = ipaddress.ip_address(row["end_ip"].strip())
+            except (KeyError, ValueError):
+                continue
+            label = _label(row)
+            key = tuple(label.values())
+            if key not in label_index:
+                label_index[key] = len(labels)
+                labels.append(label)
+            records.append((_ip_key(first), _ip_key(last), label_index[key]))
+
+    records.sort()
+    tmp_path = f"{out_path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, len(records), 0))
+        for start, end, label in records:
+            out.write(_RECORD.pack(start, end, label))
+        out.write(json.dumps(labels, separators=(",", ":")).encode())
+    os.replace(tmp_path, out_path)
+    return len(records)
+
+
+class RangeTable:
+    """Memory-mapped, binary-searchable compiled range table."""
+
+    def __init__(self, path: str):
+        self._fh = open(path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled GeoIP range table")
+        labels_offset = _HEADER.size + self.count * _RECORD.size
+        self._labels = json.loads(self._mm[labels_offset:].decode() or "[]")
+
+    def lookup(self, ip) -> dict:
+        key = _ip_key(ip)
+        mm, size, base = self._mm, _RECORD.size, _HEADER.size
+        lo, hi = 0, self.count
+        # Rightmost record whose start <= key.
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * size
+            if mm[offset:offset + 16] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return _EMPTY
+        _, end, label = _RECORD.unpack_from(mm, base + (lo - 1) * size)
+        return self._labels[label] if key <= end else _EMPTY
+
+
+class MaxMindTable:
+    """MaxMind .mmdb reader (memory-mapped) — requires the ``maxminddb`` package."""
+
+    def __init__(self, path: str):
+        try:
+            import maxminddb
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                f"GEOIP_DB_PATH={path} is a MaxMind database but the maxminddb package is not installed"
+            ) from exc
+        self._reader = maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+    def lookup(self, ip) -> dict:
+        record = self._reader.get(str(ip))
+        if not record:
+            return _EMPTY
+        country = record.get("country") or record.get("registered_country") or {}
+        subdivisions = record.get("subdivisions") or [{}]
+        return {
+            "country":      (country.get("names") or {}).get("en", ""),
+            "country_code": country.get("iso_code", ""),
+            "city":         ((record.get("city") or {}).get("names") or {}).get("en", ""),
+            "region":       (subdivisions[0].get("names") or {}).get("en", ""),
+        }
+
+
+def compiled_path(path: str) -> str:
+    """Where the compiled range table of a CSV source lives."""
+    return f"{path}.bin"
+
+
+def _open_table(path: str):
+    """Open a source read-only; never compiles (see ``compile_geoip``)."""
+    if path.endswith(".mmdb"):
+        return MaxMindTable(path)
+    if path.endswith(".csv"):
+        compiled = compiled_path(path)
+        if not os.path.exists(compiled):
+            raise FileNotFoundError(f"{compiled} is missing — run `manage.py compile_geoip`")
+        if os.path.getmtime(compiled) < os.path.getmtime(path):
+            logger.warning("geoip: %s is older than %s — run `manage.py compile_geoip`", compiled, path)
+        path = compiled
+    return RangeTable(path)
+
+
+# ---------- resolver ----------
+
+class GeoIPResolver:
+    """Process-wide resolver: LRU → local table. Never performs network I/O."""
+
+    def __init__(self, path: str = "", lru_size: int = 4096):
+        self.path = path
+        self.cache = _LRU(lru_size)
+        self._table = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._get_table() is not None
+
+    def _get_table(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.path:
+                        try:
+                            self._table = _open_table(self.path)
+                        except ImproperlyConfigured:
+                            raise
+                        except Exception as exc:
+                            logger.error("geoip: cannot load %s (%s) — offline lookups disabled", self.path, exc)
+                    self._loaded = True
+        return self._table
+
+    def lookup(self, ip: str | None) -> dict:
+        """Geo dict for a public IP, ``{}`` when unknown, private, malformed or no table."""
+        if not is_public_ip(ip):
+            return _EMPTY
+        ip = ip.strip()
+        cached = self.cache.get(ip)
+        if cached is not None:
+            return cached
+        table = self._get_table()
+        if table is None:
+            return _EMPTY
+        try:
+            result = table.lookup(ipaddress.ip_address(ip))
+        except Exception as exc:
+            logger.debug("geoip: lookup failed for %s: %s", ip, exc)
+            return _EMPTY
+        self.cache.put(ip, result)
+        return result
+
+
+def check_geoip_source(app_configs=None, **kwargs):
+    """System check: a configured source must be readable by the request path."""
+    from django.core import checks
+
+    path = geoip_db_path()
+    if path.endswith(".mmdb"):
+        if importlib.util.find_spec("maxminddb") is None:
+            return [checks.Error(
+                f"GEOIP_DB_PATH={path} is a MaxMind database but the maxminddb package is not installed.",
+                hint="Install the project dependencies (maxminddb).",
+                id="audit_logs.E001",
+            )]
+    elif path.endswith(".csv") and not os.path.exists(compiled_path(path)):
+        return [checks.Warning(
+            f"GEOIP_DB_PATH={path} has no compiled range table; offline geo lookups are disabled.",
+            hint="Run `python manage.py compile_geoip` on deploy.",
+            id="audit_logs.W001",
+        )]
+    return []
+
+
+_resolver: GeoIPResolver | None = None
+_resolver_lock = threading.Lock()
+
+
+def geoip_db_path() -> str:
+    return getattr(settings, "GEOIP_DB_PATH", "") or os.getenv("GEOIP_DB_PATH", "")
+
+
+def get_geoip_resolver() -> GeoIPResolver:
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = GeoIPResolver(
+                    path=geoip_db_path(),
+                    lru_size=int(getattr(settings, "GEOIP_LRU_SIZE", 4096)),
+                )
+    return _resolver
@@ -0,0 +1,55 @@
+"""
+apps/audit_logs/management/commands/compile_geoip.py
+
+Compile the GeoIP range CSV into the memory-mapped table read by
+``apps.audit_logs.geoip`` — ahead of time, so the request path never
+parses the CSV or writes to the data directory.
+
+Usage:
+    python manage.py compile_geoip                          # GEOIP_DB_PATH → <path>.bin
+    python manage.py compile_geoip --source ranges.csv --output /var/geo/ranges.bin
+    python manage.py compile_geoip --if-stale               # skip when the table is up to date
+
+Run by entrypoint.sh before the servers start. Point GEOIP_DB_PATH at the
+output when it is not ``<csv>.bin``.
+"""
+from __future__ import annotations
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.audit_logs.geoip import compile_csv, compiled_path, geoip_db_path
+
+
+class Command(BaseCommand):
+    help = "Compile the GeoIP range CSV into the binary range table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default="", help="IP range CSV (default: GEOIP_DB_PATH).")
+        parser.add_argument("--output", default="", help="Compiled table path (default: <source>.bin).")
+        parser.add_argument(
+            "--if-stale",
+            action="store_true",
+            default=False,
+            help="Only compile when the output is missing or older than the CSV.",
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"] or geoip_db_path()
+        if not source.endswith(".csv"):
+            self.stdout.write(f"GeoIP source {source or '(unset)'} is not a CSV — nothing to compile.")
+            return
+        if not os.path.exists(source):
+            raise CommandError(f"GeoIP CSV not found: {source}")
+
+        output = options["output"] or compiled_path(source)
+        if options["if_stale"] and os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(source):
+            self.stdout.write(f"{output} is up to date.")
+            return
+
+        try:
+            count = compile_csv(source, output)
+        except OSError as exc:
+            raise CommandError(f"Cannot write {output}: {exc}") from exc
+        self.stdout.write(self.style.SUCCESS(f"Compiled {count} ranges from {source} into {output}"))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.3 on 2026-10-17 09:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def partition_table(apps, schema_editor):
+    # PostgreSQL only — no-op on other backends (see apps/audit_logs/partitions.py).
+    from apps.audit_logs.partitions import partition_existing_table
+    partition_existing_table(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit_logs', '0007_alter_auditeventlog_event_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditeventlog',
+            name='retention_class',
+            field=models.CharField(choices=[('compliance', 'Compliance'), ('security', 'Security'), ('debug', 'Debug')], default='security', editable=False, help_text='Storage tier derived from is_compliance + retention_days. Partition key on PostgreSQL (see apps/audit_logs/partitions.py) — expired security/debug months are dropped as whole partitions.', max_length=12),
+        ),
+        migrations.AlterField(
+            model_name='auditeventlog',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False, help_text='When this event was recorded. Immutable.'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventlog',
+            index=models.Index(fields=['retention_days', 'created_at'], name='idx_ael_retention'),
+        ),
+        # Irreversible: the partitioned table cannot be turned back into a
+        # heap table without a full copy. Restore from backup to roll back.
+        migrations.RunPython(partition_table),
+    ]
@@ -15,6 +15,8 @@ Design Principles:
     - NEVER blocks the HTTP request — writes go via Celery apply_async() dispatch
     - NEVER raises exceptions to callers — all errors are logged as WARNING
     - 7-year retention for financial compliance (configurable per-event)
+    - Partitioned on PostgreSQL by retention_class, then by month of created_at;
+      expired months are dropped whole (see partitions.py)
     - Immutable once written (no update/delete permission in admin)
     - actor_email snapshot survives even if UnifiedUser is hard-deleted
     - legal_hold=True rows are NEVER deleted by any cleanup path (PCI-DSS freeze)
@@ -37,6 +39,7 @@ import logging
 import uuid6
 
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 logger = logging.getLogger(__name__)
@@ -345,6 +348,32 @@ class EventType(models.TextChoices):
     CELERY_TASK_FAILED     = "celery_task_failed",   _("Celery Task Failed")
 
 
+class RetentionClass(models.TextChoices):
+    """
+    Storage tier of an audit row — the first-level partition key on PostgreSQL.
+
+    compliance — is_compliance=True or permanent retention (retention_days=0);
+                 never removed by automated cleanup
+    security   — finite retention longer than DEBUG_RETENTION_MAX_DAYS
+    debug      — short-lived operational events (<= DEBUG_RETENTION_MAX_DAYS)
+    """
+    COMPLIANCE = "compliance", _("Compliance")
+    SECURITY   = "security",   _("Security")
+    DEBUG      = "debug",      _("Debug")
+
+
+DEBUG_RETENTION_MAX_DAYS = 90
+
+
+def classify_retention(is_compliance: bool, retention_days) -> str:
+    """Map an event's compliance flag and retention_days to its RetentionClass."""
+    if is_compliance or not retention_days or retention_days <= 0:
+        return RetentionClass.COMPLIANCE
+    if retention_days <= DEBUG_RETENTION_MAX_DAYS:
+        return RetentionClass.DEBUG
+    return RetentionClass.SECURITY
+
+
 class SeverityLevel(models.TextChoices):
     DEBUG    = "debug",    _("Debug")
     INFO     = "info",     _("Info")
@@ -702,6 +731,17 @@ class AuditEventLog(models.Model):
         default=2555,  # 7 years — financial + GDPR compliance
         help_text="Days to retain this log entry. -1 = infinite.",
     )
+    retention_class = models.CharField(
+        max_length=12,
+        choices=RetentionClass.choices,
+        default=RetentionClass.SECURITY,
+        editable=False,
+        help_text=(
+            "Storage tier derived from is_compliance + retention_days. "
+            "Partition key on PostgreSQL (see apps/audit_logs/partitions.py) — "
+            "expired security/debug months are dropped as whole partitions."
+        ),
+    )
 
     # ── Phase 9: 2026 GDPR/NDPR/PCI-DSS Compliance Fields ────────────
     # These fields extend AuditEventLog to satisfy the 2026 regulatory
@@ -818,8 +858,11 @@ class AuditEventLog(models.Model):
     )
 
     # ── Immutable timestamp ───────────────────────────────────────────
+    # Stamped when AuditService.log() builds the payload (not at INSERT time)
+    # so a re-delivered buffered event keeps the same partition key.
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True,
         help_text="When this event was recorded. Immutable.",
     )
@@ -844,6 +887,7 @@ class AuditEventLog(models.Model):
             models.Index(fields=["country_code", "-created_at"],    name="idx_ael_country_code"),
             models.Index(fields=["actor_role", "-created_at"],      name="idx_ael_actor_role"),
             models.Index(fields=["session_id"],                      name="idx_ael_session"),
+            models.Index(fields=["retention_days", "created_at"],   name="idx_ael_retention"),
             # ── Phase 9: 2026 Compliance indexes ───────────────────────────────
             # GDPR SAR queries — find all rows for a specific data subject in O(log n)
             models.Index(
@@ -914,6 +958,7 @@ class AuditEventLog(models.Model):
                 f"Attempted update on pk={self.pk}. "
                 "Create a new AuditEventLog entry instead."
             )
+        self.retention_class = classify_retention(self.is_compliance, self.retention_days)
         super().save(*args, **kwargs)
 
     @property
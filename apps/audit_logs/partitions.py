@@ -0,0 +1,354 @@
+# apps/audit_logs/partitions.py
+"""
+Time-partitioned storage for AuditEventLog (PostgreSQL only).
+
+Layout:
+
+    audit_logs_auditeventlog                      PARTITION BY LIST (retention_class)
+      ├─ audit_logs_auditeventlog_compliance      PARTITION BY RANGE (created_at)
+      │     ├─ …_compliance_202601                one partition per calendar month (UTC)
+      │     ├─ …_compliance_202602
+      │     └─ …_compliance_default               safety net for out-of-range rows
+      │                                           (late or re-delivered events for a
+      │                                           dropped month, rows older than the
+      │                                           premade window)
+      ├─ audit_logs_auditeventlog_security        (same monthly layout)
+      └─ audit_logs_auditeventlog_debug           (same monthly layout)
+
+    PRIMARY KEY (id, retention_class, created_at) — PostgreSQL requires the
+    partition keys in every unique constraint. ``id`` is still unique in
+    practice (UUID7), and buffered re-deliveries carry the same created_at
+    and retention_class, so ON CONFLICT dedupe keeps working.
+
+Retention:
+    ``drop_expired_partitions()`` detaches and drops a whole security/debug
+    month once every row in it has passed its own retention_days — an
+    index probe for max(retention_days) instead of a per-row scan. A month
+    holding ANY legal-hold, compliance-flagged or permanent row is never
+    dropped; it is reported as held and its expired rows are left to the
+    per-row cleanup in ``cleanup_audit_logs``. Compliance partitions are
+    never dropped. Default partitions are never dropped either; their
+    expired rows are deleted one by one (they are small by design).
+
+Maintenance:
+    ``ensure_partitions()`` creates the current month plus
+    AUDIT_PARTITION_PREMAKE_MONTHS (default 3) ahead for every class. It
+    runs from the daily ``audit_log_cleanup`` task. Rows of a new month
+    that already landed in the default partition are moved into it in the
+    same transaction — PostgreSQL refuses to create a partition whose
+    range still has rows in the default.
+
+Migration:
+    ``partition_existing_table()`` converts the legacy heap table in place
+    (migration 0008): rename → create partitioned parent → copy rows with
+    their derived retention_class → drop legacy → recreate indexes and FKs.
+
+On any other database backend every function here is a no-op, so the
+SQLite test suite keeps using the plain table.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+from apps.audit_logs.models import DEBUG_RETENTION_MAX_DAYS, AuditEventLog, RetentionClass
+
+logger = logging.getLogger(__name__)
+
+DROPPABLE_CLASSES = (RetentionClass.SECURITY, RetentionClass.DEBUG)
+
+# SQL twin of models.classify_retention() — used when copying legacy rows.
+_RETENTION_CLASS_SQL = (
+    "CASE WHEN is_compliance OR retention_days <= 0 THEN 'compliance' "
+    f"WHEN retention_days <= {DEBUG_RETENTION_MAX_DAYS} THEN 'debug' "
+    "ELSE 'security' END"
+)
+
+
+def _premake_months() -> int:
+    return int(getattr(settings, "AUDIT_PARTITION_PREMAKE_MONTHS", 3))
+
+
+def _table() -> str:
+    return AuditEventLog._meta.db_table
+
+
+# ---------- naming / month arithmetic ----------
+
+def month_start(value) -> date:
+    """First day of the (UTC) month containing ``value`` (date or datetime)."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = value.astimezone(dt_timezone.utc)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """[lower, upper) of a monthly partition as aware UTC datetimes."""
+    lower = datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+    upper = datetime.combine(add_months(month, 1), time.min, tzinfo=dt_timezone.utc)
+    return lower, upper
+
+
+def class_table(retention_class: str, table: str | None = None) -> str:
+    return f"{table or _table()}_{retention_class}"
+
+
+def partition_name(retention_class: str, month: date, table: str | None = None) -> str:
+    return f"{class_table(retention_class, table)}_{month:%Y%m}"
+
+
+def parse_partition_month(name: str, retention_class: str, table: str | None = None) -> date | None:
+    """Month encoded in a partition name, or None for the default partition."""
+    suffix = name[len(class_table(retention_class, table)) + 1:]
+    if len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+# ---------- introspection ----------
+
+def is_partitioned(connection=None) -> bool:
+    connection = connection or default_connection
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [_table()])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def _child_tables(cursor, parent: str) -> list[str]:
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+        [parent],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+# ---------- maintenance ----------
+
+def ensure_partitions(since=None, months_ahead: int | None = None, connection=None) -> int:
+    """
+    Create missing monthly partitions from ``since`` (default: this month)
+    through ``months_ahead`` months from now, for every retention class.
+    Returns the number of partitions created.
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return 0
+
+    qn = connection.ops.quote_name
+    first = month_start(since or timezone.now())
+    last = add_months(month_start(timezone.now()), _premake_months() if months_ahead is None else months_ahead)
+    created = 0
+    with connection.cursor() as cursor:
+        for retention_class in RetentionClass.values:
+            existing = set(_child_tables(cursor, class_table(retention_class)))
+            month = first
+            while month <= last:
+                name = partition_name(retention_class, month)
+                if name not in existing:
+                    _create_month(cursor, qn, retention_class, month)
+                    created += 1
+                month = add_months(month, 1)
+    if created:
+        logger.info("audit partitions: created %d monthly partitions", created)
+    return created
+
+
+def _create_month(cursor, qn, retention_class: str, month: date) -> None:
+    """Create one monthly partition, first moving its rows out of the default."""
+    parent = class_table(retention_class)
+    default = f"{parent}_default"
+    name = partition_name(retention_class, month)
+    stash = f"{name}_stash"
+    lower, upper = month_bounds(month)
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE created_at >= %s AND created_at < %s)",
+            [lower, upper],
+        )
+        strays = cursor.fetchone()[0]
+        if strays:
+            cursor.execute(f"CREATE TEMPORARY TABLE {qn(stash)} (LIKE {qn(default)})")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {qn(default)} WHERE created_at >= %s AND created_at < %s "
+                f"RETURNING *) INSERT INTO {qn(stash)} SELECT * FROM moved",
+                [lower, upper],
+            )
+            moved = cursor.rowcount
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(parent)} FOR VALUES FROM (%s) TO (%s)",
+            [lower, upper],
+        )
+        if strays:
+            cursor.execute(f"INSERT INTO {qn(parent)} SELECT * FROM {qn(stash)}")
+            cursor.execute(f"DROP TABLE {qn(stash)}")
+            logger.info("audit partitions: moved %d rows from %s into %s", moved, default, name)
+
+
+def _purge_default(cursor, qn, retention_class: str, now) -> int:
+    """Per-row retention for a class's default partition; returns rows deleted."""
+    cursor.execute(
+        f"DELETE FROM {qn(class_table(retention_class) + '_default')} "
+        f"WHERE NOT legal_hold AND NOT is_compliance AND retention_days > 0 "
+        f"AND created_at < %s - make_interval(days => retention_days)",
+        [now],
+    )
+    return max(cursor.rowcount, 0)
+
+
+def drop_expired_partitions(now=None, connection=None) -> dict:
+    """
+    Detach and drop security/debug months whose every row has expired, and
+    delete the expired rows of their default partitions.
+
+    Returns ``{"dropped": [names], "held": [names], "rows": estimated_rows}``.
+    """
+    connection = connection or default_connection
+    result = {"dropped": [], "held": [], "rows": 0}
+    if not is_partitioned(connection):
+        return result
+
+    qn = connection.ops.quote_name
+    now = now or timezone.now()
+    with connection.cursor() as cursor:
+        for retention_class in DROPPABLE_CLASSES:
+            parent = class_table(retention_class)
+            purged = _purge_default(cursor, qn, retention_class, now)
+            if purged:
+                result["rows"] += purged
+                logger.info("audit partitions: deleted %d expired rows from %s_default", purged, parent)
+            for name in _child_tables(cursor, parent):
+                month = parse_partition_month(name, retention_class)
+                if month is None:
+                    continue
+                _, upper = month_bounds(month)
+                if upper >= now:
+                    continue
+
+                # Both probes are index lookups (idx_ael_legal_hold,
+                # idx_ael_compliance, idx_ael_retention) — never a scan.
+                cursor.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {qn(name)} "
+                    f"WHERE legal_hold OR is_compliance OR retention_days <= 0), "
+                    f"(SELECT max(retention_days) FROM {qn(name)}), "
+                    f"(SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s))",
+                    [name],
+                )
+                blocked, max_days, estimate = cursor.fetchone()
+                if blocked:
+                    result["held"].append(name)
+                    continue
+                if max_days is not None and upper + timedelta(days=max_days) > now:
+                    continue
+
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute(f"ALTER TABLE {qn(parent)} DETACH PARTITION {qn(name)}")
+                    cursor.execute(f"DROP TABLE {qn(name)}")
+                result["dropped"].append(name)
+                result["rows"] += max(int(estimate or 0), 0)
+                logger.info("audit partitions: dropped expired partition %s (~%d rows)", name, estimate or 0)
+
+    if result["held"]:
+        logger.info("audit partitions: %d expired partitions retained for legal hold / compliance rows: %s",
+                    len(result["held"]), ", ".join(result["held"]))
+    return result
+
+
+# ---------- migration ----------
+
+def partition_existing_table(schema_editor) -> None:
+    """
+    Convert the plain AuditEventLog table into the partitioned layout.
+
+    Runs inside the migration transaction, so a failure leaves the legacy
+    table untouched. Existing rows are copied with their retention_class
+    derived from is_compliance + retention_days.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or is_partitioned(connection):
+        return
+
+    qn = connection.ops.quote_name
+    table = _table()
+    legacy = f"{table}_legacy"
+
+    with connection.cursor() as cursor:
+        # Secondary indexes and FKs are rebuilt on the partitioned parent
+        # (captured now, while their definitions still name ``table``).
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(ix.indexrelid) FROM pg_index ix "
+            "JOIN pg_class c ON c.oid = ix.indexrelid "
+            "WHERE ix.indrelid = to_regclass(%s) AND NOT ix.indisprimary AND NOT ix.indisunique",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [table],
+        )
+        pk_name = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = %s AND table_schema = current_schema() ORDER BY ordinal_position",
+            [table],
+        )
+        columns = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(f"ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(pk_name)} TO {qn(legacy + '_pkey')}")
+        for index_name, _ in indexes:
+            cursor.execute(f"DROP INDEX {qn(index_name)}")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY LIST (retention_class)"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, retention_class, created_at)")
+        for retention_class in RetentionClass.values:
+            parent = class_table(retention_class, table)
+            cursor.execute(
+                f"CREATE TABLE {qn(parent)} PARTITION OF {qn(table)} "
+                f"FOR VALUES IN (%s) PARTITION BY RANGE (created_at)",
+                [retention_class],
+            )
+            cursor.execute(f"CREATE TABLE {qn(parent + '_default')} PARTITION OF {qn(parent)} DEFAULT")
+
+        cursor.execute(f"SELECT min(created_at) FROM {qn(legacy)}")
+        oldest = cursor.fetchone()[0]
+        ensure_partitions(since=oldest, connection=connection)
+
+        column_list = ", ".join(qn(col) for col in columns)
+        select_list = ", ".join(
+            _RETENTION_CLASS_SQL if col == "retention_class" else qn(col) for col in columns
+        )
+        cursor.execute(f"INSERT INTO {qn(table)} ({column_list}) SELECT {select_list} FROM {qn(legacy)}")
+        copied = cursor.rowcount
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        for _, index_sql in indexes:
+            cursor.execute(index_sql)
+        for constraint_name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(constraint_name)} {definition}")
+
+    logger.info("audit partitions: converted %s to partitioned layout (%d rows copied)", table, copied)
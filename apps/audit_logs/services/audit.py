@@ -10,18 +10,22 @@ Architecture:
     ``retention_days`` — then delegate to ``AuditService.log()``.
 
 Non-Blocking Design:
-    All writes are fire-and-forget: events are dispatched directly to Celery
-    (Redis broker) via ``apply_async(retry=False)`` so the HTTP request path
-    is NEVER delayed.  If the broker is unreachable the fallback ``_write_sync``
-    writes directly to PostgreSQL so audit events are NEVER silently dropped.
+    All writes are fire-and-forget: events are appended to a Redis list
+    buffer (one pipelined RPUSH) and bulk-written by the ``drain_audit_buffer``
+    Celery task (see ``apps/audit_logs/buffer.py``), so the HTTP request path
+    is NEVER delayed.  If Redis is unreachable the event is dispatched to the
+    per-event ``write_audit_event`` task via ``apply_async(retry=False)``, and
+    if the broker is also down the fallback ``_write_sync`` writes directly to
+    PostgreSQL so audit events are NEVER silently dropped.  Every payload
+    carries its own UUID7 ``id`` so re-delivered events are deduplicated.
 
 Phase 9 Auto-Enrichment (2026 GDPR/NDPR/PCI-DSS):
     The following Phase 9 fields are auto-populated when not explicitly provided:
     - ``api_version``         — extracted from request.path or resolved_path (/v1/, /v2/ …)
     - ``tls_version``         — from ``request.META['SSL_PROTOCOL']`` (Nginx variable)
     - ``data_subject_id``     — auto-set to ``actor.pk`` when ``is_compliance=True``
-    - ``geo_country_code``    — set in Celery task during background GeoIP enrichment
-    - ``geo_city``            — set in Celery task during background GeoIP enrichment
+    - ``geo_country_code``    — set inline from the offline GeoIP lookup
+    - ``geo_city``            — set inline from the offline GeoIP lookup
     Fields that require caller knowledge (``request_size_bytes``, ``response_size_bytes``,
     ``session_fingerprint``, ``tenant_id``, ``legal_hold``) are passed explicitly by callers.
 
@@ -29,8 +33,9 @@ Auto-Enrichment:
     Every event is automatically enriched with:
     - ``ip_address``, ``user_agent`` — from Django ``HttpRequest.META``
     - ``device_type``, ``browser_family``, ``os_family`` — from UA parsing
-    - ``country``, ``country_code``, ``city`` — geo-IP via IPinfo
-      (Redis-cached 24 hours per IP to stay under the 45 req/min free tier)
+    - ``country``, ``country_code``, ``city`` — offline geo-IP from a local
+      MaxMind / CSV range table (``GEOIP_DB_PATH``), resolved inline with no
+      network I/O; IPinfo + Redis cache only when no local DB is configured
 
 Compliance:
     Events flagged with ``is_compliance=True`` (payments, KYC, wallet ops)
@@ -57,32 +62,37 @@ Usage:
 
 import logging
 
+import uuid6
+from django.utils import timezone
+
 logger = logging.getLogger(__name__)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Geo-IP extraction — synchronous, Redis-cached 24 h, fail-safe
+# Geo-IP extraction — offline (local DB + in-process LRU), fail-safe
 # ─────────────────────────────────────────────────────────────────────────────
 
 def _resolve_geo(ip: str, allow_network: bool = False) -> dict:
     """Resolve geographic location data for a public IP address.
 
-    Skips RFC-1918 private ranges, loopback (127.x, ::1), and the
-    172.16.0.0/12 private range to avoid unnecessary external calls.
-    Results are Redis-cached for 24 hours so the same IP is never
-    resolved more than once per day — critical for high-traffic auth
-    flows that may see the same IP thousands of times per minute.
+    Skips private, loopback, link-local and reserved addresses (checked
+    with ``ipaddress``, not string prefixes).
+
+    Primary path — offline:
+        When ``GEOIP_DB_PATH`` points at a MaxMind ``.mmdb`` or an IP-range
+        CSV, the address is resolved from a memory-mapped local table behind
+        an in-process LRU (see ``apps/audit_logs/geoip.py``). No Redis, no
+        HTTP — cheap enough to run inline on the request path.
 
-    External Provider:
-        IPinfo Lite/Core when an ``IPINFO_TOKEN`` is configured. Falls back
-        to the unauthenticated legacy endpoint for best-effort country data
-        when the token is absent. For very high-volume production workloads,
-        prefer a locally-hosted MaxMind GeoIP2 database.
+    Legacy path — no local database configured:
+        In-process LRU, then the Redis ``geo:{ip}`` cache (24 h). On a miss,
+        IPinfo is queried only when ``allow_network`` is True (Celery
+        workers); request-path callers return ``{}`` immediately.
 
     Args:
         ip: IPv4 or IPv6 address string. May be empty or ``None``.
-        allow_network: If True, allows external HTTP requests to resolve the location on cache miss.
-                       If False, only performs a cache lookup and returns immediately on miss.
+        allow_network: Legacy path only — allow an external HTTP lookup on
+            a cache miss. Ignored when a local database is configured.
 
     Returns:
         dict: A mapping with up to four keys — ``country``,
@@ -94,40 +104,38 @@ def _resolve_geo(ip: str, allow_network: bool = False) -> dict:
         This function catches ALL exceptions and returns ``{}`` —
         geo resolution failure must never propagate to callers.
     """
-    _PRIVATE_PREFIXES = (
-        '127.', '10.', '192.168.', '::1', '0.0.0.0', 'localhost',
-    )
-    if not ip or any(ip.startswith(p) for p in _PRIVATE_PREFIXES):
-        return {}
-    if ip.startswith('172.'):
-        try:
-            second_octet = int(ip.split('.')[1])
-            if 16 <= second_octet <= 31:
-                return {}
-        except Exception:
-            pass
-
     try:
-        from apps.common.utils.redis import get_redis_connection_safe
-        r = get_redis_connection_safe()
-        cache_key = f"geo:{ip}"
+        from apps.audit_logs.geoip import get_geoip_resolver, is_public_ip
 
-        if r:
-            cached = r.get(cache_key)
-            if cached:
-                import json
-                try:
-                    return json.loads(cached)
-                except Exception:
-                    pass
+        if not is_public_ip(ip):
+            return {}
+        ip = ip.strip()
+        resolver = get_geoip_resolver()
+        if resolver.available:
+            return dict(resolver.lookup(ip))
+
+        cached = resolver.cache.get(ip)
+        if cached:
+            return dict(cached)
+
+        import json as _json
+
+        cache_key = f"geo:{ip}"
+        r = None
+        try:
+            from django_redis import get_redis_connection
+            r = get_redis_connection("default")
+            raw = r.get(cache_key)
+            if raw:
+                result = _json.loads(raw)
+                resolver.cache.put(ip, result)
+                return dict(result)
+        except Exception:
+            r = None
 
-        # Speed Optimization: On the synchronous request-response path, we only do
-        # a fast in-memory Redis check. If we hit a cache miss, we return empty info
-        # and defer the external HTTP API lookups to the asynchronous Celery task.
         if not allow_network:
             return {}
 
-        import json as _json
         import os as _os
         import urllib.request as _req
         import urllib.error as _err
@@ -149,6 +157,7 @@ def _resolve_geo(ip: str, allow_network: bool = False) -> dict:
             "city":         data.get("city") or "",
             "region":       data.get("region") or "",
         }
+        resolver.cache.put(ip, result)
 
         if r:
             try:
@@ -156,7 +165,7 @@ def _resolve_geo(ip: str, allow_network: bool = False) -> dict:
             except Exception:
                 pass
 
-        return result
+        return dict(result)
 
     except Exception:
         return {}
@@ -317,6 +326,7 @@ class AuditService:
         """
         try:
             from apps.audit_logs.middleware import get_audit_context
+            from apps.audit_logs.models import classify_retention
             ctx = get_audit_context()
 
             # ── Resolve actor ─────────────────────────────────────────
@@ -406,6 +416,7 @@ class AuditService:
                     pass
 
             safe_retention_days = retention_days if retention_days >= 0 else 0
+            resolved_retention_class = classify_retention(is_compliance, safe_retention_days)
 
             # ── Phase 9: Auto-resolve api_version from request path ──────────────
             # Extracts /v1/, /v2/ etc. from the path so every audit event is
@@ -455,6 +466,8 @@ class AuditService:
 
             # ── Build payload ─────────────────────────────────────────
             payload = dict(
+                id=str(uuid6.uuid7()),
+                created_at=timezone.now(),
                 event_type=event_type,
                 event_category=event_category,
                 severity=severity,
@@ -484,6 +497,7 @@ class AuditService:
                 error_message=error_message,
                 is_compliance=is_compliance,
                 retention_days=safe_retention_days,
+                retention_class=resolved_retention_class,
                 client_device_id=resolved_client_device_id,
                 client_timezone=resolved_client_timezone,
                 client_locale=resolved_client_locale,
@@ -500,8 +514,8 @@ class AuditService:
                 tenant_id=str(tenant_id) if tenant_id else None,
                 legal_hold=legal_hold,
                 data_subject_id=str(resolved_data_subject_id) if resolved_data_subject_id else None,
-                geo_country_code=(geo_country_code or "")[:2].upper() or None,
-                geo_city=geo_city or None,
+                geo_country_code=(geo_country_code or resolved_country_code or "")[:2].upper() or None,
+                geo_city=geo_city or resolved_city or None,
             )
 
             cls._dispatch(payload)
@@ -514,7 +528,7 @@ class AuditService:
 
     @staticmethod
     def _dispatch(payload: dict) -> None:
-        """Enqueue an audit event payload to the Celery worker queue.
+        """Enqueue an audit event payload to the Redis buffer (or Celery).
 
         Dispatches immediately (NOT inside ``transaction.on_commit()``) so
         the event is recorded even if the caller's DB transaction rolls back.
@@ -531,9 +545,18 @@ class AuditService:
                 resolves the FK separately to avoid serialisation issues.
 
         Note:
-            Falls back to ``_write_sync()`` if the broker is unreachable so
-            audit events are NEVER silently dropped.
+            Falls back to the per-event ``write_audit_event`` task when the
+            Redis buffer is unavailable, and to ``_write_sync()`` if the
+            broker is unreachable too, so audit events are NEVER silently
+            dropped.
         """
+        try:
+            from apps.audit_logs.buffer import enqueue_audit_event
+            if enqueue_audit_event(payload):
+                return
+        except Exception as exc:
+            logger.debug("AuditService: audit buffer unavailable (%s) — dispatching per event", exc)
+
         try:
             from apps.audit_logs.tasks import write_audit_event
             write_audit_event.apply_async(
@@ -568,7 +591,7 @@ def _write_sync(payload: dict) -> None:
         obj = AuditEventLog(**payload)
         if actor_id:
             obj.actor_id = actor_id
-        obj.save()
+        obj.save(force_insert=True)
     except Exception:
         logger.exception(
             "AuditService._write_sync() failed for payload=%s",
@@ -4,9 +4,11 @@ Celery tasks for the audit_logs app.
 
 Tasks
 ─────
-  write_audit_event     — Write one AuditEventLog row (primary task).
+  drain_audit_buffer    — Bulk-write buffered audit events (primary path, see buffer.py).
+  write_audit_event     — Write one AuditEventLog row (fallback when Redis is down).
   cleanup_audit_logs    — Periodic cleanup of expired audit records (daily 2AM).
-                          Respects per-row retention_days (NDPR/PCI-DSS).
+                          Drops expired monthly partitions on PostgreSQL, then
+                          range-deletes the rest; respects per-row retention_days.
 
 Compliance notes:
   - Rows with is_compliance=True are NEVER deleted, regardless of retention_days.
@@ -20,7 +22,6 @@ import logging
 from datetime import timedelta
 
 from celery import shared_task
-from django.db.models import DurationField, ExpressionWrapper, F
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,108 @@ logger = logging.getLogger(__name__)
 # 1. WRITE AUDIT EVENT
 # ═══════════════════════════════════════════════════════════════════════════
 
+# ── Known AuditEventLog field names (allowlist) ───────────────────────────
+# Geo-enrichment services may add extra keys (country_code, city, region,
+# asn, …) that are NOT columns on AuditEventLog. Strip them here so we
+# never crash with "unexpected keyword argument".
+_KNOWN_FIELDS = {
+    "id",
+    "event_type", "event_category", "severity", "action",
+    "actor", "actor_email", "actor_role", "session_id",
+    "ip_address", "user_agent", "device_type",
+    "browser_family", "os_family",
+    "country", "country_code", "city", "correlation_id",
+    "resource_type", "resource_id",
+    "request_method", "request_path", "response_status", "duration_ms",
+    "old_values", "new_values", "metadata", "error_message",
+    "is_compliance", "retention_days", "retention_class", "created_at",
+    # ── Wave B3: Frontend client context fields (migration 0005) ─────────────
+    # Added for device-level audit trails per GDPR/NDPR/PCI-DSS requirements.
+    # These are populated from X-Client-* request headers via AuditMiddleware.
+    "client_device_id", "client_timezone", "client_locale", "client_platform",
+    "client_geo_lat", "client_geo_lng", "client_geo_accuracy_m",
+    # ── Phase 9: 2026 GDPR/NDPR/PCI-DSS compliance fields (migration 0009) ───
+    # New fields that extend the audit schema for full 2026 compliance coverage.
+    # See apps/audit_logs/models.py for complete field documentation.
+    "request_size_bytes",   # Incoming payload size (anomaly detection)
+    "response_size_bytes",  # Outgoing payload size (bandwidth audit)
+    "tls_version",          # TLS version for PCI-DSS Req. 10.3 compliance
+    "session_fingerprint",  # SHA-256 device fingerprint (fraud detection)
+    "api_version",          # /v1/, /v2/ for per-version security segmentation
+    "tenant_id",            # Multi-tenant partition (future expansion)
+    "legal_hold",           # PCI-DSS freeze — blocks ALL deletion paths
+    "data_subject_id",      # GDPR SAR reference UUID (Art. 15 compliance)
+    "geo_country_code",     # ISO 3166-1 alpha-2 strict 2-char GeoIP code
+    "geo_city",             # GeoIP city for geographic compliance segmentation
+}
+
+
+def enrich_geo(payload: dict, geo_by_ip: dict | None = None) -> None:
+    """
+    Background Geo-IP enrichment (async path only), in place.
+
+    AuditService.log() already resolves geo inline from the offline GeoIP
+    table, so this only does work for events logged without a local
+    database configured: the lookup may then fall back to IPinfo from this
+    Celery worker. ``geo_by_ip`` memoises lookups across a batch so each distinct IP is
+    resolved once.
+    """
+    ip_address = payload.get("ip_address")
+    country = payload.get("country")
+    country_code = payload.get("country_code")
+    city = payload.get("city")
+    if not ip_address or (country and country_code):
+        return
+    try:
+        if geo_by_ip is not None and ip_address in geo_by_ip:
+            geo = geo_by_ip[ip_address]
+        else:
+            from apps.audit_logs.services.audit import _resolve_geo
+            geo = _resolve_geo(ip_address, allow_network=True)
+            if geo_by_ip is not None:
+                geo_by_ip[ip_address] = geo
+        if geo:
+            payload["country"]          = geo.get("country")       or country or ""
+            payload["country_code"]      = geo.get("country_code")  or country_code or ""
+            payload["city"]              = geo.get("city")          or city or ""
+            # Phase 9: Also populate the new strict 2-char compliance fields.
+            # geo_country_code is always exactly 2 chars (ISO 3166-1 alpha-2).
+            raw_cc = geo.get("country_code") or country_code or ""
+            if not payload.get("geo_country_code"):
+                payload["geo_country_code"] = raw_cc[:2].upper() if raw_cc else None
+            if not payload.get("geo_city"):
+                payload["geo_city"] = geo.get("city") or city or None
+    except Exception as geo_exc:
+        logger.debug("write_audit_event: background geo enrichment failed: %s", geo_exc)
+
+
+def build_audit_event(payload: dict):
+    """Unsaved AuditEventLog from a payload (unknown keys stripped, actor_id set)."""
+    from apps.audit_logs.models import AuditEventLog, classify_retention
+
+    # ⚡ Strip any keys the ORM doesn't know about (geo extras, future fields)
+    safe_payload = {k: v for k, v in payload.items() if k in _KNOWN_FIELDS}
+
+    # Log stripped keys so we can identify payload drift early
+    stripped = set(payload) - _KNOWN_FIELDS - {"actor_id"}
+    if stripped:
+        logger.debug(
+            "write_audit_event: stripped unknown payload keys: %s", stripped
+        )
+
+    # AuditEventLog rows are append-only by design, so every audit event
+    # must be persisted as a fresh row even when a correlation_id repeats.
+    # Re-deliveries of the SAME event share its ``id`` and are deduplicated.
+    obj = AuditEventLog(**safe_payload)
+    # Partition key — always derived, never trusted from the payload.
+    obj.retention_class = classify_retention(obj.is_compliance, obj.retention_days)
+
+    actor_id = payload.get("actor_id")
+    if actor_id:
+        obj.actor_id = actor_id
+    return obj
+
+
 @shared_task(
     name="write_audit_event",
     bind=True,
@@ -41,100 +144,28 @@ def write_audit_event(self, payload: dict) -> None:
     """
     Write an AuditEventLog row from the given payload dict.
 
-    Called via apply_async() from AuditService — fully async, never blocks
-    the main Django request thread.
+    Per-event path: used by AuditService when the Redis audit buffer is
+    unavailable (see apps/audit_logs/buffer.py for the batched path).
 
     Retries up to 2 times on transient DB errors. After that, logs the
     failure as WARNING and gives up — audit failures MUST never crash the
     main request flow.
     """
-    # ── Known AuditEventLog field names (allowlist) ───────────────────────────
-    # Geo-enrichment services may add extra keys (country_code, city, region,
-    # asn, …) that are NOT columns on AuditEventLog. Strip them here so we
-    # never crash with "unexpected keyword argument".
-    _KNOWN_FIELDS = {
-        "event_type", "event_category", "severity", "action",
-        "actor", "actor_email", "actor_role", "session_id",
-        "ip_address", "user_agent", "device_type",
-        "browser_family", "os_family",
-        "country", "country_code", "city", "correlation_id",
-        "resource_type", "resource_id",
-        "request_method", "request_path", "response_status", "duration_ms",
-        "old_values", "new_values", "metadata", "error_message",
-        "is_compliance", "retention_days",
-        # ── Wave B3: Frontend client context fields (migration 0005) ─────────────
-        # Added for device-level audit trails per GDPR/NDPR/PCI-DSS requirements.
-        # These are populated from X-Client-* request headers via AuditMiddleware.
-        "client_device_id", "client_timezone", "client_locale", "client_platform",
-        "client_geo_lat", "client_geo_lng", "client_geo_accuracy_m",
-        # ── Phase 9: 2026 GDPR/NDPR/PCI-DSS compliance fields (migration 0009) ───
-        # New fields that extend the audit schema for full 2026 compliance coverage.
-        # See apps/audit_logs/models.py for complete field documentation.
-        "request_size_bytes",   # Incoming payload size (anomaly detection)
-        "response_size_bytes",  # Outgoing payload size (bandwidth audit)
-        "tls_version",          # TLS version for PCI-DSS Req. 10.3 compliance
-        "session_fingerprint",  # SHA-256 device fingerprint (fraud detection)
-        "api_version",          # /v1/, /v2/ for per-version security segmentation
-        "tenant_id",            # Multi-tenant partition (future expansion)
-        "legal_hold",           # PCI-DSS freeze — blocks ALL deletion paths
-        "data_subject_id",      # GDPR SAR reference UUID (Art. 15 compliance)
-        "geo_country_code",     # ISO 3166-1 alpha-2 strict 2-char GeoIP code
-        "geo_city",             # GeoIP city for geographic compliance segmentation
-    }
-
+    from django.db import IntegrityError
 
     try:
-        from apps.audit_logs.models import AuditEventLog
-
-        # Extract actor_id separately (set via obj.actor_id, not __init__)
-        actor_id = payload.get("actor_id")
-
-        # ⚡ Background Geo-IP enrichment (Async-path Only)
-        # If the IP address is present but geo location fields are missing/empty,
-        # trigger the full geo lookup allowing network calls in this Celery worker thread.
-        ip_address = payload.get("ip_address")
-        country = payload.get("country")
-        country_code = payload.get("country_code")
-        city = payload.get("city")
-        if ip_address and not (country and country_code):
-            try:
-                from apps.audit_logs.services.audit import _resolve_geo
-                geo = _resolve_geo(ip_address, allow_network=True)
-                if geo:
-                    payload["country"]          = geo.get("country")       or country or ""
-                    payload["country_code"]      = geo.get("country_code")  or country_code or ""
-                    payload["city"]              = geo.get("city")          or city or ""
-                    # Phase 9: Also populate the new strict 2-char compliance fields.
-                    # geo_country_code is always exactly 2 chars (ISO 3166-1 alpha-2).
-                    raw_cc = geo.get("country_code") or country_code or ""
-                    payload.setdefault("geo_country_code", raw_cc[:2].upper() if raw_cc else None)
-                    payload.setdefault("geo_city", geo.get("city") or city or None)
-            except Exception as geo_exc:
-                logger.debug("write_audit_event: background geo enrichment failed: %s", geo_exc)
-
-        # ⚡ Strip any keys the ORM doesn't know about (geo extras, future fields)
-        safe_payload = {k: v for k, v in payload.items() if k in _KNOWN_FIELDS}
-
-        # Log stripped keys so we can identify payload drift early
-        stripped = set(payload) - _KNOWN_FIELDS - {"actor_id"}
-        if stripped:
-            logger.debug(
-                "write_audit_event: stripped unknown payload keys: %s", stripped
-            )
-
-        # AuditEventLog rows are append-only by design, so every audit event
-        # must be persisted as a fresh row even when a correlation_id repeats.
-        obj = AuditEventLog(**safe_payload)
-
-        if actor_id:
-            obj.actor_id = actor_id
-        obj.save()
+        enrich_geo(payload)
+        obj = build_audit_event(payload)
+        obj.save(force_insert=True)
 
         logger.debug(
             "AuditEventLog written: event_type=%s actor=%s",
-            safe_payload.get("event_type"),
-            safe_payload.get("actor_email") or actor_id,
+            obj.event_type,
+            obj.actor_email or payload.get("actor_id"),
         )
+    except IntegrityError:
+        # Same event id already written (re-delivery) — at-least-once dedupe.
+        logger.debug("write_audit_event: duplicate event id=%s skipped", payload.get("id"))
     except Exception as exc:
         logger.warning(
             "write_audit_event failed (attempt %d/3): %s — event_type=%s",
@@ -146,6 +177,36 @@ def write_audit_event(self, payload: dict) -> None:
             raise self.retry(exc=exc)
 
 
+@shared_task(
+    name="drain_audit_buffer",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=5,
+    ignore_result=True,
+)
+def drain_audit_buffer(self) -> int:
+    """
+    Drain the Redis audit buffer into AuditEventLog with bulk INSERTs.
+
+    Scheduled by the producer once per flush interval (or immediately when
+    a full batch is waiting) and by Celery beat as a safety net. Events stay
+    in the buffer until their batch is committed, so a failed run is simply
+    retried — nothing is lost.
+    """
+    from apps.audit_logs.buffer import drain_audit_buffer_once
+
+    try:
+        consumed = drain_audit_buffer_once()
+    except Exception as exc:
+        logger.warning("drain_audit_buffer failed (attempt %d): %s", self.request.retries + 1, exc)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        return 0
+    if consumed:
+        logger.debug("drain_audit_buffer: wrote %d buffered audit events", consumed)
+    return consumed
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 2. AUDIT LOG CLEANUP — Production data retention enforcement
 # ═══════════════════════════════════════════════════════════════════════════
@@ -174,74 +235,80 @@ def cleanup_audit_logs(self) -> dict:
     NEVER deletes compliance-marked events (PCI, GDPR, financial).
     Scheduled: daily at 2 AM UTC via CELERY_BEAT_SCHEDULE in base.py.
 
+    On PostgreSQL the table is partitioned (see partitions.py): the task
+    first pre-creates upcoming monthly partitions, then detaches and drops
+    whole expired security/debug months. Rows that outlive their partition
+    (shorter retention_days than their month's maximum, or months held by a
+    legal-hold row) are removed by an index range delete per distinct
+    retention_days value.
+
     Returns:
         dict with counts of deleted records per category.
     """
     now = timezone.now()
     result = {
         "audit_deleted": 0,
+        "partitions_dropped": 0,
+        "partitions_held": 0,
         "webhook_deleted": 0,
         "run_at": now.isoformat(),
     }
 
-    # ── Step 1: Delete expired non-compliance AuditEventLog rows ─────────
+    # ── Step 1a: Partition maintenance + whole-partition retention ──────
+    try:
+        from apps.audit_logs import partitions
+
+        partitions.ensure_partitions()
+        dropped = partitions.drop_expired_partitions(now=now)
+        result["partitions_dropped"] = len(dropped["dropped"])
+        result["partitions_held"] = len(dropped["held"])
+        result["audit_deleted"] += dropped["rows"]
+    except Exception as exc:
+        logger.error("audit_log_cleanup: partition retention failed: %s", exc)
+
+    # ── Step 1b: Delete remaining expired non-compliance rows ───────────
     #
     # Production-grade strategy (NDPR / PCI-DSS Art. 17):
-    #   We annotate each row with its individual expiry date using a DB-side
-    #   ExpressionWrapper so each row's own retention_days column drives deletion.
-    #   This means a 7-year financial event and a 90-day debug event co-exist
-    #   in the same table with ZERO risk of premature erasure.
+    #   Each row's own retention_days drives deletion, so a 7-year financial
+    #   event and a 90-day debug event co-exist with ZERO risk of premature
+    #   erasure. Instead of computing created_at + retention_days for every
+    #   row (unindexable), rows are grouped by their retention_days value:
+    #   each group is a plain created_at range on idx_ael_retention.
     #
     # Excluded from deletion:
     #   - is_compliance = True  (hard financial / GDPR compliance records)
     #   - retention_days <= 0   (permanent retention sentinel — set to -1 by convention)
+    #   - legal_hold = True     (Phase 9 regulatory freeze)
     try:
         from apps.audit_logs.models import AuditEventLog
 
         BATCH_SIZE = 1000
         total_deleted = 0
 
-        while True:
-            # Annotate rows with a computed expiry timestamp:
-            #   expiry_at = created_at + retention_days (converted to interval)
-            # Then filter: expiry_at < now AND is_compliance=False AND retention_days > 0
-            expired_ids = list(
-                AuditEventLog.objects.filter(
-                    is_compliance=False,
-                    retention_days__gt=0,   # exclude permanent (-1) rows
-                    legal_hold=False,        # Phase 9: NEVER delete legal-hold rows
-                )
-                .annotate(
-                    expiry_at=ExpressionWrapper(
-                        F("created_at")
-                        + ExpressionWrapper(
-                            F("retention_days") * timedelta(days=1),
-                            output_field=DurationField(),
-                        ),
-                        output_field=DurationField(),
-                    )
-                )
-                .filter(expiry_at__lt=now)
-                .values_list("id", flat=True)[:BATCH_SIZE]
-            )
-
-            if not expired_ids:
-                break
-
-            deleted_count, _ = AuditEventLog.objects.filter(
-                id__in=expired_ids,
+        for retention_days in _finite_retention_values():
+            cutoff = now - timedelta(days=retention_days)
+            expired = AuditEventLog.objects.filter(
+                retention_days=retention_days,
+                created_at__lt=cutoff,
                 is_compliance=False,  # double-guard — never delete compliance rows
                 legal_hold=False,     # Phase 9 triple-guard — never delete frozen rows
-            ).delete()
-            total_deleted += deleted_count
-
-            if deleted_count < BATCH_SIZE:
-                break  # exhausted eligible rows
-
-        result["audit_deleted"] = total_deleted
+            )
+            while True:
+                expired_ids = list(expired.values_list("id", flat=True)[:BATCH_SIZE])
+                if not expired_ids:
+                    break
+                deleted_count, _ = expired.filter(id__in=expired_ids).delete()
+                total_deleted += deleted_count
+                if deleted_count < BATCH_SIZE:
+                    break  # exhausted eligible rows
+
+        result["audit_deleted"] += total_deleted
         logger.info(
-            "audit_log_cleanup: deleted %d expired AuditEventLog rows (per-row retention)",
+            "audit_log_cleanup: deleted %d expired AuditEventLog rows (per-row retention), "
+            "dropped %d partitions (%d held)",
             total_deleted,
+            result["partitions_dropped"],
+            result["partitions_held"],
         )
 
     except Exception as exc:
@@ -273,3 +340,34 @@ def cleanup_audit_logs(self) -> dict:
         result["webhook_deleted"],
     )
     return result
+
+
+def _finite_retention_values() -> list[int]:
+    """
+    Distinct positive retention_days values present in AuditEventLog.
+
+    On PostgreSQL this is a loose index scan over idx_ael_retention (one
+    index probe per distinct value) rather than an aggregate over every row.
+    """
+    from django.db import connection
+
+    from apps.audit_logs.models import AuditEventLog
+
+    if connection.vendor != "postgresql":
+        return sorted(
+            AuditEventLog.objects.filter(retention_days__gt=0)
+            .values_list("retention_days", flat=True)
+            .distinct()
+        )
+
+    table = connection.ops.quote_name(AuditEventLog._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH RECURSIVE r(v) AS ("
+            f"  SELECT min(retention_days) FROM {table} WHERE retention_days > 0"
+            f"  UNION ALL"
+            f"  SELECT (SELECT min(retention_days) FROM {table} WHERE retention_days > r.v)"
+            f"  FROM r WHERE r.v IS NOT NULL"
+            f") SELECT v FROM r WHERE v IS NOT NULL"
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,177 @@
+# apps/audit_logs/tests/test_audit_buffer.py
+"""
+FASHIONISTAR — Tests: micro-batched audit buffer
+================================================
+Covers:
+  - AuditService.log() appends to the Redis buffer instead of dispatching a task
+  - drain_audit_buffer_once() writes the buffer with bulk INSERTs and empties it
+  - Re-delivered events (same id) are not duplicated
+  - A drainer whose lock expired mid-batch never trims the buffer
+  - A buffer outage falls back to the per-event task / _write_sync path
+
+Run with:
+  pytest apps/audit_logs/tests/test_audit_buffer.py -v
+"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Helpers
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def rpush(self, key, value):
+        self.ops.append(lambda: self.redis.rpush(key, value))
+
+    def set(self, key, value, nx=False, ex=None):
+        self.ops.append(lambda: self.redis.set(key, value, nx=nx, ex=ex))
+
+    def execute(self):
+        return [op() for op in self.ops]
+
+
+class FakeRedis:
+    """Just enough of the redis-py list / string API for the buffer."""
+
+    def __init__(self):
+        self.lists = {}
+        self.strings = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode())
+        return len(self.lists[key])
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value).encode()
+        return True
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+
+    def expire(self, key, ttl):
+        return key in self.strings
+
+    def eval(self, script, numkeys, *args):
+        """The buffer's owner-checked Lua scripts (renew / trim / release)."""
+        keys, argv = args[:numkeys], args[numkeys:]
+        if self.strings.get(keys[0]) != str(argv[0]).encode():
+            return 0
+        if "ltrim" in script:
+            self.ltrim(keys[1], int(argv[1]), -1)
+        elif "del" in script:
+            self.delete(keys[0])
+        return 1
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("apps.common.utils.redis_list_buffer._redis", return_value=redis), \
+         patch("apps.audit_logs.tasks.drain_audit_buffer.apply_async"):
+        yield redis
+
+
+def _log(action="buffered event"):
+    from apps.audit_logs.models import EventCategory, EventType, SeverityLevel
+    from apps.audit_logs.services.audit import AuditService
+
+    AuditService.log(
+        event_type=EventType.LOGIN_SUCCESS,
+        event_category=EventCategory.AUTHENTICATION,
+        severity=SeverityLevel.INFO,
+        action=action,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Tests
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TestAuditBuffer:
+    def test_log_buffers_instead_of_dispatching(self, fake_redis):
+        from apps.audit_logs.buffer import BUFFER_KEY
+        from apps.audit_logs.models import AuditEventLog
+
+        with patch("apps.audit_logs.tasks.write_audit_event.apply_async") as per_event:
+            _log()
+
+        per_event.assert_not_called()
+        assert len(fake_redis.lists[BUFFER_KEY]) == 1
+        assert AuditEventLog.objects.count() == 0
+
+    def test_drain_writes_in_batches_and_empties_buffer(self, fake_redis, settings):
+        from apps.audit_logs.buffer import BUFFER_KEY, drain_audit_buffer_once, write_audit_batch
+        from apps.audit_logs.models import AuditEventLog
+
+        settings.AUDIT_BUFFER_BATCH_SIZE = 2
+        for i in range(5):
+            _log(action=f"event {i}")
+
+        with patch("apps.audit_logs.buffer.write_audit_batch", wraps=write_audit_batch) as batch:
+            assert drain_audit_buffer_once() == 5
+
+        assert batch.call_count == 3
+        assert fake_redis.lists[BUFFER_KEY] == []
+        assert AuditEventLog.objects.count() == 5
+
+    def test_redelivered_events_are_not_duplicated(self, fake_redis):
+        from apps.audit_logs.buffer import BUFFER_KEY, drain_audit_buffer_once
+        from apps.audit_logs.models import AuditEventLog
+
+        _log()
+        item = fake_redis.lists[BUFFER_KEY][0]
+        assert drain_audit_buffer_once() == 1
+
+        fake_redis.lists[BUFFER_KEY] = [item]   # crash between INSERT and LTRIM
+        assert drain_audit_buffer_once() == 1
+        assert AuditEventLog.objects.count() == 1
+
+    def test_drainer_that_lost_its_lock_does_not_trim(self, fake_redis):
+        from apps.audit_logs.buffer import BUFFER_KEY, DRAIN_LOCK_KEY, drain_audit_buffer_once, write_audit_batch
+
+        _log()
+
+        def slow_batch(payloads):
+            write_audit_batch(payloads)
+            fake_redis.strings[DRAIN_LOCK_KEY] = b"second-drainer"   # TTL expired, lock taken over
+
+        with patch("apps.audit_logs.buffer.write_audit_batch", side_effect=slow_batch):
+            assert drain_audit_buffer_once() == 0
+
+        assert len(fake_redis.lists[BUFFER_KEY]) == 1               # left for the new owner
+        assert fake_redis.strings[DRAIN_LOCK_KEY] == b"second-drainer"
+
+    def test_buffer_outage_falls_back_to_sync_write(self):
+        from apps.audit_logs.models import AuditEventLog
+
+        with patch("apps.common.utils.redis_list_buffer._redis", side_effect=ConnectionError("redis down")), \
+             patch("apps.audit_logs.tasks.write_audit_event.apply_async",
+                   side_effect=Exception("broker down")):
+            _log()
+
+        assert AuditEventLog.objects.filter(action="buffered event").count() == 1
@@ -0,0 +1,108 @@
+# apps/audit_logs/tests/test_geoip.py
+"""
+FASHIONISTAR — Tests: offline GeoIP resolver
+============================================
+Covers:
+  - CSV ranges (CIDR and start/end) compile to a memory-mapped table
+  - Compilation happens in ``compile_geoip``; the resolver never writes
+  - IPv4 and IPv6 lookups by binary search; gaps resolve to {}
+  - Private / malformed addresses short-circuit without a lookup
+  - Repeat lookups are served from the in-process LRU
+  - _resolve_geo() uses the local table and never touches the network
+
+Run with:
+  pytest apps/audit_logs/tests/test_geoip.py -v
+"""
+from __future__ import annotations
+
+import io
+import ipaddress
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+
+from apps.audit_logs.geoip import GeoIPResolver, RangeTable, compile_csv
+
+CSV = """network,start_ip,end_ip,country_code,country,city,region
+102.89.0.0/16,,,NG,Nigeria,Lagos,Lagos
+,41.58.0.0,41.58.255.255,NG,Nigeria,Abuja,FCT
+81.2.69.0/24,,,GB,United Kingdom,London,England
+2a02:c7f::/32,,,GB,United Kingdom,,
+"""
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    path = tmp_path / "ranges.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+@pytest.fixture
+def geo_csv(raw_csv):
+    call_command("compile_geoip", source=raw_csv, stdout=io.StringIO())
+    return raw_csv
+
+
+class TestRangeTable:
+    def test_compile_and_lookup(self, geo_csv, tmp_path):
+        out = str(tmp_path / "ranges.bin")
+        assert compile_csv(geo_csv, out) == 4
+        table = RangeTable(out)
+
+        assert table.lookup(ipaddress.ip_address("102.89.7.1"))["city"] == "Lagos"
+        assert table.lookup(ipaddress.ip_address("41.58.255.255"))["city"] == "Abuja"
+        assert table.lookup(ipaddress.ip_address("81.2.69.160"))["country_code"] == "GB"
+        assert table.lookup(ipaddress.ip_address("2a02:c7f:1::1"))["country"] == "United Kingdom"
+        assert table.lookup(ipaddress.ip_address("41.59.0.1")) == {}   # gap between ranges
+        assert table.lookup(ipaddress.ip_address("1.1.1.1")) == {}     # before first range
+
+
+class TestGeoIPResolver:
+    def test_csv_source_reads_the_precompiled_table(self, geo_csv):
+        resolver = GeoIPResolver(path=geo_csv)
+        assert resolver.lookup("102.89.1.1")["country_code"] == "NG"
+        assert resolver.available
+
+    def test_uncompiled_csv_is_never_compiled_on_lookup(self, raw_csv):
+        resolver = GeoIPResolver(path=raw_csv)
+        assert resolver.lookup("102.89.1.1") == {}
+        assert not resolver.available
+        assert not os.path.exists(f"{raw_csv}.bin")
+
+    def test_mmdb_without_maxminddb_fails_loudly(self, tmp_path):
+        resolver = GeoIPResolver(path=str(tmp_path / "City.mmdb"))
+        with patch.dict("sys.modules", {"maxminddb": None}), pytest.raises(ImproperlyConfigured):
+            resolver.lookup("81.2.69.1")
+
+    def test_private_and_malformed_addresses(self, geo_csv):
+        resolver = GeoIPResolver(path=geo_csv)
+        for ip in ("10.0.0.1", "172.20.1.1", "127.0.0.1", "::1", "not-an-ip", "", None):
+            assert resolver.lookup(ip) == {}
+
+    def test_repeat_lookups_hit_the_lru(self, geo_csv):
+        resolver = GeoIPResolver(path=geo_csv, lru_size=8)
+        resolver.lookup("81.2.69.1")
+        with patch.object(RangeTable, "lookup") as table_lookup:
+            assert resolver.lookup("81.2.69.1")["city"] == "London"
+        table_lookup.assert_not_called()
+
+    def test_missing_database_disables_lookups(self, tmp_path):
+        resolver = GeoIPResolver(path=str(tmp_path / "absent.bin"))
+        assert resolver.lookup("81.2.69.1") == {}
+        assert not resolver.available
+
+
+class TestResolveGeo:
+    def test_resolves_inline_without_network(self, geo_csv):
+        from apps.audit_logs.services.audit import _resolve_geo
+
+        with patch("apps.audit_logs.geoip._resolver", GeoIPResolver(path=geo_csv)), \
+             patch("urllib.request.urlopen") as urlopen:
+            geo = _resolve_geo("102.89.1.1", allow_network=True)
+
+        urlopen.assert_not_called()
+        assert geo == {"country": "Nigeria", "country_code": "NG", "city": "Lagos", "region": "Lagos"}
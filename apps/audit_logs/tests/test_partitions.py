@@ -0,0 +1,113 @@
+# apps/audit_logs/tests/test_partitions.py
+"""
+FASHIONISTAR — Tests: partitioned AuditEventLog retention
+=========================================================
+Covers:
+  - classify_retention() maps compliance flag + retention_days to a tier
+  - build_audit_event() derives retention_class and keeps the payload created_at
+  - Monthly partition naming and bounds helpers
+  - cleanup_audit_logs deletes each row at its own retention_days, keeps
+    compliance, permanent and legal-hold rows
+  - Partition functions are no-ops off PostgreSQL
+
+Run with:
+  pytest apps/audit_logs/tests/test_partitions.py -v
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.utils import timezone
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _event(label, days_old, retention_days, **extra):
+    from apps.audit_logs.models import AuditEventLog, EventCategory, EventType
+
+    return AuditEventLog(
+        event_type=EventType.API_CALL,
+        event_category=EventCategory.SYSTEM,
+        action=label,
+        retention_days=retention_days,
+        created_at=timezone.now() - timedelta(days=days_old),
+        **extra,
+    )
+
+
+class TestRetentionClass:
+    def test_classify_retention(self):
+        from apps.audit_logs.models import RetentionClass, classify_retention
+
+        assert classify_retention(True, 30) == RetentionClass.COMPLIANCE
+        assert classify_retention(False, 0) == RetentionClass.COMPLIANCE
+        assert classify_retention(False, 90) == RetentionClass.DEBUG
+        assert classify_retention(False, 730) == RetentionClass.SECURITY
+
+    def test_build_audit_event_derives_partition_key(self):
+        from apps.audit_logs.models import RetentionClass
+        from apps.audit_logs.tasks import build_audit_event
+
+        stamped = timezone.now() - timedelta(minutes=5)
+        obj = build_audit_event({
+            "event_type": "api_call",
+            "event_category": "system",
+            "action": "x",
+            "retention_days": 30,
+            "retention_class": RetentionClass.COMPLIANCE,  # never trusted
+            "created_at": stamped,
+        })
+        assert obj.retention_class == RetentionClass.DEBUG
+        assert obj.created_at == stamped
+
+
+class TestPartitionNaming:
+    def test_month_helpers(self):
+        from apps.audit_logs.partitions import add_months, month_bounds, month_start
+
+        assert month_start(datetime(2026, 3, 31, 23, 30, tzinfo=dt_timezone.utc)) == date(2026, 3, 1)
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        lower, upper = month_bounds(date(2026, 12, 1))
+        assert (lower.month, upper.year, upper.month) == (12, 2027, 1)
+
+    def test_partition_name_round_trip(self):
+        from apps.audit_logs.partitions import parse_partition_month, partition_name
+
+        name = partition_name("debug", date(2026, 4, 1), table="audit")
+        assert name == "audit_debug_202604"
+        assert parse_partition_month(name, "debug", table="audit") == date(2026, 4, 1)
+        assert parse_partition_month("audit_debug_default", "debug", table="audit") is None
+
+    def test_partition_functions_noop_off_postgres(self):
+        from django.db import connection
+
+        from apps.audit_logs.partitions import drop_expired_partitions, ensure_partitions
+
+        if connection.vendor == "postgresql":
+            pytest.skip("exercises the non-PostgreSQL fallback")
+        assert ensure_partitions() == 0
+        assert drop_expired_partitions() == {"dropped": [], "held": [], "rows": 0}
+
+
+class TestCleanupRetention:
+    def test_rows_expire_at_their_own_retention(self):
+        from apps.audit_logs.models import AuditEventLog
+        from apps.audit_logs.tasks import cleanup_audit_logs
+
+        AuditEventLog.objects.bulk_create([
+            _event("debug-expired", 100, 90),
+            _event("debug-live", 60, 90),
+            _event("security-expired", 400, 365),
+            _event("security-live", 400, 730),
+            _event("permanent", 400, 0),
+            _event("compliance", 400, 30, is_compliance=True),
+            _event("legal-hold", 400, 30, legal_hold=True),
+        ])
+
+        result = cleanup_audit_logs.apply().get()
+
+        remaining = set(AuditEventLog.objects.values_list("action", flat=True))
+        assert remaining == {"debug-live", "security-live", "permanent", "compliance", "legal-hold"}
+        assert result["audit_deleted"] == 2
@@ -13,6 +13,7 @@ from apps.common.http.errors import (
     ProviderHTTPStatusError,
     ProviderTimeoutError,
 )
+from apps.common.http.pool import async_trace, provider_async_client, record_request
 from apps.common.http.retry import RetryPolicy
 from apps.common.http.sync_client import (
     DEFAULT_LIMITS,
@@ -42,6 +43,16 @@ class ProviderAsyncHTTPClient:
         self.retry_policy = retry_policy or RetryPolicy()
         self.transport = transport
 
+    def connect(self):
+        """Async context manager yielding the client for this base URL (see pool)."""
+        return provider_async_client(
+            provider=self.provider,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            transport=self.transport,
+        )
+
     async def request(
         self,
         method: str,
@@ -59,89 +70,88 @@ class ProviderAsyncHTTPClient:
         if idempotency_key:
             request_headers.setdefault("Idempotency-Key", idempotency_key)
 
-        attempt = 1
-        while True:
-            started = time.perf_counter()
-            try:
-                async with httpx.AsyncClient(
-                    base_url=self.base_url,
-                    timeout=self.timeout,
-                    limits=self.limits,
-                    transport=self.transport,
-                ) as client:
+        extensions = {"trace": async_trace(self.provider), **kwargs.pop("extensions", {})}
+
+        async with self.connect() as client:
+            attempt = 1
+            while True:
+                started = time.perf_counter()
+                try:
+                    record_request(self.provider)
                     response = await client.request(
                         method,
                         path,
                         headers=request_headers,
+                        extensions=extensions,
                         **kwargs,
                     )
-                elapsed_ms = (time.perf_counter() - started) * 1000
-                data = _json_or_empty(response)
-                logger.info(
-                    "provider_http_async",
-                    extra={
-                        "provider": self.provider,
-                        "action": action,
-                        "reference": reference,
-                        "status_code": response.status_code,
-                        "duration_ms": round(elapsed_ms, 2),
-                        "attempt": attempt,
-                    },
-                )
-                if response.is_error:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    data = _json_or_empty(response)
+                    logger.info(
+                        "provider_http_async",
+                        extra={
+                            "provider": self.provider,
+                            "action": action,
+                            "reference": reference,
+                            "status_code": response.status_code,
+                            "duration_ms": round(elapsed_ms, 2),
+                            "attempt": attempt,
+                        },
+                    )
+                    if response.is_error:
+                        if self.retry_policy.should_retry(
+                            method=method,
+                            attempt=attempt,
+                            status_code=response.status_code,
+                            idempotency_key=idempotency_key,
+                        ):
+                            attempt += 1
+                            await asyncio.sleep(self.retry_policy.backoff_seconds * attempt)
+                            continue
+                        raise ProviderHTTPStatusError(
+                            provider=self.provider,
+                            action=action,
+                            message=data.get("message") or response.text,
+                            status_code=response.status_code,
+                            response_payload=data,
+                            reference=reference,
+                        )
+                    return ProviderHTTPResponse(
+                        status_code=response.status_code,
+                        data=data,
+                        text=response.text,
+                        elapsed_ms=elapsed_ms,
+                        headers=dict(response.headers),
+                    )
+                except httpx.TimeoutException as exc:
                     if self.retry_policy.should_retry(
                         method=method,
                         attempt=attempt,
-                        status_code=response.status_code,
                         idempotency_key=idempotency_key,
                     ):
                         attempt += 1
                         await asyncio.sleep(self.retry_policy.backoff_seconds * attempt)
                         continue
-                    raise ProviderHTTPStatusError(
+                    raise ProviderTimeoutError(
                         provider=self.provider,
                         action=action,
-                        message=data.get("message") or response.text,
-                        status_code=response.status_code,
-                        response_payload=data,
+                        message=str(exc) or "Provider request timed out.",
                         reference=reference,
-                    )
-                return ProviderHTTPResponse(
-                    status_code=response.status_code,
-                    data=data,
-                    text=response.text,
-                    elapsed_ms=elapsed_ms,
-                    headers=dict(response.headers),
-                )
-            except httpx.TimeoutException as exc:
-                if self.retry_policy.should_retry(
-                    method=method,
-                    attempt=attempt,
-                    idempotency_key=idempotency_key,
-                ):
-                    attempt += 1
-                    await asyncio.sleep(self.retry_policy.backoff_seconds * attempt)
-                    continue
-                raise ProviderTimeoutError(
-                    provider=self.provider,
-                    action=action,
-                    message=str(exc) or "Provider request timed out.",
-                    reference=reference,
-                ) from exc
-            except httpx.RequestError as exc:
-                if self.retry_policy.should_retry(
-                    method=method,
-                    attempt=attempt,
-                    idempotency_key=idempotency_key,
-                ):
-                    attempt += 1
-                    await asyncio.sleep(self.retry_policy.backoff_seconds * attempt)
-                    continue
-                raise ProviderConnectionError(
-                    provider=self.provider,
-                    action=action,
-                    message=str(exc) or "Provider request failed.",
-                    reference=reference,
-                ) from exc
-            except ProviderHTTPError:
-                raise
+                    ) from exc
+                except httpx.RequestError as exc:
+                    if self.retry_policy.should_retry(
+                        method=method,
+                        attempt=attempt,
+                        idempotency_key=idempotency_key,
+                    ):
+                        attempt += 1
+                        await asyncio.sleep(self.retry_policy.backoff_seconds * attempt)
+                        continue
+                    raise ProviderConnectionError(
+                        provider=self.provider,
+                        action=action,
+                        message=str(exc) or "Provider request failed.",
+                        reference=reference,
+                    ) from exc
+                except ProviderHTTPError:
+                    raise
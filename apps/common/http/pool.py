@@ -0,0 +1,288 @@
+"""
+Process-wide pooled httpx clients for outbound provider calls.
+
+Provider wrappers (Paystack, Flutterwave, OlivePay, KYC, SMS, email) are
+cheap to construct and often built per call; the ``httpx.Client`` behind
+them is not. Every wrapper with the same base URL and transport settings
+shares one long-lived client, so keep-alive connections — and the TCP and
+TLS handshakes they saved — survive across requests.
+
+Registries:
+    sync   one ``httpx.Client`` per (base_url, timeout, limits, transport).
+           httpx clients are thread-safe, so gunicorn/Celery threads share it.
+    async  one ``httpx.AsyncClient`` per key *per long-lived event loop* —
+           an async connection pool is bound to the loop that opened it.
+           Only loops registered with ``register_long_lived_loop()`` (the
+           ASGI server loop, at lifespan startup) get pooled clients; their
+           clients are closed by ``aclose_provider_clients()`` at lifespan
+           shutdown. Short-lived loops (``async_to_sync``, ``asyncio.run``
+           in Celery tasks and management commands) would never close a
+           pooled client, so ``provider_async_client()`` gives them a scoped
+           client that is closed when the call returns.
+
+HTTP/2 is negotiated (ALPN) through ``httpx[http2]`` unless PROVIDER_HTTP2
+is False; providers that do not offer h2 fall back to HTTP/1.1 keep-alive.
+
+Forked children (Celery prefork, gunicorn --preload) drop the inherited
+registries without closing them — the sockets belong to the parent.
+
+Shutdown:
+    ``close_provider_clients()``    sync clients; atexit + Celery worker shutdown
+    ``aclose_provider_clients()``   async clients of the running loop; ASGI lifespan
+
+Metrics:
+    ``provider_pool_stats()`` returns per-provider request, TCP connect and
+    TLS handshake counters plus open/idle connection counts per pool. The
+    analytics Prometheus export publishes them as ``provider_http_*``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import weakref
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ("requests", "connections_opened", "tls_handshakes")
+
+_lock = threading.Lock()
+_sync_clients: dict[tuple, httpx.Client] = {}
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_long_lived_loops: weakref.WeakSet = weakref.WeakSet()
+_pool_providers: dict[str, set[str]] = defaultdict(set)
+_stats: dict[str, dict[str, int]] = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+
+
+def _http2_enabled() -> bool:
+    return bool(getattr(settings, "PROVIDER_HTTP2", True))
+
+
+def _key(base_url: str, timeout: httpx.Timeout, limits: httpx.Limits, transport: Any) -> tuple:
+    # Timeout/Limits define __eq__ without __hash__, so key on their fields.
+    return (
+        base_url,
+        (timeout.connect, timeout.read, timeout.write, timeout.pool),
+        (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry),
+        transport,
+    )
+
+
+# ---------- registries ----------
+
+def get_sync_client(
+    *,
+    provider: str,
+    base_url: str,
+    timeout: httpx.Timeout,
+    limits: httpx.Limits,
+    transport: httpx.BaseTransport | None = None,
+) -> httpx.Client:
+    key = _key(base_url, timeout, limits, transport)
+    client = _sync_clients.get(key)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _sync_clients.get(key)
+            if client is None or client.is_closed:
+                client = _sync_clients[key] = httpx.Client(
+                    base_url=base_url,
+                    timeout=timeout,
+                    limits=limits,
+                    transport=transport,
+                    http2=_http2_enabled(),
+                )
+                logger.debug("provider_http_pool: opened sync pool for %s", base_url)
+    if provider not in _pool_providers.get(base_url, ()):
+        with _lock:
+            _pool_providers[base_url].add(provider)
+    return client
+
+
+def register_long_lived_loop() -> None:
+    """Let the running loop keep pooled async clients until lifespan shutdown."""
+    _long_lived_loops.add(asyncio.get_running_loop())
+
+
+def get_async_client(
+    *,
+    provider: str,
+    base_url: str,
+    timeout: httpx.Timeout,
+    limits: httpx.Limits,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Pooled client of the running loop; the loop must be long-lived."""
+    loop = asyncio.get_running_loop()
+    if loop not in _long_lived_loops:
+        raise RuntimeError("get_async_client() needs a loop registered with register_long_lived_loop()")
+    key = _key(base_url, timeout, limits, transport)
+    with _lock:
+        clients = _async_clients.get(loop)
+        if clients is None:
+            clients = _async_clients[loop] = {}
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = clients[key] = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=timeout,
+                limits=limits,
+                transport=transport,
+                http2=_http2_enabled(),
+            )
+            logger.debug("provider_http_pool: opened async pool for %s", base_url)
+        _pool_providers[base_url].add(provider)
+    return client
+
+
+@asynccontextmanager
+async def provider_async_client(
+    *,
+    provider: str,
+    base_url: str,
+    timeout: httpx.Timeout,
+    limits: httpx.Limits,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Async client for one provider call: the pooled client on a long-lived
+    loop, otherwise a scoped client closed on exit.
+    """
+    if asyncio.get_running_loop() in _long_lived_loops:
+        yield get_async_client(
+            provider=provider,
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            transport=transport,
+        )
+        return
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=limits,
+        transport=transport,
+        http2=_http2_enabled(),
+    ) as client:
+        yield client
+
+
+# ---------- per-provider counters ----------
+
+def _record(provider: str, event: str) -> None:
+    if event == "connection.connect_tcp.complete":
+        counter = "connections_opened"
+    elif event == "connection.start_tls.complete":
+        counter = "tls_handshakes"
+    else:
+        return
+    with _lock:
+        _stats[provider][counter] += 1
+
+
+def record_request(provider: str) -> None:
+    with _lock:
+        _stats[provider]["requests"] += 1
+
+
+def sync_trace(provider: str):
+    """httpcore ``trace`` extension counting new connections for ``provider``."""
+    def trace(event: str, info: dict) -> None:
+        _record(provider, event)
+    return trace
+
+
+def async_trace(provider: str):
+    """Async twin of :func:`sync_trace` (httpcore awaits async callbacks)."""
+    async def trace(event: str, info: dict) -> None:
+        _record(provider, event)
+    return trace
+
+
+def _connection_counts(client: httpx.Client | httpx.AsyncClient) -> tuple[int, int]:
+    """(open, idle) connections in a client's default transport pool."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", ()) or ())
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return len(connections), idle
+
+
+def provider_pool_stats() -> dict[str, Any]:
+    """
+    Snapshot of pool metrics for this process::
+
+        {"providers": {"paystack": {"requests": 12, "connections_opened": 1,
+                                    "tls_handshakes": 1}},
+         "pools": [{"base_url": "https://api.paystack.co", "kind": "sync",
+                    "providers": ["paystack"], "open": 1, "idle": 1}]}
+    """
+    with _lock:
+        providers = {name: dict(counters) for name, counters in _stats.items()}
+        clients = [("sync", key[0], client) for key, client in _sync_clients.items()]
+        for loop_clients in list(_async_clients.values()):
+            clients.extend(("async", key[0], client) for key, client in loop_clients.items())
+        pool_providers = {url: sorted(names) for url, names in _pool_providers.items()}
+
+    pools = []
+    for kind, base_url, client in clients:
+        if client.is_closed:
+            continue
+        open_count, idle = _connection_counts(client)
+        pools.append({
+            "base_url": base_url,
+            "kind": kind,
+            "providers": pool_providers.get(base_url, []),
+            "open": open_count,
+            "idle": idle,
+        })
+    return {"providers": providers, "pools": pools}
+
+
+# ---------- shutdown ----------
+
+def close_provider_clients() -> None:
+    """Close every pooled sync client (idempotent)."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as exc:  # pragma: no cover - best effort at shutdown
+            logger.debug("provider_http_pool: close failed: %s", exc)
+
+
+async def aclose_provider_clients() -> None:
+    """Close the async clients bound to the running loop (idempotent)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _long_lived_loops.discard(loop)
+        clients = list((_async_clients.pop(loop, None) or {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as exc:  # pragma: no cover - best effort at shutdown
+            logger.debug("provider_http_pool: aclose failed: %s", exc)
+
+
+def _reset_after_fork() -> None:
+    global _lock
+    _lock = threading.Lock()
+    _sync_clients.clear()
+    _async_clients.clear()
+    _long_lived_loops.clear()
+    _pool_providers.clear()
+    _stats.clear()
+
+
+atexit.register(close_provider_clients)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -13,12 +13,15 @@ from apps.common.http.errors import (
     ProviderHTTPStatusError,
     ProviderTimeoutError,
 )
+from apps.common.http.pool import get_sync_client, record_request, sync_trace
 from apps.common.http.retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=5.0)
-DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# Idle connections are kept for 30s: long enough to span bursts of payment
+# init/verify calls, shorter than the ~60s idle cutoff of provider load balancers.
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
 
 
 @dataclass(slots=True)
@@ -56,6 +59,17 @@ class ProviderSyncHTTPClient:
         self.retry_policy = retry_policy or RetryPolicy()
         self.transport = transport
 
+    @property
+    def client(self) -> httpx.Client:
+        """Process-wide pooled client for this base URL (see apps.common.http.pool)."""
+        return get_sync_client(
+            provider=self.provider,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            transport=self.transport,
+        )
+
     def request(
         self,
         method: str,
@@ -73,22 +87,20 @@ class ProviderSyncHTTPClient:
         if idempotency_key:
             request_headers.setdefault("Idempotency-Key", idempotency_key)
 
+        extensions = {"trace": sync_trace(self.provider), **kwargs.pop("extensions", {})}
+
         attempt = 1
         while True:
             started = time.perf_counter()
             try:
-                with httpx.Client(
-                    base_url=self.base_url,
-                    timeout=self.timeout,
-                    limits=self.limits,
-                    transport=self.transport,
-                ) as client:
-                    response = client.request(
-                        method,
-                        path,
-                        headers=request_headers,
-                        **kwargs,
-                    )
+                record_request(self.provider)
+                response = self.client.request(
+                    method,
+                    path,
+                    headers=request_headers,
+                    extensions=extensions,
+                    **kwargs,
+                )
                 elapsed_ms = (time.perf_counter() - started) * 1000
                 data = _json_or_empty(response)
                 logger.info(
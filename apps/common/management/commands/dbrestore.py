@@ -25,6 +25,7 @@ Usage:
   python manage.py dbrestore --from rolling/latest.sql.gz --db-url "postgresql://..."
 """
 
+import os
 import sys
 import json
 import logging
@@ -201,17 +202,24 @@ class Command(BaseCommand):
 
     def _verify_backup(self, verify_path, json_output):
         """Verify a backup without restoring."""
-        from apps.common.tasks.dbrestore import _download_from_storage, _detect_backup_format, _parse_copy_blocks, _cleanup_temp
+        from apps.common.tasks.dbrestore import (
+            _BACKUP_FORMAT_COPY,
+            _BACKUP_FORMAT_UNKNOWN,
+            _cleanup_temp,
+            _detect_backup_format,
+            _download_from_storage,
+            _parse_copy_blocks,
+            _read_sql_head,
+        )
 
         try:
             sql_file, tmp_dir = _download_from_storage(verify_path)
 
             try:
-                with open(sql_file, "r", encoding="utf-8", errors="replace") as f:
-                    sql_content = f.read()
-
-                backup_format = _detect_backup_format(sql_content)
-                blocks = _parse_copy_blocks(sql_content)
+                blocks = _parse_copy_blocks(sql_file)
+                backup_format = _detect_backup_format(_read_sql_head(sql_file))
+                if backup_format == _BACKUP_FORMAT_UNKNOWN and blocks:
+                    backup_format = _BACKUP_FORMAT_COPY
                 total_rows = sum(b["row_count"] for b in blocks)
 
                 result = {
@@ -220,7 +228,7 @@ class Command(BaseCommand):
                     "backup_format": backup_format,
                     "tables_found": len(blocks),
                     "estimated_rows": total_rows,
-                    "file_size_kb": round(len(sql_content) / 1024, 2),
+                    "file_size_kb": round(os.path.getsize(sql_file) / 1024, 2),
                     "table_names": [b["table_name"] for b in blocks[:50]],
                 }
 
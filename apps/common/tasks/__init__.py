@@ -47,7 +47,9 @@ from apps.common.tasks.analytics import (         # noqa: F401
 from apps.common.tasks.cloudinary import (        # noqa: F401
     delete_cloudinary_asset_task,
     process_cloudinary_upload_webhook,
+    drain_cloudinary_webhook_buffer,
     generate_eager_transformations,
+    generate_eager_transformations_batch,
     purge_cloudinary_cache,
     bulk_sync_cloudinary_urls,
     process_admin_cloudinary_upload,  # Phase 6: async admin upload
@@ -87,7 +89,9 @@ __all__ = [
     # cloudinary
     "delete_cloudinary_asset_task",
     "process_cloudinary_upload_webhook",
+    "drain_cloudinary_webhook_buffer",
     "generate_eager_transformations",
+    "generate_eager_transformations_batch",
     "purge_cloudinary_cache",
     "bulk_sync_cloudinary_urls",
     "process_admin_cloudinary_upload",  # Phase 6
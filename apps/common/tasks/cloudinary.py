@@ -6,7 +6,9 @@ Tasks
 ─────
   delete_cloudinary_asset_task        Background asset deletion.
   process_cloudinary_upload_webhook   Webhook → model field update (idempotent).
+  drain_cloudinary_webhook_buffer     Coalesced webhooks → one bulk_update per model.
   generate_eager_transformations      Trigger 2K/4K/8K server-side variants.
+  generate_eager_transformations_batch  Same, for every asset of a webhook batch.
   purge_cloudinary_cache              CDN edge-cache invalidation.
   bulk_sync_cloudinary_urls           Bulk sync multiple asset URLs to a model.
 
@@ -19,6 +21,8 @@ Production-Grade Features (Phase 4)
   ✅ Race-condition safety — IntegrityError on duplicate mark_processed() is a no-op
   ✅ Eager transform chaining — product images trigger 2K/4K generation automatically
   ✅ Atomic transactions — each DB update in transaction.atomic()
+  ✅ Webhook coalescing — buffered notifications are grouped by target model
+     and applied with bulk_update (see utils/cloudinary_webhook_buffer.py)
 """
 
 from __future__ import annotations
@@ -240,6 +244,55 @@ _WEBHOOK_ROUTES: list[tuple[str, str, str, callable, str]] = [
 ]
 
 
+def _compile_route_map(routes: list[tuple]) -> dict[str, list[tuple]]:
+    """
+    Index routes by their first path segment, compiled once at import.
+
+    "/products/images/" becomes ("products", "images") under key "products";
+    a pattern without a trailing slash ("/avatars/user_") matches its last
+    segment as a prefix. Entries keep their table position so the earliest
+    route wins, exactly as with the linear substring scan.
+    """
+    index: dict[str, list[tuple]] = {}
+    for order, route in enumerate(routes):
+        pattern = route[0]
+        segments = tuple(pattern.strip("/").split("/"))
+        closed = pattern.endswith("/")
+        if len(segments) == 1 and not closed:
+            raise ValueError(f"Webhook route {pattern!r} must name a full path segment")
+        index.setdefault(segments[0], []).append((order, segments, closed, route))
+    return index
+
+
+_ROUTE_PREFIX_MAP = _compile_route_map(_WEBHOOK_ROUTES)
+
+
+def _match_route(public_id: str) -> Optional[tuple]:
+    """
+    Return the first _WEBHOOK_ROUTES entry whose path pattern occurs in
+    ``public_id`` (same result as ``path_substr in public_id``), or None.
+
+    One dict probe per path segment instead of a substring scan per route.
+    """
+    parts = public_id.split("/")
+    best: Optional[tuple] = None
+    for i in range(1, len(parts)):  # a pattern starts after a "/"
+        for order, segments, closed, route in _ROUTE_PREFIX_MAP.get(parts[i], ()):
+            if best is not None and order >= best[0]:
+                continue
+            last = i + len(segments) - 1
+            if last >= len(parts) or tuple(parts[i:last]) != segments[:-1]:
+                continue
+            if closed:
+                # "/a/b/" needs segment b exactly, followed by another "/"
+                if parts[last] != segments[-1] or last + 1 >= len(parts):
+                    continue
+            elif not parts[last].startswith(segments[-1]):
+                continue
+            best = (order, route)
+    return best[1] if best else None
+
+
 def _get_target_field(path_substr: str, resource_type: str, asset_label: str) -> str:
     """
     Determine the model field name based on path prefix and resource type.
@@ -457,10 +510,10 @@ def process_cloudinary_upload_webhook(self, payload: dict) -> None:
     parts = public_id.split("/")
 
     try:
-        # ── ② ROUTE MATCHING ─────────────────────────────────────────────
-        for path_substr, model_dotted, pk_field, pk_getter, asset_label in _WEBHOOK_ROUTES:
-            if path_substr not in public_id:
-                continue
+        # ── ② ROUTE MATCHING (precompiled prefix map) ────────────────────
+        route = _match_route(public_id)
+        if route is not None:
+            path_substr, model_dotted, pk_field, pk_getter, asset_label = route
 
             # ── ③ SAFE MODEL RESOLUTION ──────────────────────────────────
             Model = _safe_resolve_model(model_dotted)
@@ -516,7 +569,6 @@ def process_cloudinary_upload_webhook(self, payload: dict) -> None:
                 )
 
             routed = True
-            break
 
         if not routed:
             logger.info(
@@ -629,6 +681,241 @@ def _safe_mark_processed(
         logger.warning("mark_processed failed (non-fatal): %s", exc)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# 2b. COALESCED WEBHOOK PROCESSING — one bulk_update per target model
+# ═══════════════════════════════════════════════════════════════════════════
+
+def process_cloudinary_webhook_batch(payloads: list[dict]) -> dict:
+    """
+    Apply a batch of validated Cloudinary webhook payloads in one pass.
+
+    Same outcome as calling process_cloudinary_upload_webhook() per payload,
+    with the per-asset work coalesced:
+
+      ① one idempotency check for the batch (cache get_many + one IN query),
+        plus in-batch dedupe of Cloudinary retries;
+      ② routing through the precompiled prefix map;
+      ③ one SELECT + bulk_update per (model, pk field, target field) group,
+        each group in its own transaction.atomic() — when several payloads
+        target the same row, the last one to arrive wins;
+      ④ one mark_processed_many() for every handled payload;
+      ⑤ one generate_eager_transformations_batch task for the whole batch.
+
+    A group whose update fails is handed to the per-asset task (retries and
+    failure bookkeeping as before), so one bad row cannot block the batch.
+
+    Returns counters: received, duplicates, updated, skipped, fallback.
+    """
+    from apps.common.utils.webhook_idempotency import (
+        find_duplicates,
+        generate_idempotency_key,
+        mark_processed_many,
+    )
+
+    t_start = time.monotonic()
+    stats = {"received": len(payloads), "duplicates": 0, "updated": 0, "skipped": 0, "fallback": 0}
+
+    # ── ① NORMALISE + IDEMPOTENCY ────────────────────────────────────────
+    items: dict[str, dict] = {}
+    for payload in payloads:
+        public_id     = payload.get("public_id", "")
+        secure_url    = payload.get("secure_url", "")
+        resource_type = payload.get("resource_type", "image")
+        if not public_id or not secure_url:
+            stats["skipped"] += 1
+            continue
+        idem_key = generate_idempotency_key(
+            public_id, str(payload.get("created_at", "")), resource_type,
+        )
+        if idem_key in items:
+            stats["duplicates"] += 1
+            continue
+        items[idem_key] = {
+            "idempotency_key": idem_key,
+            "payload": payload,
+            "public_id": public_id,
+            "secure_url": secure_url,
+            "resource_type": resource_type,
+        }
+
+    for idem_key in find_duplicates(list(items), check_database=True):
+        del items[idem_key]
+        stats["duplicates"] += 1
+
+    # ── ② ROUTE + GROUP BY TARGET ────────────────────────────────────────
+    models: dict[str, object] = {}
+    groups: dict[tuple[str, str, str], list[dict]] = {}
+    records: list[dict] = []
+
+    for item in items.values():
+        route = _match_route(item["public_id"])
+        if route is None:
+            records.append(_batch_record(item, "unknown"))
+            continue
+
+        path_substr, model_dotted, pk_field, pk_getter, asset_label = route
+        if model_dotted not in models:
+            models[model_dotted] = _safe_resolve_model(model_dotted)
+        if models[model_dotted] is None:
+            # Mark as "processed" so we don't retry forever for a missing model
+            records.append(_batch_record(item, f"future:{model_dotted}", with_url=False))
+            continue
+
+        pk_value = pk_getter(item["public_id"].split("/"))
+        if not pk_value:
+            logger.warning(
+                "Cloudinary webhook batch: cannot extract PK from public_id=%s "
+                "for route %s — skipping.",
+                item["public_id"], path_substr,
+            )
+            stats["skipped"] += 1
+            continue
+
+        item["pk"] = str(pk_value)
+        item["asset_label"] = asset_label
+        target_field = _get_target_field(path_substr, item["resource_type"], asset_label)
+        groups.setdefault((model_dotted, pk_field, target_field), []).append(item)
+
+    # ── ③ ONE bulk_update PER GROUP ──────────────────────────────────────
+    routed: list[dict] = []
+    for (model_dotted, pk_field, target_field), group in groups.items():
+        Model = models[model_dotted]
+        urls = {item["pk"]: item["secure_url"] for item in group}   # last arrival wins
+        try:
+            with transaction.atomic():
+                objs = list(
+                    Model.objects.filter(**{f"{pk_field}__in": list(urls)})
+                    .only(pk_field, target_field)
+                )
+                for obj in objs:
+                    setattr(obj, target_field, urls[str(getattr(obj, pk_field))])
+                if objs:
+                    Model.objects.bulk_update(objs, [target_field])
+        except Exception as exc:
+            logger.warning(
+                "Cloudinary webhook batch: bulk update of %d %s rows failed (%s) — "
+                "falling back to per-asset tasks",
+                len(urls), model_dotted, exc,
+            )
+            for item in group:
+                process_cloudinary_upload_webhook.apply_async(
+                    kwargs={"payload": item["payload"]},
+                    ignore_result=True,
+                )
+            stats["fallback"] += len(group)
+            continue
+
+        found = {str(getattr(obj, pk_field)) for obj in objs}
+        missing = set(urls) - found
+        if missing:
+            logger.warning(
+                "⚠️ Cloudinary webhook batch: no %s row found for %s in %s",
+                model_dotted, pk_field, sorted(missing)[:10],
+            )
+        logger.info(
+            "✅ Cloudinary webhook batch: saved %s.%s for %d rows (%d notifications)",
+            model_dotted.rsplit(".", 1)[-1], target_field, len(objs), len(group),
+        )
+        stats["updated"] += len(objs)
+        for item in group:
+            records.append(_batch_record(item, item["asset_label"], model_pk=item["pk"]))
+            routed.append(item)
+
+    # ── ④ MARK PROCESSED (Redis + DB audit trail) ────────────────────────
+    processing_ms = (time.monotonic() - t_start) * 1000
+    for record in records:
+        record["processing_time_ms"] = processing_ms
+    try:
+        mark_processed_many(records)
+    except Exception as exc:
+        logger.warning("mark_processed_many failed (non-fatal): %s", exc)
+
+    # ── ⑤ AUDIT LOG ──────────────────────────────────────────────────────
+    for item in routed:
+        _dispatch_audit_log(
+            item["asset_label"],
+            _get_audit_event_type(item["asset_label"], item["resource_type"]),
+            item["asset_label"],
+            item["pk"],
+            item["secure_url"],
+            item["public_id"],
+        )
+
+    # ── ⑥ EAGER TRANSFORMS — one task for the whole batch ────────────────
+    assets = list({
+        item["public_id"]: {"public_id": item["public_id"], "asset_type": item["asset_label"]}
+        for item in routed
+        if item["asset_label"] in EAGER_TRANSFORM_ASSET_TYPES
+    }.values())
+    if assets:
+        try:
+            generate_eager_transformations_batch.apply_async(
+                kwargs={"assets": assets},
+                countdown=5,    # 5s delay: let Cloudinary complete the primary upload
+                ignore_result=True,
+            )
+        except Exception as exc:
+            logger.error(
+                "Cloudinary webhook batch: eager transforms for %d assets not scheduled: %s",
+                len(assets), exc,
+            )
+
+    logger.info("Cloudinary webhook batch processed: %s", stats)
+    return stats
+
+
+def _batch_record(
+    item: dict,
+    model_target: str,
+    model_pk: Optional[str] = None,
+    with_url: bool = True,
+) -> dict:
+    """mark_processed_many() record for a successfully handled batch item."""
+    return {
+        "idempotency_key": item["idempotency_key"],
+        "public_id": item["public_id"],
+        "asset_type": item["resource_type"],
+        "model_target": model_target,
+        "model_pk": model_pk,
+        "secure_url": item["secure_url"] if with_url else None,
+        "success": True,
+    }
+
+
+@shared_task(
+    name="drain_cloudinary_webhook_buffer",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=5,
+    ignore_result=True,
+)
+def drain_cloudinary_webhook_buffer(self) -> int:
+    """
+    Drain the Redis Cloudinary webhook buffer through
+    process_cloudinary_webhook_batch().
+
+    Scheduled by the webhook view once per flush interval (or immediately
+    when a full batch is waiting) and by Celery beat as a safety net.
+    Payloads stay buffered until their batch was processed, so a failed run
+    is simply retried — nothing is lost.
+    """
+    from apps.common.utils.cloudinary_webhook_buffer import drain_cloudinary_webhooks_once
+
+    try:
+        consumed = drain_cloudinary_webhooks_once()
+    except Exception as exc:
+        logger.warning(
+            "drain_cloudinary_webhook_buffer failed (attempt %d): %s",
+            self.request.retries + 1, exc,
+        )
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        return 0
+    if consumed:
+        logger.debug("drain_cloudinary_webhook_buffer: processed %d buffered webhooks", consumed)
+    return consumed
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 3. EAGER TRANSFORMATIONS (2K / 4K / 8K variants)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -694,6 +981,64 @@ def generate_eager_transformations(
         raise self.retry(exc=exc)
 
 
+@shared_task(
+    name="generate_eager_transformations_batch",
+    bind=True,
+    max_retries=2,
+    default_retry_delay=30,
+    ignore_result=True,
+)
+def generate_eager_transformations_batch(self, assets: list[dict]) -> None:
+    """
+    Trigger eager transformations for every asset of a webhook batch.
+
+    Cloudinary's explicit() API takes one public_id per call, so the batch
+    is one task issuing the calls back to back: one queue round trip and one
+    SDK configuration instead of one task per asset. Only the assets whose
+    call failed are retried.
+
+    Args:
+        assets: List of {"public_id": ..., "asset_type": ...} dicts.
+    """
+    import cloudinary.uploader
+    from apps.common.utils.cloudinary import _ASSET_CONFIGS
+
+    _ensure_cloudinary_config()
+
+    triggered = 0
+    failed: list[dict] = []
+    last_exc: Optional[Exception] = None
+    for asset in assets:
+        public_id  = asset.get("public_id")
+        asset_type = asset.get("asset_type", "product_image")
+        config = _ASSET_CONFIGS.get(asset_type, _ASSET_CONFIGS["generic_image"])
+        eager  = config.get("eager", [])
+        if not public_id or not eager:
+            continue
+        try:
+            cloudinary.uploader.explicit(
+                public_id,
+                type="upload",
+                eager=eager,
+                eager_async=True,   # Non-blocking: Cloudinary calls webhook when done
+            )
+            triggered += 1
+        except Exception as exc:
+            logger.error(
+                "generate_eager_transformations_batch FAILED for public_id=%s: %s",
+                public_id, exc,
+            )
+            failed.append(asset)
+            last_exc = exc
+
+    logger.info(
+        "generate_eager_transformations_batch: triggered %d of %d assets (%d failed)",
+        triggered, len(assets), len(failed),
+    )
+    if failed:
+        raise self.retry(exc=last_exc, kwargs={"assets": failed})
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 4. CDN CACHE INVALIDATION
 # ═══════════════════════════════════════════════════════════════════════════
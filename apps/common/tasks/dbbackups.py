@@ -20,29 +20,51 @@ Storage:
   Both use Django's storage API, so the tasks are fully storage-agnostic.
 
 All backups use gzip compression.
-Backup-level encryption is supported via DBBACKUP_ENCRYPTION_KEY env var (Fernet symmetric encryption).
+Backup-level encryption is supported via DBBACKUP_ENCRYPTION_KEY env var (a Fernet key).
 When DBBACKUP_ENCRYPTION_KEY is set, the pipeline becomes:
-  pg_dump -> gzip -> Fernet encrypt -> upload to storage
+  pg_dump -> gzip -> AES-256-GCM frames -> upload to storage
 When not set, the pipeline is:
   pg_dump -> gzip -> upload to storage
+Every stage is a generator over ~1 MiB chunks: pg_dump's stdout is piped
+straight through compression and encryption into the storage upload, so
+no temp files are written and worker memory stays flat as the database
+grows. Cloudinary storage is fed through its chunked upload API in
+_UPLOAD_CHUNK_SIZE parts (the storage's own save() reads the whole file
+into memory); other backends receive a file object over the stream. Older single-token Fernet backups remain restorable (dbrestore.py).
 Backups are created via pg_dump subprocess for full fidelity (extensions, vectors, etc).
 """
 
+import io
 import os
 import subprocess
+import struct
 import tempfile
-import gzip
-import shutil
+import time
+import uuid
+import zlib
 import logging
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from celery import shared_task
 from django.conf import settings
+from django.core.files import File
 from django.core.files.storage import default_storage
 
 logger = logging.getLogger(__name__)
 
+# Pipeline chunk size: peak memory is roughly one chunk per stage.
+_CHUNK_SIZE = 1024 * 1024
+# Seconds pg_dump itself may take; time spent compressing, encrypting and
+# uploading between reads is not counted.
+_PG_DUMP_TIMEOUT = 300
+# Cloudinary chunked upload part size (every part but the last must be >= 5 MB).
+_UPLOAD_CHUNK_SIZE = 20 * 1024 * 1024
+
+# Streamed encryption container (see _encrypt_chunks).
+_STREAM_MAGIC = b"FSBKAES1"
+_FRAME = struct.Struct(">IB")
+
 
 # === HELPERS ===
 
@@ -72,19 +94,22 @@ def _get_database_url():
     return os.environ.get("DATABASE_URL", "")
 
 
-def _run_pg_dump(output_file):
+class _DumpUnavailable(Exception):
+    """pg_dump could not run (missing binary, or failed before producing output)."""
+
+
+def _pg_dump_chunks(db_url, chunk_size=_CHUNK_SIZE, timeout=_PG_DUMP_TIMEOUT):
     """
-    Create a database backup at output_file (plain SQL).
-    Tries pg_dump binary first (best fidelity for pgvector/extensions).
-    Falls back to pure-Python psycopg dump if pg_dump not found.
-    Returns True on success, False on failure.
+    Yield pg_dump plain-SQL output straight from its stdout pipe.
+    Raises _DumpUnavailable if pg_dump is missing or fails before emitting
+    anything (the caller then falls back to the psycopg dump); a failure
+    after output has been streamed raises RuntimeError.
+
+    ``timeout`` bounds the time spent waiting on pg_dump (reads from its
+    pipe and the final exit), not the wall clock of the whole backup: while
+    the consumer gzips, encrypts and uploads a chunk, pg_dump is simply
+    blocked on the full pipe.
     """
-    db_url = _get_database_url()
-    if not db_url:
-        logger.error("[DBBACKUP] No DATABASE_URL found in environment")
-        return False
-
-    # --- Strategy 1: pg_dump binary ---
     cmd = [
         "pg_dump",
         db_url,
@@ -93,121 +118,179 @@ def _run_pg_dump(output_file):
         "--clean",
         "--if-exists",
         "--format=plain",
-        f"--file={output_file}",
     ]
 
-    logger.info("[DBBACKUP] Attempting pg_dump -> %s", output_file)
+    logger.info("[DBBACKUP] Attempting streamed pg_dump")
 
+    stderr = tempfile.TemporaryFile()
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300,
-        )
-        if result.returncode == 0:
-            logger.info("[DBBACKUP] pg_dump completed successfully")
-            return True
-        logger.error("[DBBACKUP] pg_dump failed (exit %d): %s", result.returncode, result.stderr[:500])
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
     except FileNotFoundError:
-        logger.warning("[DBBACKUP] pg_dump binary not found, falling back to psycopg dump")
+        stderr.close()
+        raise _DumpUnavailable("pg_dump binary not found")
+
+    dump_seconds = 0.0
+    emitted = False
+    try:
+        while True:
+            started = time.monotonic()
+            chunk = proc.stdout.read(chunk_size)
+            dump_seconds += time.monotonic() - started
+            if not chunk:
+                break
+            if dump_seconds > timeout:
+                raise RuntimeError(f"pg_dump timed out after {timeout} seconds")
+            emitted = True
+            yield chunk
+
+        returncode = proc.wait(timeout=max(timeout - dump_seconds, 1))
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read(500).decode("utf-8", errors="replace")
+            logger.error("[DBBACKUP] pg_dump failed (exit %d): %s", returncode, message)
+            if not emitted:
+                raise _DumpUnavailable(message)
+            raise RuntimeError(f"pg_dump exited with {returncode} mid-stream")
+        logger.info("[DBBACKUP] pg_dump completed successfully")
     except subprocess.TimeoutExpired:
-        logger.error("[DBBACKUP] pg_dump timed out after 300 seconds")
-        return False
-    except Exception as exc:
-        logger.warning("[DBBACKUP] pg_dump error: %s, falling back to psycopg dump", exc)
+        raise RuntimeError(f"pg_dump timed out after {timeout} seconds")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        stderr.close()
+
+
+def _psycopg_dump_chunks(db_url):
+    """
+    Pure-Python dump (no pg_dump binary needed) as a byte stream.
+    Uses psycopg's COPY TO STDOUT to export each table's data.
+    Handles Neon serverless connection drops with per-table reconnection —
+    a table is retried only while none of its rows have been streamed yet;
+    a drop mid-table fails the backup so the task retry starts clean.
+    """
+    import psycopg
+
+    def _get_connection():
+        """Create a fresh autocommit connection to Neon."""
+        c = psycopg.connect(db_url, connect_timeout=30)
+        c.autocommit = True
+        return c
 
-    # --- Strategy 2: Pure-Python psycopg dump (no pg_dump binary needed) ---
-    # Uses psycopg's COPY TO STDOUT to export each table's data.
-    # Handles Neon serverless connection drops with per-table reconnection.
     logger.info("[DBBACKUP] Using pure-Python psycopg dump fallback")
+    conn = _get_connection()
     try:
-        import psycopg
-        from psycopg import sql
-
-        def _get_connection():
-            """Create a fresh autocommit connection to Neon."""
-            c = psycopg.connect(db_url, connect_timeout=30)
-            c.autocommit = True
-            return c
-
-        conn = _get_connection()
-
-        with open(output_file, "w", encoding="utf-8", errors="replace") as f:
-            f.write("-- FASHIONISTAR database backup (psycopg fallback)\n")
-            f.write(f"-- Generated: {datetime.utcnow().isoformat()}Z\n")
-            f.write("-- This is a data-only backup. Schema must be restored via migrations.\n\n")
-
-            # Get all user tables (exclude playing_with_neon - Neon demo table)
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT table_schema, table_name
-                    FROM information_schema.tables
-                    WHERE table_schema NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-                      AND table_type = 'BASE TABLE'
-                      AND table_name != 'playing_with_neon'
-                    ORDER BY table_schema, table_name;
-                """)
-                tables = cur.fetchall()
-
-            total_tables = len(tables)
-            dumped = 0
-
-            # Dump each table's data using COPY with reconnection on failure
-            for schema, table in tables:
-                fq_table = f'"{schema}"."{table}"'
-                logger.info("[DBBACKUP] Dumping %s (%d/%d)", fq_table, dumped + 1, total_tables)
-
-                max_retries = 3
-                for attempt in range(max_retries):
+        yield (
+            "-- FASHIONISTAR database backup (psycopg fallback)\n"
+            f"-- Generated: {datetime.utcnow().isoformat()}Z\n"
+            "-- This is a data-only backup. Schema must be restored via migrations.\n\n"
+        ).encode()
+
+        # Get all user tables (exclude playing_with_neon - Neon demo table)
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT table_schema, table_name
+                FROM information_schema.tables
+                WHERE table_schema NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+                  AND table_type = 'BASE TABLE'
+                  AND table_name != 'playing_with_neon'
+                ORDER BY table_schema, table_name;
+            """)
+            tables = cur.fetchall()
+
+        total_tables = len(tables)
+        dumped = 0
+
+        for schema, table in tables:
+            fq_table = f'"{schema}"."{table}"'
+            logger.info("[DBBACKUP] Dumping %s (%d/%d)", fq_table, dumped + 1, total_tables)
+
+            max_retries = 3
+            for attempt in range(max_retries):
+                started = False
+                try:
+                    with conn.cursor() as cur:
+                        with cur.copy(f"COPY {fq_table} TO STDOUT") as copy:
+                            for row in copy:
+                                if not started:
+                                    yield f"\n-- Data for {fq_table}\nCOPY {fq_table} FROM stdin;\n".encode()
+                                    started = True
+                                yield bytes(row)
+                    if not started:
+                        yield f"\n-- Data for {fq_table}\nCOPY {fq_table} FROM stdin;\n".encode()
+                    yield b"\\.\n"
+                    dumped += 1
+                    break
+                except (psycopg.OperationalError, psycopg.InterfaceError) as conn_err:
+                    logger.warning(
+                        "[DBBACKUP] Connection lost on %s (attempt %d/%d): %s",
+                        fq_table, attempt + 1, max_retries, conn_err,
+                    )
                     try:
-                        f.write(f"\n-- Data for {fq_table}\n")
-                        f.write(f"COPY {fq_table} FROM stdin;\n")
-                        with conn.cursor() as cur:
-                            with cur.copy(f"COPY {fq_table} TO STDOUT") as copy:
-                                for row in copy:
-                                    f.write(bytes(row).decode("utf-8", errors="replace"))
-                        f.write("\\.\n")
-                        f.flush()
-                        dumped += 1
-                        break
-                    except (psycopg.OperationalError, psycopg.InterfaceError) as conn_err:
-                        logger.warning(
-                            "[DBBACKUP] Connection lost on %s (attempt %d/%d): %s",
-                            fq_table, attempt + 1, max_retries, conn_err,
-                        )
-                        try:
-                            conn.close()
-                        except Exception:
-                            pass
-                        if attempt < max_retries - 1:
-                            conn = _get_connection()
-                        else:
-                            logger.error("[DBBACKUP] Failed to dump %s after %d retries", fq_table, max_retries)
-                            f.write(f"-- ERROR: Could not dump {fq_table} after {max_retries} retries\n")
-                    except Exception as tbl_err:
-                        logger.warning("[DBBACKUP] Error dumping %s: %s", fq_table, tbl_err)
-                        f.write(f"-- ERROR dumping {fq_table}: {tbl_err}\n")
-                        break
-
+                        conn.close()
+                    except Exception:
+                        pass
+                    if started:
+                        raise
+                    if attempt < max_retries - 1:
+                        conn = _get_connection()
+                    else:
+                        logger.error("[DBBACKUP] Failed to dump %s after %d retries", fq_table, max_retries)
+                        yield f"-- ERROR: Could not dump {fq_table} after {max_retries} retries\n".encode()
+                except Exception as tbl_err:
+                    if started:
+                        raise
+                    logger.warning("[DBBACKUP] Error dumping %s: %s", fq_table, tbl_err)
+                    yield f"-- ERROR dumping {fq_table}: {tbl_err}\n".encode()
+                    break
+
+        logger.info("[DBBACKUP] psycopg dump completed: %d/%d tables dumped", dumped, total_tables)
+    finally:
         try:
             conn.close()
         except Exception:
             pass
 
-        logger.info("[DBBACKUP] psycopg dump completed: %d/%d tables dumped -> %s", dumped, total_tables, output_file)
-        return True
-    except Exception as exc:
-        logger.error("[DBBACKUP] psycopg dump fallback failed: %s", exc)
-        return False
 
+def _dump_chunks():
+    """
+    Plain-SQL database dump as a byte stream.
+    Tries pg_dump first (best fidelity for pgvector/extensions), then the
+    psycopg COPY fallback.
+    """
+    db_url = _get_database_url()
+    if not db_url:
+        raise RuntimeError("No DATABASE_URL found in environment")
 
-def _gzip_file(source_path, dest_path):
-    """Compress a file with gzip."""
-    with open(source_path, "rb") as src:
-        with gzip.open(dest_path, "wb", compresslevel=6) as dst:
-            shutil.copyfileobj(src, dst)
-    return os.path.getsize(dest_path)
+    try:
+        yield from _pg_dump_chunks(db_url)
+        return
+    except _DumpUnavailable as exc:
+        logger.warning("[DBBACKUP] pg_dump unavailable (%s), falling back to psycopg dump", exc)
+    yield from _psycopg_dump_chunks(db_url)
+
+
+def _gzip_chunks(chunks, level=6):
+    """gzip-compress a byte stream incrementally (same format as gzip.open)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _rechunk(chunks, size=_CHUNK_SIZE):
+    """Regroup a byte stream into size-byte chunks (the last may be shorter)."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        while len(buf) >= size:
+            yield bytes(buf[:size])
+            del buf[:size]
+    if buf:
+        yield bytes(buf)
 
 
 def _is_encryption_enabled():
@@ -215,49 +298,221 @@ def _is_encryption_enabled():
     return bool(os.environ.get("DBBACKUP_ENCRYPTION_KEY", "").strip())
 
 
-def _encrypt_file(source_path, dest_path):
+def _stream_cipher():
     """
-    Encrypt a file using Fernet symmetric encryption.
-    The entire file is read, encrypted, and written to dest_path.
-    Used after gzip compression when DBBACKUP_ENCRYPTION_KEY is set.
+    AES-256-GCM cipher keyed from DBBACKUP_ENCRYPTION_KEY (a Fernet key).
+    The 32 key bytes are run through HKDF so the stream key never equals
+    the Fernet key used by legacy single-token backups.
     """
-    from cryptography.fernet import Fernet
+    import base64
+
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
     key = os.environ.get("DBBACKUP_ENCRYPTION_KEY", "").strip()
     if not key:
         raise ValueError("DBBACKUP_ENCRYPTION_KEY not set but encryption requested")
 
-    fernet = Fernet(key.encode() if isinstance(key, str) else key)
+    material = base64.urlsafe_b64decode(key.encode() if isinstance(key, str) else key)
+    derived = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"fashionistar-dbbackup-stream-v1",
+    ).derive(material)
+    return AESGCM(derived)
+
+
+def _encrypt_chunks(chunks, size=_CHUNK_SIZE):
+    """
+    Chunked authenticated encryption of a byte stream.
+
+    Layout: MAGIC (8) | nonce prefix (8) | frames, each frame being
+    ``length (u32) | final (u8) | AES-GCM ciphertext+tag``. The nonce is
+    prefix + frame counter and the frame header plus counter are bound as
+    associated data, so reordered, dropped or truncated frames fail to
+    decrypt. Only one frame of plaintext is held in memory.
+    """
+    cipher = _stream_cipher()
+    prefix = os.urandom(8)
+    yield _STREAM_MAGIC + prefix
+
+    seq = 0
+    pending = None
+    for chunk in _rechunk(chunks, size):
+        if pending is not None:
+            yield _seal_frame(cipher, prefix, seq, pending, final=False)
+            seq += 1
+        pending = chunk
+    yield _seal_frame(cipher, prefix, seq, pending or b"", final=True)
+
 
-    with open(source_path, "rb") as f:
-        plaintext = f.read()
+def _frame_aad(seq, header):
+    return _STREAM_MAGIC + seq.to_bytes(8, "big") + header
 
-    ciphertext = fernet.encrypt(plaintext)
 
-    with open(dest_path, "wb") as f:
-        f.write(ciphertext)
+def _seal_frame(cipher, prefix, seq, plaintext, final):
+    nonce = prefix + seq.to_bytes(4, "big")
+    length = len(plaintext) + 16
+    header = _FRAME.pack(length, 1 if final else 0)
+    return header + cipher.encrypt(nonce, plaintext, _frame_aad(seq, header))
 
-    return os.path.getsize(dest_path)
 
+def _decrypt_chunks(fileobj):
+    """
+    Inverse of _encrypt_chunks: yield plaintext frames read from fileobj.
+    Raises ValueError on a bad header, a tampered frame or a truncated stream.
+    """
+    header = fileobj.read(len(_STREAM_MAGIC) + 8)
+    if header[:len(_STREAM_MAGIC)] != _STREAM_MAGIC:
+        raise ValueError("Not a streamed backup (bad magic)")
+    prefix = header[len(_STREAM_MAGIC):]
+    cipher = _stream_cipher()
+
+    seq = 0
+    while True:
+        frame_header = fileobj.read(_FRAME.size)
+        if len(frame_header) < _FRAME.size:
+            raise ValueError("Encrypted backup is truncated (no final frame)")
+        length, final = _FRAME.unpack(frame_header)
+        ciphertext = fileobj.read(length)
+        if len(ciphertext) < length:
+            raise ValueError("Encrypted backup is truncated mid-frame")
+        nonce = prefix + seq.to_bytes(4, "big")
+        try:
+            yield cipher.decrypt(nonce, ciphertext, _frame_aad(seq, frame_header))
+        except Exception as exc:
+            raise ValueError(f"Encrypted backup frame {seq} failed authentication") from exc
+        if final:
+            return
+        seq += 1
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only, non-seekable file object over a byte-chunk iterator."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b""
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            try:
+                self._buf = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        self.bytes_read += n
+        return n
+
+    def close(self):
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        super().close()
+
+
+def _backup_chunks(encrypt):
+    """The full pipeline as one byte stream: dump -> gzip [-> encrypt]."""
+    chunks = _gzip_chunks(_dump_chunks())
+    if encrypt:
+        chunks = _encrypt_chunks(chunks)
+    return chunks
+
+
+def _is_cloudinary_storage(storage):
+    try:
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+    except ImportError:
+        return False
+    return isinstance(storage, MediaCloudinaryStorage)
+
+
+def _upload_cloudinary_chunked(storage, storage_path, chunks, chunk_size=_UPLOAD_CHUNK_SIZE):
+    """
+    Upload a byte stream with Cloudinary's chunked upload API.
+
+    Uses the same public_id/folder/tag options as the storage's own save().
+    cloudinary.uploader.upload_large() needs a seekable file to compute the
+    total size up front; here every part but the last is sent with an
+    unknown total ("/-1"), so only one part is held in memory.
+    Returns (public_id, bytes_uploaded).
+    """
+    import cloudinary.uploader
+
+    name = storage._prepend_prefix(storage._normalise_name(storage_path))
+    options = {
+        "use_filename": True,
+        "resource_type": storage._get_resource_type(name),
+        "tags": storage.TAG,
+        "filename": os.path.basename(name),
+    }
+    folder = os.path.dirname(name)
+    if folder:
+        options["folder"] = folder
+
+    upload_id = uuid.uuid4().hex
+    offset = 0
+    result = None
+    parts = _rechunk(chunks, chunk_size)
+    try:
+        part = next(parts, b"")
+        while True:
+            following = next(parts, None)
+            last = following is None
+            total = offset + len(part) if last else -1
+            headers = {
+                "Content-Range": f"bytes {offset}-{offset + len(part) - 1}/{total}",
+                "X-Unique-Upload-Id": upload_id,
+            }
+            result = cloudinary.uploader.upload_large_part(
+                (options["filename"], part), http_headers=headers, **options
+            )
+            offset += len(part)
+            if last:
+                break
+            part = following
+    finally:
+        parts.close()
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    return result["public_id"], offset
 
-def _upload_to_storage(local_path, storage_path):
+
+def _upload_stream(chunks, storage_path):
     """
-    Upload a local file to the configured Django storage backend.
-    Works with both FileSystemStorage (dev) and CloudinaryStorage (prod).
+    Stream a byte iterator into the configured backup storage.
+    CloudinaryStorage (prod) is fed through the chunked upload API, other
+    backends such as FileSystemStorage (dev) pull from a file object over
+    the stream, so nothing is staged on disk or held whole in memory.
+    Returns (saved_path, bytes_uploaded).
     """
     storage = _get_storage()
-    with open(local_path, "rb") as f:
-        saved_path = storage.save(storage_path, f)
-    return saved_path
+    if _is_cloudinary_storage(storage):
+        return _upload_cloudinary_chunked(storage, storage_path, chunks)
+
+    reader = _ChunkReader(chunks)
+    try:
+        saved_path = storage.save(storage_path, File(io.BufferedReader(reader, _CHUNK_SIZE), name=storage_path))
+    finally:
+        reader.close()
+    return saved_path, reader.bytes_read
 
 
 def _create_backup(tier, filename):
     """
-    Full backup pipeline:
-    1. pg_dump -> temp .sql file
-    2. gzip -> temp .sql.gz file
-    3. Upload to storage (Cloudinary or local)
-    4. Clean up temp files
+    Full backup pipeline, streamed end to end:
+      pg_dump stdout (or psycopg COPY) -> gzip -> [AES-GCM frames] -> storage
+    Memory is bounded by one chunk per stage and nothing touches local disk,
+    so worker RAM stays flat as the database grows.
     """
     folder = _get_backup_folder()
     storage = _get_storage()
@@ -271,51 +526,19 @@ def _create_backup(tier, filename):
     else:
         storage_path = f"{folder}/{tier}/{filename}"
 
-    tmp_dir = tempfile.mkdtemp(prefix=f"dbbackup_{tier}_")
-    tmp_sql = os.path.join(tmp_dir, "dump.sql")
-    tmp_gz = os.path.join(tmp_dir, "dump.sql.gz")
-    tmp_enc = os.path.join(tmp_dir, "dump.sql.gz.enc")
-
     encrypt = _is_encryption_enabled()
 
-    try:
-        if not _run_pg_dump(tmp_sql):
-            raise Exception(f"pg_dump failed for {tier} backup")
-
-        compressed_size = _gzip_file(tmp_sql, tmp_gz)
-        logger.info("[DBBACKUP] Compressed: %.2f KB", compressed_size / 1024)
-
-        if encrypt:
-            encrypted_size = _encrypt_file(tmp_gz, tmp_enc)
-            logger.info("[DBBACKUP] Encrypted: %.2f KB", encrypted_size / 1024)
-            upload_source = tmp_enc
-            result_size = encrypted_size
-        else:
-            upload_source = tmp_gz
-            result_size = compressed_size
-
-        saved_path = _upload_to_storage(upload_source, storage_path)
-        logger.info("[DBBACKUP] Uploaded to storage: %s", saved_path)
-
-        return {
-            "status": "ok",
-            "path": saved_path,
-            "tier": tier,
-            "size_kb": round(result_size / 1024, 2),
-            "encrypted": encrypt,
-            "timestamp": datetime.now(datetime.timezone.utc).isoformat(),
-        }
-    finally:
-        for tmp_file in (tmp_sql, tmp_gz, tmp_enc):
-            try:
-                if os.path.exists(tmp_file):
-                    os.remove(tmp_file)
-            except Exception:
-                pass
-        try:
-            os.rmdir(tmp_dir)
-        except Exception:
-            pass
+    saved_path, result_size = _upload_stream(_backup_chunks(encrypt), storage_path)
+    logger.info("[DBBACKUP] Uploaded to storage: %s (%.2f KB)", saved_path, result_size / 1024)
+
+    return {
+        "status": "ok",
+        "path": saved_path,
+        "tier": tier,
+        "size_kb": round(result_size / 1024, 2),
+        "encrypted": encrypt,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
 
 
 def _list_storage_files(tier):
@@ -359,7 +582,7 @@ def _parse_timestamp_from_filename(filename):
     """
     Parse a timestamp from a backup filename.
     Formats: YYYYMMDD_HHMMSS (hourly) or YYYYMM_01_HHMMSS (monthly)
-    Returns datetime object or None.
+    Returns an aware (UTC) datetime object or None.
     """
     base = filename.replace(".sql.gz", "")
 
@@ -369,6 +592,7 @@ def _parse_timestamp_from_filename(filename):
             return datetime(
                 int(match.group(1)), int(match.group(2)), int(match.group(3)),
                 int(match.group(4)), int(match.group(5)), int(match.group(6)),
+                tzinfo=timezone.utc,
             )
         except ValueError:
             return None
@@ -379,6 +603,7 @@ def _parse_timestamp_from_filename(filename):
             return datetime(
                 int(match.group(1)), int(match.group(2)), 1,
                 int(match.group(3)), int(match.group(4)), int(match.group(5)),
+                tzinfo=timezone.utc,
             )
         except ValueError:
             return None
@@ -451,7 +676,7 @@ def monthly_backup(self):
     File: {folder}/monthly/YYYYMM_01_HHMMSS.sql.gz
     Cleaned up after 365 days (12 months).
     """
-    timestamp = datetime.now(datetime.timezone.utc).strftime("%Y%m_01_%H%M%S")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m_01_%H%M%S")
     filename = f"{timestamp}.sql.gz"
 
     try:
@@ -474,7 +699,7 @@ def cleanup_hourly_backups():
     Delete hourly backup files older than 30 days.
     Runs daily at 4 AM UTC via Celery Beat.
     """
-    cutoff = datetime.now(datetime.timezone.utc) - timedelta(days=30)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
     files = _list_storage_files("hourly")
 
     deleted_count = 0
@@ -505,7 +730,7 @@ def cleanup_monthly_backups():
     Delete monthly backup files older than 365 days (12 months / 1 year).
     Runs monthly on the 2nd of each month via Celery Beat.
     """
-    cutoff = datetime.now(datetime.timezone.utc) - timedelta(days=365)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=365)
     files = _list_storage_files("monthly")
 
     deleted_count = 0
@@ -26,6 +26,12 @@ Backup formats supported:
   1. pg_dump --format=plain (full SQL: CREATE TABLE + INSERT + extensions)
   2. psycopg COPY fallback (data-only: COPY "schema"."table" FROM stdin; ... \\.)
 
+Restores stream: the backup is decrypted and decompressed chunk by chunk
+to a .sql file, COPY blocks are indexed by byte offset in one pass, and
+each block's data is fed to COPY / bulk inserts straight from the file.
+On PostgreSQL, independent tables restore concurrently over a psycopg
+connection pool (DBRESTORE_PARALLEL_WORKERS), parents before children.
+
 Key design principles:
   - NEVER corrupt existing data in non-empty databases
   - Automatically detect backup format (pg_dump vs COPY-only)
@@ -34,14 +40,15 @@ Key design principles:
   - Detailed progress logging and structured result reporting
 """
 
+import io
 import os
 import re
-import gzip
-import shutil
+import zlib
 import tempfile
+import itertools
 import logging
 import subprocess
-from io import StringIO
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 
 from celery import shared_task
@@ -65,6 +72,10 @@ _RESTORE_METHOD_PSYCOPY = "psycopg_copy"
 _RESTORE_METHOD_ORM = "django_orm"
 _RESTORE_METHOD_MERGE = "merge_safe"
 
+# Streaming: decompression / COPY chunk size and ORM / SQLite write batch size
+_STREAM_CHUNK_SIZE = 1024 * 1024
+_ORM_BATCH_SIZE = 1000
+
 # Tables that should never be restored (Django internal, ephemeral, or auto-managed)
 _EXCLUDED_TABLES = {
     "django_session",
@@ -149,24 +160,28 @@ def _detect_target_engine():
 
 def _is_encrypted_file(file_path):
     """
-    Detect if a file is Fernet-encrypted by checking for the Fernet token prefix.
-    Fernet tokens start with 'gAAAAA' (base64-encoded version byte 0x80 + timestamp).
+    Detect if a file is encrypted, in either container:
+      - streamed AES-GCM frames (current backups): starts with the stream magic
+      - legacy single Fernet token: starts with 'gAAAAA'
+        (base64-encoded version byte 0x80 + timestamp)
     """
+    from apps.common.tasks.dbbackups import _STREAM_MAGIC
+
     try:
         with open(file_path, "rb") as f:
             header = f.read(16)
-        # Fernet tokens always start with 0x80 byte (base64 'gAAAAA')
-        return header[:6] == b"gAAAAA"
+        return header.startswith(_STREAM_MAGIC) or header[:6] == b"gAAAAA"
     except Exception:
         return False
 
 
 def _decrypt_file(source_path, dest_path):
     """
-    Decrypt a Fernet-encrypted file.
-    Reads the entire encrypted file, decrypts it, and writes plaintext to dest_path.
+    Decrypt an encrypted backup file to dest_path.
+    Streamed AES-GCM backups are decrypted frame by frame; legacy Fernet
+    backups are a single token, so the whole file is read and decrypted.
     """
-    from cryptography.fernet import Fernet
+    from apps.common.tasks.dbbackups import _STREAM_MAGIC, _decrypt_chunks
 
     key = os.environ.get("DBBACKUP_ENCRYPTION_KEY", "").strip()
     if not key:
@@ -175,11 +190,19 @@ def _decrypt_file(source_path, dest_path):
             "Set DBBACKUP_ENCRYPTION_KEY in your environment to restore encrypted backups."
         )
 
-    fernet = Fernet(key.encode() if isinstance(key, str) else key)
+    with open(source_path, "rb") as src:
+        if src.read(len(_STREAM_MAGIC)) == _STREAM_MAGIC:
+            src.seek(0)
+            with open(dest_path, "wb") as dst:
+                for chunk in _decrypt_chunks(src):
+                    dst.write(chunk)
+            return os.path.getsize(dest_path)
+        src.seek(0)
+        ciphertext = src.read()
 
-    with open(source_path, "rb") as f:
-        ciphertext = f.read()
+    from cryptography.fernet import Fernet
 
+    fernet = Fernet(key.encode() if isinstance(key, str) else key)
     plaintext = fernet.decrypt(ciphertext)
 
     with open(dest_path, "wb") as f:
@@ -188,19 +211,48 @@ def _decrypt_file(source_path, dest_path):
     return os.path.getsize(dest_path)
 
 
+def _gunzip_chunks(chunks, max_chunk=_STREAM_CHUNK_SIZE):
+    """
+    Decompress a gzip byte stream incrementally (multi-member aware).
+    Output is capped at max_chunk bytes per step so a highly compressible
+    dump never inflates into one huge buffer. Raises EOFError on truncation.
+    """
+    decompressor = zlib.decompressobj(31)
+    in_member = False
+    for chunk in chunks:
+        data = chunk
+        while data:
+            in_member = True
+            out = decompressor.decompress(data, max_chunk)
+            while out:
+                yield out
+                if decompressor.eof or decompressor.unconsumed_tail:
+                    break
+                out = decompressor.decompress(b"", max_chunk)
+            if decompressor.eof:
+                in_member = False
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(31)
+            else:
+                data = decompressor.unconsumed_tail
+    if in_member:
+        raise EOFError("Compressed backup ended before the end-of-stream marker")
+
+
 def _download_from_storage(storage_path):
     """
     Download a backup file from the configured storage backend.
     Handles both encrypted and non-encrypted backups automatically.
 
-    Pipeline:
-      1. Download file from storage
-      2. If encrypted (Fernet): decrypt → decompress gzip → .sql
-      3. If not encrypted: decompress gzip → .sql
+    Pipeline (streamed in ~1 MiB chunks, never the whole file in memory):
+      1. Read from storage
+      2. If encrypted (AES-GCM frames): decrypt frame by frame
+         Legacy single-token Fernet backups are staged to disk and decrypted whole
+      3. Decompress gzip → .sql
 
     Returns (path_to_decompressed_sql_file, tmp_dir_path).
     """
-    from apps.common.tasks.dbbackups import _get_storage
+    from apps.common.tasks.dbbackups import _ChunkReader, _STREAM_MAGIC, _decrypt_chunks, _get_storage
 
     storage = _get_storage()
 
@@ -210,44 +262,43 @@ def _download_from_storage(storage_path):
     tmp_sql = os.path.join(tmp_dir, "backup.sql")
 
     try:
-        # Step 1: Download from storage
-        with open(tmp_raw, "wb") as f:
-            f.write(storage.open(storage_path).read())
-        logger.info("[DBRESTORE] Downloaded: %s (%s bytes)", storage_path, os.path.getsize(tmp_raw))
-
-        # Step 2: Check if the file is encrypted
-        encrypted = _is_encrypted_file(tmp_raw)
-
-        if encrypted:
-            logger.info("[DBRESTORE] Backup is encrypted, decrypting with Fernet...")
-            decrypted_size = _decrypt_file(tmp_raw, tmp_dec)
-            logger.info("[DBRESTORE] Decrypted: %s bytes", decrypted_size)
-            gzip_source = tmp_dec
-        else:
-            logger.info("[DBRESTORE] Backup is not encrypted, proceeding to decompress.")
-            gzip_source = tmp_raw
+        with storage.open(storage_path, "rb") as src:
+            head = src.read(16)
+            stored = itertools.chain([head], iter(lambda: src.read(_STREAM_CHUNK_SIZE), b""))
+
+            if head.startswith(_STREAM_MAGIC):
+                logger.info("[DBRESTORE] Backup is stream-encrypted, decrypting frames...")
+                compressed = _decrypt_chunks(io.BufferedReader(_ChunkReader(stored), _STREAM_CHUNK_SIZE))
+            elif head[:6] == b"gAAAAA":
+                logger.info("[DBRESTORE] Backup is legacy Fernet-encrypted, decrypting...")
+                with open(tmp_raw, "wb") as f:
+                    for chunk in stored:
+                        f.write(chunk)
+                decrypted_size = _decrypt_file(tmp_raw, tmp_dec)
+                os.remove(tmp_raw)
+                logger.info("[DBRESTORE] Decrypted: %s bytes", decrypted_size)
+                dec = open(tmp_dec, "rb")
+                compressed = iter(lambda: dec.read(_STREAM_CHUNK_SIZE), b"")
+            else:
+                logger.info("[DBRESTORE] Backup is not encrypted, proceeding to decompress.")
+                compressed = stored
 
-        # Step 3: Decompress gzip
-        with gzip.open(gzip_source, "rb") as src:
             with open(tmp_sql, "wb") as dst:
-                shutil.copyfileobj(src, dst)
-        logger.info("[DBRESTORE] Decompressed: %s (%s bytes)", tmp_sql, os.path.getsize(tmp_sql))
+                for chunk in _gunzip_chunks(compressed):
+                    dst.write(chunk)
 
+        logger.info("[DBRESTORE] Decompressed: %s (%s bytes)", tmp_sql, os.path.getsize(tmp_sql))
         return tmp_sql, tmp_dir
 
     except Exception as exc:
         # Clean up on failure
-        for f in (tmp_raw, tmp_dec, tmp_sql):
-            try:
-                if os.path.exists(f):
-                    os.remove(f)
-            except Exception:
-                pass
-        try:
-            os.rmdir(tmp_dir)
-        except Exception:
-            pass
+        _cleanup_temp(tmp_dir, tmp_raw, tmp_dec, tmp_sql)
         raise Exception(f"Failed to download/decrypt/decompress backup: {exc}")
+    finally:
+        if "dec" in locals():
+            dec.close()
+        if os.path.exists(tmp_dec):
+            os.remove(tmp_dec)
 
 
 def _cleanup_temp(tmp_dir, *files):
@@ -268,128 +319,151 @@ def _cleanup_temp(tmp_dir, *files):
 # SQL PARSING UTILITIES
 # =============================================================================
 
-def _parse_copy_blocks(sql_content):
+_COPY_HEADER = re.compile(
+    r'COPY\s+("?(\w+)"?\.)?"?(\w+)"?\s+(?:\(([^)]+)\)\s+)?FROM\s+stdin;',
+    re.IGNORECASE,
+)
+
+
+def _scan_sql_file(sql_file):
     """
-    Parse COPY ... FROM stdin; blocks from SQL content.
+    Stream a plain SQL dump line by line.
+
+    Yields ("statement", text) for ordinary SQL statements and
+    ("copy", block) for each COPY ... FROM stdin; block. COPY data is never
+    read into memory — the block records where its data lives in the file:
 
-    Returns a list of dicts:
         {
             "table": "public.auth_user",
             "schema": "public",
             "table_name": "auth_user",
             "columns": ["id", "email", ...],  # extracted from COPY statement if present
-            "data": "row1\trow2\t...\n...",   # raw COPY data
+            "path": sql_file,
+            "data_offset": 1234,              # byte offset of the first data row
+            "data_length": 5678,              # bytes up to (excluding) the "\\." line
+            "row_count": 42,
         }
     """
-    blocks = []
+    statement = []
+    block = None
+    offset = 0
+    with open(sql_file, "rb") as f:
+        for line in f:
+            line_start = offset
+            offset += len(line)
+
+            if block is not None:
+                if line.strip() == b"\\.":
+                    block["data_length"] = line_start - block["data_offset"]
+                    yield "copy", block
+                    block = None
+                else:
+                    block["row_count"] += 1
+                continue
 
-    # Pattern: COPY "schema"."table" FROM stdin;  (or COPY "table" FROM stdin;)
-    # Data follows until a line with just "\."
-    pattern = re.compile(
-        r'COPY\s+("?(\w+)"?\.)?"?(\w+)"?\s+(?:\(([^)]+)\)\s+)?FROM\s+stdin;\n',
-        re.IGNORECASE,
-    )
+            if not statement:
+                stripped = line.strip()
+                if not stripped or stripped.startswith(b"--"):
+                    continue
+                if stripped[:4].upper() == b"COPY":
+                    match = _COPY_HEADER.match(stripped.decode("utf-8", errors="replace"))
+                    if match:
+                        schema = match.group(2) or "public"
+                        table_name = match.group(3)
+                        columns_str = match.group(4)
+                        block = {
+                            "schema": schema,
+                            "table_name": table_name,
+                            "fq_table": f'"{schema}"."{table_name}"',
+                            "columns": [c.strip().strip('"') for c in columns_str.split(",")] if columns_str else [],
+                            "path": sql_file,
+                            "data_offset": offset,
+                            "data_length": 0,
+                            "row_count": 0,
+                        }
+                        continue
 
-    pos = 0
-    while True:
-        match = pattern.search(sql_content, pos)
-        if not match:
-            break
-
-        schema = match.group(2) or "public"
-        table_name = match.group(3)
-        columns_str = match.group(4)
-        columns = [c.strip().strip('"') for c in columns_str.split(",")] if columns_str else []
-
-        data_start = match.end()
-        # Find the terminator line: \.\n or \.\r\n
-        term_match = re.search(r'^\\\.\s*$', sql_content[data_start:], re.MULTILINE)
-        if not term_match:
-            logger.warning("[DBRESTORE] No COPY terminator found for %s.%s", schema, table_name)
-            break
-
-        data = sql_content[data_start:data_start + term_match.start()]
-        blocks.append({
-            "schema": schema,
-            "table_name": table_name,
-            "fq_table": f'"{schema}"."{table_name}"',
-            "columns": columns,
-            "data": data,
-            "row_count": data.count("\n") if data else 0,
-        })
+            statement.append(line.decode("utf-8", errors="replace"))
+            if line.rstrip().endswith(b";"):
+                yield "statement", "".join(statement).strip()
+                statement = []
+
+    if block is not None:
+        logger.warning("[DBRESTORE] No COPY terminator found for %s.%s", block["schema"], block["table_name"])
+    elif statement:
+        remaining = "".join(statement).strip()
+        if remaining:
+            yield "statement", remaining
 
-        pos = data_start + term_match.end()
 
-    return blocks
+def _parse_copy_blocks(sql_file):
+    """
+    Index the COPY ... FROM stdin; blocks of a decompressed SQL file.
+
+    One streaming pass; returns block dicts (see _scan_sql_file) whose data
+    is read on demand with _iter_block_data / _iter_block_rows, so any
+    number of blocks can be restored independently and concurrently.
+    """
+    return [item for kind, item in _scan_sql_file(sql_file) if kind == "copy"]
 
 
-def _parse_pg_dump_statements(sql_content):
+def _parse_pg_dump_statements(sql_file):
     """
-    Split a pg_dump plain SQL file into individual SQL statements.
-    Respects COPY blocks (which contain data with newlines).
+    Lazily split a pg_dump plain SQL file into individual SQL statements.
+    COPY blocks are yielded as block dicts (data stays in the file).
 
-    Returns a list of (statement_type, statement_text) tuples.
+    Yields (statement_type, statement) tuples.
     statement_type is one of: 'ddl', 'copy', 'insert', 'other'
     """
-    statements = []
-    pos = 0
-    length = len(sql_content)
-
-    while pos < length:
-        # Skip whitespace and comments
-        while pos < length and sql_content[pos] in " \t\n\r":
-            pos += 1
-        if pos >= length:
-            break
-
-        # Skip single-line comments (-- ...)
-        if sql_content[pos:pos + 2] == "--":
-            end = sql_content.find("\n", pos)
-            if end == -1:
-                break
-            pos = end + 1
+    for kind, item in _scan_sql_file(sql_file):
+        if kind == "copy":
+            yield "copy", item
             continue
+        upper = item.upper()
+        if upper.startswith("CREATE") or upper.startswith("ALTER") or upper.startswith("DROP"):
+            yield "ddl", item
+        elif upper.startswith("INSERT"):
+            yield "insert", item
+        else:
+            yield "other", item
 
-        # Check for COPY block
-        if sql_content[pos:pos + 4].upper() == "COPY":
-            # Find the semicolon after FROM stdin
-            semi = sql_content.find(";", pos)
-            if semi == -1:
+
+def _iter_block_data(block, chunk_size=_STREAM_CHUNK_SIZE):
+    """Yield a COPY block's raw data (bytes) straight from the SQL file."""
+    remaining = block["data_length"]
+    with open(block["path"], "rb") as f:
+        f.seek(block["data_offset"])
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
                 break
-            header = sql_content[pos:semi + 1]
-            # Find the \. terminator
-            data_start = semi + 1
-            # Skip the newline after semicolon
-            if data_start < length and sql_content[data_start] == "\n":
-                data_start += 1
-            term = re.search(r'^\\\.\s*$', sql_content[data_start:], re.MULTILINE)
-            if term:
-                block_end = data_start + term.end()
-                statements.append(("copy", sql_content[pos:block_end]))
-                pos = block_end
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_block_rows(block):
+    """
+    Yield a COPY block's rows as lists of str values.
+    COPY format: tab-separated values, \\N for NULL.
+    """
+    with open(block["path"], "rb") as f:
+        f.seek(block["data_offset"])
+        remaining = block["data_length"]
+        while remaining > 0:
+            line = f.readline()
+            if not line:
+                break
+            remaining -= len(line)
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            if not text.strip():
                 continue
+            yield [None if v == "\\N" else v for v in text.split("\t")]
 
-        # Find the next semicolon (end of statement)
-        semi = sql_content.find(";", pos)
-        if semi == -1:
-            # Remaining text
-            remaining = sql_content[pos:].strip()
-            if remaining:
-                statements.append(("other", remaining))
-            break
-
-        stmt = sql_content[pos:semi + 1].strip()
-        if stmt:
-            upper = stmt.upper()
-            if upper.startswith("CREATE") or upper.startswith("ALTER") or upper.startswith("DROP"):
-                statements.append(("ddl", stmt))
-            elif upper.startswith("INSERT"):
-                statements.append(("insert", stmt))
-            else:
-                statements.append(("other", stmt))
-        pos = semi + 1
 
-    return statements
+def _read_sql_head(sql_file, size=64 * 1024):
+    """First `size` bytes of the SQL file as text (for format detection)."""
+    with open(sql_file, "rb") as f:
+        return f.read(size).decode("utf-8", errors="replace")
 
 
 def _get_table_columns_from_django(table_name):
@@ -447,6 +521,119 @@ def _get_table_row_count(table_name):
         return -1
 
 
+# =============================================================================
+# PARALLEL TABLE RESTORE (PostgreSQL)
+# =============================================================================
+
+def _parallel_workers():
+    return max(int(getattr(settings, "DBRESTORE_PARALLEL_WORKERS", 4)), 1)
+
+
+def _open_restore_pool(db_url, workers):
+    """psycopg connection pool shared by the restore workers (one connection each)."""
+    from psycopg_pool import ConnectionPool
+
+    return ConnectionPool(
+        db_url,
+        min_size=1,
+        max_size=workers,
+        kwargs={"connect_timeout": 30, "autocommit": False},
+        open=True,
+    )
+
+
+def _table_dependencies(pool, blocks):
+    """
+    Map each block's (schema, table) to the restored tables it references by
+    foreign key. Self-references and tables outside the restore are ignored.
+    """
+    keys = {(b["schema"], b["table_name"]) for b in blocks}
+    deps = {key: set() for key in keys}
+    try:
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT cn.nspname, cl.relname, fn.nspname, fl.relname
+                FROM pg_constraint c
+                JOIN pg_class cl ON cl.oid = c.conrelid
+                JOIN pg_namespace cn ON cn.oid = cl.relnamespace
+                JOIN pg_class fl ON fl.oid = c.confrelid
+                JOIN pg_namespace fn ON fn.oid = fl.relnamespace
+                WHERE c.contype = 'f' AND c.conrelid <> c.confrelid;
+            """)
+            for schema, table, ref_schema, ref_table in cur.fetchall():
+                child, parent = (schema, table), (ref_schema, ref_table)
+                if child in keys and parent in keys:
+                    deps[child].add(parent)
+    except Exception as exc:
+        logger.warning("[DBRESTORE] Could not read FK graph, restoring tables one at a time: %s", exc)
+        return None
+    return deps
+
+
+def _missing_tables(pool, blocks):
+    """Return the fq_table names of blocks whose table does not exist in the target database."""
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT t.fq_table FROM unnest(%s::text[]) AS t(fq_table) WHERE to_regclass(t.fq_table) IS NULL;",
+            ([b["fq_table"] for b in blocks],),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def _run_table_restores(blocks, work, deps, workers):
+    """
+    Run work(block) for every block on a thread pool, parents before children.
+
+    A table starts once every table it references has finished, so
+    independent tables load concurrently while deferred FK checks still see
+    their parents committed. With no FK graph (deps is None) tables run one
+    at a time in file order. Returns {fq_table: result or exception}.
+    """
+    by_key = {(b["schema"], b["table_name"]): b for b in blocks}
+    if deps is None:
+        workers, deps = 1, {}
+
+    results = {}
+    pending = dict(by_key)
+    done = set()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dbrestore") as executor:
+        running = {}
+        while pending or running:
+            ready = [key for key in pending if deps.get(key, set()) <= done]
+            if not ready and not running:
+                logger.warning("[DBRESTORE] FK cycle among %d tables, restoring them together", len(pending))
+                ready = list(pending)
+            for key in ready:
+                block = pending.pop(key)
+                running[executor.submit(work, block)] = key
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                done.add(key)
+                try:
+                    results[by_key[key]["fq_table"]] = future.result()
+                except Exception as exc:
+                    results[by_key[key]["fq_table"]] = exc
+    return results
+
+
+def _with_connection_retry(pool, fq_table, fn, max_retries=3):
+    """Run fn(conn) in a pooled transaction, retrying on dropped connections."""
+    import psycopg
+
+    for attempt in range(max_retries):
+        try:
+            with pool.connection() as conn:
+                return fn(conn)
+        except (psycopg.OperationalError, psycopg.InterfaceError) as conn_err:
+            logger.warning(
+                "[DBRESTORE] Connection lost on %s (attempt %d/%d): %s",
+                fq_table, attempt + 1, max_retries, conn_err,
+            )
+            if attempt == max_retries - 1:
+                raise Exception(f"connection failed after {max_retries} retries") from conn_err
+
+
 # =============================================================================
 # METHOD 1: PSQL BINARY RESTORE (PostgreSQL only, pg_dump format)
 # =============================================================================
@@ -515,120 +702,88 @@ def _restore_via_psql(sql_file, target_db_url=None, destructive=True):
 # METHOD 2: PSYCOPY COPY-BASED RESTORE (PostgreSQL only, COPY format)
 # =============================================================================
 
-def _restore_via_psycopg_copy(sql_content, target_db_url=None, destructive=True):
+def _restore_via_psycopg_copy(sql_file, target_db_url=None, destructive=True, blocks=None):
     """
     Restore COPY-format backup to PostgreSQL using psycopg's COPY FROM STDIN.
-    Parses COPY blocks and streams data back into the database.
+    Each block's data is streamed from the SQL file in chunks; independent
+    tables load concurrently over a connection pool (DBRESTORE_PARALLEL_WORKERS,
+    default 4), parents before children.
 
     Args:
-        sql_content: The full SQL content (string)
+        sql_file: Path to the decompressed .sql file
         target_db_url: Database URL (defaults to DATABASE_URL env var)
-        destructive: If True, TRUNCATE tables before loading (for empty/replace)
+        destructive: If True, TRUNCATE all restored tables (one statement) before loading
                      If False, append data (may fail on unique constraints)
+        blocks: Pre-built block index (see _parse_copy_blocks)
 
     Returns dict with restore results.
     """
-    import psycopg
-
     db_url = target_db_url or os.environ.get("DATABASE_URL", "")
     if not db_url:
         return {"status": "error", "error": "No DATABASE_URL found"}
 
     logger.info("[DBRESTORE] Method 2: psycopg COPY restore (destructive=%s)", destructive)
 
-    blocks = _parse_copy_blocks(sql_content)
+    blocks = _parse_copy_blocks(sql_file) if blocks is None else blocks
     if not blocks:
         return {"status": "error", "method": _RESTORE_METHOD_PSYCOPY, "error": "No COPY blocks found in backup"}
 
     total_blocks = len(blocks)
-    restored = 0
+    targets = [b for b in blocks if b["table_name"] not in _EXCLUDED_TABLES]
+    skipped = total_blocks - len(targets)
     errors = []
-    skipped = 0
-
-    def _get_conn():
-        c = psycopg.connect(db_url, connect_timeout=30)
-        c.autocommit = False
-        return c
 
-    conn = None
+    def _copy_block(block):
+        def _load(conn):
+            with conn.cursor() as cur:
+                with cur.copy(f'COPY {block["fq_table"]} FROM stdin;') as copy:
+                    for chunk in _iter_block_data(block):
+                        copy.write(chunk)
+        logger.info("[DBRESTORE] Restoring %s (~%d rows)", block["fq_table"], block["row_count"])
+        _with_connection_retry(pool, block["fq_table"], _load)
+
+    workers = _parallel_workers()
+    pool = _open_restore_pool(db_url, workers)
     try:
-        conn = _get_conn()
-
-        for i, block in enumerate(blocks):
-            table = block["table_name"]
-            fq_table = block["fq_table"]
-
-            # Skip excluded tables
-            if table in _EXCLUDED_TABLES:
-                logger.info("[DBRESTORE] Skipping excluded table: %s (%d/%d)", fq_table, i + 1, total_blocks)
-                skipped += 1
-                continue
-
-            logger.info("[DBRESTORE] Restoring %s (%d/%d, ~%d rows)", fq_table, i + 1, total_blocks, block["row_count"])
-
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    with conn.cursor() as cur:
-                        # Destructive mode: TRUNCATE before loading
-                        if destructive:
-                            cur.execute(f'TRUNCATE TABLE {fq_table} CASCADE;')
-
-                        # Use COPY FROM STDIN to stream data back
-                        copy_stmt = f'COPY {fq_table} FROM stdin;'
-                        with cur.copy(copy_stmt) as copy:
-                            # Write the data in chunks
-                            data = block["data"]
-                            if isinstance(data, str):
-                                data = data.encode("utf-8")
-                            # Write in 8KB chunks for memory efficiency
-                            chunk_size = 8192
-                            for j in range(0, len(data), chunk_size):
-                                copy.write(data[j:j + chunk_size])
-
-                    conn.commit()
-                    restored += 1
-                    break
-
-                except (psycopg.OperationalError, psycopg.InterfaceError) as conn_err:
-                    logger.warning(
-                        "[DBRESTORE] Connection lost on %s (attempt %d/%d): %s",
-                        fq_table, attempt + 1, max_retries, conn_err,
-                    )
-                    try:
-                        if conn:
-                            conn.close()
-                    except Exception:
-                        pass
-                    if attempt < max_retries - 1:
-                        conn = _get_conn()
-                    else:
-                        errors.append(f"{fq_table}: connection failed after {max_retries} retries")
-
-                except psycopg.Error as pg_err:
-                    logger.warning("[DBRESTORE] Error on %s: %s", fq_table, pg_err)
-                    errors.append(f"{fq_table}: {pg_err}")
-                    try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-                    break
-
-                except Exception as exc:
-                    logger.warning("[DBRESTORE] Unexpected error on %s: %s", fq_table, exc)
-                    errors.append(f"{fq_table}: {exc}")
-                    try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-                    break
-
-    finally:
-        if conn:
+        # Tables missing from the target are reported per table (one bad
+        # name must not fail the shared TRUNCATE for every other table).
+        try:
+            missing = _missing_tables(pool, targets)
+        except Exception as exc:
+            return {"status": "error", "method": _RESTORE_METHOD_PSYCOPY, "error": f"Could not list target tables: {exc}"}
+        for block in targets:
+            if block["fq_table"] in missing:
+                logger.warning("[DBRESTORE] Table %s does not exist in target database", block["fq_table"])
+                errors.append(f'{block["fq_table"]}: table does not exist')
+        targets = [b for b in targets if b["fq_table"] not in missing]
+
+        if destructive and targets:
+            # One TRUNCATE for every table: per-table TRUNCATE ... CASCADE
+            # would wipe children that another worker has already loaded.
+            table_list = ", ".join(b["fq_table"] for b in targets)
             try:
-                conn.close()
-            except Exception:
-                pass
+                with pool.connection() as conn:
+                    conn.execute(f"TRUNCATE TABLE {table_list} CASCADE;")
+            except Exception as exc:
+                logger.error("[DBRESTORE] TRUNCATE before restore failed: %s", exc)
+                return {
+                    "status": "error",
+                    "method": _RESTORE_METHOD_PSYCOPY,
+                    "error": f"TRUNCATE failed: {exc}",
+                    "errors": errors[:20],
+                }
+
+        results = _run_table_restores(targets, _copy_block, _table_dependencies(pool, targets), workers)
+    finally:
+        pool.close()
+
+    failed = 0
+    for fq_table, outcome in results.items():
+        if isinstance(outcome, Exception):
+            logger.warning("[DBRESTORE] Error on %s: %s", fq_table, outcome)
+            errors.append(f"{fq_table}: {outcome}")
+            failed += 1
+    restored = len(results) - failed
 
     logger.info(
         "[DBRESTORE] psycopg COPY restore: %d/%d tables restored, %d skipped, %d errors",
@@ -649,22 +804,23 @@ def _restore_via_psycopg_copy(sql_content, target_db_url=None, destructive=True)
 # METHOD 3: DJANGO ORM CROSS-DB RESTORE (SQLite + PostgreSQL, merge-safe)
 # =============================================================================
 
-def _restore_via_django_orm(sql_content, merge_mode=False):
+def _restore_via_django_orm(sql_file, merge_mode=False, blocks=None):
     """
     Restore backup data using Django's ORM layer.
     This method works across ALL database backends (SQLite, PostgreSQL, MySQL).
-    Parses COPY blocks, maps table names to Django models, and uses bulk_create.
+    Streams COPY blocks, maps table names to Django models, and uses batched bulk_create.
 
     Args:
-        sql_content: The full SQL content (string)
-        merge_mode: If True, uses get_or_create (non-destructive merge into existing DB)
+        sql_file: Path to the decompressed .sql file
+        merge_mode: If True, inserts only rows whose primary key is new (non-destructive merge)
                     If False, clears existing data first then bulk_create (destructive)
+        blocks: Pre-built block index (see _parse_copy_blocks)
 
     Returns dict with restore results.
     """
     logger.info("[DBRESTORE] Method 3: Django ORM restore (merge_mode=%s)", merge_mode)
 
-    blocks = _parse_copy_blocks(sql_content)
+    blocks = _parse_copy_blocks(sql_file) if blocks is None else blocks
     if not blocks:
         return {"status": "error", "method": _RESTORE_METHOD_ORM, "error": "No COPY blocks found in backup"}
 
@@ -722,12 +878,13 @@ def _restore_via_django_orm(sql_content, merge_mode=False):
     }
 
 
-def _restore_table_via_orm(model, block, merge_mode):
+def _restore_table_via_orm(model, block, merge_mode, batch_size=_ORM_BATCH_SIZE):
     """
     Restore a single table's data via Django ORM.
 
-    Uses COPY data parsing to extract rows, maps to model fields,
-    and uses bulk_create (destructive) or get_or_create (merge).
+    Streams COPY rows from the SQL file, maps them to model fields and
+    writes them in batches: bulk_create (destructive) or, in merge mode,
+    bulk_create of the rows whose primary key is not already present.
     """
     # Get model field names (DB column names)
     field_map = {}  # db_column -> model field
@@ -746,92 +903,70 @@ def _restore_table_via_orm(model, block, merge_mode):
         # Final fallback: use model field order
         columns = [f.column for f in model._meta.concrete_fields if f.column]
 
-    # Parse COPY data into rows
-    # COPY format: tab-separated values, \N for NULL, \t for tab in data
-    raw_data = block["data"]
-    if not raw_data.strip():
-        return 0
-
-    rows = []
-    for line in raw_data.split("\n"):
-        if not line.strip():
-            continue
-        # Split by tab (COPY default delimiter)
-        values = line.split("\t")
-        # Convert \N to None (NULL marker in COPY format)
-        values = [None if v == "\\N" else v for v in values]
+    # Resolve each COPY column to a model field once, not per row
+    column_fields = []
+    for col_name in columns:
+        field = field_map.get(col_name)
+        if field is None:
+            # Try case-insensitive match
+            for fc, fl in field_map.items():
+                if fc.lower() == col_name.lower():
+                    field = fl
+                    break
+        column_fields.append((col_name, field))
+
+    def _instances():
+        for values in _iter_block_rows(block):
+            if len(values) != len(columns):
+                # Column count mismatch - try to handle gracefully
+                logger.warning(
+                    "[DBRESTORE] Column mismatch on %s: expected %d, got %d. Skipping row.",
+                    model._meta.db_table, len(columns), len(values),
+                )
+                continue
 
-        if len(values) != len(columns):
-            # Column count mismatch - try to handle gracefully
-            logger.warning(
-                "[DBRESTORE] Column mismatch on %s: expected %d, got %d. Skipping row.",
-                model._meta.db_table, len(columns), len(values),
-            )
-            continue
+            row_dict = {}
+            for (col_name, field), value in zip(column_fields, values):
+                if field is not None:
+                    # Convert string values to proper Python types
+                    converted = _convert_value_for_field(field, value)
+                    if converted is not None:
+                        # Use attname (Python attribute name) not column name
+                        row_dict[field.attname] = converted
+                else:
+                    # Unknown column, store by column name
+                    row_dict[col_name] = value
 
-        row_dict = {}
-        for col_name, value in zip(columns, values):
-            field = field_map.get(col_name)
-            if field is None:
-                # Try case-insensitive match
-                for fc, fl in field_map.items():
-                    if fc.lower() == col_name.lower():
-                        field = fl
-                        break
+            if row_dict:
+                yield model(**row_dict)
 
-            if field is not None:
-                # Convert string values to proper Python types
-                converted = _convert_value_for_field(field, value)
-                if converted is not None:
-                    # Use attname (Python attribute name) not column name
-                    row_dict[field.attname] = converted
-            else:
-                # Unknown column, store by column name
-                row_dict[col_name] = value
+    pk_name = model._meta.pk.attname
+    written = 0
+    with transaction.atomic():
+        if not merge_mode:
+            # Destructive: clear table then bulk_create
+            model.objects.all().delete()
 
-        if row_dict:
-            rows.append(row_dict)
+        batch = []
+        for instance in itertools.chain(_instances(), [None]):
+            if instance is not None:
+                batch.append(instance)
+                if len(batch) < batch_size:
+                    continue
+            if not batch:
+                break
 
-    if not rows:
-        return 0
+            if merge_mode:
+                # Non-destructive: only rows whose primary key is new
+                pks = [getattr(obj, pk_name) for obj in batch if getattr(obj, pk_name) is not None]
+                existing = set(model.objects.filter(pk__in=pks).values_list("pk", flat=True)) if pks else set()
+                batch = [obj for obj in batch if getattr(obj, pk_name) is None or getattr(obj, pk_name) not in existing]
 
-    # Create model instances
-    instances = []
-    for row_dict in rows:
-        instance = model(**row_dict)
-        instances.append(instance)
+            model.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
 
-    with transaction.atomic():
-        if merge_mode:
-            # Non-destructive: use get_or_create for each row
-            created_count = 0
-            for instance in instances:
-                # Use the primary key to check existence
-                pk_field = model._meta.pk
-                pk_name = pk_field.attname
-                pk_value = getattr(instance, pk_name, None)
-
-                if pk_value is not None:
-                    _, created = model.objects.get_or_create(
-                        **{pk_name: pk_value},
-                        defaults={
-                            f.attname: getattr(instance, f.attname)
-                            for f in model._meta.concrete_fields
-                            if f.attname != pk_name
-                        },
-                    )
-                    if created:
-                        created_count += 1
-                else:
-                    # No PK, just create
-                    instance.save()
-                    created_count += 1
-            return created_count
-        else:
-            # Destructive: clear table then bulk_create
-            model.objects.all().delete()
-            model.objects.bulk_create(instances, ignore_conflicts=False)
-            return len(instances)
+    return written
 
 
 def _convert_value_for_field(field, value):
@@ -915,34 +1050,37 @@ def _convert_value_for_field(field, value):
 # METHOD 4: SCHEMA-AWARE MERGE RESTORE (non-destructive, all DB engines)
 # =============================================================================
 
-def _restore_via_merge(sql_content):
+def _restore_via_merge(sql_file, blocks=None):
     """
     Non-destructive merge restore that preserves existing data.
     Works with both PostgreSQL and SQLite.
 
-    For PostgreSQL: Uses INSERT ... ON CONFLICT DO NOTHING
-    For SQLite: Uses INSERT OR IGNORE INTO ...
+    For PostgreSQL: COPY into a staging table, then one
+                    INSERT ... SELECT ... ON CONFLICT DO NOTHING per table,
+                    independent tables in parallel
+    For SQLite: Batched INSERT OR IGNORE INTO ...
 
     This method NEVER deletes existing rows. It only inserts rows that
     don't already exist (matched by primary key).
 
     Args:
-        sql_content: The full SQL content (string)
+        sql_file: Path to the decompressed .sql file
+        blocks: Pre-built block index (see _parse_copy_blocks)
 
     Returns dict with restore results.
     """
     engine = _detect_target_engine()
     logger.info("[DBRESTORE] Method 4: Schema-aware merge restore (engine=%s)", engine)
 
-    blocks = _parse_copy_blocks(sql_content)
+    blocks = _parse_copy_blocks(sql_file) if blocks is None else blocks
     if not blocks:
         return {"status": "error", "method": _RESTORE_METHOD_MERGE, "error": "No COPY blocks found in backup"}
 
     total_blocks = len(blocks)
-    restored = 0
     skipped = 0
     errors = []
     total_rows = 0
+    targets = []
 
     for i, block in enumerate(blocks):
         table_name = block["table_name"]
@@ -965,15 +1103,49 @@ def _restore_via_merge(sql_content):
                 skipped += 1
                 continue
 
-        logger.info("[DBRESTORE] Merging %s (%d/%d)", table_name, i + 1, total_blocks)
+        if not block["row_count"]:
+            skipped += 1
+            continue
 
+        # Resolved here, on the Django connection, so workers never touch it
+        columns = block.get("columns") or _get_table_columns_from_django(block["fq_table"])
+        if not columns:
+            logger.warning("[DBRESTORE] Could not determine columns for %s, skipping", table_name)
+            skipped += 1
+            continue
+        targets.append({**block, "columns": columns, "pk_columns": _get_primary_key_columns(block["fq_table"], engine)})
+
+    if engine == "postgresql":
+        db_url = os.environ.get("DATABASE_URL", "")
+        if not db_url:
+            return {"status": "error", "method": _RESTORE_METHOD_MERGE, "error": "No DATABASE_URL for psycopg merge"}
+        workers = _parallel_workers()
+        pool = _open_restore_pool(db_url, workers)
         try:
-            rows_merged = _merge_table_data(block, engine)
+            results = _run_table_restores(
+                targets,
+                lambda block: _merge_table_data(block, engine, pool=pool),
+                _table_dependencies(pool, targets),
+                workers,
+            )
+        finally:
+            pool.close()
+    else:
+        results = {}
+        for block in targets:
+            try:
+                results[block["fq_table"]] = _merge_table_data(block, engine)
+            except Exception as exc:
+                results[block["fq_table"]] = exc
+
+    restored = 0
+    for fq_table, outcome in results.items():
+        if isinstance(outcome, Exception):
+            logger.warning("[DBRESTORE] Error merging %s: %s", fq_table, outcome)
+            errors.append(f"{fq_table}: {outcome}")
+        else:
             restored += 1
-            total_rows += rows_merged
-        except Exception as exc:
-            logger.warning("[DBRESTORE] Error merging %s: %s", table_name, exc)
-            errors.append(f"{table_name}: {exc}")
+            total_rows += outcome
 
     logger.info(
         "[DBRESTORE] Merge restore: %d/%d tables merged, %d skipped, %d rows inserted, %d errors",
@@ -992,169 +1164,63 @@ def _restore_via_merge(sql_content):
     }
 
 
-def _merge_table_data(block, engine):
+def _merge_table_data(block, engine, pool=None, batch_size=_ORM_BATCH_SIZE):
     """
     Merge a single table's data using non-destructive INSERT with conflict resolution.
 
-    For PostgreSQL: Uses a temp table + COPY FROM STDIN + INSERT ON CONFLICT DO NOTHING.
-                    This handles all PG data types (JSON, bytea, arrays) correctly
-                    because COPY FROM STDIN parses the text representation natively.
-    For SQLite: Uses INSERT OR IGNORE INTO ... with parameterized values.
+    For PostgreSQL: COPY FROM STDIN (streamed from the SQL file) into a
+                    staging temp table, then one INSERT ... SELECT ... ON CONFLICT
+                    DO NOTHING. COPY parses the text representation natively, so
+                    all PG data types (JSON, bytea, arrays) are handled correctly.
+                    The staging table is dropped on commit.
+    For SQLite: Batched INSERT OR IGNORE INTO ... (executemany).
+
+    ``block["columns"]`` and ``block["pk_columns"]`` are resolved by the caller.
     """
     table_name = block["table_name"]
-    fq_table = block["fq_table"].replace('"', '')
-    # For SQLite, strip schema prefix
-    if engine == "sqlite":
-        fq_table = table_name
-
-    # Get column names
-    columns = block.get("columns", [])
-    if not columns:
-        columns = _get_table_columns_from_django(block["fq_table"])
-
-    if not columns:
-        logger.warning("[DBRESTORE] Could not determine columns for %s, skipping", table_name)
-        return 0
-
-    # Get primary key columns for conflict resolution
-    pk_columns = _get_primary_key_columns(block["fq_table"], engine)
-
-    # Parse COPY data into rows
-    raw_data = block["data"]
-    if not raw_data.strip():
-        return 0
-
-    rows_inserted = 0
+    columns = block["columns"]
+    pk_columns = block.get("pk_columns") or []
+    col_list = ", ".join(f'"{c}"' for c in columns)
 
     if engine == "postgresql":
-        # Use psycopg directly for COPY FROM STDIN into temp table approach
-        # This is the safest way to handle all PG data types (JSON, bytea, arrays)
-        import psycopg
-
-        db_url = os.environ.get("DATABASE_URL", "")
-        if not db_url:
-            logger.error("[DBRESTORE] No DATABASE_URL for psycopg merge")
-            return 0
-
-        temp_table_name = f"_tmp_restore_{table_name[:40]}"
+        staging = f"_tmp_restore_{table_name[:40]}"
+        conflict_cols = ", ".join(f'"{c}"' for c in pk_columns)
+        conflict = f"({conflict_cols}) " if conflict_cols else ""
 
-        def _get_conn():
-            c = psycopg.connect(db_url, connect_timeout=30)
-            c.autocommit = False
-            return c
-
-        conn = None
-        try:
-            conn = _get_conn()
+        def _merge(conn):
             with conn.cursor() as cur:
-                # Step 1: Create temp table LIKE target (structure only, no constraints)
-                cur.execute(f'CREATE TEMP TABLE "{temp_table_name}" (LIKE {block["fq_table"]});')
-
-                # Step 2: COPY data into temp table using COPY FROM STDIN
-                copy_stmt = f'COPY "{temp_table_name}" FROM stdin;'
-                data_bytes = raw_data.encode("utf-8") if isinstance(raw_data, str) else raw_data
-                with cur.copy(copy_stmt) as copy:
-                    chunk_size = 8192
-                    for j in range(0, len(data_bytes), chunk_size):
-                        copy.write(data_bytes[j:j + chunk_size])
-
-                # Step 3: INSERT ... ON CONFLICT DO NOTHING from temp to target
-                col_list = ", ".join(f'"{c}"' for c in columns)
-                conflict_cols = ", ".join(f'"{c}"' for c in pk_columns) if pk_columns else ""
-
-                if conflict_cols:
-                    insert_sql = (
-                        f'INSERT INTO {block["fq_table"]} ({col_list}) '
-                        f'SELECT {col_list} FROM "{temp_table_name}" '
-                        f'ON CONFLICT ({conflict_cols}) DO NOTHING'
-                    )
-                else:
-                    insert_sql = (
-                        f'INSERT INTO {block["fq_table"]} ({col_list}) '
-                        f'SELECT {col_list} FROM "{temp_table_name}" '
-                        f'ON CONFLICT DO NOTHING'
-                    )
-                cur.execute(insert_sql)
-                rows_inserted = cur.rowcount if cur.rowcount and cur.rowcount > 0 else 0
-
-                # Step 4: Drop temp table
-                cur.execute(f'DROP TABLE IF EXISTS "{temp_table_name}";')
-
-            conn.commit()
-
-        except (psycopg.OperationalError, psycopg.InterfaceError) as conn_err:
-            logger.warning("[DBRESTORE] Connection lost during merge of %s: %s", table_name, conn_err)
-            try:
-                if conn:
-                    conn.rollback()
-                    conn.close()
-            except Exception:
-                pass
-            # Retry once with fresh connection
-            try:
-                conn = _get_conn()
-                with conn.cursor() as cur:
-                    cur.execute(f'CREATE TEMP TABLE "{temp_table_name}" (LIKE {block["fq_table"]});')
-                    copy_stmt = f'COPY "{temp_table_name}" FROM stdin;'
-                    data_bytes = raw_data.encode("utf-8") if isinstance(raw_data, str) else raw_data
-                    with cur.copy(copy_stmt) as copy:
-                        chunk_size = 8192
-                        for j in range(0, len(data_bytes), chunk_size):
-                            copy.write(data_bytes[j:j + chunk_size])
-                    col_list = ", ".join(f'"{c}"' for c in columns)
-                    conflict_cols = ", ".join(f'"{c}"' for c in pk_columns) if pk_columns else ""
-                    if conflict_cols:
-                        cur.execute(
-                            f'INSERT INTO {block["fq_table"]} ({col_list}) '
-                            f'SELECT {col_list} FROM "{temp_table_name}" '
-                            f'ON CONFLICT ({conflict_cols}) DO NOTHING'
-                        )
-                    else:
-                        cur.execute(
-                            f'INSERT INTO {block["fq_table"]} ({col_list}) '
-                            f'SELECT {col_list} FROM "{temp_table_name}" '
-                            f'ON CONFLICT DO NOTHING'
-                        )
-                    rows_inserted = cur.rowcount if cur.rowcount and cur.rowcount > 0 else 0
-                    cur.execute(f'DROP TABLE IF EXISTS "{temp_table_name}";')
-                conn.commit()
-            except Exception as retry_err:
-                logger.error("[DBRESTORE] Retry also failed for %s: %s", table_name, retry_err)
-                raise
-        except Exception as exc:
-            logger.error("[DBRESTORE] Merge failed for %s: %s", table_name, exc)
-            try:
-                if conn:
-                    conn.rollback()
-            except Exception:
-                pass
-            raise
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+                cur.execute(f'CREATE TEMP TABLE "{staging}" (LIKE {block["fq_table"]}) ON COMMIT DROP;')
+                with cur.copy(f'COPY "{staging}" ({col_list}) FROM stdin;') as copy:
+                    for chunk in _iter_block_data(block):
+                        copy.write(chunk)
+                cur.execute(
+                    f'INSERT INTO {block["fq_table"]} ({col_list}) '
+                    f'SELECT {col_list} FROM "{staging}" '
+                    f'ON CONFLICT {conflict}DO NOTHING'
+                )
+                return cur.rowcount if cur.rowcount and cur.rowcount > 0 else 0
+
+        logger.info("[DBRESTORE] Merging %s (~%d rows)", block["fq_table"], block["row_count"])
+        return _with_connection_retry(pool, block["fq_table"], _merge, max_retries=2)
 
-    elif engine == "sqlite":
-        # SQLite: use INSERT OR IGNORE with parameterized values
+    rows_inserted = 0
+    if engine == "sqlite":
+        sql = f'INSERT OR IGNORE INTO "{table_name}" ({col_list}) VALUES ({", ".join(["%s"] * len(columns))})'
         with transaction.atomic():
             with connection.cursor() as cursor:
-                for line in raw_data.split("\n"):
-                    if not line.strip():
-                        continue
-
-                    values = line.split("\t")
-                    values = [None if v == "\\N" else v for v in values]
-
-                    if len(values) != len(columns):
-                        continue
-
-                    col_list = ", ".join(f'"{c}"' for c in columns)
-                    placeholders = ", ".join(["%s"] * len(columns))
-                    sql = f'INSERT OR IGNORE INTO "{fq_table}" ({col_list}) VALUES ({placeholders})'
-                    cursor.execute(sql, values)
+                batch = []
+                for values in itertools.chain(_iter_block_rows(block), [None]):
+                    if values is not None:
+                        if len(values) != len(columns):
+                            continue
+                        batch.append(values)
+                        if len(batch) < batch_size:
+                            continue
+                    if not batch:
+                        break
+                    cursor.executemany(sql, batch)
                     rows_inserted += cursor.rowcount if cursor.rowcount > 0 else 0
+                    batch = []
 
     return rows_inserted
 
@@ -1228,12 +1294,13 @@ def _restore_backup(
         }
 
     try:
-        # Step 2: Read SQL content
-        with open(sql_file, "r", encoding="utf-8", errors="replace") as f:
-            sql_content = f.read()
+        # Step 2: Index COPY blocks (one streaming pass; data stays on disk)
+        blocks = _parse_copy_blocks(sql_file)
 
         # Step 3: Detect backup format
-        backup_format = _detect_backup_format(sql_content)
+        backup_format = _detect_backup_format(_read_sql_head(sql_file))
+        if backup_format == _BACKUP_FORMAT_UNKNOWN and blocks:
+            backup_format = _BACKUP_FORMAT_COPY
         target_engine = _detect_target_engine()
 
         logger.info("[DBRESTORE] Backup format: %s, Target engine: %s", backup_format, target_engine)
@@ -1248,36 +1315,36 @@ def _restore_backup(
                 result = _restore_via_psql(sql_file, target_db_url, destructive=not merge_mode)
                 if result.get("status") == "error" and "not found" in result.get("error", "").lower():
                     logger.info("[DBRESTORE] psql not available, trying psycopg COPY")
-                    result = _restore_via_psycopg_copy(sql_content, target_db_url, destructive=not merge_mode)
+                    result = _restore_via_psycopg_copy(sql_file, target_db_url, destructive=not merge_mode, blocks=blocks)
 
             elif backup_format == _BACKUP_FORMAT_COPY and target_engine == "postgresql":
                 if merge_mode:
-                    result = _restore_via_merge(sql_content)
+                    result = _restore_via_merge(sql_file, blocks=blocks)
                 else:
-                    result = _restore_via_psycopg_copy(sql_content, target_db_url, destructive=True)
+                    result = _restore_via_psycopg_copy(sql_file, target_db_url, destructive=True, blocks=blocks)
 
             elif target_engine == "sqlite":
                 # SQLite: always use ORM or merge
                 if merge_mode:
-                    result = _restore_via_merge(sql_content)
+                    result = _restore_via_merge(sql_file, blocks=blocks)
                 else:
-                    result = _restore_via_django_orm(sql_content, merge_mode=False)
+                    result = _restore_via_django_orm(sql_file, merge_mode=False, blocks=blocks)
 
             else:
                 # Fallback: ORM-based restore (works everywhere)
-                result = _restore_via_django_orm(sql_content, merge_mode=merge_mode)
+                result = _restore_via_django_orm(sql_file, merge_mode=merge_mode, blocks=blocks)
 
         elif method == "psql":
             result = _restore_via_psql(sql_file, target_db_url, destructive=not merge_mode)
 
         elif method == "psycopg":
-            result = _restore_via_psycopg_copy(sql_content, target_db_url, destructive=not merge_mode)
+            result = _restore_via_psycopg_copy(sql_file, target_db_url, destructive=not merge_mode, blocks=blocks)
 
         elif method == "orm":
-            result = _restore_via_django_orm(sql_content, merge_mode=merge_mode)
+            result = _restore_via_django_orm(sql_file, merge_mode=merge_mode, blocks=blocks)
 
         elif method == "merge":
-            result = _restore_via_merge(sql_content)
+            result = _restore_via_merge(sql_file, blocks=blocks)
 
         else:
             return {
@@ -1355,11 +1422,10 @@ def verify_backup_task(self, storage_path):
         sql_file, tmp_dir = _download_from_storage(storage_path)
 
         try:
-            with open(sql_file, "r", encoding="utf-8", errors="replace") as f:
-                sql_content = f.read()
-
-            backup_format = _detect_backup_format(sql_content)
-            blocks = _parse_copy_blocks(sql_content)
+            blocks = _parse_copy_blocks(sql_file)
+            backup_format = _detect_backup_format(_read_sql_head(sql_file))
+            if backup_format == _BACKUP_FORMAT_UNKNOWN and blocks:
+                backup_format = _BACKUP_FORMAT_COPY
 
             total_rows = sum(b["row_count"] for b in blocks)
             table_list = [b["table_name"] for b in blocks]
@@ -200,6 +200,28 @@ class TestWebhookRouting(CacheClearMixin, TestCase):
         result = _get_target_field("/products/images/", "image", "product_image")
         self.assertEqual(result, "image")
 
+    def test_prefix_map_matches_mid_path_avatar(self):
+        from apps.common.tasks.cloudinary import _match_route
+        route = _match_route(
+            "fashionistar/users/avatars/user_550e8400-e29b-41d4-a716-446655440000/a.jpg"
+        )
+        self.assertEqual(route[4], "avatar")
+
+    def test_prefix_map_agrees_with_substring_scan(self):
+        from apps.common.tasks.cloudinary import _WEBHOOK_ROUTES, _match_route
+        public_ids = [
+            "/products/images/PROD-001/image.jpg",
+            "fashionistar/products/videos/PROD-001/clip.mp4",
+            "/measurements/M-1/scan.jpg",
+            "/measurements",                     # no trailing "/" → no match
+            "/xproducts/images/P/a.jpg",         # segment must match exactly
+            "avatars/user_x/a.jpg",              # pattern needs a leading "/"
+            "/generic/asset.jpg",
+        ]
+        for public_id in public_ids:
+            expected = next((r for r in _WEBHOOK_ROUTES if r[0] in public_id), None)
+            self.assertIs(_match_route(public_id), expected, public_id)
+
     def test_audit_event_mapping_avatar(self):
         from apps.common.tasks.cloudinary import _get_audit_event_type, _EVENT_AVATAR_CLOUDINARY
         result = _get_audit_event_type("avatar", "image")
@@ -527,6 +549,12 @@ class TestCeleryQueueRouting(TestCase):
         self.assertIn("generate_eager_transformations", routes)
         self.assertEqual(routes["generate_eager_transformations"]["queue"], "transforms")
 
+    def test_webhook_batch_tasks_routed(self):
+        from backend.celery import app
+        routes = app.conf.task_routes
+        self.assertEqual(routes["drain_cloudinary_webhook_buffer"]["queue"], "webhooks")
+        self.assertEqual(routes["generate_eager_transformations_batch"]["queue"], "transforms")
+
     def test_delete_cloudinary_in_cleanup_queue(self):
         from backend.celery import app
         routes = app.conf.task_routes
@@ -301,7 +301,9 @@ class TasksPackageImportTests(TestCase):
         "update_model_analytics_counter",
         "delete_cloudinary_asset_task",
         "process_cloudinary_upload_webhook",
+        "drain_cloudinary_webhook_buffer",
         "generate_eager_transformations",
+        "generate_eager_transformations_batch",
         "purge_cloudinary_cache",
         "bulk_sync_cloudinary_urls",
         "upsert_user_lifecycle_registry",
@@ -395,6 +397,58 @@ class WebhookTaskIdempotencyTests(TransactionTestCase):
         process_cloudinary_upload_webhook(payload)  # should not raise
 
 
+class WebhookBatchTests(TransactionTestCase):
+    """process_cloudinary_webhook_batch — coalesced, bulk-updated webhooks."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f"batch_{i}@test.com", password="securepass123")
+            for i in range(2)
+        ]
+        patcher = patch(
+            "apps.common.tasks.cloudinary.generate_eager_transformations_batch.apply_async"
+        )
+        self.mock_eager = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_payload(self, user_id, url: str, created_at: str = "1") -> dict:
+        return {
+            "public_id":  f"fashionistar/users/avatars/user_{user_id}/test.jpg",
+            "secure_url": url,
+            "resource_type": "image",
+            "created_at": created_at,
+        }
+
+    def test_batch_updates_every_avatar_and_chains_one_eager_task(self):
+        from apps.common.tasks.cloudinary import process_cloudinary_webhook_batch
+
+        first, second = self.users
+        stats = process_cloudinary_webhook_batch([
+            self._make_payload(first.pk, "https://res.cloudinary.com/test/old.jpg", "1"),
+            self._make_payload(second.pk, "https://res.cloudinary.com/test/b.jpg"),
+            self._make_payload(first.pk, "https://res.cloudinary.com/test/new.jpg", "2"),
+        ])
+
+        self.assertEqual(stats["updated"], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.avatar, "https://res.cloudinary.com/test/new.jpg")  # last arrival wins
+        self.assertEqual(second.avatar, "https://res.cloudinary.com/test/b.jpg")
+        self.mock_eager.assert_called_once()
+        self.assertEqual(len(self.mock_eager.call_args[1]["kwargs"]["assets"]), 2)
+
+    def test_batch_is_idempotent(self):
+        from apps.common.tasks.cloudinary import process_cloudinary_webhook_batch
+
+        payloads = [self._make_payload(user.pk, f"https://res.cloudinary.com/test/{i}.jpg")
+                    for i, user in enumerate(self.users)]
+        process_cloudinary_webhook_batch(payloads)
+        stats = process_cloudinary_webhook_batch(payloads)
+
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(stats["updated"], 0)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 5. bulk_sync_cloudinary_urls — atomic transaction + multiple images
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,128 @@
+import gzip
+import threading
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+from apps.common.tasks import dbbackups, dbrestore
+
+
+DUMP = (
+    b"-- PostgreSQL database dump\n"
+    b"SET statement_timeout = 0;\n"
+    b"CREATE TABLE public.shop (\n    id integer NOT NULL\n);\n"
+    b"COPY public.shop (id, name) FROM stdin;\n"
+    b"1\tAlpha\n"
+    b"2\t\\N\n"
+    b"\\.\n"
+    b"COPY \"public\".\"item\" FROM stdin;\n"
+    b"\\.\n"
+    b"ALTER TABLE ONLY public.shop ADD CONSTRAINT shop_pkey PRIMARY KEY (id);\n"
+)
+
+
+@pytest.fixture
+def sql_file(tmp_path):
+    path = tmp_path / "backup.sql"
+    path.write_bytes(DUMP)
+    return str(path)
+
+
+def test_copy_blocks_are_indexed_without_loading_data(sql_file):
+    shop, item = dbrestore._parse_copy_blocks(sql_file)
+
+    assert (shop["fq_table"], shop["columns"], shop["row_count"]) == ('"public"."shop"', ["id", "name"], 2)
+    assert b"".join(dbrestore._iter_block_data(shop, chunk_size=4)) == b"1\tAlpha\n2\t\\N\n"
+    assert list(dbrestore._iter_block_rows(shop)) == [["1", "Alpha"], ["2", None]]
+    assert (item["table_name"], item["row_count"], item["data_length"]) == ("item", 0, 0)
+
+
+def test_pg_dump_statements_are_split_lazily(sql_file):
+    kinds = [kind for kind, _ in dbrestore._parse_pg_dump_statements(sql_file)]
+
+    assert kinds == ["other", "ddl", "copy", "copy", "ddl"]
+
+
+def test_tables_restore_after_the_tables_they_reference():
+    blocks = [
+        {"schema": "public", "table_name": name, "fq_table": name}
+        for name in ("order_item", "order", "product", "audit")
+    ]
+    deps = {("public", "order_item"): {("public", "order"), ("public", "product")}}
+    finished, lock = [], threading.Lock()
+
+    def work(block):
+        time.sleep(0.01)
+        with lock:
+            finished.append(block["table_name"])
+        return block["table_name"]
+
+    results = dbrestore._run_table_restores(blocks, work, deps, workers=4)
+
+    assert finished[-1] == "order_item"
+    assert results == {b["fq_table"]: b["table_name"] for b in blocks}
+
+
+def test_download_streams_encrypted_backup_to_sql(settings, tmp_path, monkeypatch):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "dbbackups": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path)},
+        },
+    }
+    monkeypatch.setenv("DBBACKUP_ENCRYPTION_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(dbbackups, "_dump_chunks", lambda: iter([DUMP] * 1000))
+    result = dbbackups._create_backup("rolling", "latest.sql.gz")
+
+    sql_path, tmp_dir = dbrestore._download_from_storage(result["path"])
+    try:
+        with open(sql_path, "rb") as f:
+            assert f.read() == DUMP * 1000
+        assert len(dbrestore._parse_copy_blocks(sql_path)) == 2000
+    finally:
+        dbrestore._cleanup_temp(tmp_dir, sql_path)
+
+
+def test_truncated_gzip_is_rejected():
+    data = gzip.compress(b"COPY x FROM stdin;\n" * 10_000)
+
+    with pytest.raises(EOFError):
+        list(dbrestore._gunzip_chunks([data[:-20]]))
+
+
+def test_missing_table_is_reported_without_failing_the_restore(sql_file, monkeypatch):
+    executed, loaded = [], []
+
+    class _Conn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql):
+            executed.append(sql)
+
+    class _Pool:
+        def connection(self):
+            return _Conn()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(dbrestore, "_open_restore_pool", lambda url, workers: _Pool())
+    monkeypatch.setattr(dbrestore, "_missing_tables", lambda pool, blocks: {'"public"."item"'})
+    monkeypatch.setattr(dbrestore, "_table_dependencies", lambda pool, blocks: None)
+    monkeypatch.setattr(
+        dbrestore, "_run_table_restores",
+        lambda blocks, work, deps, workers: {b["fq_table"]: loaded.append(b["fq_table"]) for b in blocks},
+    )
+
+    result = dbrestore._restore_via_psycopg_copy(sql_file, target_db_url="postgres://target")
+
+    assert executed == ['TRUNCATE TABLE "public"."shop" CASCADE;']
+    assert loaded == ['"public"."shop"']
+    assert (result["status"], result["tables_restored"]) == ("ok", 1)
+    assert result["errors"] == ['"public"."item": table does not exist']
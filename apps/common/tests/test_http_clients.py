@@ -68,3 +68,71 @@ def test_async_provider_client_normalizes_timeout():
             await client.request("GET", "/verify/ref", action="payment.verify")
 
     asyncio.run(run_case())
+
+
+def test_sync_provider_clients_share_one_pooled_client_per_base_url():
+    from apps.common.http.pool import close_provider_clients, provider_pool_stats
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+    first = ProviderSyncHTTPClient(provider="pooled", base_url="https://pooled.test/", transport=transport)
+    second = ProviderSyncHTTPClient(provider="pooled", base_url="https://pooled.test", transport=transport)
+
+    first.request("GET", "/a", action="a")
+    second.request("GET", "/b", action="b")
+
+    assert first.client is second.client
+    stats = provider_pool_stats()
+    assert stats["providers"]["pooled"]["requests"] >= 2
+    assert any(pool["base_url"] == "https://pooled.test" for pool in stats["pools"])
+
+    pooled = first.client
+    close_provider_clients()
+    assert pooled.is_closed
+    assert first.client is not pooled
+    close_provider_clients()
+
+
+def test_async_provider_clients_are_pooled_per_long_lived_loop():
+    from apps.common.http.pool import aclose_provider_clients, register_long_lived_loop
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"ok": True})
+
+    transport = httpx.MockTransport(handler)
+
+    async def run_case():
+        register_long_lived_loop()
+        first = ProviderAsyncHTTPClient(provider="pooled", base_url="https://pooled.test", transport=transport)
+        second = ProviderAsyncHTTPClient(provider="pooled", base_url="https://pooled.test", transport=transport)
+        await first.request("GET", "/a", action="a")
+        async with first.connect() as pooled, second.connect() as other:
+            assert pooled is other
+        assert not pooled.is_closed
+        await aclose_provider_clients()
+        assert pooled.is_closed
+        return pooled
+
+    assert asyncio.run(run_case()) is not asyncio.run(run_case())
+
+
+def test_async_provider_client_is_scoped_on_short_lived_loops():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"ok": True})
+
+    async def run_case():
+        client = ProviderAsyncHTTPClient(
+            provider="scoped",
+            base_url="https://scoped.test",
+            transport=httpx.MockTransport(handler),
+        )
+        response = await client.request("GET", "/a", action="a")
+        async with client.connect() as first:
+            pass
+        async with client.connect() as second:
+            pass
+        return response, first, second
+
+    response, first, second = asyncio.run(run_case())
+    assert response.data == {"ok": True}
+    assert first.is_closed and second.is_closed
+    assert first is not second
@@ -0,0 +1,74 @@
+# apps/common/utils/cloudinary_webhook_buffer.py
+"""
+Coalescing buffer for Cloudinary upload webhooks — Redis list + batch drain.
+
+A vendor uploading a 40-image gallery produces 40 notifications within a
+few seconds. Instead of one Celery task (duplicate check, route scan,
+UPDATE, eager chain) per asset, validated payloads are appended to a Redis
+list and processed together:
+
+    CloudinaryWebhookView.post(payload)
+        └─ enqueue_cloudinary_webhook()   RPUSH cloudinary:webhooks:v1 + SET NX flush flag
+                └─ drain_cloudinary_webhook_buffer task (once per flush interval,
+                   or immediately when CLOUDINARY_WEBHOOK_BATCH_SIZE payloads wait;
+                   Celery beat also runs it as a safety net)
+                        └─ drain_cloudinary_webhooks_once()
+                               LRANGE head → process_cloudinary_webhook_batch() → LTRIM
+
+Delivery guarantees:
+    * At-least-once. Payloads leave the list (LTRIM) only AFTER their batch
+      was processed. A crash in between re-delivers the batch.
+    * Idempotent. Every payload carries its Cloudinary idempotency key
+      (public_id + created_at + resource_type); re-delivered payloads are
+      discarded by the batch duplicate check.
+    * A single drainer at a time (SET NX lock, renewed before every batch;
+      the LTRIM is owner-checked).
+
+Fallback: Redis unavailable or buffering disabled → the per-asset
+``process_cloudinary_upload_webhook`` task, exactly as before.
+
+The list/lock mechanics live in ``apps.common.utils.redis_list_buffer``
+(shared with the audit sink).
+
+Settings:
+    CLOUDINARY_WEBHOOK_BUFFER_ENABLED   default True
+    CLOUDINARY_WEBHOOK_BATCH_SIZE       payloads per batch (default 100)
+    CLOUDINARY_WEBHOOK_FLUSH_INTERVAL   max seconds a payload waits (default 2)
+"""
+
+from __future__ import annotations
+
+from apps.common.utils.redis_list_buffer import RedisListBuffer
+
+cloudinary_webhook_buffer = RedisListBuffer(
+    "cloudinary:webhooks:v1",
+    drain_task="apps.common.tasks.cloudinary.drain_cloudinary_webhook_buffer",
+    handler="apps.common.tasks.cloudinary.process_cloudinary_webhook_batch",
+    enabled_setting="CLOUDINARY_WEBHOOK_BUFFER_ENABLED",
+    batch_size_setting="CLOUDINARY_WEBHOOK_BATCH_SIZE",
+    flush_interval_setting="CLOUDINARY_WEBHOOK_FLUSH_INTERVAL",
+    batch_size=100,
+)
+
+BUFFER_KEY     = cloudinary_webhook_buffer.key
+FLUSH_FLAG_KEY = cloudinary_webhook_buffer.flush_flag_key
+DRAIN_LOCK_KEY = cloudinary_webhook_buffer.drain_lock_key
+
+
+def enqueue_cloudinary_webhook(payload: dict) -> bool:
+    """
+    Append one validated payload to the buffer. Returns False when
+    buffering is disabled.
+
+    Raises on Redis errors so the caller can fall back to the per-asset task.
+    """
+    return cloudinary_webhook_buffer.enqueue(payload)
+
+
+def drain_cloudinary_webhooks_once(max_batches: int | None = None) -> int:
+    """
+    Process buffered payloads in batches until the list is empty (or
+    ``max_batches`` batches were processed). Returns the number of payloads
+    consumed; 0 if another drainer holds the lock.
+    """
+    return cloudinary_webhook_buffer.drain_once(max_batches)
@@ -0,0 +1,209 @@
+# apps/common/utils/redis_list_buffer.py
+"""
+Coalescing Redis list buffer — RPUSH on the hot path, batch drain in Celery.
+
+Shared by the audit sink (apps/audit_logs/buffer.py) and the Cloudinary
+webhook buffer (apps/common/utils/cloudinary_webhook_buffer.py):
+
+    buffer.enqueue(payload)   RPUSH <key> + SET NX <key>:flush_scheduled
+                              (one pipelined round trip, no retry loop)
+        └─ drain task (scheduled once per flush interval, or immediately
+           when the list reaches a full batch; Celery beat also runs it as
+           a safety net)
+                └─ buffer.drain_once()
+                       LRANGE head → handler(payloads) → owner-checked LTRIM
+
+Delivery guarantees:
+    * At-least-once. Items leave the list (LTRIM) only AFTER the handler
+      returned. A crash in between re-delivers the batch, so handlers must
+      be idempotent.
+    * A single drainer at a time (SET NX lock). Producers only RPUSH to the
+      tail, so trimming the head never drops an unhandled item.
+    * The lock is renewed before every batch, and the LTRIM runs in a Lua
+      script only while the drainer still holds its token. A batch that
+      outlives the lock TTL is left in place for the drainer that took over;
+      it can never trim that drainer's unhandled head.
+
+The drain task and batch handler are given as dotted paths and resolved at
+call time (they usually live in modules that import the buffer).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = lock, ARGV[1] = token. Each script acts only for the lock owner.
+_RENEW_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+# KEYS[2] = buffer, ARGV[2] = number of consumed items
+_TRIM_IF_OWNER = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('ltrim', KEYS[2], ARGV[2], -1)
+    return 1
+end
+return 0
+"""
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis():
+    """Single-try connection from the django_redis pool (hot path — no retry loop)."""
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+class RedisListBuffer:
+    """
+    One named buffer: its Redis keys, settings and drain wiring.
+
+    Args:
+        key:                    Redis list key; the flush flag and drain lock
+                                are ``<key>:flush_scheduled`` / ``<key>:drain_lock``.
+        drain_task:             Dotted path of the Celery task that calls ``drain_once()``.
+        handler:                Dotted path of ``handler(payloads: list[dict])``.
+        enabled_setting:        Django setting toggling the buffer (default True).
+        batch_size_setting:     Django setting for items per batch.
+        flush_interval_setting: Django setting for the max seconds an item waits.
+        batch_size / flush_interval: defaults for the two settings above.
+        lock_ttl:               Drain lock TTL in seconds, renewed before every batch.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        drain_task: str,
+        handler: str,
+        enabled_setting: str,
+        batch_size_setting: str,
+        flush_interval_setting: str,
+        batch_size: int = 100,
+        flush_interval: int = 2,
+        lock_ttl: int = 120,
+    ):
+        self.key = key
+        self.flush_flag_key = f"{key}:flush_scheduled"
+        self.drain_lock_key = f"{key}:drain_lock"
+        self.drain_task = drain_task
+        self.handler = handler
+        self.enabled_setting = enabled_setting
+        self.batch_size_setting = batch_size_setting
+        self.flush_interval_setting = flush_interval_setting
+        self.default_batch_size = batch_size
+        self.default_flush_interval = flush_interval
+        self.lock_ttl = lock_ttl
+
+    @property
+    def name(self) -> str:
+        return self.drain_task.rsplit(".", 1)[-1]
+
+    def enabled(self) -> bool:
+        return bool(getattr(settings, self.enabled_setting, True))
+
+    def batch_size(self) -> int:
+        return int(getattr(settings, self.batch_size_setting, self.default_batch_size))
+
+    def flush_interval(self) -> int:
+        return int(getattr(settings, self.flush_interval_setting, self.default_flush_interval))
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Producer
+    # ─────────────────────────────────────────────────────────────────────
+
+    def enqueue(self, payload: dict) -> bool:
+        """
+        Append one payload to the buffer. Returns False when buffering is disabled.
+
+        Raises on Redis errors so the caller can fall back to its unbuffered
+        path. A failure to *schedule* the drain is swallowed — the payload is
+        already buffered and the beat safety net will drain it.
+        """
+        if not self.enabled():
+            return False
+
+        data = json.dumps(payload, cls=DjangoJSONEncoder)
+        interval = self.flush_interval()
+        pipe = _redis().pipeline(transaction=False)
+        pipe.rpush(self.key, data)
+        pipe.set(self.flush_flag_key, 1, nx=True, ex=max(interval, 1))
+        length, first_in_window = pipe.execute()
+
+        full = length % self.batch_size() == 0
+        if first_in_window or full:
+            try:
+                import_string(self.drain_task).apply_async(
+                    countdown=0 if full else interval,
+                    retry=False,
+                    ignore_result=True,
+                )
+            except Exception as exc:
+                logger.debug("%s: drain not scheduled (%s) — beat will drain", self.name, exc)
+        return True
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Consumer
+    # ─────────────────────────────────────────────────────────────────────
+
+    def drain_once(self, max_batches: int | None = None) -> int:
+        """
+        Hand buffered payloads to the handler in batches until the list is
+        empty (or ``max_batches`` batches were handled). Returns the number
+        of items consumed. Returns 0 immediately if another drainer holds
+        the lock, and stops early (without trimming) if the lock expired
+        mid-batch.
+        """
+        r = _redis()
+        token = uuid.uuid4().hex
+        if not r.set(self.drain_lock_key, token, nx=True, ex=self.lock_ttl):
+            return 0
+
+        handler = import_string(self.handler)
+        batch_size = self.batch_size()
+        consumed = 0
+        batches = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                if not r.eval(_RENEW_LOCK, 1, self.drain_lock_key, token, self.lock_ttl):
+                    break
+                raw = r.lrange(self.key, 0, batch_size - 1)
+                if not raw:
+                    break
+
+                payloads = []
+                for item in raw:
+                    try:
+                        payloads.append(json.loads(item))
+                    except (TypeError, ValueError):
+                        logger.error("%s: dropping undecodable buffer item: %.200r", self.name, item)
+
+                handler(payloads)
+                # Only after the batch was handled, and only while we still own the lock
+                if not r.eval(_TRIM_IF_OWNER, 2, self.drain_lock_key, self.key, token, len(raw)):
+                    logger.warning("%s: lock expired mid-batch — leaving %d items for the next drainer",
+                                   self.name, len(raw))
+                    break
+                consumed += len(raw)
+                batches += 1
+        finally:
+            try:
+                r.eval(_RELEASE_LOCK, 1, self.drain_lock_key, token)
+            except Exception:
+                pass
+        return consumed
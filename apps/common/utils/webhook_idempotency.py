@@ -126,6 +126,51 @@ def is_duplicate(
     return False
 
 
+def find_duplicates(
+    idempotency_keys: list[str],
+    check_database: bool = False,
+) -> set[str]:
+    """
+    Batch form of is_duplicate(): the subset of ``idempotency_keys`` already
+    processed, in one cache ``get_many`` plus (optionally) one ``IN`` query.
+
+    Example:
+        >>> find_duplicates(["a1b2...", "c3d4..."], check_database=True)
+        {"a1b2..."}
+    """
+    if not idempotency_keys:
+        return set()
+
+    cache_keys = {f"{_IDEMPOTENCY_KEY_PREFIX}{key}": key for key in idempotency_keys}
+    duplicates = {cache_keys[hit] for hit in cache.get_many(list(cache_keys))}
+
+    remaining = [key for key in idempotency_keys if key not in duplicates]
+    if check_database and remaining:
+        try:
+            from apps.common.models.processed_webhook import CloudinaryProcessedWebhook
+
+            found = set(
+                CloudinaryProcessedWebhook.objects.filter(
+                    idempotency_key__in=remaining,
+                ).values_list("idempotency_key", flat=True)
+            )
+            if found:
+                cache.set_many(
+                    {f"{_IDEMPOTENCY_KEY_PREFIX}{key}": True for key in found},
+                    _IDEMPOTENCY_TTL,
+                )
+                duplicates |= found
+        except Exception as exc:
+            logger.warning(
+                "Database check failed for batch idempotency: %s — proceeding to process",
+                exc,
+            )
+
+    if duplicates:
+        logger.debug("Duplicate webhooks detected in batch: %d", len(duplicates))
+    return duplicates
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # RECORDING PROCESSED WEBHOOKS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -213,6 +258,55 @@ def mark_processed(
         # Don't re-raise — we already marked it in Redis
 
 
+def mark_processed_many(records: list[dict]) -> None:
+    """
+    Batch form of mark_processed(): one cache ``set_many`` and one
+    ``bulk_create``. Each record takes mark_processed()'s keyword arguments.
+
+    Keys already recorded (a concurrent worker won the race) are skipped via
+    ``ignore_conflicts`` rather than raising IntegrityError.
+    """
+    if not records:
+        return
+
+    cache.set_many(
+        {f"{_IDEMPOTENCY_KEY_PREFIX}{rec['idempotency_key']}": True for rec in records},
+        _IDEMPOTENCY_TTL,
+    )
+
+    try:
+        from apps.common.models.processed_webhook import CloudinaryProcessedWebhook
+
+        rows = []
+        for rec in records:
+            public_id    = rec["public_id"]
+            asset_type   = rec["asset_type"]
+            model_target = rec["model_target"]
+            rows.append(CloudinaryProcessedWebhook(
+                idempotency_key=rec["idempotency_key"],
+                public_id=public_id,
+                asset_type=asset_type,
+                model_target=model_target,
+                model_pk=rec.get("model_pk") or "",
+                secure_url=rec.get("secure_url") or "",
+                processing_time_ms=rec.get("processing_time_ms", 0.0),
+                success=rec.get("success", True),
+                error_message=rec.get("error_message"),
+                payload_hash=hashlib.sha256(
+                    f"{public_id}|{asset_type}|{model_target}".encode("utf-8")
+                ).hexdigest(),
+            ))
+        CloudinaryProcessedWebhook.objects.bulk_create(rows, ignore_conflicts=True)
+        logger.info("Webhooks recorded in ProcessedWebhook: %d (batch)", len(rows))
+    except Exception as exc:
+        logger.error(
+            "Failed to record %d processed webhooks in database: %s",
+            len(records),
+            exc,
+        )
+        # Don't re-raise — we already marked them in Redis
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # WEBHOOK REPLAY FOR DEBUGGING
 # ─────────────────────────────────────────────────────────────────────────────
@@ -520,8 +520,10 @@ class CloudinaryWebhookView(View):
           prevent Cloudinary from endlessly retrying).
 
     On valid payload:
-        Dispatches a Celery task to update the appropriate model field with
-        the ``secure_url`` from Cloudinary.
+        Buffers the notification for the batched consumer
+        (``drain_cloudinary_webhook_buffer``), which updates the appropriate
+        model fields with the ``secure_url`` from Cloudinary. Falls back to
+        one ``process_cloudinary_upload_webhook`` task per asset.
     """
 
     http_method_names = ["post", "head"]
@@ -529,6 +531,7 @@ class CloudinaryWebhookView(View):
     def post(self, request: HttpRequest) -> JsonResponse:  # type: ignore[override]
         from apps.common.tasks import process_cloudinary_upload_webhook
         from apps.common.utils.cloudinary import validate_cloudinary_webhook
+        from apps.common.utils.cloudinary_webhook_buffer import enqueue_cloudinary_webhook
 
         body = request.body
         timestamp = request.headers.get("X-Cld-Timestamp", "")
@@ -564,7 +567,18 @@ class CloudinaryWebhookView(View):
         )
 
         # ── Dispatch background task ──────────────────────────────────────
+        # Buffered notifications are coalesced into one batch per flush
+        # window; without Redis (or with buffering off) each asset gets its
+        # own task.
         if notification_type in ("upload", "eager") and secure_url:
+            try:
+                if enqueue_cloudinary_webhook(payload):
+                    return JsonResponse({"status": "received"}, status=200)
+            except Exception as exc:
+                logger.warning(
+                    "Cloudinary webhook: buffer unavailable (%s) — dispatching per-asset task",
+                    exc,
+                )
             try:
                 process_cloudinary_upload_webhook.apply_async(
                     kwargs={"payload": payload},
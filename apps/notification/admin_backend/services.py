@@ -42,6 +42,9 @@ def admin_broadcast_notification(
         )
         
     Notification.objects.bulk_create(notifications)
+
+    from apps.notification.services.notification_service import publish_bulk_in_app
+    transaction.on_commit(lambda: publish_bulk_in_app(notifications))
     
     logger.info("Admin %s broadcasted notification of type %s to %d users (role=%s)", 
                 admin_user.email, notification_type, len(notifications), target_role)
@@ -255,7 +255,7 @@ class NotificationBadgeConsumer(AsyncJsonWebsocketConsumer):
     # ── Internal helpers ──────────────────────────────────────────────────────
 
     async def _send_badge(self):
-        """Query the DB for the current unread count and push to this socket."""
+        """Push the current unread count (Redis counter, DB on miss) to this socket."""
         try:
             unread = await aget_unread_count(self.user_id)
         except Exception as exc:
@@ -290,9 +290,11 @@ class NotificationBadgeConsumer(AsyncJsonWebsocketConsumer):
                 id=notification_id,
                 recipient_id=self.user_id,
                 read_at__isnull=True,
-            ).aupdate(read_at=timezone.now(), is_read=True)
+            ).aupdate(read_at=timezone.now())
 
             if updated:
+                from apps.notification.unread_counter import adecr_unread
+                await adecr_unread(self.user_id, updated)
                 logger.debug(
                     "mark_read: notification_id=%s user=%s", notification_id, self.user_id
                 )
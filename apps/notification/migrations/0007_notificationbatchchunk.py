@@ -0,0 +1,28 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0006_notification_active_notificationbatch_active_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationBatchChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_pk', models.CharField(max_length=64, verbose_name='Last Recipient PK')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Sent Count')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Failed Count')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='notification.notificationbatch', verbose_name='Batch')),
+            ],
+            options={
+                'verbose_name': 'Notification Batch Chunk',
+                'verbose_name_plural': 'Notification Batch Chunks',
+                'constraints': [models.UniqueConstraint(fields=('batch', 'last_pk'), name='nbc_batch_last_pk_uniq')],
+            },
+        ),
+    ]
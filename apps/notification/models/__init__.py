@@ -7,7 +7,7 @@ from apps.notification.models.notification import (
     NotificationPreference,
 )
 from apps.notification.models.push_device import PushDevice
-from apps.notification.models.batch import NotificationBatch, NotificationReadReceipt
+from apps.notification.models.batch import NotificationBatch, NotificationBatchChunk, NotificationReadReceipt
 
 __all__ = [
     # Core
@@ -19,5 +19,6 @@ __all__ = [
     # Phase 5 additions
     "PushDevice",
     "NotificationBatch",
+    "NotificationBatchChunk",
     "NotificationReadReceipt",
 ]
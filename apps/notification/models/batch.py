@@ -7,6 +7,10 @@ NotificationBatch:
   - Tracks total/sent/failed counts for operational visibility.
   - Used by the notification fan-out Celery task for progress tracking.
 
+NotificationBatchChunk:
+  - Checkpoint row per finished fan-out range, written in the same
+    transaction as that range's notifications.
+
 NotificationReadReceipt:
   - Explicit read confirmation per notification per user.
   - Decoupled from the Notification.read_at timestamp for multi-device tracking.
@@ -156,6 +160,38 @@ class NotificationBatch(TimeStampedModel):
         return round((self.sent_count / self.total_count) * 100, 2)
 
 
+class NotificationBatchChunk(models.Model):
+    """
+    One finished keyset range (…, last_pk] of a NotificationBatch fan-out.
+
+    Inserted inside the chunk's notification transaction, so a range is
+    either delivered and checkpointed or neither. The unique constraint
+    makes a concurrent re-delivery of the same range roll back instead of
+    notifying its recipients twice.
+    """
+
+    batch = models.ForeignKey(
+        NotificationBatch,
+        on_delete=models.CASCADE,
+        related_name="chunks",
+        verbose_name=_("Batch"),
+    )
+    last_pk = models.CharField(max_length=64, verbose_name=_("Last Recipient PK"))
+    sent_count = models.PositiveIntegerField(default=0, verbose_name=_("Sent Count"))
+    failed_count = models.PositiveIntegerField(default=0, verbose_name=_("Failed Count"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Notification Batch Chunk")
+        verbose_name_plural = _("Notification Batch Chunks")
+        constraints = [
+            models.UniqueConstraint(fields=["batch", "last_pk"], name="nbc_batch_last_pk_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.batch_id} ..{self.last_pk} ({self.sent_count}/{self.failed_count})"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # NOTIFICATION READ RECEIPT
 # ─────────────────────────────────────────────────────────────────────────────
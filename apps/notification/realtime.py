@@ -5,30 +5,51 @@ Post-commit fanout helpers for real-time notification push.
 All functions are fail-safe: a Redis / channel_layer outage must NEVER
 propagate an exception to the caller (admin save, service method, etc.).
 
+Pushes go through ``realtime_dispatcher``, a per-process buffer. It
+collects new-notification and badge events for a short window
+(NOTIFICATION_REALTIME_WINDOW, default 0.2s), then sends them all in one
+batch:
+
+  - badge events for the same user inside the window collapse into one,
+    carrying the latest unread count
+  - unread counts for the whole batch come from one cache get_many
+    (plus one GROUP BY for counters that are missing)
+  - group_send calls run concurrently on one event loop (bounded by
+    NOTIFICATION_REALTIME_CONCURRENCY), so channels_redis pipelines them
+    over its connection pool instead of paying one blocking round trip
+    per user
+
+Bulk paths (bulk_notify, batch fan-out) queue their whole chunk and
+flush straight away.
+
 Usage:
     from apps.notification.realtime import (
         push_unread_badge_count,
         push_new_notification,
+        push_bulk_notifications,
     )
 
     # After creating a Notification row:
     push_new_notification(notification_instance)
 
+    # After bulk-creating rows (one batched flush):
+    push_bulk_notifications(notifications)
+
     # After marking notifications read (clears badge):
     push_unread_badge_count(user_id)
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import TYPE_CHECKING
+import threading
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
 
-from apps.notification.models import Notification, NotificationChannel
-
-if TYPE_CHECKING:
-    pass
+from apps.notification.models import Notification
+from apps.notification.unread_counter import get_unread_counts
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +63,125 @@ def _get_layer():
         return None
 
 
+def _group_name(user_id) -> str:
+    return f"notification_user_{user_id}"
+
+
+def _notification_payload(notification: Notification) -> dict:
+    """Payload mirrors the NotificationSchema used by the frontend."""
+    return {
+        "id": str(notification.pk),
+        "title": notification.title,
+        "body": notification.body,
+        "notification_type": notification.notification_type,
+        "channel": notification.channel,
+        "is_read": bool(notification.is_read),
+        "is_sent": bool(notification.is_sent),
+        "read_at": notification.read_at.isoformat() if notification.read_at else None,
+        "created_at": (
+            notification.created_at.isoformat()
+            if notification.created_at
+            else None
+        ),
+    }
+
+
+async def _send_many(channel_layer, messages: list[tuple[str, dict]], concurrency: int) -> int:
+    """group_send every (group, message) concurrently; returns the failure count."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(group: str, message: dict):
+        async with semaphore:
+            await channel_layer.group_send(group, message)
+
+    results = await asyncio.gather(
+        *(_send(group, message) for group, message in messages),
+        return_exceptions=True,
+    )
+    return sum(1 for r in results if isinstance(r, BaseException))
+
+
+class RealtimeDispatcher:
+    """
+    Per-process buffer of pending socket pushes.
+
+    ``queue_*`` is O(1) and never touches Redis; the first queued event
+    arms a timer for ``window`` seconds, and ``flush()`` sends everything
+    pending as one batch. New-notification events are sent before badge
+    events so the feed item lands before the counter moves.
+    """
+
+    def __init__(self, window: float, concurrency: int):
+        self.window = window
+        self.concurrency = concurrency
+        self._new: list[tuple[str, dict]] = []
+        self._badges: set[str] = set()
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def queue_new(self, notification: Notification) -> None:
+        user_id = str(notification.recipient_id)
+        payload = _notification_payload(notification)
+        with self._lock:
+            self._new.append((user_id, payload))
+            self._badges.add(user_id)
+            self._arm_locked()
+
+    def queue_badges(self, user_ids) -> None:
+        with self._lock:
+            self._badges.update(str(uid) for uid in user_ids)
+            self._arm_locked()
+
+    def flush(self) -> int:
+        """Send everything pending. Returns the number of group_send calls made."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            new, badges = self._new, self._badges
+            self._new, self._badges = [], set()
+
+        if not new and not badges:
+            return 0
+        channel_layer = _get_layer()
+        if channel_layer is None:
+            return 0
+
+        try:
+            counts = get_unread_counts(badges)
+            messages = [
+                (_group_name(user_id), {"type": "notification.new", "payload": payload})
+                for user_id, payload in new
+            ]
+            messages.extend(
+                (_group_name(user_id), {
+                    "type": "notification.badge",
+                    "payload": {"unread_count": counts.get(user_id, 0)},
+                })
+                for user_id in badges
+            )
+            failed = async_to_sync(_send_many)(channel_layer, messages, self.concurrency)
+            if failed:
+                logger.debug("realtime flush: %d of %d pushes failed", failed, len(messages))
+            logger.debug("realtime flush: new=%d badges=%d", len(new), len(badges))
+            return len(messages)
+        except Exception as exc:
+            logger.debug("realtime flush failed (new=%d badges=%d): %s", len(new), len(badges), exc)
+            return 0
+
+    def _arm_locked(self) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+realtime_dispatcher = RealtimeDispatcher(
+    window=float(getattr(settings, "NOTIFICATION_REALTIME_WINDOW", 0.2)),
+    concurrency=int(getattr(settings, "NOTIFICATION_REALTIME_CONCURRENCY", 64)),
+)
+
+
 def push_unread_badge_count(user_id) -> None:
     """
     Push the latest unread in-app notification count to a user's socket group.
@@ -51,27 +191,14 @@ def push_unread_badge_count(user_id) -> None:
       - The user marks one or all notifications read.
       - Any service that mutates the user's notification state.
 
+    The push is coalesced with other badge updates for the same user in the
+    dispatcher window; the count is read from the Redis unread counter at
+    flush time, so callers adjust the counter before pushing.
+
     Fails silently when Redis / channel_layer is unavailable.
     """
-    channel_layer = _get_layer()
-    if channel_layer is None:
-        return
-
     try:
-        unread_count = Notification.objects.filter(
-            recipient_id=user_id,
-            channel=NotificationChannel.IN_APP,
-            read_at__isnull=True,
-        ).count()
-
-        async_to_sync(channel_layer.group_send)(
-            f"notification_user_{user_id}",
-            {
-                "type": "notification.badge",
-                "payload": {"unread_count": unread_count},
-            },
-        )
-        logger.debug("push_unread_badge_count: user=%s unread=%s", user_id, unread_count)
+        realtime_dispatcher.queue_badges([user_id])
     except Exception as exc:
         logger.debug("push_unread_badge_count: failed for user=%s: %s", user_id, exc)
 
@@ -82,40 +209,32 @@ def push_new_notification(notification: Notification) -> None:
 
     The consumer's ``notification_new`` handler forwards the payload to
     every open browser tab of the same user so the notification feed
-    updates instantly without a REST poll.
+    updates instantly without a REST poll. The recipient's badge is
+    refreshed in the same flush.
 
     Payload mirrors the NotificationSchema used by the frontend:
       id, title, body, notification_type, channel, is_read, created_at
 
     Fails silently when Redis / channel_layer is unavailable.
     """
-    channel_layer = _get_layer()
-    if channel_layer is None:
-        return
-
     try:
-        user_id = str(notification.recipient_id)
-        payload = {
-            "id": str(notification.pk),
-            "title": notification.title,
-            "body": notification.body,
-            "notification_type": notification.notification_type,
-            "channel": notification.channel,
-            "is_read": bool(notification.is_read),
-            "is_sent": bool(notification.is_sent),
-            "read_at": notification.read_at.isoformat() if notification.read_at else None,
-            "created_at": (
-                notification.created_at.isoformat()
-                if notification.created_at
-                else None
-            ),
-        }
-        async_to_sync(channel_layer.group_send)(
-            f"notification_user_{user_id}",
-            {"type": "notification.new", "payload": payload},
-        )
-        # Also refresh the badge count so the number increments in real time.
-        push_unread_badge_count(user_id)
-        logger.debug("push_new_notification: user=%s notification=%s", user_id, notification.pk)
+        realtime_dispatcher.queue_new(notification)
     except Exception as exc:
         logger.debug("push_new_notification: failed for notification=%s: %s", notification.pk, exc)
+
+
+def push_bulk_notifications(notifications) -> int:
+    """
+    Push a bulk-created set of notifications (and the recipients' badges)
+    in one batched flush. Returns the number of group_send calls made.
+
+    Fails silently when Redis / channel_layer is unavailable.
+    """
+    try:
+        for notification in notifications:
+            if notification.recipient_id:
+                realtime_dispatcher.queue_new(notification)
+        return realtime_dispatcher.flush()
+    except Exception as exc:
+        logger.debug("push_bulk_notifications: failed: %s", exc)
+        return 0
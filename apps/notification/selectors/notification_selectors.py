@@ -46,12 +46,13 @@ def get_user_notifications(
 
 
 def get_unread_count(user_id) -> int:
-    """Return the count of unread in-app notifications for a user."""
-    return Notification.objects.filter(
-        recipient_id=user_id,
-        channel=NotificationChannel.IN_APP,
-        read_at__isnull=True,
-    ).count()
+    """
+    Return the count of unread in-app notifications for a user.
+    Served from the Redis counter (apps.notification.unread_counter);
+    counts from the DB only on a counter miss.
+    """
+    from apps.notification.unread_counter import get_unread_count as _counter_get
+    return _counter_get(user_id)
 
 
 def get_notification_by_id(notification_id, user_id) -> Notification | None:
@@ -98,13 +99,11 @@ async def aget_user_notifications(
 async def aget_unread_count(user_id) -> int:
     """
     Async count of unread in-app notifications for a user.
-    Used by the Ninja badge endpoint — returns in microseconds from Redis/DB.
+    Used by the Ninja badge endpoint — returns in microseconds from the
+    Redis counter; counts from the DB only on a counter miss.
     """
-    return await Notification.objects.filter(
-        recipient_id=user_id,
-        channel=NotificationChannel.IN_APP,
-        read_at__isnull=True,
-    ).acount()
+    from apps.notification.unread_counter import aget_unread_count as _counter_aget
+    return await _counter_aget(user_id)
 
 
 async def aget_notification_by_id(
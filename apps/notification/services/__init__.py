@@ -6,6 +6,7 @@ from apps.notification.services.notification_service import (
     send_order_notification,
     send_vendor_notification,
     bulk_notify,
+    bulk_notify_user_ids,
 )
 
 __all__ = [
@@ -15,4 +16,5 @@ __all__ = [
     "send_order_notification",
     "send_vendor_notification",
     "bulk_notify",
+    "bulk_notify_user_ids",
 ]
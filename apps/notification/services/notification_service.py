@@ -24,7 +24,17 @@ from apps.notification.models import (
     NotificationPreference,
     NotificationTemplate,
 )
-from apps.notification.realtime import push_new_notification, push_unread_badge_count
+from apps.notification.realtime import (
+    push_bulk_notifications,
+    push_new_notification,
+    push_unread_badge_count,
+)
+from apps.notification.unread_counter import (
+    decr_unread,
+    incr_unread,
+    invalidate_unread,
+    reset_unread,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +74,23 @@ def _is_opted_in(user, notification_type: str, channel: str) -> bool:
     return pref.enabled
 
 
+def _opted_out_user_ids(user_ids: list, notification_type: str, channel: str) -> set:
+    """
+    Bulk counterpart of _is_opted_in(): ONE query for a whole recipient chunk.
+    Returns the subset of user_ids that disabled this type/channel.
+    """
+    if notification_type in _MANDATORY_TYPES or not user_ids:
+        return set()
+    return set(
+        NotificationPreference.objects.filter(
+            user_id__in=user_ids,
+            notification_type=notification_type,
+            channel=channel,
+            enabled=False,
+        ).values_list("user_id", flat=True)
+    )
+
+
 def _get_template_content(
     notification_type: str,
     channel: str,
@@ -155,7 +182,12 @@ def create_notification(
     # push_unread_badge_count so only one on_commit hook is needed.
     if channel == NotificationChannel.IN_APP and notification.recipient_id:
         _notif_ref = notification  # capture for the closure
-        transaction.on_commit(lambda: push_new_notification(_notif_ref))
+
+        def _count_and_push() -> None:
+            incr_unread(_notif_ref.recipient_id)
+            push_new_notification(_notif_ref)
+
+        transaction.on_commit(_count_and_push)
     # ── Audit event (fire after commit alongside Celery dispatch) ─────────
     _notif_id = str(notification.id)
     _recipient_id = str(getattr(recipient, 'id', ''))
@@ -193,9 +225,12 @@ def mark_as_read(*, user, notification_id) -> Notification | None:
         return None
     notification = Notification.objects.get(id=notification_id)
     if notification.recipient_id:
-        transaction.on_commit(
-            lambda: push_unread_badge_count(notification.recipient_id)
-        )
+        def _count_and_push() -> None:
+            if notification.channel == NotificationChannel.IN_APP:
+                decr_unread(notification.recipient_id)
+            push_unread_badge_count(notification.recipient_id)
+
+        transaction.on_commit(_count_and_push)
     return notification
 
 
@@ -210,7 +245,11 @@ def mark_all_as_read(*, user) -> int:
     ).update(read_at=now)
     logger.info("mark_all_as_read: user=%s count=%d", user, count)
     if count:
-        transaction.on_commit(lambda: push_unread_badge_count(user.id))
+        def _reset_and_push() -> None:
+            reset_unread(user.id)
+            push_unread_badge_count(user.id)
+
+        transaction.on_commit(_reset_and_push)
     return count
 
 
@@ -291,22 +330,24 @@ def bulk_notify(
     """
     Create notifications for a list of users (e.g., price-drop wishlist alert).
     Uses bulk_create for performance — does NOT trigger individual signals.
+    Opt-outs are resolved with one preference query for the whole list.
     """
-    records = []
-    for user in recipients:
-        if not _is_opted_in(user, notification_type, channel):
-            continue
-        records.append(
-            Notification(
-                recipient=user,
-                notification_type=notification_type,
-                channel=channel,
-                title=title,
-                body=body,
-                metadata=metadata or {},
-            )
+    opted_out = _opted_out_user_ids([u.pk for u in recipients], notification_type, channel)
+    records = [
+        Notification(
+            recipient=user,
+            notification_type=notification_type,
+            channel=channel,
+            title=title,
+            body=body,
+            metadata=metadata or {},
         )
+        for user in recipients
+        if user.pk not in opted_out
+    ]
     created = Notification.objects.bulk_create(records, batch_size=200)
+    if channel == NotificationChannel.IN_APP and created:
+        transaction.on_commit(lambda: publish_bulk_in_app(created))
     logger.info(
         "bulk_notify: type=%s channel=%s count=%d",
         notification_type,
@@ -314,3 +355,46 @@ def bulk_notify(
         len(created),
     )
     return created
+
+
+def bulk_notify_user_ids(
+    *,
+    user_ids: list,
+    notification_type: str,
+    title: str,
+    body: str,
+    channel: str = NotificationChannel.IN_APP,
+    metadata: dict | None = None,
+) -> list:
+    """
+    ID-only variant of bulk_notify() for broadcast fan-out.
+
+    No user rows are loaded: one preference query, then one bulk INSERT
+    built from recipient_id. Returns the recipient ids that were notified.
+    """
+    opted_out = _opted_out_user_ids(user_ids, notification_type, channel)
+    recipient_ids = [uid for uid in user_ids if uid not in opted_out]
+    metadata = metadata or {}
+    created = Notification.objects.bulk_create(
+        [
+            Notification(
+                recipient_id=uid,
+                notification_type=notification_type,
+                channel=channel,
+                title=title,
+                body=body,
+                metadata=metadata,
+            )
+            for uid in recipient_ids
+        ],
+        batch_size=1000,
+    )
+    if channel == NotificationChannel.IN_APP and created:
+        transaction.on_commit(lambda: publish_bulk_in_app(created))
+    return recipient_ids
+
+
+def publish_bulk_in_app(notifications: list) -> None:
+    """Post-commit for bulk in-app creates: drop stale counters, then one batched push."""
+    invalidate_unread([n.recipient_id for n in notifications])
+    push_bulk_notifications(notifications)
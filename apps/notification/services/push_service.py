@@ -7,7 +7,8 @@ Architecture:
   - PushDeviceService: upsert device token on app launch, invalidate on logout.
   - BatchNotificationService: create batch → celery fan-out → update progress.
   - All writes: transaction.atomic() + transaction.on_commit() for Celery enqueue.
-  - select_for_update() on Batch counter updates to prevent race conditions.
+  - Batch counters are bumped with F() expressions; lifecycle transitions
+    use select_for_update() to prevent race conditions.
 
 GDPR:
   - PushDevice tokens pruned after 90 days of inactivity (data minimisation).
@@ -19,6 +20,7 @@ from __future__ import annotations
 import logging
 
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
 from apps.notification.models import (
@@ -183,8 +185,8 @@ class BatchNotificationService:
         4. complete_batch() → status=COMPLETED / FAILED
         5. cancel_batch() → status=CANCELLED (only from DRAFT/SCHEDULED)
 
-    All counter updates use select_for_update() to prevent race conditions
-    when multiple Celery workers update the same batch concurrently.
+    Status transitions use select_for_update(); counter updates are single
+    F()-expression UPDATEs so concurrent chunk workers never lose an increment.
     """
 
     @staticmethod
@@ -259,7 +261,6 @@ class BatchNotificationService:
         return batch
 
     @staticmethod
-    @transaction.atomic
     def record_batch_progress(
         *,
         batch_id: str,
@@ -268,13 +269,17 @@ class BatchNotificationService:
     ) -> None:
         """
         Atomically increment sent/failed counters on a batch.
-        Called by the fan-out Celery task after each chunk is processed.
-        Uses select_for_update() to prevent concurrent worker race conditions.
+        Called by the fan-out chunk workers after each chunk is processed.
+        A single UPDATE ... SET n = n + delta. Inside a chunk transaction the
+        batch row stays locked until that chunk commits, so the chunk calls
+        it last: parallel chunks then serialise only on their commits, not
+        on their notification inserts.
         """
-        batch = NotificationBatch.objects.select_for_update().get(batch_id=batch_id)
-        batch.sent_count += sent_delta
-        batch.failed_count += failed_delta
-        batch.save(update_fields=["sent_count", "failed_count", "updated_at"])
+        NotificationBatch.objects.filter(batch_id=batch_id).update(
+            sent_count=F("sent_count") + sent_delta,
+            failed_count=F("failed_count") + failed_delta,
+            updated_at=timezone.now(),
+        )
 
     @staticmethod
     @transaction.atomic
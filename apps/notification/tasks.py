@@ -109,31 +109,71 @@ def _dispatch_sms(notif) -> None:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+def _fan_out_chunk_size() -> int:
+    from django.conf import settings
+    return int(getattr(settings, "NOTIFICATION_FANOUT_CHUNK_SIZE", 1000))
+
+
+def _batch_recipient_queryset(batch):
+    """Active target users for a batch, ordered for keyset iteration."""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    qs = User.objects.filter(is_active=True, is_deleted=False)
+    if batch.target_roles:
+        qs = qs.filter(role__in=batch.target_roles)
+    return qs.order_by("pk")
+
+
+def _iter_recipient_ranges(qs, chunk_size: int):
+    """
+    Yield (after_pk, last_pk, size) keyset ranges over qs.
+
+    Each step is an index-only ``WHERE pk > cursor ORDER BY pk LIMIT n``,
+    so the cost per chunk stays flat however deep into the table we are
+    (unlike OFFSET, which re-reads every skipped row).
+    """
+    cursor = None
+    while True:
+        page = qs if cursor is None else qs.filter(pk__gt=cursor)
+        ids = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        yield (None if cursor is None else str(cursor)), str(ids[-1]), len(ids)
+        if len(ids) < chunk_size:
+            return
+        cursor = ids[-1]
+
+
 @shared_task(bind=True, max_retries=2, default_retry_delay=120, name="notification.fan_out_batch")
 def fan_out_batch_task(self, batch_id: str):
     """
     Fan out a NotificationBatch to all target recipients.
 
-    Chunked delivery (500/chunk) with atomic progress counter updates
-    via BatchNotificationService.record_batch_progress().
+    Coordinator: splits the recipients into keyset pk ranges of
+    NOTIFICATION_FANOUT_CHUNK_SIZE (default 1000) and runs them as a Celery
+    chord — chunk workers in parallel, finalize_fan_out_task once all are done.
 
     Args:
         batch_id: UUID string of the NotificationBatch to dispatch.
 
     Flow:
         1. Load batch and resolve target user queryset.
-        2. Chunk users into groups of 500.
-        3. For each chunk: create notifications via bulk_notify().
-        4. After each chunk: update sent/failed counters.
+        2. Walk the recipients by primary key (keyset, no OFFSET).
+        3. group(fan_out_chunk_task per range) | finalize_fan_out_task.
+        4. Each chunk, in one transaction: one preference query + one bulk INSERT
+           + one checkpoint INSERT + one counter UPDATE.
         5. On completion: mark batch COMPLETED or FAILED.
+
+    Resumable: each finished chunk commits a NotificationBatchChunk row with
+    its notifications, so re-running the coordinator (retry, worker loss)
+    only redoes the unfinished ranges.
     """
-    from django.contrib.auth import get_user_model
+    from celery import chord, group
+
     from apps.notification.models import NotificationBatch
-    from apps.notification.services.notification_service import bulk_notify
     from apps.notification.services.push_service import BatchNotificationService
 
-    User = get_user_model()
-
     try:
         batch = NotificationBatch.objects.get(batch_id=batch_id)
     except NotificationBatch.DoesNotExist:
@@ -144,52 +184,120 @@ def fan_out_batch_task(self, batch_id: str):
         logger.info("fan_out_batch_task: batch %s was cancelled, skipping", batch_id)
         return
 
-    # ── Resolve target users ────────────────────────────────────────────────
-    qs = User.objects.filter(is_active=True, is_deleted=False)
-    if batch.target_roles:
-        qs = qs.filter(role__in=batch.target_roles)
-    qs = qs.only("id", "email", "role")
+    try:
+        ranges = list(_iter_recipient_ranges(_batch_recipient_queryset(batch), _fan_out_chunk_size()))
+    except Exception as exc:
+        logger.exception("fan_out_batch_task: recipient scan failed: batch=%s", batch_id)
+        raise self.retry(exc=exc)
+
+    total = sum(size for _, _, size in ranges)
+    logger.info(
+        "fan_out_batch_task: batch=%s total_recipients=%d chunks=%d",
+        batch_id, total, len(ranges),
+    )
 
-    CHUNK_SIZE = 500
-    total = qs.count()
-    offset = 0
-    total_sent = 0
-    total_failed = 0
+    if not ranges:
+        BatchNotificationService.complete_batch(batch_id=batch_id, total_count=0)
+        return
 
-    logger.info("fan_out_batch_task: batch=%s total_recipients=%d", batch_id, total)
+    chord(
+        group(fan_out_chunk_task.s(batch_id, after_pk, last_pk) for after_pk, last_pk, _ in ranges)
+    )(finalize_fan_out_task.s(batch_id, total))
 
-    while offset < total:
-        chunk = list(qs[offset : offset + CHUNK_SIZE])
-        try:
-            created = bulk_notify(
-                recipients=chunk,
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30, name="notification.fan_out_chunk")
+def fan_out_chunk_task(self, batch_id: str, after_pk, last_pk) -> list[int]:
+    """
+    Deliver one keyset range (after_pk, last_pk] of a NotificationBatch.
+
+    Returns [sent, failed]. A range that already completed (per its
+    NotificationBatchChunk checkpoint) returns its recorded result without
+    notifying anyone again. The checkpoint is inserted in the same
+    transaction as the notifications, so a crash can never leave a range
+    delivered but unrecorded.
+    """
+    from django.db import IntegrityError, transaction
+
+    from apps.notification.models import NotificationBatch, NotificationBatchChunk
+    from apps.notification.services.notification_service import bulk_notify_user_ids
+    from apps.notification.services.push_service import BatchNotificationService
+
+    def recorded():
+        return (
+            NotificationBatchChunk.objects
+            .filter(batch__batch_id=batch_id, last_pk=str(last_pk))
+            .values_list("sent_count", "failed_count")
+            .first()
+        )
+
+    done = recorded()
+    if done is not None:
+        return list(done)
+
+    batch = NotificationBatch.objects.get(batch_id=batch_id)
+    if batch.status == NotificationBatch.Status.CANCELLED:
+        return [0, 0]
+
+    qs = _batch_recipient_queryset(batch).filter(pk__lte=last_pk)
+    if after_pk is not None:
+        qs = qs.filter(pk__gt=after_pk)
+    user_ids = list(qs.values_list("pk", flat=True))
+
+    try:
+        with transaction.atomic():
+            notified = bulk_notify_user_ids(
+                user_ids=user_ids,
                 notification_type=batch.notification_type,
                 title=batch.template_context.get("title", batch.title),
                 body=batch.template_context.get("body", ""),
                 channel=batch.channel,
                 metadata={"batch_id": batch_id, **batch.template_context},
             )
-            sent_delta = len(created)
-            failed_delta = len(chunk) - sent_delta
-        except Exception:
-            logger.exception("fan_out_batch_task chunk failed: batch=%s offset=%d", batch_id, offset)
-            sent_delta = 0
-            failed_delta = len(chunk)
-
-        BatchNotificationService.record_batch_progress(
-            batch_id=batch_id,
-            sent_delta=sent_delta,
-            failed_delta=failed_delta,
-        )
-        total_sent += sent_delta
-        total_failed += failed_delta
-        offset += CHUNK_SIZE
+            sent_delta = len(notified)
+            failed_delta = len(user_ids) - sent_delta
+            # A concurrent delivery of this range that committed first makes
+            # this insert fail, rolling our notifications back.
+            NotificationBatchChunk.objects.create(
+                batch=batch, last_pk=str(last_pk), sent_count=sent_delta, failed_count=failed_delta,
+            )
+            BatchNotificationService.record_batch_progress(
+                batch_id=batch_id,
+                sent_delta=sent_delta,
+                failed_delta=failed_delta,
+            )
+    except IntegrityError:
+        done = recorded()
+        if done is not None:
+            return list(done)
+        raise
+    except Exception as exc:
+        logger.exception("fan_out_chunk_task failed: batch=%s range=(%s, %s]", batch_id, after_pk, last_pk)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        sent_delta, failed_delta = 0, len(user_ids)
+        with transaction.atomic():
+            _, created = NotificationBatchChunk.objects.get_or_create(
+                batch=batch, last_pk=str(last_pk), defaults={"failed_count": failed_delta},
+            )
+            if created:
+                BatchNotificationService.record_batch_progress(batch_id=batch_id, failed_delta=failed_delta)
+
+    return [sent_delta, failed_delta]
+
+
+@shared_task(name="notification.fan_out_finalize")
+def finalize_fan_out_task(results, batch_id: str, total: int):
+    """Chord callback: mark the batch COMPLETED / FAILED once every chunk has reported."""
+    from apps.notification.services.push_service import BatchNotificationService
 
+    total_sent = sum(r[0] for r in results)
+    total_failed = sum(r[1] for r in results)
     BatchNotificationService.complete_batch(batch_id=batch_id, total_count=total)
     logger.info(
         "fan_out_batch_task complete: batch=%s sent=%d failed=%d",
         batch_id, total_sent, total_failed,
     )
+    return {"sent": total_sent, "failed": total_failed, "total": total}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -223,3 +331,27 @@ def anonymize_read_receipt_ips_task(self):
     count = ReadReceiptService.anonymize_old_ips(days=30)
     logger.info("anonymize_read_receipt_ips: anonymized=%d", count)
     return {"anonymized": count}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UNREAD BADGE COUNTERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@shared_task(name="notification.reconcile_unread_counters")
+def reconcile_unread_counters_task(lookback_minutes: int = 15):
+    """
+    Re-seed the Redis unread counters of users with notification activity in
+    the last `lookback_minutes` from the DB (bounds any counter drift).
+
+    Beat schedule: every 10 minutes (lookback overlaps the interval).
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from apps.notification.unread_counter import reconcile_unread_counts
+
+    count = reconcile_unread_counts(since=timezone.now() - timedelta(minutes=lookback_minutes))
+    logger.info("reconcile_unread_counters: users=%d", count)
+    return {"reconciled": count}
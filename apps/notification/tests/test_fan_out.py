@@ -0,0 +1,126 @@
+# apps/notification/tests/test_fan_out.py
+"""
+Tests for the keyset-paginated NotificationBatch fan-out.
+
+Coverage:
+  - _iter_recipient_ranges: keyset ranges cover every user exactly once
+  - fan_out_batch_task: chord of chunk workers, opt-outs, completion counters
+  - fan_out_chunk_task: completed ranges are skipped on resume, and the
+    checkpoint commits together with the range's notifications
+
+Run with:
+  pytest apps/notification/tests/test_fan_out.py -v
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.notification.models import (
+    Notification,
+    NotificationBatch,
+    NotificationBatchChunk,
+    NotificationChannel,
+    NotificationPreference,
+    NotificationType,
+)
+from apps.notification.services.push_service import BatchNotificationService
+from apps.notification.tasks import (
+    _batch_recipient_queryset,
+    _iter_recipient_ranges,
+    fan_out_batch_task,
+    fan_out_chunk_task,
+)
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def users(db):
+    return [
+        User.objects.create_user(email=f"fanout{i}@test.com", password="Pass1234!")
+        for i in range(5)
+    ]
+
+
+@pytest.fixture
+def promo_batch(db):
+    return BatchNotificationService.create_batch(
+        title="Weekend Sale",
+        notification_type=NotificationType.PROMO,
+        template_context={"title": "Weekend Sale", "body": "20% off everything."},
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TESTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestFanOut:
+    def test_keyset_ranges_cover_all_recipients_once(self, users, promo_batch):
+        qs = _batch_recipient_queryset(promo_batch)
+        ranges = list(_iter_recipient_ranges(qs, 2))
+
+        assert ranges[0][0] is None
+        assert sum(size for _, _, size in ranges) == qs.count()
+        # each range starts where the previous one ended
+        for (_, prev_last, _), (after, _, _) in zip(ranges, ranges[1:]):
+            assert after == prev_last
+
+    @override_settings(NOTIFICATION_FANOUT_CHUNK_SIZE=2)
+    def test_fan_out_notifies_opted_in_users_and_completes(self, users, promo_batch):
+        NotificationPreference.objects.create(
+            user=users[0],
+            notification_type=NotificationType.PROMO,
+            channel=NotificationChannel.IN_APP,
+            enabled=False,
+        )
+        total = _batch_recipient_queryset(promo_batch).count()
+
+        fan_out_batch_task.apply(args=[str(promo_batch.batch_id)])
+
+        promo_batch.refresh_from_db()
+        assert promo_batch.status == NotificationBatch.Status.COMPLETED
+        assert promo_batch.total_count == total
+        assert promo_batch.sent_count == total - 1
+        assert promo_batch.failed_count == 1
+        assert not Notification.objects.filter(recipient=users[0]).exists()
+        assert Notification.objects.filter(
+            notification_type=NotificationType.PROMO
+        ).count() == total - 1
+
+    def test_completed_chunk_is_skipped_on_resume(self, users, promo_batch):
+        batch_id = str(promo_batch.batch_id)
+        last_pk = str(users[-1].pk)
+        NotificationBatchChunk.objects.create(batch=promo_batch, last_pk=last_pk, sent_count=7)
+
+        result = fan_out_chunk_task.apply(args=[batch_id, None, last_pk]).get()
+
+        assert result == [7, 0]
+        assert Notification.objects.count() == 0
+
+    def test_redelivered_chunk_notifies_once(self, users, promo_batch):
+        batch_id = str(promo_batch.batch_id)
+        last_pk = str(_batch_recipient_queryset(promo_batch).last().pk)
+
+        first = fan_out_chunk_task.apply(args=[batch_id, None, last_pk]).get()
+        second = fan_out_chunk_task.apply(args=[batch_id, None, last_pk]).get()
+
+        promo_batch.refresh_from_db()
+        assert first == second
+        assert Notification.objects.count() == first[0]
+        assert promo_batch.sent_count == first[0]
+        assert NotificationBatchChunk.objects.filter(batch=promo_batch).count() == 1
@@ -0,0 +1,78 @@
+# apps/notification/tests/test_realtime_dispatcher.py
+"""
+Tests for the batched real-time push dispatcher.
+
+Coverage:
+  - Repeated badge updates for one user inside the window collapse to one push
+  - New-notification events are sent before the badge events of the same flush
+  - Unread counts for the whole flush are read in one batch
+  - push_bulk_notifications flushes a bulk chunk immediately
+
+Run with:
+  pytest apps/notification/tests/test_realtime_dispatcher.py -v
+"""
+
+import uuid
+from unittest.mock import patch
+
+from apps.notification.models import Notification, NotificationChannel, NotificationType
+from apps.notification.realtime import RealtimeDispatcher, push_bulk_notifications
+
+
+class FakeLayer:
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message["type"], message["payload"]))
+
+
+def _notification(user_id):
+    return Notification(
+        recipient_id=user_id,
+        notification_type=NotificationType.PROMO,
+        channel=NotificationChannel.IN_APP,
+        title="Sale",
+        body="Sale body",
+    )
+
+
+class TestRealtimeDispatcher:
+    def test_badges_coalesce_and_follow_new_events(self):
+        alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+        layer = FakeLayer()
+        dispatcher = RealtimeDispatcher(window=3600, concurrency=4)
+
+        dispatcher.queue_badges([alice])
+        dispatcher.queue_new(_notification(bob))
+        dispatcher.queue_badges([alice, bob])
+        dispatcher.queue_badges([alice])
+
+        with patch("apps.notification.realtime._get_layer", return_value=layer), \
+             patch("apps.notification.realtime.get_unread_counts",
+                   return_value={alice: 2, bob: 1}) as counts:
+            assert dispatcher.flush() == 3
+
+        counts.assert_called_once()
+        assert set(counts.call_args.args[0]) == {alice, bob}
+        assert layer.sent[0][:2] == (f"notification_user_{bob}", "notification.new")
+        badges = {group: payload["unread_count"] for group, kind, payload in layer.sent[1:]}
+        assert badges == {f"notification_user_{alice}": 2, f"notification_user_{bob}": 1}
+
+    def test_flush_without_pending_events_is_free(self):
+        dispatcher = RealtimeDispatcher(window=3600, concurrency=4)
+        with patch("apps.notification.realtime._get_layer") as get_layer:
+            assert dispatcher.flush() == 0
+        get_layer.assert_not_called()
+
+    def test_push_bulk_notifications_flushes_immediately(self):
+        users = [str(uuid.uuid4()) for _ in range(3)]
+        layer = FakeLayer()
+        with patch("apps.notification.realtime._get_layer", return_value=layer), \
+             patch("apps.notification.realtime.get_unread_counts",
+                   side_effect=lambda ids: {uid: 1 for uid in ids}):
+            sent = push_bulk_notifications([_notification(uid) for uid in users])
+
+        assert sent == 6
+        kinds = [kind for _, kind, _ in layer.sent]
+        assert kinds == ["notification.new"] * 3 + ["notification.badge"] * 3
@@ -0,0 +1,124 @@
+# apps/notification/tests/test_unread_counter.py
+"""
+Tests for the Redis-maintained unread notification counters.
+
+Coverage:
+  - get_unread_count: DB count on miss, O(1) cache read afterwards
+  - create / mark_as_read / mark_all_as_read keep the counter in step
+  - bulk_notify invalidates the recipients' counters
+  - reconcile_unread_counts re-seeds drifted counters
+
+Run with:
+  pytest apps/notification/tests/test_unread_counter.py -v
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.notification.models import NotificationType
+from apps.notification.services import (
+    bulk_notify,
+    create_notification,
+    mark_all_as_read,
+    mark_as_read,
+)
+from apps.notification.unread_counter import (
+    get_unread_count,
+    reconcile_unread_counts,
+    reset_unread,
+)
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+COUNTER_KEY = "notification:unread:v1:{}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _no_dispatch():
+    with patch("apps.notification.services.notification_service.dispatch_notification_task"), \
+         patch("apps.notification.services.notification_service.push_new_notification"), \
+         patch("apps.notification.services.notification_service.push_unread_badge_count"), \
+         patch("apps.notification.services.notification_service.push_bulk_notifications"):
+        yield
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="badge@test.com", password="Pass1234!")
+
+
+def _notify(user, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return create_notification(
+            recipient=user,
+            notification_type=NotificationType.SYSTEM_ALERT,
+            title="Alert",
+            body="Something happened.",
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TESTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestUnreadCounter:
+    def test_miss_counts_from_db_then_serves_from_cache(
+        self, user, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        _notify(user, django_capture_on_commit_callbacks)
+        cache.delete(COUNTER_KEY.format(user.id))
+
+        assert get_unread_count(user.id) == 1
+        with django_assert_num_queries(0):
+            assert get_unread_count(user.id) == 1
+
+    def test_create_and_read_paths_adjust_counter(self, user, django_capture_on_commit_callbacks):
+        assert get_unread_count(user.id) == 0  # seed the counter
+        first = _notify(user, django_capture_on_commit_callbacks)
+        _notify(user, django_capture_on_commit_callbacks)
+        _notify(user, django_capture_on_commit_callbacks)
+        assert cache.get(COUNTER_KEY.format(user.id)) == 3
+
+        with django_capture_on_commit_callbacks(execute=True):
+            mark_as_read(user=user, notification_id=first.id)
+        assert cache.get(COUNTER_KEY.format(user.id)) == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            mark_all_as_read(user=user)
+        assert cache.get(COUNTER_KEY.format(user.id)) == 0
+
+    def test_bulk_notify_invalidates_counter(self, user, django_capture_on_commit_callbacks):
+        reset_unread(user.id, 5)
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk_notify(
+                recipients=[user],
+                notification_type=NotificationType.PROMO,
+                title="Sale",
+                body="Sale body",
+            )
+        assert cache.get(COUNTER_KEY.format(user.id)) is None
+        assert get_unread_count(user.id) == 1
+
+    def test_reconcile_reseeds_recent_recipients(self, user, django_capture_on_commit_callbacks):
+        _notify(user, django_capture_on_commit_callbacks)
+        reset_unread(user.id, 42)  # drifted
+
+        assert reconcile_unread_counts(since=timezone.now() - timedelta(minutes=5)) == 1
+        assert cache.get(COUNTER_KEY.format(user.id)) == 1
@@ -0,0 +1,214 @@
+# apps/notification/unread_counter.py
+"""
+Per-user unread in-app notification counters kept in the shared cache (Redis).
+
+The badge count is read on every WebSocket connect, every badge push and
+every unread-count poll. Counting rows each time is O(unread) per read;
+this module keeps one integer per user instead:
+
+  create (in_app)      → incr_unread(user_id)          (atomic INCR)
+  mark one read        → decr_unread(user_id)          (atomic DECR)
+  mark all read        → reset_unread(user_id)          (SET 0)
+  bulk create          → invalidate_unread(user_ids)    (one DEL for the chunk)
+
+Counters are only ever adjusted when present. A missing key (first read,
+TTL expiry, invalidation, Redis restart) is a cache miss: the next read
+counts from the DB once and seeds the key with ``add()``. Counters expire
+after NOTIFICATION_UNREAD_COUNTER_TTL seconds (default 6h), and the
+``notification.reconcile_unread_counters`` beat task re-seeds users with
+recent notification activity, so any drift is bounded.
+
+All functions are fail-safe: a cache outage degrades to a DB count.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.notification.models import Notification, NotificationChannel
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY = "notification:unread:v1:{user_id}"
+
+
+def _key(user_id) -> str:
+    return UNREAD_KEY.format(user_id=user_id)
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "NOTIFICATION_UNREAD_COUNTER_TTL", 6 * 3600))
+
+
+def _unread_qs(user_id):
+    return Notification.objects.filter(
+        recipient_id=user_id,
+        channel=NotificationChannel.IN_APP,
+        read_at__isnull=True,
+    )
+
+
+# ---------- reads ----------
+
+def get_unread_count(user_id) -> int:
+    """O(1) unread count; counts from the DB and seeds the counter on a miss."""
+    try:
+        value = cache.get(_key(user_id))
+        if value is not None:
+            return int(value)
+    except Exception as exc:
+        logger.debug("unread_counter: get failed for user=%s: %s", user_id, exc)
+
+    count = _unread_qs(user_id).count()
+    try:
+        cache.add(_key(user_id), count, _ttl())
+    except Exception:
+        pass
+    return count
+
+
+async def aget_unread_count(user_id) -> int:
+    """Async counterpart of get_unread_count() (native async cache + ORM)."""
+    try:
+        value = await cache.aget(_key(user_id))
+        if value is not None:
+            return int(value)
+    except Exception as exc:
+        logger.debug("unread_counter: aget failed for user=%s: %s", user_id, exc)
+
+    count = await _unread_qs(user_id).acount()
+    try:
+        await cache.aadd(_key(user_id), count, _ttl())
+    except Exception:
+        pass
+    return count
+
+
+def get_unread_counts(user_ids) -> dict:
+    """
+    Unread counts for many users: one get_many, plus ONE GROUP BY for the
+    users whose counter is missing (which are then seeded).
+    """
+    user_ids = [str(uid) for uid in user_ids]
+    if not user_ids:
+        return {}
+    try:
+        cached = cache.get_many([_key(uid) for uid in user_ids])
+    except Exception as exc:
+        logger.debug("unread_counter: get_many failed: %s", exc)
+        cached = {}
+
+    counts = {}
+    missing = []
+    for uid in user_ids:
+        value = cached.get(_key(uid))
+        if value is None:
+            missing.append(uid)
+        else:
+            counts[uid] = int(value)
+
+    if missing:
+        from django.db.models import Count
+
+        fresh = {
+            str(rid): n
+            for rid, n in Notification.objects.filter(
+                recipient_id__in=missing,
+                channel=NotificationChannel.IN_APP,
+                read_at__isnull=True,
+            ).values("recipient_id").annotate(n=Count("id")).values_list("recipient_id", "n")
+        }
+        seeded = {uid: fresh.get(uid, 0) for uid in missing}
+        counts.update(seeded)
+        try:
+            cache.set_many({_key(uid): n for uid, n in seeded.items()}, _ttl())
+        except Exception:
+            pass
+    return counts
+
+
+# ---------- writes ----------
+
+def incr_unread(user_id, delta: int = 1) -> None:
+    """Adjust an existing counter by delta; a missing counter is left for the next read."""
+    if not delta:
+        return
+    try:
+        if cache.incr(_key(user_id), delta) < 0:
+            cache.delete(_key(user_id))
+    except ValueError:
+        pass  # not cached — next read reconciles from the DB
+    except Exception as exc:
+        logger.debug("unread_counter: incr failed for user=%s: %s", user_id, exc)
+        invalidate_unread([user_id])
+
+
+def decr_unread(user_id, delta: int = 1) -> None:
+    incr_unread(user_id, -delta)
+
+
+async def adecr_unread(user_id, delta: int = 1) -> None:
+    try:
+        if await cache.adecr(_key(user_id), delta) < 0:
+            await cache.adelete(_key(user_id))
+    except ValueError:
+        pass
+    except Exception as exc:
+        logger.debug("unread_counter: adecr failed for user=%s: %s", user_id, exc)
+        try:
+            await cache.adelete(_key(user_id))
+        except Exception:
+            pass
+
+
+def reset_unread(user_id, count: int = 0) -> None:
+    try:
+        cache.set(_key(user_id), count, _ttl())
+    except Exception as exc:
+        logger.debug("unread_counter: reset failed for user=%s: %s", user_id, exc)
+
+
+def invalidate_unread(user_ids) -> None:
+    """Drop counters for a set of users (bulk creates) — one round trip."""
+    keys = [_key(uid) for uid in user_ids]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception as exc:
+        logger.debug("unread_counter: invalidate of %d counters failed: %s", len(keys), exc)
+
+
+# ---------- reconciliation ----------
+
+def reconcile_unread_counts(since: datetime) -> int:
+    """
+    Re-seed counters for every user whose notifications changed since ``since``.
+
+    Two queries regardless of user count (active recipients + one GROUP BY)
+    and one set_many. Returns the number of counters written.
+    """
+    from django.db.models import Count, Q
+
+    user_ids = set(
+        Notification.objects.filter(
+            Q(updated_at__gte=since) | Q(read_at__gte=since),
+            channel=NotificationChannel.IN_APP,
+            recipient_id__isnull=False,
+        ).values_list("recipient_id", flat=True).distinct()
+    )
+    if not user_ids:
+        return 0
+
+    counts = dict(
+        Notification.objects.filter(
+            recipient_id__in=user_ids,
+            channel=NotificationChannel.IN_APP,
+            read_at__isnull=True,
+        ).values("recipient_id").annotate(n=Count("id")).values_list("recipient_id", "n")
+    )
+    cache.set_many({_key(uid): counts.get(uid, 0) for uid in user_ids}, _ttl())
+    return len(user_ids)
@@ -11,7 +11,8 @@ Models registered:
 
 Production rules:
   - PaymentIntent: all financial/gateway fields are read-only
-  - PaymentWebhookEvent: immutable audit log (no add/change/delete)
+  - PaymentWebhookEvent: immutable audit log (no add/change/delete);
+    the "Replay" action re-queues selected events through the inbox
   - PaymentProviderLog: immutable API call audit (no add/change/delete)
   - PaymentProvider: editable gateway config (staff only)
   - PaystackTransferRecipient: bank_code/account_number are readonly
@@ -170,7 +171,7 @@ class PaymentWebhookEventAdmin(admin.ModelAdmin):
 
     list_display = [
         "provider_badge", "event_display", "reference",
-        "processed_badge", "created_at",
+        "processed_badge", "attempts", "created_at",
     ]
     list_filter = ["provider", "event", "processed"]
     search_fields = ["reference", "event_id", "payload_hash"]
@@ -191,7 +192,7 @@ class PaymentWebhookEventAdmin(admin.ModelAdmin):
             "fields": ("provider", "event", "event_id", "reference", "processed"),
         }),
         (_("Processing"), {
-            "fields": ("processing_error", "payload_hash"),
+            "fields": ("attempts", "processed_at", "processing_error", "payload_hash"),
         }),
         (_("Payload"), {
             "fields": ("payload",),
@@ -203,6 +204,8 @@ class PaymentWebhookEventAdmin(admin.ModelAdmin):
         }),
     )
 
+    actions = ["replay_events"]
+
     def has_add_permission(self, request):
         return False
 
@@ -212,6 +215,13 @@ class PaymentWebhookEventAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return False
 
+    @admin.action(description="Replay selected webhook events")
+    def replay_events(self, request, queryset):
+        from apps.payment.webhook_inbox import WEBHOOK_SOURCES, PaymentWebhookInbox
+
+        count = PaymentWebhookInbox.replay(queryset.filter(provider__in=list(WEBHOOK_SOURCES)))
+        self.message_user(request, f"{count} webhook event(s) queued for replay.")
+
     @admin.display(description="Provider")
     def provider_badge(self, obj):
         bg, fg = _PROVIDER_COLOURS.get(obj.provider, ("#6b7280", "#fff"))
@@ -0,0 +1,92 @@
+"""
+apps/payment/management/commands/replay_payment_webhooks.py
+
+Replay payment webhook events from the inbox (PaymentWebhookEvent).
+
+Usage:
+    python manage.py replay_payment_webhooks --failed
+    python manage.py replay_payment_webhooks --reference FSPAY-20260101-AB12
+    python manage.py replay_payment_webhooks --provider flutterwave --since 2026-10-01
+    python manage.py replay_payment_webhooks --id 01928f3e-... --inline
+    python manage.py replay_payment_webhooks --failed --dry-run
+
+Selection:
+    --failed     events with a processing error (includes dead-lettered ones)
+    --pending    events never processed
+    With neither flag, processed events matching the filters are replayed
+    too — handlers are idempotent, so this only re-applies missing effects.
+
+Events are reset to pending and re-enqueued per partition (provider +
+reference); --inline drains them in this process instead of Celery.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.payment.models import PaymentWebhookEvent
+from apps.payment.webhook_inbox import WEBHOOK_SOURCES, PaymentWebhookInbox
+
+
+class Command(BaseCommand):
+    help = "Replay payment webhook events from the inbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", choices=sorted(WEBHOOK_SOURCES), help="Restrict to one gateway.")
+        parser.add_argument("--reference", help="Restrict to one payment reference.")
+        parser.add_argument("--id", dest="ids", action="append", default=[], metavar="UUID",
+                            help="Replay a specific event (repeatable).")
+        parser.add_argument("--event", help="Restrict to one event name (e.g. charge.success).")
+        parser.add_argument("--since", help="Only events received on/after this ISO date or datetime.")
+        parser.add_argument("--failed", action="store_true", help="Only events with a processing error.")
+        parser.add_argument("--pending", action="store_true", help="Only events never processed.")
+        parser.add_argument("--limit", type=int, default=1000, metavar="N",
+                            help="Replay at most N events (default: 1000).")
+        parser.add_argument("--inline", action="store_true", help="Process now instead of enqueueing.")
+        parser.add_argument("--dry-run", action="store_true", help="List matching events without replaying.")
+
+    def handle(self, *args, **options):
+        events = PaymentWebhookEvent.objects.all()
+        if options["provider"]:
+            events = events.filter(provider=options["provider"])
+        else:
+            events = events.filter(provider__in=list(WEBHOOK_SOURCES))
+        if options["reference"]:
+            events = events.filter(reference=options["reference"])
+        if options["ids"]:
+            events = events.filter(pk__in=options["ids"])
+        if options["event"]:
+            events = events.filter(event=options["event"])
+        if options["since"]:
+            events = events.filter(created_at__gte=self._parse_since(options["since"]))
+        if options["failed"]:
+            events = events.exclude(processing_error="")
+        if options["pending"]:
+            events = events.filter(processed=False)
+
+        selected = list(events.order_by("created_at")[: options["limit"]])
+        for webhook in selected:
+            self.stdout.write(
+                f"{webhook.created_at:%Y-%m-%d %H:%M:%S} {webhook.provider:<12} {webhook.event:<22} "
+                f"{webhook.reference or '-':<32} attempts={webhook.attempts} "
+                f"{'processed' if webhook.processed else 'pending'} {webhook.processing_error[:60]}"
+            )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {len(selected)} event(s) would be replayed."))
+            return
+
+        with transaction.atomic():
+            count = PaymentWebhookInbox.replay(selected, inline=options["inline"])
+        mode = "processed inline" if options["inline"] else "enqueued"
+        self.stdout.write(self.style.SUCCESS(f"{count} event(s) replayed ({mode})."))
+
+    @staticmethod
+    def _parse_since(value: str) -> datetime:
+        try:
+            since = datetime.fromisoformat(value)
+        except ValueError as exc:
+            raise CommandError(f"--since: invalid date {value!r}") from exc
+        return timezone.make_aware(since) if timezone.is_naive(since) else since
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0006_paymentintent_active_paymentprovider_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentwebhookevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Processing attempts. Events at PAYMENT_WEBHOOK_MAX_ATTEMPTS are dead-lettered until replayed.'),
+        ),
+        migrations.AddField(
+            model_name='paymentwebhookevent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='paymentwebhookevent',
+            index=models.Index(fields=['provider', 'reference', 'processed', 'created_at'], name='idx_pwe_partition'),
+        ),
+    ]
@@ -269,10 +269,19 @@ class PaymentWebhookEvent(TimeStampedModel):
     payload = models.JSONField(default=dict)
     processed = models.BooleanField(default=False, db_index=True)
     processing_error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Processing attempts. Events at PAYMENT_WEBHOOK_MAX_ATTEMPTS are dead-lettered until replayed.",
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["provider", "event", "processed"])]
+        indexes = [
+            models.Index(fields=["provider", "event", "processed"]),
+            # Inbox partition drain: pending events of one reference, in arrival order.
+            models.Index(fields=["provider", "reference", "processed", "created_at"], name="idx_pwe_partition"),
+        ]
 
 
 class PaystackTransferRecipient(TimeStampedModel):
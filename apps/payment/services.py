@@ -13,7 +13,7 @@ Architecture:
 Services:
     PaystackClient          — Low-level Paystack API wrapper (sync + async).
     PaymentIntentService    — High-level payment intent lifecycle (init, succeed).
-    PaystackWebhookService  — Idempotent webhook event processor.
+    PaystackWebhookService  — Paystack entry point to the webhook inbox.
     TransferRecipientService — Bank transfer recipient registration.
 
 Compliance:
@@ -828,7 +828,7 @@ class PaymentIntentService:
 
 
 class PaystackWebhookService:
-    """Idempotent Paystack webhook event processor.
+    """Paystack entry point to the payment webhook inbox.
 
     Deduplicates events via SHA-256 hash of the raw payload body so
     duplicate deliveries (Paystack retries) are silently ignored.
@@ -840,6 +840,8 @@ class PaystackWebhookService:
     Compliance:
         All webhook events write to ``PaymentWebhookEvent`` for audit.
         Transfer outcomes are additionally logged in ``PaymentProviderLog``.
+
+    See ``apps.payment.webhook_inbox`` for the receive/process split.
     """
 
     @staticmethod
@@ -855,68 +857,52 @@ class PaystackWebhookService:
         return hashlib.sha256(raw_payload).hexdigest()
 
     @classmethod
-    @db_transaction.atomic
+    def receive(cls, *, raw_payload: bytes, signature: str) -> tuple[PaymentWebhookEvent, bool]:
+        """Verify and persist a Paystack webhook; processing is queued to Celery.
+
+        Args:
+            raw_payload: Raw request body bytes (used for signature + hash).
+            signature: ``X-Paystack-Signature`` header value.
+
+        Returns:
+            tuple: ``(event, created)`` — ``created`` is False for a duplicate.
+
+        Raises:
+            ValidationError: If signature verification fails.
+        """
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        return PaymentWebhookInbox.receive(
+            PaymentProviderCode.PAYSTACK, raw_payload=raw_payload, signature=signature,
+        )
+
+    @classmethod
     def process(cls, *, raw_payload: bytes, signature: str) -> PaymentWebhookEvent:
-        """Verify and process an incoming Paystack webhook event.
+        """Verify, persist and process a Paystack webhook inline.
 
         Steps:
             1. Validates HMAC-SHA512 signature.
             2. Deduplicates via ``PaymentWebhookEvent`` SHA-256 hash.
-            3. Dispatches to the correct handler (charge success/failure,
-               transfer outcome).
-            4. Marks the event as processed.
+            3. Drains the event's reference partition (charge success/failure,
+               transfer outcome) in arrival order.
 
         Args:
             raw_payload: Raw request body bytes (used for signature + hash).
             signature: ``X-Paystack-Signature`` header value.
 
         Returns:
-            PaymentWebhookEvent: The created or existing webhook event record.
+            PaymentWebhookEvent: The created or existing webhook event record;
+                ``processing_error`` is set if its handler failed.
 
         Raises:
             ValidationError: If signature verification fails.
         """
-        if not PaystackClient.verify_signature(raw_payload, signature):
-            raise ValidationError("Invalid Paystack webhook signature.")
-        payload = json.loads(raw_payload.decode("utf-8"))
-        event_name = payload.get("event", "")
-        data = payload.get("data") or {}
-        reference = data.get("reference") or data.get("transfer_code") or ""
-        event_id = str(data.get("id") or data.get("event_id") or reference)
-        webhook, created = PaymentWebhookEvent.objects.get_or_create(
-            payload_hash=cls._payload_hash(raw_payload),
-            defaults={
-                "provider": PaymentProviderCode.PAYSTACK,
-                "event": event_name,
-                "event_id": event_id,
-                "reference": reference,
-                "payload": payload,
-            },
-        )
-        if not created or webhook.processed:
-            return webhook
-        try:
-            if event_name == "charge.success":
-                intent = PaymentIntent.objects.select_for_update().get(reference=reference)
-                PaymentIntentService.mark_success(intent, payload)
-            elif event_name == "charge.failed":
-                PaymentIntent.objects.filter(reference=reference).update(status=PaymentIntentStatus.FAILED, provider_response=payload)
-            elif event_name in {"transfer.success", "transfer.failed", "transfer.reversed"}:
-                # Transfer settlement is recorded in the provider audit trail here;
-                # payout ledger entries remain in apps.transactions.
-                PaymentProviderLog.objects.create(
-                    provider=PaymentProviderCode.PAYSTACK,
-                    action=event_name,
-                    reference=reference,
-                    success=event_name == "transfer.success",
-                    response_payload=payload,
-                )
-            webhook.processed = True
-            webhook.save(update_fields=["processed", "updated_at"])
-        except Exception as exc:
-            webhook.processing_error = str(exc)
-            webhook.save(update_fields=["processing_error", "updated_at"])
-            raise
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        webhook, _created = cls.receive(raw_payload=raw_payload, signature=signature)
+        if not webhook.processed:
+            PaymentWebhookInbox.drain(webhook.provider, webhook.reference, webhook_id=str(webhook.pk))
+            webhook.refresh_from_db()
         return webhook
 
 
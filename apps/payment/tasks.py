@@ -0,0 +1,58 @@
+# apps/payment/tasks.py
+"""
+Celery tasks for the Payment domain.
+
+Tasks:
+  process_payment_webhook      — Drain one webhook inbox partition
+                                 (provider + payment reference) in arrival order.
+  sweep_payment_webhook_inbox  — Re-enqueue partitions whose pending events
+                                 were never drained (beat, every minute).
+
+Both run on the ``webhooks`` queue. Ordering per reference is enforced by
+row locks in ``PaymentWebhookInbox.drain``, not by the queue, so any number
+of workers can consume it.
+"""
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF = 15  # seconds; doubled on every retry
+
+
+@shared_task(
+    bind=True,
+    name="process_payment_webhook",
+    max_retries=5,
+    acks_late=True,  # a crashed worker leaves the partition for redelivery
+)
+def process_payment_webhook(self, provider: str, reference: str = "", webhook_id: str | None = None) -> dict:
+    """
+    Apply the pending webhook events of one (provider, reference) partition.
+
+    A failed event stops the partition and the task retries with exponential
+    back-off; the event itself is dead-lettered after
+    PAYMENT_WEBHOOK_MAX_ATTEMPTS and later events then proceed.
+    """
+    from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+    result = PaymentWebhookInbox.drain(provider, reference, webhook_id=webhook_id)
+    if result["failed"] and self.request.retries < self.max_retries:
+        raise self.retry(countdown=RETRY_BACKOFF * 2 ** self.request.retries)
+    if result["failed"]:
+        logger.error(
+            "process_payment_webhook: partition %s/%s still failing at event %s",
+            provider, reference, result["failed"],
+        )
+    return result
+
+
+@shared_task(name="sweep_payment_webhook_inbox")
+def sweep_payment_webhook_inbox() -> dict:
+    """Re-enqueue inbox partitions with events still pending after a grace period."""
+    from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+    return {"enqueued": PaymentWebhookInbox.sweep()}
@@ -1,5 +1,6 @@
 import hashlib
 import hmac
+import io
 import json
 from decimal import Decimal
 from unittest.mock import patch
@@ -193,3 +194,228 @@ class PaystackWebhookServiceTests(TestCase):
             transport.last_json["metadata"]["callback_url"],
             "http://localhost:3000/client/dashboard/orders/ORDER-456/confirmation",
         )
+
+
+class PaymentWebhookInboxTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="webhook-inbox@example.com", password="StrongPass123!", role="client")
+        self.intent = PaymentIntent.objects.create(
+            user=self.user,
+            purpose=PaymentPurpose.WALLET_TOPUP,
+            amount=Decimal("2500.00"),
+            currency="NGN",
+            reference="INBOX-REF-001",
+        )
+        self.client = APIClient()
+
+    def _paystack(self, event: str, reference: str = "INBOX-REF-001", event_id: int = 1) -> tuple[bytes, str]:
+        payload = json.dumps({"event": event, "data": {"reference": reference, "id": event_id}}).encode("utf-8")
+        return payload, hmac.new(settings.PAYSTACK_SECRET_KEY.encode("utf-8"), payload, hashlib.sha512).hexdigest()
+
+    def _post_paystack(self, payload: bytes, signature: str):
+        return self.client.post(
+            "/api/v1/payment/paystack/webhook/",
+            data=payload,
+            content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=signature,
+        )
+
+    def test_webhook_is_acknowledged_before_processing(self):
+        payload, signature = self._paystack("charge.success")
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self._post_paystack(payload, signature)
+
+        self.assertEqual(response.status_code, 200)
+        webhook = PaymentWebhookEvent.objects.get()
+        self.assertFalse(webhook.processed)
+        self.intent.refresh_from_db()
+        self.assertNotEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+        for callback in callbacks:  # enqueue → eager Celery drains the partition
+            callback()
+        webhook.refresh_from_db()
+        self.intent.refresh_from_db()
+        self.assertTrue(webhook.processed)
+        self.assertEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_duplicate_delivery_is_not_enqueued_twice(self):
+        payload, signature = self._paystack("charge.success")
+        self._post_paystack(payload, signature)
+
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        with patch.object(PaymentWebhookInbox, "enqueue") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._post_paystack(payload, signature)
+
+        self.assertTrue(response.json()["data"]["duplicate"])
+        enqueue.assert_not_called()
+        self.assertEqual(PaymentWebhookEvent.objects.count(), 1)
+
+    def test_invalid_signature_is_rejected_without_persisting(self):
+        payload, _ = self._paystack("charge.success")
+
+        response = self._post_paystack(payload, "bad-signature")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(PaymentWebhookEvent.objects.exists())
+
+    def test_partition_applies_events_in_arrival_order(self):
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        for event_id, event in enumerate(("charge.success", "charge.failed")):
+            payload, signature = self._paystack(event, event_id=event_id)
+            PaymentWebhookInbox.receive("paystack", raw_payload=payload, signature=signature)
+
+        result = PaymentWebhookInbox.drain("paystack", "INBOX-REF-001")
+
+        self.assertEqual(result, {"processed": 2, "failed": None})
+        self.intent.refresh_from_db()
+        self.assertEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_failed_event_blocks_partition_until_dead_lettered(self):
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        for event_id, event in enumerate(("charge.success", "charge.failed")):
+            payload, signature = self._paystack(event, reference="INBOX-UNKNOWN", event_id=event_id)
+            PaymentWebhookInbox.receive("paystack", raw_payload=payload, signature=signature)
+
+        with self.settings(PAYMENT_WEBHOOK_MAX_ATTEMPTS=2):
+            first = PaymentWebhookInbox.drain("paystack", "INBOX-UNKNOWN")
+            second = PaymentWebhookInbox.drain("paystack", "INBOX-UNKNOWN")
+            third = PaymentWebhookInbox.drain("paystack", "INBOX-UNKNOWN")
+
+        self.assertEqual((first["processed"], second["processed"]), (0, 0))
+        self.assertEqual(third, {"processed": 1, "failed": None})
+        dead = PaymentWebhookEvent.objects.get(event="charge.success")
+        self.assertEqual(dead.attempts, 2)
+        self.assertFalse(dead.processed)
+        self.assertTrue(dead.processing_error)
+
+    def _post_flutterwave(self, verified: dict):
+        payload = json.dumps({
+            "event": "charge.completed",
+            "data": {"id": 99, "tx_ref": "INBOX-REF-001", "status": "successful", "amount": 2500, "currency": "NGN"},
+        }).encode("utf-8")
+
+        with self.settings(FLUTTERWAVE_WEBHOOK_SECRET_HASH="fw-hash"):
+            with patch(
+                "apps.providers.Payment.flutterwave.FlutterwaveClient.verify_transaction",
+                return_value={"status": "success", "data": verified},
+            ) as verify:
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(
+                        "/api/v1/payment/flutterwave/webhook/",
+                        data=payload,
+                        content_type="application/json",
+                        HTTP_VERIF_HASH="fw-hash",
+                    )
+        return response, verify
+
+    def test_flutterwave_webhook_uses_verif_hash(self):
+        PaymentIntent.objects.filter(pk=self.intent.pk).update(provider="flutterwave")
+
+        response, verify = self._post_flutterwave(
+            {"tx_ref": "INBOX-REF-001", "status": "successful", "amount": 2500, "currency": "NGN"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        verify.assert_called_once_with(99)
+        webhook = PaymentWebhookEvent.objects.get()
+        self.assertEqual((webhook.provider, webhook.reference), ("flutterwave", "INBOX-REF-001"))
+        self.intent.refresh_from_db()
+        self.assertEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_flutterwave_success_with_mismatched_amount_is_not_credited(self):
+        PaymentIntent.objects.filter(pk=self.intent.pk).update(provider="flutterwave")
+
+        self._post_flutterwave({"tx_ref": "INBOX-REF-001", "status": "successful", "amount": 25, "currency": "NGN"})
+
+        webhook = PaymentWebhookEvent.objects.get()
+        self.assertFalse(webhook.processed)
+        self.assertIn("expected 2500.00 NGN", webhook.processing_error)
+        self.intent.refresh_from_db()
+        self.assertNotEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_webhook_never_settles_another_providers_intent(self):
+        # self.intent is a Paystack intent; a Flutterwave success must not touch it.
+        response, verify = self._post_flutterwave(
+            {"tx_ref": "INBOX-REF-001", "status": "successful", "amount": 2500, "currency": "NGN"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        verify.assert_not_called()
+        self.assertFalse(PaymentWebhookEvent.objects.get().processed)
+        self.intent.refresh_from_db()
+        self.assertNotEqual(self.intent.status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_replay_command_reprocesses_failed_events(self):
+        from django.core.management import call_command
+
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        payload, signature = self._paystack("charge.success", reference="INBOX-LATE")
+        PaymentWebhookInbox.receive("paystack", raw_payload=payload, signature=signature)
+        PaymentWebhookInbox.drain("paystack", "INBOX-LATE")  # intent does not exist yet
+        PaymentIntent.objects.create(
+            user=self.user,
+            purpose=PaymentPurpose.WALLET_TOPUP,
+            amount=Decimal("100.00"),
+            currency="NGN",
+            reference="INBOX-LATE",
+        )
+
+        call_command("replay_payment_webhooks", "--failed", "--inline", stdout=io.StringIO())
+
+        webhook = PaymentWebhookEvent.objects.get()
+        self.assertTrue(webhook.processed)
+        self.assertEqual(webhook.attempts, 1)
+        self.assertEqual(PaymentIntent.objects.get(reference="INBOX-LATE").status, PaymentIntentStatus.SUCCEEDED)
+
+    def test_sweep_leaves_retrying_events_to_their_backoff(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        payload, signature = self._paystack("charge.success", reference="INBOX-UNKNOWN")
+        webhook, _ = PaymentWebhookInbox.receive("paystack", raw_payload=payload, signature=signature)
+        PaymentWebhookInbox.drain("paystack", "INBOX-UNKNOWN")  # attempt 1 fails, task retries in 15s
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        PaymentWebhookEvent.objects.filter(pk=webhook.pk).update(created_at=an_hour_ago)
+
+        with patch.object(PaymentWebhookInbox, "enqueue") as enqueue:
+            self.assertEqual(PaymentWebhookInbox.sweep(), 0)
+            PaymentWebhookEvent.objects.filter(pk=webhook.pk).update(updated_at=an_hour_ago)  # retry was lost
+            self.assertEqual(PaymentWebhookInbox.sweep(), 1)
+
+        enqueue.assert_called_once()
+        self.assertEqual(PaymentWebhookEvent.objects.get(pk=webhook.pk).attempts, 1)
+
+    def test_replayed_transfer_is_logged_once(self):
+        from apps.payment.models import PaymentProviderLog
+        from apps.payment.webhook_inbox import PaymentWebhookInbox
+
+        payload, signature = self._paystack("transfer.success", reference="TRF-001")
+        webhook, _ = PaymentWebhookInbox.receive("paystack", raw_payload=payload, signature=signature)
+        PaymentWebhookInbox.drain("paystack", "TRF-001")
+        PaymentWebhookInbox.replay([webhook], inline=True)
+
+        self.assertTrue(PaymentWebhookEvent.objects.get(pk=webhook.pk).processed)
+        self.assertEqual(PaymentProviderLog.objects.filter(reference="TRF-001").count(), 1)
+
+    def test_inbox_tasks_routed_to_a_deployed_worker_queue(self):
+        import re
+        from pathlib import Path
+
+        from backend.celery import app
+
+        dockerfile = Path(settings.BASE_DIR) / "Dockerfile.celery"
+        deployed = set(re.search(r"CELERY_QUEUES=([\w,]+)", dockerfile.read_text()).group(1).split(","))
+        routes = app.conf.task_routes
+        for task_name in ("process_payment_webhook", "sweep_payment_webhook_inbox"):
+            self.assertIn(routes[task_name]["queue"], deployed, task_name)
+        beat_entry = app.conf.beat_schedule["payment-webhook-inbox-sweep"]
+        self.assertIn(beat_entry["options"]["queue"], deployed)
@@ -4,6 +4,8 @@ from apps.payment.views import (
     CashConfirmationConfirmView,
     CashConfirmationCreateView,
     CashConfirmationResendView,
+    FlutterwaveWebhookView,
+    OlivePayWebhookView,
     PaystackBanksView,
     PaystackInitializeView,
     PaystackTransferRecipientView,
@@ -22,6 +24,8 @@ urlpatterns = [
     path("paystack/initialize/", PaystackInitializeView.as_view(), name="paystack-initialize"),
     path("paystack/verify/<str:reference>/", PaystackVerifyView.as_view(), name="paystack-verify"),
     path("paystack/webhook/", PaystackWebhookView.as_view(), name="paystack-webhook"),
+    path("flutterwave/webhook/", FlutterwaveWebhookView.as_view(), name="flutterwave-webhook"),
+    path("olivepay/webhook/", OlivePayWebhookView.as_view(), name="olivepay-webhook"),
     path("banks/", PaystackBanksView.as_view(), name="banks"),
     path("transfer-recipient/", PaystackTransferRecipientView.as_view(), name="transfer-recipient"),
 ]
@@ -10,6 +10,9 @@ Flow:
   1. Initialize (Frontend calls PaystackInitializeView)
   2. Redirect (User pays via Paystack)
   3. Verify (Webhook or manual VerifyView call)
+
+Webhooks from Paystack, Flutterwave and OlivePay are persisted to the
+webhook inbox and acknowledged at once; Celery applies them.
 """
 
 from django.core.exceptions import ValidationError
@@ -36,12 +39,13 @@ from apps.payment.serializers import (
     WalletFundPaymentSerializer,
 )
 from apps.payment.cash_service import CashOrderService
+from apps.payment.models import PaymentProviderCode
 from apps.payment.services import (
     PaymentIntentService,
     PaystackClient,
-    PaystackWebhookService,
     TransferRecipientService,
 )
+from apps.payment.webhook_inbox import PaymentWebhookInbox
 
 
 # ===========================================================================
@@ -134,44 +138,62 @@ class PaystackVerifyView(generics.GenericAPIView):
 
 
 # ===========================================================================
-# POST /api/v1/payment/paystack/webhook/
+# POST /api/v1/payment/{paystack,flutterwave,olivepay}/webhook/
 # ===========================================================================
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class PaystackWebhookView(generics.GenericAPIView):
+class PaymentWebhookView(generics.GenericAPIView):
     """
-    Asynchronous handler for Paystack webhook notifications.
+    Webhook inbox endpoint shared by every payment gateway.
 
     Flow:
-      1. Paystack sends a signed POST request.
-      2. Verify signature using environment secret.
-      3. Process the event (charge.success, transfer.success, etc.).
-      4. Ensure idempotency via reference tracking.
+      1. The provider sends a signed POST request.
+      2. Verify the signature (``WebhookSource.signature_header``).
+      3. Deduplicate and persist the raw event (``PaymentWebhookEvent``).
+      4. Acknowledge immediately; Celery applies the event per payment
+         reference, in arrival order (see apps/payment/webhook_inbox.py).
 
     Status Codes:
-      200 OK: Webhook accepted.
+      200 OK: Webhook accepted (or already received).
+      400 Bad Request: Body is not a JSON object.
       401 Unauthorized: Invalid signature.
     """
     permission_classes = [AllowAny]
     serializer_class = PaystackWebhookSerializer
     renderer_classes = [CustomJSONRenderer, BrowsableAPIRenderer]
+    provider = ""
 
     def post(self, request):
+        source = PaymentWebhookInbox.source(self.provider)
         try:
-            webhook = PaystackWebhookService.process(
+            webhook, created = PaymentWebhookInbox.receive(
+                self.provider,
                 raw_payload=request.body,
-                signature=request.headers.get("X-Paystack-Signature", ""),
+                signature=request.headers.get(source.signature_header, ""),
             )
         except ValidationError as exc:
-            return error_response(message=str(exc), status=status.HTTP_401_UNAUTHORIZED)
+            code = status.HTTP_400_BAD_REQUEST if exc.code == "invalid_payload" else status.HTTP_401_UNAUTHORIZED
+            return error_response(message=exc.messages[0], status=code)
 
         return success_response(
-            data={"processed": webhook.processed},
-            message="Webhook received and processed.",
+            data={"event_id": str(webhook.pk), "duplicate": not created, "processed": webhook.processed},
+            message="Webhook received.",
         )
 
 
+class PaystackWebhookView(PaymentWebhookView):
+    provider = PaymentProviderCode.PAYSTACK
+
+
+class FlutterwaveWebhookView(PaymentWebhookView):
+    provider = PaymentProviderCode.FLUTTERWAVE
+
+
+class OlivePayWebhookView(PaymentWebhookView):
+    provider = PaymentProviderCode.OLIVE_PAY
+
+
 # ===========================================================================
 # GET /api/v1/payment/paystack/banks/
 # ===========================================================================
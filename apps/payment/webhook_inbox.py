@@ -0,0 +1,469 @@
+# apps/payment/webhook_inbox.py
+"""
+Durable payment webhook inbox — Paystack, Flutterwave and OlivePay.
+
+Receive (request path, no business logic):
+    1. Verify the provider signature.
+    2. Deduplicate on the SHA-256 of the raw body (provider retries resend
+       the same bytes) and persist the event as a ``PaymentWebhookEvent``.
+    3. On commit, enqueue ``process_payment_webhook`` for the event's
+       partition and acknowledge with 200.
+
+Process (Celery, ``webhooks`` queue):
+    Events are partitioned by payment reference. A drain locks the pending
+    events of one (provider, reference) with SELECT … FOR UPDATE and applies
+    them in arrival order, each in its own savepoint. A second drain of the
+    same partition blocks on those row locks and then only sees what the
+    first left unprocessed, so events of one reference are never applied
+    concurrently or out of order; different references run in parallel.
+
+    A charge success is applied only to an intent of the same provider.
+    Flutterwave (static ``verif-hash``) and OlivePay successes are first
+    re-verified through the provider API — before the drain takes any row
+    lock — and the confirmed amount and currency must match the intent's.
+
+    A failing event stops its partition (later events wait behind it) and
+    the task retries with back-off. After PAYMENT_WEBHOOK_MAX_ATTEMPTS
+    (default 5) the event is dead-lettered: skipped by drains, kept with its
+    ``processing_error`` until replayed.
+
+Recovery:
+    ``sweep_payment_webhook_inbox`` (Celery beat, every minute) re-enqueues
+    partitions with events still pending after a grace period — covers a
+    broker outage between commit and enqueue. Events that already failed
+    are swept only once their back-off retry is overdue.
+
+Replay:
+    ``PaymentWebhookInbox.replay()`` resets events to pending and re-enqueues
+    them; exposed as ``manage.py replay_payment_webhooks`` and as an admin
+    action. Handlers are idempotent (``mark_success`` ignores an already
+    succeeded intent; a failure never downgrades a succeeded intent; a
+    transfer is logged once per provider, reference and event).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.payment.models import (
+    PaymentIntent,
+    PaymentIntentStatus,
+    PaymentProviderCode,
+    PaymentProviderLog,
+    PaymentWebhookEvent,
+)
+
+logger = logging.getLogger("application")
+
+_SUCCESS_STATUSES = {"success", "successful", "completed"}
+
+
+def max_attempts() -> int:
+    return int(getattr(settings, "PAYMENT_WEBHOOK_MAX_ATTEMPTS", 5))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Provider adapters
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class WebhookSource:
+    """How one provider signs, identifies and classifies its webhook events."""
+
+    provider: str
+    label: str
+    signature_header: str
+    verify: Callable[[bytes, str], bool]
+    reference_keys: tuple[str, ...]
+    # (event name, data) → ("charge" | "transfer" | "", succeeded)
+    classify: Callable[[str, dict], tuple[str, bool]]
+    # (data, intent) → transaction as reported by the provider API. Set for
+    # providers whose webhook authentication does not cover the body.
+    confirm: Callable[[dict, PaymentIntent], dict] | None = None
+
+    def describe(self, payload: dict[str, Any]) -> tuple[str, str, str]:
+        """(event, event_id, reference) of a parsed payload."""
+        event = str(payload.get("event") or payload.get("event.type") or payload.get("type") or "")
+        data = payload.get("data") or {}
+        reference = next((str(data[key]) for key in self.reference_keys if data.get(key)), "")
+        event_id = str(data.get("id") or data.get("event_id") or payload.get("id") or reference)
+        return event, event_id, reference
+
+
+def _verify_paystack(raw_payload: bytes, signature: str) -> bool:
+    from apps.payment.services import PaystackClient
+
+    return PaystackClient.verify_signature(raw_payload, signature)
+
+
+def _verify_flutterwave(raw_payload: bytes, signature: str) -> bool:
+    from apps.providers.Payment.flutterwave import FlutterwaveClient
+
+    return FlutterwaveClient.verify_signature(signature)
+
+
+def _verify_olivepay(raw_payload: bytes, signature: str) -> bool:
+    from apps.providers.Payment.olivepay import OlivePayClient
+
+    return OlivePayClient.verify_signature(raw_payload, signature)
+
+
+def _confirm_flutterwave(data: dict, intent: PaymentIntent) -> dict:
+    # verif-hash is a static shared secret, not a signature over the body.
+    from apps.providers.Payment.flutterwave import FlutterwaveClient
+
+    transaction_id = data.get("id")
+    if not transaction_id:
+        raise ValidationError("Flutterwave webhook carries no transaction id to verify.")
+    verified = (FlutterwaveClient.verify_transaction(transaction_id) or {}).get("data") or {}
+    if str(verified.get("tx_ref", "")) != intent.reference:
+        raise ValidationError(
+            f"Flutterwave transaction {transaction_id} does not belong to reference {intent.reference}."
+        )
+    return verified
+
+
+def _confirm_olivepay(data: dict, intent: PaymentIntent) -> dict:
+    from apps.providers.Payment.olivepay import OlivePayClient
+
+    return (OlivePayClient.verify_payment(intent.reference) or {}).get("data") or {}
+
+
+def _check_settlement(intent: PaymentIntent, transaction: dict) -> None:
+    """Raise unless the provider-confirmed transaction succeeded for the intent's amount and currency."""
+    if str(transaction.get("status", "")).lower() not in _SUCCESS_STATUSES:
+        raise ValidationError(f"Payment {intent.reference} is not confirmed by the provider.")
+    try:
+        amount = Decimal(str(transaction.get("amount")))
+    except (InvalidOperation, ValueError):
+        amount = None
+    currency = str(transaction.get("currency") or "").upper()
+    if amount != intent.amount or currency != intent.currency.upper():
+        raise ValidationError(
+            f"Payment {intent.reference} settled {transaction.get('amount')} {currency or '?'}, "
+            f"expected {intent.amount} {intent.currency}."
+        )
+
+
+def _classify_paystack(event: str, data: dict) -> tuple[str, bool]:
+    if event in {"charge.success", "charge.failed"}:
+        return "charge", event == "charge.success"
+    if event in {"transfer.success", "transfer.failed", "transfer.reversed"}:
+        return "transfer", event == "transfer.success"
+    return "", False
+
+
+def _classify_flutterwave(event: str, data: dict) -> tuple[str, bool]:
+    succeeded = str(data.get("status", "")).lower() in _SUCCESS_STATUSES
+    if event == "charge.completed":
+        return "charge", succeeded
+    if event == "transfer.completed":
+        return "transfer", succeeded
+    return "", False
+
+
+def _classify_olivepay(event: str, data: dict) -> tuple[str, bool]:
+    # Event names are provisional (see apps/providers/Payment/olivepay.py);
+    # the data.status field decides the outcome when the name does not.
+    kind, _, outcome = event.partition(".")
+    succeeded = outcome in _SUCCESS_STATUSES or str(data.get("status", "")).lower() in _SUCCESS_STATUSES
+    if kind in {"payment", "charge"}:
+        return "charge", succeeded
+    if kind == "transfer":
+        return "transfer", succeeded
+    return "", False
+
+
+WEBHOOK_SOURCES: dict[str, WebhookSource] = {
+    source.provider: source
+    for source in (
+        WebhookSource(
+            provider=PaymentProviderCode.PAYSTACK,
+            label="Paystack",
+            signature_header="X-Paystack-Signature",
+            verify=_verify_paystack,
+            reference_keys=("reference", "transfer_code"),
+            classify=_classify_paystack,
+        ),
+        WebhookSource(
+            provider=PaymentProviderCode.FLUTTERWAVE,
+            label="Flutterwave",
+            signature_header="verif-hash",
+            verify=_verify_flutterwave,
+            reference_keys=("tx_ref", "reference"),
+            classify=_classify_flutterwave,
+            confirm=_confirm_flutterwave,
+        ),
+        WebhookSource(
+            provider=PaymentProviderCode.OLIVE_PAY,
+            label="OlivePay",
+            signature_header="X-OlivePay-Signature",
+            verify=_verify_olivepay,
+            reference_keys=("reference",),
+            classify=_classify_olivepay,
+            confirm=_confirm_olivepay,
+        ),
+    )
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Inbox
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class PaymentWebhookInbox:
+    """Persist-then-process webhook pipeline shared by every payment gateway."""
+
+    @staticmethod
+    def source(provider: str) -> WebhookSource:
+        try:
+            return WEBHOOK_SOURCES[provider]
+        except KeyError:
+            raise ValidationError(f"Unsupported webhook provider '{provider}'.") from None
+
+    @staticmethod
+    def payload_hash(raw_payload: bytes) -> str:
+        return hashlib.sha256(raw_payload).hexdigest()
+
+    # ── Receive ───────────────────────────────────────────────────────────────
+
+    @classmethod
+    @db_transaction.atomic
+    def receive(
+        cls, provider: str, *, raw_payload: bytes, signature: str
+    ) -> tuple[PaymentWebhookEvent, bool]:
+        """Verify, deduplicate and persist one delivery; enqueue it on commit.
+
+        Returns:
+            tuple: ``(event, created)`` — ``created`` is False for a duplicate.
+
+        Raises:
+            ValidationError: ``code="invalid_signature"`` for a bad signature,
+                ``code="invalid_payload"`` for a body that is not a JSON object.
+        """
+        source = cls.source(provider)
+        if not source.verify(raw_payload, signature):
+            raise ValidationError(f"Invalid {source.label} webhook signature.", code="invalid_signature")
+        try:
+            payload = json.loads(raw_payload.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            payload = None
+        if not isinstance(payload, dict):
+            raise ValidationError(f"Malformed {source.label} webhook payload.", code="invalid_payload")
+
+        event, event_id, reference = source.describe(payload)
+        webhook, created = PaymentWebhookEvent.objects.get_or_create(
+            payload_hash=cls.payload_hash(raw_payload),
+            defaults={
+                "provider": source.provider,
+                "event": event,
+                "event_id": event_id,
+                "reference": reference,
+                "payload": payload,
+            },
+        )
+        if created:
+            db_transaction.on_commit(lambda: cls.enqueue(webhook))
+        return webhook, created
+
+    @staticmethod
+    def enqueue(webhook: PaymentWebhookEvent) -> None:
+        """Schedule the drain of ``webhook``'s partition (best effort — the sweeper retries)."""
+        from apps.payment.tasks import process_payment_webhook
+
+        try:
+            process_payment_webhook.apply_async(
+                kwargs={
+                    "provider": webhook.provider,
+                    "reference": webhook.reference,
+                    "webhook_id": str(webhook.pk),
+                },
+            )
+        except Exception as exc:
+            logger.warning(
+                "PaymentWebhookInbox.enqueue failed provider=%s ref=%s: %s",
+                webhook.provider, webhook.reference, exc,
+            )
+
+    # ── Process ───────────────────────────────────────────────────────────────
+
+    @classmethod
+    def drain(cls, provider: str, reference: str = "", *, webhook_id: str | None = None) -> dict[str, Any]:
+        """Apply the pending events of one partition in arrival order.
+
+        Events without a reference form a partition of their own and are
+        drained by ``webhook_id``.
+
+        Returns:
+            dict: ``{"processed": n, "failed": event_id_or_None}``.
+        """
+        source = cls.source(provider)
+        result: dict[str, Any] = {"processed": 0, "failed": None}
+        pending = PaymentWebhookEvent.objects.filter(
+            provider=provider,
+            reference=reference,
+            processed=False,
+            attempts__lt=max_attempts(),
+        )
+        if not reference:
+            pending = pending.filter(pk=webhook_id)
+        # Provider API calls happen here, before any row lock is taken. Events
+        # that arrive after this snapshot are drained by their own task.
+        snapshot = list(pending.order_by("created_at", "id"))
+        confirmations = cls.confirm_pending(source, snapshot)
+        with db_transaction.atomic():
+            locked = pending.select_for_update().filter(pk__in=[w.pk for w in snapshot])
+            for webhook in locked.order_by("created_at", "id"):
+                webhook.attempts += 1
+                try:
+                    with db_transaction.atomic():
+                        cls.apply(source, webhook, confirmations.get(webhook.pk))
+                except Exception as exc:
+                    webhook.processing_error = str(exc) or exc.__class__.__name__
+                    webhook.save(update_fields=["attempts", "processing_error", "updated_at"])
+                    logger.warning(
+                        "PaymentWebhookInbox: %s %s ref=%s failed (attempt %d): %s",
+                        provider, webhook.event, reference, webhook.attempts, exc,
+                    )
+                    result["failed"] = str(webhook.pk)
+                    break
+                webhook.processed = True
+                webhook.processed_at = timezone.now()
+                webhook.processing_error = ""
+                webhook.save(update_fields=["processed", "processed_at", "attempts", "processing_error", "updated_at"])
+                result["processed"] += 1
+        return result
+
+    @staticmethod
+    def confirm_pending(
+        source: WebhookSource, webhooks: Iterable[PaymentWebhookEvent]
+    ) -> dict[Any, dict | Exception]:
+        """Fetch the provider's view of every charge success in ``webhooks``, outside any transaction.
+
+        Returns:
+            dict: event pk → confirmed transaction, or the exception the
+            provider call raised (re-raised by ``apply`` so it counts as an
+            attempt).
+        """
+        confirmations: dict[Any, dict | Exception] = {}
+        if source.confirm is None:
+            return confirmations
+        for webhook in webhooks:
+            data = webhook.payload.get("data") or {}
+            if source.classify(webhook.event, data) != ("charge", True):
+                continue
+            intent = PaymentIntent.objects.filter(
+                reference=webhook.reference, provider=webhook.provider,
+            ).first()
+            if intent is None or intent.status == PaymentIntentStatus.SUCCEEDED:
+                continue
+            try:
+                confirmations[webhook.pk] = source.confirm(data, intent)
+            except Exception as exc:
+                confirmations[webhook.pk] = exc
+        return confirmations
+
+    @staticmethod
+    def apply(
+        source: WebhookSource, webhook: PaymentWebhookEvent, confirmation: dict | Exception | None = None
+    ) -> None:
+        """Run the state changes for one event (inside the caller's savepoint).
+
+        ``confirmation`` is this event's entry from ``confirm_pending``; no
+        provider call is made here, while the intent row is locked.
+        """
+        from apps.payment.services import PaymentIntentService
+
+        payload = webhook.payload
+        data = payload.get("data") or {}
+        kind, succeeded = source.classify(webhook.event, data)
+        if kind == "charge" and succeeded:
+            intent = PaymentIntent.objects.select_for_update().get(
+                reference=webhook.reference, provider=webhook.provider,
+            )
+            if source.confirm is not None and intent.status != PaymentIntentStatus.SUCCEEDED:
+                # Credit only what the provider's API confirmed, never the webhook's claim.
+                if isinstance(confirmation, Exception):
+                    raise confirmation
+                if confirmation is None:
+                    raise ValidationError(f"Payment {intent.reference} was not verified with the provider yet.")
+                _check_settlement(intent, confirmation)
+            PaymentIntentService.mark_success(intent, payload)
+        elif kind == "charge":
+            # A late or replayed failure never downgrades a succeeded intent.
+            PaymentIntent.objects.filter(
+                reference=webhook.reference, provider=webhook.provider,
+            ).exclude(
+                status=PaymentIntentStatus.SUCCEEDED,
+            ).update(status=PaymentIntentStatus.FAILED, provider_response=payload)
+        elif kind == "transfer":
+            # Transfer settlement is recorded in the provider audit trail here;
+            # payout ledger entries remain in apps.transactions. Keyed on
+            # (provider, reference, event) so a replay never duplicates it.
+            PaymentProviderLog.objects.get_or_create(
+                provider=webhook.provider,
+                action=webhook.event,
+                reference=webhook.reference,
+                defaults={"success": succeeded, "response_payload": payload},
+            )
+
+    # ── Recovery / replay ─────────────────────────────────────────────────────
+
+    @classmethod
+    def sweep(cls, *, older_than_seconds: int = 60, limit: int = 500) -> int:
+        """Re-enqueue partitions whose pending events were never drained.
+
+        An event that already failed is left to its task's back-off retry;
+        it is picked up here only once that retry is overdue by the grace
+        period (its task was lost), so the sweep never burns attempts.
+        """
+        from apps.payment.tasks import RETRY_BACKOFF
+
+        now = timezone.now()
+        grace = timedelta(seconds=older_than_seconds)
+        due = Q(attempts=0, created_at__lt=now - grace)
+        for attempt in range(1, max_attempts()):
+            backoff = timedelta(seconds=RETRY_BACKOFF * 2 ** (attempt - 1))
+            due |= Q(attempts=attempt, updated_at__lt=now - backoff - grace)
+        stale = (
+            PaymentWebhookEvent.objects.filter(due, processed=False)
+            .order_by("created_at")
+            .only("id", "provider", "reference")[:limit]
+        )
+        seen: set[tuple[str, str]] = set()
+        for webhook in stale:
+            key = (webhook.provider, webhook.reference or str(webhook.pk))
+            if key not in seen:
+                seen.add(key)
+                cls.enqueue(webhook)
+        return len(seen)
+
+    @classmethod
+    def replay(cls, webhooks: Iterable[PaymentWebhookEvent], *, inline: bool = False) -> int:
+        """Reset events to pending and process them again (queued, or now when ``inline``)."""
+        webhooks = list(webhooks)
+        if not webhooks:
+            return 0
+        PaymentWebhookEvent.objects.filter(pk__in=[w.pk for w in webhooks]).update(
+            processed=False, processed_at=None, attempts=0, processing_error="", updated_at=timezone.now(),
+        )
+        partitions = {(w.provider, w.reference or str(w.pk)): w for w in webhooks}
+        for webhook in partitions.values():
+            if inline:
+                cls.drain(webhook.provider, webhook.reference, webhook_id=str(webhook.pk))
+            else:
+                db_transaction.on_commit(lambda webhook=webhook: cls.enqueue(webhook))
+        return len(webhooks)
@@ -24,8 +24,8 @@ Architecture principles:
    before checkout to give real-time discount previews.
 4. INVENTORY ADJUST (Async): PATCH /vendor/{slug}/inventory/ runs stock
    mutation through the async service for minimal ASGI event-loop blocking.
-5. SEARCH SUGGEST: GET /search/suggest/ returns lightweight slug+title list
-   for frontend autocomplete driven by the selector's FTS index.
+5. SEARCH SUGGEST: GET /search/suggest/ returns lightweight type+slug+title
+   list for frontend autocomplete, served from the in-memory prefix index.
 """
 
 from __future__ import annotations
@@ -614,18 +614,12 @@ async def list_featured_products(request, page: int = 1, page_size: int = 20):
 @router.get("/search/suggest/", auth=None, summary="Autocomplete product titles")
 async def search_suggest(request, q: str = ""):
     """
-    Best-practice #5: lightweight FTS suggest for frontend autocomplete.
-    Returns [{slug, title}] — no images, no heavy fields.
+    Best-practice #5: in-memory prefix-index suggest for frontend autocomplete.
+    Returns [{type, slug, title}] — type is product | tag | category | brand.
     """
     if len(q.strip()) < 2:
         return {"results": []}
-    suggestions = await asearch_suggest(q.strip())
-    return {
-        "results": [
-            {"slug": s.slug, "title": s.title}
-            for s in suggestions
-        ]
-    }
+    return {"results": await asearch_suggest(q.strip())}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
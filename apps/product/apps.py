@@ -27,3 +27,31 @@ class ProductConfig(AppConfig):
             logging.getLogger("application").debug(
                 "django-auditlog product registration skipped"
             )
+
+        # ── Suggest index refresh bridges (see services/suggest_index.py) ─────
+        try:
+            from django.db.models.signals import post_delete, post_save
+
+            from apps.product.models import Product
+            from apps.product.services.suggest_index import (
+                on_product_deleted,
+                on_product_saved,
+            )
+
+            post_save.connect(
+                on_product_saved,
+                sender=Product,
+                dispatch_uid="product_suggest_index_save",
+                weak=False,
+            )
+            post_delete.connect(
+                on_product_deleted,
+                sender=Product,
+                dispatch_uid="product_suggest_index_delete",
+                weak=False,
+            )
+        except Exception as exc:
+            import logging
+            logging.getLogger("application").debug(
+                "product suggest index signal registration skipped: %s", exc
+            )
@@ -824,11 +824,21 @@ def alist_inventory_logs(product_id: Any):
     )
 
 
-async def asearch_suggest(query: str, limit: int = 10):
+async def asearch_suggest(query: str, limit: int = 10) -> list[dict[str, str]]:
     """
-    Async FTS-based search suggest for autocomplete.
-    Returns [{slug, title}] — lightweight, no images.
+    Async search-as-you-type suggest for autocomplete.
+    Returns [{type, slug, title}] — lightweight, no images.
+
+    Served from the in-memory prefix index (services/suggest_index.py) — no
+    database round-trip per keystroke. Until this worker has loaded a
+    snapshot, falls back to a title icontains query over published products.
     """
+    from apps.product.services.suggest_index import suggest_index_store
+
+    index = await suggest_index_store.acurrent()
+    if index is not None:
+        return index.lookup(query, limit)
+
     results = []
     async for product in (
         Product.objects
@@ -840,7 +850,7 @@ async def asearch_suggest(query: str, limit: int = 10):
         .only("slug", "title")
         .order_by("-rating")[:limit]
     ):
-        results.append(product)
+        results.append({"type": "product", "slug": product.slug, "title": product.title})
     return results
 
 
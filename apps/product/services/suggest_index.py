@@ -0,0 +1,411 @@
+# apps/product/services/suggest_index.py
+"""
+In-memory search-as-you-type index for ``GET /products/search/suggest/``.
+
+Structure
+─────────
+Every suggestible thing (published product titles, product tags, categories,
+active brands) is one *entry* ``(type, id, slug, label, score)``.  Entries are
+stored best-first (score descending), so an entry's position IS its rank and
+"top N matches" means "N smallest entry positions".
+
+Each label is tokenised and indexed under every word-suffix of the label
+("floral maxi dress" → "floral maxi dress", "maxi dress", "dress"), giving a
+sorted ``keys`` array with a parallel ``postings`` array of entry positions.
+A query prefix is answered with two ``bisect`` calls over ``keys`` plus a
+``heapq.nsmallest`` over the postings slice — no database, no network.
+Prefixes of up to ``SHORT_PREFIX_LEN`` characters (the widest ranges) keep
+their top-K in a per-index memo after the first lookup.
+
+Sharing across workers
+──────────────────────
+Celery builds the index and publishes it to the shared cache (Redis) as a
+zlib-compressed JSON snapshot plus a small version token.  Each web worker
+checks the version token at most every ``PRODUCT_SUGGEST_CHECK_INTERVAL``
+seconds and, when it changes, loads the new snapshot on a background thread
+while continuing to serve the previous index.  Until a worker has an index
+``asearch_suggest`` falls back to the database.
+
+Freshness
+─────────
+  * Product save/delete → debounced ``product.refresh_suggest_index`` task,
+    which merges only the products changed since the snapshot watermark.
+  * The same task also runs every minute from beat (soft deletes go through
+    ``QuerySet.update()`` and send no signal).
+  * ``product.rebuild_suggest_index`` rebuilds everything hourly — this is
+    also what refreshes tag / category / brand entries and popularity scores.
+
+Settings:
+    PRODUCT_SUGGEST_CHECK_INTERVAL  (default 5 seconds)
+    PRODUCT_SUGGEST_DEBOUNCE        (default 3 seconds)
+    PRODUCT_SUGGEST_WATERMARK_SKEW  (default 120 seconds)
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+import uuid
+import zlib
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_KEY = "product:suggest:v1:snapshot"
+VERSION_KEY = "product:suggest:v1:version"
+DEBOUNCE_KEY = "product:suggest:v1:debounce"
+PUBLISH_LOCK_KEY = "product:suggest:v1:lock"
+BOOTSTRAP_KEY = "product:suggest:v1:bootstrap"
+
+SHORT_PREFIX_LEN = 3
+SHORT_PREFIX_TOP_K = 20
+MAX_KEY_TOKENS = 8
+
+# (type, id, slug, label, score)
+Entry = Tuple[str, str, str, str, float]
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, strip accents and punctuation: ``"Ankara Maxi-Dress"`` → ``"ankara maxi dress"``."""
+    folded = text.casefold()
+    if not folded.isascii():
+        decomposed = unicodedata.normalize("NFKD", folded)
+        folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_TOKEN.findall(folded))
+
+
+class SuggestIndex:
+    """Immutable prefix index over suggest entries. Safe to share between threads."""
+
+    __slots__ = ("entries", "watermark", "version", "_keys", "_postings", "_short")
+
+    def __init__(
+        self,
+        entries: Iterable[Entry],
+        watermark: Optional[datetime] = None,
+        version: Optional[str] = None,
+    ):
+        self.entries: List[Entry] = sorted(entries, key=lambda e: (-e[4], e[3]))
+        self.watermark = watermark
+        self.version = version
+
+        pairs: List[Tuple[str, int]] = []
+        for pos, entry in enumerate(self.entries):
+            tokens = normalize_text(entry[3]).split()[:MAX_KEY_TOKENS]
+            for i in range(len(tokens)):
+                pairs.append((" ".join(tokens[i:]), pos))
+        pairs.sort()
+        self._keys = [k for k, _ in pairs]
+        self._postings = [p for _, p in pairs]
+        # Top-K per short prefix, memoised on first use (plain dict writes are atomic)
+        self._short: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------- Lookup ----------
+    def lookup(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Best ``limit`` entries whose label has a word run starting with ``query``."""
+        prefix = normalize_text(query)
+        if not prefix or limit <= 0:
+            return []
+
+        if len(prefix) <= SHORT_PREFIX_LEN and limit <= SHORT_PREFIX_TOP_K:
+            top = self._short.get(prefix)
+            if top is None:
+                top = self._short[prefix] = self._scan(prefix, SHORT_PREFIX_TOP_K)
+            positions = top[:limit]
+        else:
+            positions = self._scan(prefix, limit)
+
+        return [
+            {"type": kind, "slug": slug, "title": label}
+            for kind, _, slug, label, _ in (self.entries[p] for p in positions)
+        ]
+
+    def _scan(self, prefix: str, limit: int) -> List[int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return heapq.nsmallest(limit, set(self._postings[lo:hi]))
+
+    # ---------- Incremental update ----------
+    def merged(
+        self,
+        upserts: Sequence[Entry],
+        removed: Iterable[Tuple[str, str]],
+        watermark: Optional[datetime],
+    ) -> "SuggestIndex":
+        """New index with ``(type, id)`` pairs in ``removed`` dropped and ``upserts`` replacing by ``(type, id)``."""
+        drop = set(removed) | {(e[0], e[1]) for e in upserts}
+        kept = [e for e in self.entries if (e[0], e[1]) not in drop]
+        return SuggestIndex(kept + list(upserts), watermark=watermark)
+
+    # ---------- Snapshot ----------
+    def to_snapshot(self, version: str) -> bytes:
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "entries": self.entries,
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 6)
+
+    @classmethod
+    def from_snapshot(cls, blob: bytes) -> Optional["SuggestIndex"]:
+        try:
+            payload = json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError, TypeError) as exc:
+            logger.warning("SuggestIndex: unreadable snapshot: %s", exc)
+            return None
+        if payload.get("format") != SNAPSHOT_FORMAT:
+            return None
+        watermark = payload.get("watermark")
+        return cls(
+            (tuple(e) for e in payload["entries"]),
+            watermark=datetime.fromisoformat(watermark) if watermark else None,
+            version=payload.get("version"),
+        )
+
+
+class SuggestIndexStore:
+    """
+    Per-process holder of the current ``SuggestIndex``.
+
+    The request path costs at most one small cache read (the version token)
+    every ``check_interval`` seconds; snapshot loading and parsing happen on a
+    background thread so a lookup never waits for it.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        self.check_interval = check_interval
+        self._index: Optional[SuggestIndex] = None
+        self._checked_at = 0.0
+        self._loading = False
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[SuggestIndex]:
+        if self._due():
+            try:
+                self._on_version(cache.get(VERSION_KEY))
+            except Exception as exc:
+                logger.debug("SuggestIndexStore: version check failed: %s", exc)
+        return self._index
+
+    async def acurrent(self) -> Optional[SuggestIndex]:
+        if self._due():
+            try:
+                self._on_version(await cache.aget(VERSION_KEY))
+            except Exception as exc:
+                logger.debug("SuggestIndexStore: version check failed: %s", exc)
+        return self._index
+
+    def install(self, index: SuggestIndex) -> None:
+        with self._lock:
+            self._index = index
+            self._checked_at = time.monotonic()
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def _on_version(self, version: Optional[str]) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._loading or (self._index is not None and self._index.version == version):
+                return
+            self._loading = True
+        threading.Thread(target=self._load, args=(version,), name="product-suggest-loader", daemon=True).start()
+
+    def _load(self, version: Optional[str]) -> None:
+        try:
+            blob = cache.get(SNAPSHOT_KEY) if version else None
+            index = SuggestIndex.from_snapshot(blob) if blob else None
+            if index is not None:
+                self.install(index)
+            elif cache.add(BOOTSTRAP_KEY, 1, 300):
+                # Nothing published yet (fresh Redis) — ask a worker to build it
+                from apps.product.tasks import rebuild_suggest_index
+                rebuild_suggest_index.apply_async()
+        except Exception as exc:
+            logger.warning("SuggestIndexStore: snapshot load failed: %s", exc)
+        finally:
+            with self._lock:
+                self._loading = False
+
+
+suggest_index_store = SuggestIndexStore(
+    check_interval=getattr(settings, "PRODUCT_SUGGEST_CHECK_INTERVAL", 5.0),
+)
+
+
+# ── Building (Celery / management only) ──────────────────────────────────────
+
+
+def _product_score(orders_count: int, views: int, rating: Any, featured: bool) -> float:
+    return round(
+        2.0 * math.log1p(orders_count or 0)
+        + 0.5 * math.log1p(views or 0)
+        + float(rating or 0)
+        + (2.0 if featured else 0.0),
+        4,
+    )
+
+
+def _product_entry(row: Dict[str, Any]) -> Entry:
+    return (
+        "product",
+        str(row["id"]),
+        row["slug"],
+        row["title"],
+        _product_score(row["orders_count"], row["views"], row["rating"], row["featured"]),
+    )
+
+
+_PRODUCT_FIELDS = ("id", "slug", "title", "orders_count", "views", "rating", "featured")
+
+
+def build_suggest_entries() -> List[Entry]:
+    """Read every suggestible row: one query per entry type."""
+    from django.db.models import Count, Q
+
+    from apps.catalog.models import Brand, Category
+    from apps.product.models import Product, ProductStatus, ProductTag
+
+    entries: List[Entry] = [
+        _product_entry(row)
+        for row in Product.objects.filter(status=ProductStatus.PUBLISHED, is_deleted=False)
+        .values(*_PRODUCT_FIELDS)
+        .iterator(chunk_size=2000)
+    ]
+
+    live = Q(tag_products__status=ProductStatus.PUBLISHED, tag_products__is_deleted=False)
+    for tag in (
+        ProductTag.objects.annotate(live_count=Count("tag_products", filter=live))
+        .filter(live_count__gt=0)
+        .values("id", "slug", "name", "live_count")
+    ):
+        entries.append(("tag", str(tag["id"]), tag["slug"], tag["name"], round(math.log1p(tag["live_count"]), 4)))
+
+    for cat in Category.objects.exclude(slug__isnull=True).values("id", "slug", "name", "cached_product_count"):
+        entries.append((
+            "category", str(cat["id"]), cat["slug"], cat["name"],
+            round(0.5 + math.log1p(cat["cached_product_count"] or 0), 4),
+        ))
+
+    for brand in (
+        Brand.objects.filter(active=True)
+        .exclude(slug__isnull=True)
+        .values("id", "slug", "title", "cached_product_count", "premium", "verified")
+    ):
+        entries.append((
+            "brand", str(brand["id"]), brand["slug"], brand["title"],
+            round(
+                math.log1p(brand["cached_product_count"] or 0)
+                + (1.0 if brand["premium"] else 0.0)
+                + (0.5 if brand["verified"] else 0.0),
+                4,
+            ),
+        ))
+    return entries
+
+
+def publish_suggest_index(index: SuggestIndex) -> str:
+    """Write the snapshot, then flip the version token, then install locally."""
+    version = uuid.uuid4().hex
+    index.version = version
+    cache.set(SNAPSHOT_KEY, index.to_snapshot(version), None)
+    cache.set(VERSION_KEY, version, None)
+    suggest_index_store.install(index)
+    return version
+
+
+def load_published_index() -> Optional[SuggestIndex]:
+    """Read the shared snapshot directly (bypassing the per-process check interval)."""
+    blob = cache.get(SNAPSHOT_KEY)
+    return SuggestIndex.from_snapshot(blob) if blob else None
+
+
+def rebuild_full() -> SuggestIndex:
+    started = timezone.now()
+    index = SuggestIndex(build_suggest_entries(), watermark=started)
+    publish_suggest_index(index)
+    return index
+
+
+def refresh_changed_products(removed_ids: Sequence[str] = ()) -> Tuple[int, int]:
+    """
+    Merge products touched since the snapshot watermark into the snapshot.
+
+    Returns ``(upserted, removed)``.  Falls back to a full rebuild when no
+    snapshot has been published yet.
+    """
+    from django.db.models import Q
+
+    from apps.product.models import Product, ProductStatus
+
+    current = load_published_index()
+    if current is None or current.watermark is None:
+        index = rebuild_full()
+        return len(index), 0
+
+    started = timezone.now()
+    skew = timedelta(seconds=getattr(settings, "PRODUCT_SUGGEST_WATERMARK_SKEW", 120))
+    since = current.watermark - skew
+
+    upserts: List[Entry] = []
+    removed = {("product", str(pk)) for pk in removed_ids}
+    for row in (
+        Product.all_objects.filter(Q(updated_at__gte=since) | Q(deleted_at__gte=since))
+        .values(*_PRODUCT_FIELDS, "status", "is_deleted")
+        .iterator(chunk_size=2000)
+    ):
+        if row["status"] == ProductStatus.PUBLISHED and not row["is_deleted"]:
+            upserts.append(_product_entry(row))
+        else:
+            removed.add(("product", str(row["id"])))
+
+    if upserts or removed:
+        publish_suggest_index(current.merged(upserts, removed, watermark=started))
+    return len(upserts), len(removed)
+
+
+# ── Signal bridges (wired in ProductConfig.ready) ────────────────────────────
+
+
+def _schedule_refresh(removed_ids: Optional[List[str]] = None) -> None:
+    try:
+        from apps.product.tasks import refresh_suggest_index
+
+        debounce = getattr(settings, "PRODUCT_SUGGEST_DEBOUNCE", 3)
+        if removed_ids:
+            refresh_suggest_index.apply_async(kwargs={"removed_ids": removed_ids}, countdown=debounce)
+        elif cache.add(DEBOUNCE_KEY, 1, debounce * 10):
+            # One refresh per burst of saves; the task clears the key before it reads
+            refresh_suggest_index.apply_async(countdown=debounce)
+    except Exception as exc:
+        logger.debug("product suggest refresh not scheduled (Redis/Celery unavailable): %s", exc)
+
+
+def on_product_saved(sender, instance, **kwargs) -> None:
+    transaction.on_commit(_schedule_refresh)
+
+
+def on_product_deleted(sender, instance, **kwargs) -> None:
+    pk = str(instance.pk)
+    transaction.on_commit(lambda: _schedule_refresh([pk]))
+
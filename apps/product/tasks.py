@@ -0,0 +1,66 @@
+# apps/product/tasks.py
+"""Product Domain — Celery Tasks (search-as-you-type suggest index)."""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    name="product.refresh_suggest_index",
+    bind=True, max_retries=5, default_retry_delay=5, ignore_result=True,
+    soft_time_limit=60, time_limit=120,
+)
+def refresh_suggest_index(self, removed_ids=None) -> str:
+    """
+    Merge products changed since the last snapshot into the suggest index.
+
+    Enqueued (debounced) by the Product post_save / post_delete bridges and
+    every minute from beat. Publishes are serialised with a cache lock so two
+    workers never overwrite each other's snapshot.
+    """
+    from django.core.cache import cache
+
+    from apps.product.services.suggest_index import (
+        DEBOUNCE_KEY,
+        PUBLISH_LOCK_KEY,
+        refresh_changed_products,
+    )
+
+    if not cache.add(PUBLISH_LOCK_KEY, 1, 120):
+        raise self.retry(countdown=5)
+    try:
+        # Cleared before reading so saves committed from now on schedule a new run
+        cache.delete(DEBOUNCE_KEY)
+        upserted, removed = refresh_changed_products(removed_ids or ())
+        msg = f"suggest index refreshed: upserted={upserted} removed={removed}"
+        logger.debug(msg)
+        return msg
+    finally:
+        cache.delete(PUBLISH_LOCK_KEY)
+
+
+@shared_task(
+    name="product.rebuild_suggest_index",
+    bind=True, max_retries=3, default_retry_delay=30, ignore_result=True,
+    soft_time_limit=300, time_limit=600,
+)
+def rebuild_suggest_index(self) -> str:
+    """Rebuild the whole suggest index (products, tags, categories, brands) and re-score it."""
+    from django.core.cache import cache
+
+    from apps.product.services.suggest_index import PUBLISH_LOCK_KEY, rebuild_full
+
+    if not cache.add(PUBLISH_LOCK_KEY, 1, 600):
+        raise self.retry(countdown=30)
+    try:
+        index = rebuild_full()
+        msg = f"suggest index rebuilt: entries={len(index)}"
+        logger.info(msg)
+        return msg
+    except Exception as exc:
+        logger.exception("product.rebuild_suggest_index failed: %s", exc)
+        raise self.retry(exc=exc)
+    finally:
+        cache.delete(PUBLISH_LOCK_KEY)
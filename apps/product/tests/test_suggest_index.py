@@ -0,0 +1,139 @@
+# apps/product/tests/test_suggest_index.py
+"""
+Tests for the in-memory search-as-you-type suggest index.
+
+Run with:
+  pytest apps/product/tests/test_suggest_index.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+
+from apps.product.services.suggest_index import (
+    SuggestIndex,
+    load_published_index,
+    normalize_text,
+    rebuild_full,
+    refresh_changed_products,
+)
+
+
+ENTRIES = [
+    ("product", "p1", "floral-maxi-dress", "Floral Maxi Dress", 9.0),
+    ("product", "p2", "maxi-skirt", "Maxi Skirt", 4.0),
+    ("product", "p3", "ankara-maxi-dress", "Ankara Maxi-Dress", 7.0),
+    ("tag", "t1", "maxi", "Maxi", 1.0),
+    ("brand", "b1", "mainland-co", "Mainland Co", 2.0),
+    ("category", "c1", "menswear", "Ménswear", 3.0),
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INDEX STRUCTURE
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestSuggestIndex:
+    def test_normalize_text_folds_case_accents_and_punctuation(self):
+        assert normalize_text("  Ankara MAXI-Dress ") == "ankara maxi dress"
+        assert normalize_text("Ménswear") == "menswear"
+
+    def test_mid_title_word_prefix_matches_ranked_by_score(self):
+        index = SuggestIndex(ENTRIES)
+        slugs = [s["slug"] for s in index.lookup("maxi")]
+        assert slugs == ["floral-maxi-dress", "ankara-maxi-dress", "maxi-skirt", "maxi"]
+
+    def test_multi_word_prefix(self):
+        index = SuggestIndex(ENTRIES)
+        assert [s["slug"] for s in index.lookup("maxi dr")] == ["floral-maxi-dress", "ankara-maxi-dress"]
+
+    def test_short_prefix_memo_matches_full_scan(self):
+        index = SuggestIndex(ENTRIES)
+        # "ma" is served from the short-prefix memo, limit=50 forces the bisect scan
+        assert index.lookup("ma", limit=10) == index.lookup("ma", limit=50)[:10]
+        assert index.lookup("men")[0] == {"type": "category", "slug": "menswear", "title": "Ménswear"}
+
+    def test_limit_and_no_match(self):
+        index = SuggestIndex(ENTRIES)
+        assert len(index.lookup("maxi", limit=2)) == 2
+        assert index.lookup("zzz") == []
+        assert index.lookup("  ") == []
+
+    def test_merged_replaces_and_removes_by_type_and_id(self):
+        index = SuggestIndex(ENTRIES)
+        merged = index.merged(
+            [("product", "p2", "maxi-skirt", "Maxi Skirt", 20.0)],
+            [("product", "p1")],
+            watermark=None,
+        )
+        slugs = [s["slug"] for s in merged.lookup("maxi")]
+        assert slugs[0] == "maxi-skirt"
+        assert "floral-maxi-dress" not in slugs
+        assert len(merged) == len(ENTRIES) - 1
+
+    def test_snapshot_round_trip(self):
+        index = SuggestIndex(ENTRIES)
+        restored = SuggestIndex.from_snapshot(index.to_snapshot("abc"))
+        assert restored.version == "abc"
+        assert restored.lookup("maxi") == index.lookup("maxi")
+        assert SuggestIndex.from_snapshot(b"not a snapshot") is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BUILD / INCREMENTAL REFRESH
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _make_product(title, slug, **extra):
+    from apps.product.models import Product, ProductStatus
+
+    fields = dict(
+        title=title,
+        slug=slug,
+        price=Decimal("1000.00"),
+        currency="NGN",
+        stock_qty=5,
+        status=ProductStatus.PUBLISHED,
+    )
+    fields.update(extra)
+    return Product.objects.create(**fields)
+
+
+@pytest.mark.django_db
+class TestSuggestIndexBuild:
+    def test_rebuild_full_indexes_published_products_by_popularity(self):
+        from apps.product.models import ProductStatus
+
+        _make_product("Agbada Classic", "agbada-classic", orders_count=1)
+        _make_product("Agbada Royal", "agbada-royal", orders_count=500, featured=True)
+        _make_product("Agbada Draft", "agbada-draft", status=ProductStatus.DRAFT)
+
+        rebuild_full()
+
+        published = load_published_index()
+        assert [s["slug"] for s in published.lookup("agbada")] == ["agbada-royal", "agbada-classic"]
+
+    def test_refresh_merges_changed_and_soft_deleted_products(self):
+        kept = _make_product("Kaftan Blue", "kaftan-blue")
+        gone = _make_product("Kaftan Red", "kaftan-red")
+        rebuild_full()
+
+        _make_product("Kaftan Green", "kaftan-green")
+        gone.soft_delete()
+
+        refresh_changed_products()
+
+        slugs = {s["slug"] for s in load_published_index().lookup("kaftan")}
+        assert slugs == {kept.slug, "kaftan-green"}
+
+    def test_refresh_without_snapshot_does_full_build(self):
+        _make_product("Buba Set", "buba-set")
+        refresh_changed_products()
+        assert load_published_index().lookup("bu")[0]["slug"] == "buba-set"
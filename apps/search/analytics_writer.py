@@ -0,0 +1,300 @@
+# apps/search/analytics_writer.py
+"""
+Buffered, off-request writer for search analytics (SearchQuery + SearchResult).
+
+The request path only appends a small tuple to an in-process buffer.  A
+daemon flusher thread drains the buffer when it reaches ``batch_size``
+entries or every ``flush_interval`` seconds, whichever comes first, and
+persists each chunk with:
+
+  * ONE ``bulk_create`` of SearchQuery rows with pre-assigned PKs,
+  * ONE ``SELECT id`` to drop results whose SearchableContent was deleted,
+  * ONE ``bulk_create`` of SearchResult rows built from the content ids the
+    search already had in hand (no per-result ``get(id=...)``).
+
+Analytics are best-effort: if the buffer is full the oldest entry is dropped
+and counted in ``dropped``; anything still buffered at interpreter exit is
+flushed by an ``atexit`` hook.  ``SearchQuery.created_at`` is stamped at
+flush time, so it can lag the request by up to ``flush_interval`` seconds.
+
+Search ids:
+    ``record()`` returns the SearchQuery PK immediately, so responses keep
+    their ``search_id`` and audit events their ``query_id``.  On PostgreSQL
+    the PK is taken from a per-process block of values reserved from the
+    table's sequence (one ``nextval`` round trip per block); the row itself
+    is inserted by the flusher.  Backends without sequences (SQLite, MySQL)
+    insert the SearchQuery row on the request path to obtain its PK and
+    buffer only the SearchResult rows.  The id points at a row once the
+    flush ran (``get_cached_results(search_id)``); an entry dropped on
+    overflow leaves its id unused.
+
+Settings:
+    SEARCH_ANALYTICS_BATCH_SIZE      (default 200)
+    SEARCH_ANALYTICS_FLUSH_INTERVAL  (default 2.0 seconds)
+    SEARCH_ANALYTICS_MAX_BUFFER      (default 10000 entries)
+    SEARCH_ANALYTICS_EAGER           (default False — flush inline; used by tests)
+    SEARCH_ANALYTICS_ID_BLOCK        (default 100 — SearchQuery ids reserved per round trip)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import SearchableContent, SearchQuery, SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PendingSearch:
+    """One buffered search: the SearchQuery fields plus (content_id, score, snippet) per result."""
+
+    query_text: str
+    filters: Dict[str, Any]
+    user_id: Optional[Any]
+    results_count: int
+    execution_time_ms: int
+    results: List[Tuple[int, float, str]] = field(default_factory=list)
+    query_id: Optional[int] = None
+    query_saved: bool = False  # SearchQuery row already inserted on the request path
+
+
+class SearchQueryIdAllocator:
+    """SearchQuery PKs handed out before the row exists (PostgreSQL sequence blocks)."""
+
+    def __init__(self, block_size: int = 100):
+        self.block_size = block_size
+        self._ids: Deque[int] = deque()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    @property
+    def supported(self) -> bool:
+        return connection.vendor == "postgresql"
+
+    def take_reserved(self) -> Optional[int]:
+        """Next id from the current block, or None when a reservation round trip is due."""
+        with self._lock:
+            if self._ids and self._pid == os.getpid():
+                return self._ids.popleft()
+            return None
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent may still hand out the ids it reserved
+                self._ids.clear()
+                self._pid = os.getpid()
+            if not self._ids:
+                self._ids.extend(self._reserve(self.block_size))
+            return self._ids.popleft()
+
+    @staticmethod
+    def _reserve(count: int) -> List[int]:
+        opts = SearchQuery._meta
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+                [opts.db_table, opts.pk.column, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SearchAnalyticsWriter:
+    """Process-local buffer + background flusher for search analytics rows."""
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_buffer: int = 10_000,
+        eager: bool = False,
+        ids: Optional[SearchQueryIdAllocator] = None,
+    ):
+        self.ids = ids or SearchQueryIdAllocator()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.eager = eager
+        self.dropped = 0
+        self.written = 0
+        self._pending: Deque[PendingSearch] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    # ---------- Request path (non-blocking) ----------
+    def record(
+        self,
+        query_text: str,
+        filters: Optional[Dict[str, Any]],
+        user: Optional[Any],
+        results_count: int,
+        execution_time_ms: int,
+        results: Optional[List[Dict[str, Any]]] = None,
+    ) -> int:
+        """Buffer one search and return its SearchQuery id (see "Search ids" above)."""
+        entry = self._entry(query_text, filters, user, results_count, execution_time_ms, results)
+        if self.ids.supported:
+            entry.query_id = self.ids.next_id()
+        else:
+            query = self._build_query(entry)
+            query.save(force_insert=True)
+            entry.query_id, entry.query_saved = query.pk, True
+        return self._enqueue(entry)
+
+    async def arecord(self, *args, **kwargs) -> int:
+        """
+        Async ``record``: every database round trip (id block reservation,
+        request-path insert without sequences, eager flush) runs in a thread.
+        """
+        if self.eager or not self.ids.supported:
+            return await sync_to_async(self.record)(*args, **kwargs)
+        entry = self._entry(*args, **kwargs)
+        entry.query_id = self.ids.take_reserved()
+        if entry.query_id is None:
+            entry.query_id = await sync_to_async(self.ids.next_id)()
+        return self._enqueue(entry)
+
+    @staticmethod
+    def _entry(
+        query_text: str,
+        filters: Optional[Dict[str, Any]],
+        user: Optional[Any],
+        results_count: int,
+        execution_time_ms: int,
+        results: Optional[List[Dict[str, Any]]] = None,
+    ) -> PendingSearch:
+        return PendingSearch(
+            query_text=query_text,
+            filters=filters or {},
+            user_id=user.pk if user is not None and getattr(user, "is_authenticated", False) else None,
+            results_count=results_count,
+            execution_time_ms=execution_time_ms,
+            results=[(r["id"], r["combined_score"], r["snippet"]) for r in (results or [])],
+        )
+
+    def _enqueue(self, entry: PendingSearch) -> int:
+        with self._lock:
+            if len(self._pending) >= self.max_buffer:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(entry)
+            pending = len(self._pending)
+
+        if self.eager:
+            self.flush()
+            return entry.query_id
+
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return entry.query_id
+
+    # ---------- Flushing ----------
+    def flush(self) -> int:
+        """Persist everything currently buffered. Returns the number of searches persisted."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+
+            written = 0
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                try:
+                    written += self._write_chunk(chunk)
+                except Exception as exc:
+                    logger.error("SearchAnalyticsWriter: failed to persist %d searches: %s", len(chunk), exc)
+            self.written += written
+            return written
+
+    @staticmethod
+    def _build_query(entry: PendingSearch) -> SearchQuery:
+        return SearchQuery(
+            id=entry.query_id,
+            query_text=entry.query_text,
+            filters=entry.filters,
+            user_id=entry.user_id,
+            results_count=entry.results_count,
+            execution_time_ms=entry.execution_time_ms,
+        )
+
+    def _write_chunk(self, chunk: List[PendingSearch]) -> int:
+        query_objs = [self._build_query(e) for e in chunk if not e.query_saved]
+
+        with transaction.atomic():
+            if query_objs:
+                SearchQuery.objects.bulk_create(query_objs)
+
+            content_ids = {cid for e in chunk for cid, _, _ in e.results}
+            existing = set(
+                SearchableContent.objects.filter(id__in=content_ids).values_list("id", flat=True)
+            ) if content_ids else set()
+
+            result_objs = [
+                SearchResult(
+                    query_id=e.query_id,
+                    content_id=cid,
+                    relevance_score=score,
+                    rank=rank,
+                    snippet=snippet,
+                )
+                for e in chunk
+                for rank, (cid, score, snippet) in enumerate(e.results, 1)
+                if cid in existing
+            ]
+            if result_objs:
+                SearchResult.objects.bulk_create(result_objs, batch_size=1000, ignore_conflicts=True)
+
+        return len(chunk)
+
+    def _ensure_flusher(self) -> None:
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            if self._pid is not None and self._pid != pid:
+                # Forked (gunicorn/celery prefork): the parent's buffer belongs to the parent
+                self._pending.clear()
+            else:
+                atexit.register(self.flush)
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="search-analytics-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error("SearchAnalyticsWriter: flusher iteration failed: %s", exc)
+            finally:
+                close_old_connections()
+
+
+search_analytics_writer = SearchAnalyticsWriter(
+    batch_size=getattr(settings, "SEARCH_ANALYTICS_BATCH_SIZE", 200),
+    flush_interval=getattr(settings, "SEARCH_ANALYTICS_FLUSH_INTERVAL", 2.0),
+    max_buffer=getattr(settings, "SEARCH_ANALYTICS_MAX_BUFFER", 10_000),
+    eager=getattr(settings, "SEARCH_ANALYTICS_EAGER", False),
+    ids=SearchQueryIdAllocator(block_size=getattr(settings, "SEARCH_ANALYTICS_ID_BLOCK", 100)),
+)
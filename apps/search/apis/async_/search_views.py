@@ -49,7 +49,7 @@ class SearchResponse(BaseModel):
     total_count: int
     execution_time_ms: int
     query: str
-    search_id: int
+    search_id: Optional[int] = None  # None when served from the result cache
 
 
 class DashboardResponse(BaseModel):
@@ -119,7 +119,7 @@ async def execute_search(request: HttpRequest, search_request: SearchRequest):
         total_count=results['total_count'],
         execution_time_ms=results['execution_time_ms'],
         query=results['query'],
-        search_id=results['search_id'],
+        search_id=results.get('search_id'),
     )
 
 
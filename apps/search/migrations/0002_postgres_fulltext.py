@@ -0,0 +1,67 @@
+"""
+PostgreSQL full-text engine for SearchableContent.
+
+Adds (PostgreSQL only — a no-op on SQLite/MySQL):
+  * ``fts_document``  — STORED generated ``tsvector`` column (title weight A,
+    content weight B, metadata_text weight C), so Postgres keeps it in sync on
+    every INSERT/UPDATE without triggers or application code.
+  * GIN index on ``fts_document`` for ``@@`` matching.
+  * ``pg_trgm`` extension + GIN trigram index on ``title`` for the typo-tolerant
+    fallback used when the tsquery finds nothing.
+
+The column is deliberately not declared on the Django model: Django never
+writes it, and the SQLite test database does not need it.
+"""
+
+from django.db import migrations
+
+# Must match HybridSearchService.pg_text_search_config
+TS_CONFIG = "english"
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE search_searchablecontent
+    ADD COLUMN IF NOT EXISTS fts_document tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}'::regconfig, coalesce(content, '')), 'B') ||
+        setweight(to_tsvector('{TS_CONFIG}'::regconfig, coalesce(metadata_text, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS search_sc_fts_document_gin "
+    "ON search_searchablecontent USING gin (fts_document)",
+    "CREATE INDEX IF NOT EXISTS search_sc_title_trgm_gin "
+    "ON search_searchablecontent USING gin (title gin_trgm_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS search_sc_title_trgm_gin",
+    "DROP INDEX IF EXISTS search_sc_fts_document_gin",
+    "ALTER TABLE search_searchablecontent DROP COLUMN IF EXISTS fts_document",
+]
+
+
+def add_postgres_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in FORWARD_SQL:
+        schema_editor.execute(statement)
+
+
+def remove_postgres_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in REVERSE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_postgres_fulltext, reverse_code=remove_postgres_fulltext),
+    ]
@@ -1,6 +1,6 @@
 # apps/search/models.py
 """
-Search app models (compatible with MySQL FULLTEXT and SQLite fallback).
+Search app models (compatible with MySQL FULLTEXT, PostgreSQL tsvector and SQLite fallback).
 """
 
 from __future__ import annotations
@@ -43,7 +43,9 @@ class SearchableContent(models.Model):
     metadata = models.JSONField(default=dict)
     metadata_text = models.TextField(blank=True, default="")
 
-    # The fulltext_all column is created as a Generated Column for MySQL in migration 0002
+    # The fulltext_all column is created as a Generated Column for MySQL in migration 0002.
+    # On PostgreSQL, migration 0002_postgres_fulltext adds the generated tsvector column
+    # fts_document (GIN indexed) plus a pg_trgm index on title; neither is declared here.
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,271 @@
+# apps/search/result_cache.py
+"""
+Search result cache: normalized keys, single-flight fills, stale-while-revalidate.
+
+Entries are stored as ``{"results": [...], "fresh_until": <epoch>}`` with a
+hard TTL of ``ttl + stale_ttl``:
+
+  * fresh  (now < fresh_until)     → served directly.
+  * stale  (fresh_until <= now)    → served directly; ONE caller (guarded by a
+                                     ``cache.add`` lock) recomputes it in the
+                                     background.
+  * miss                           → ONE computation per key:
+        - in-process: concurrent callers wait on the leader's flight
+          (threading.Event for sync, asyncio.Future for async);
+        - cross-process: the leader takes a ``cache.add`` lock; callers that
+          lose it poll the cache for up to ``wait_timeout`` seconds before
+          computing themselves (so a crashed leader never blocks search).
+
+The async API uses Django's ``cache.aget/aadd/aset/adelete`` so the event
+loop is never blocked on cache I/O.
+
+Services are created per request, so the in-process flight registry only
+merges concurrent misses when every caller shares one instance — use
+``get_search_result_cache()`` rather than constructing the class directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Dropped from the cache key only (the query itself still runs verbatim).
+# "and"/"or"/"not" are deliberately absent: they are operators in websearch syntax.
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "for", "in", "on", "to", "with", "at", "by", "from",
+    "is", "are", "my", "me", "i", "some", "any",
+})
+_BOOLEAN_OPERATORS = re.compile(r'[+\-"*()~<>]')
+_WHITESPACE = re.compile(r"\s+")
+
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+COALESCED = "coalesced"
+
+
+def normalize_query(query_text: str) -> str:
+    """Case-fold, collapse whitespace and drop stopwords (unless that empties the query)."""
+    normalized = _WHITESPACE.sub(" ", query_text.casefold()).strip()
+    if _BOOLEAN_OPERATORS.search(normalized):
+        # Operators make word order/stopwords significant — only fold case/whitespace
+        return normalized
+    tokens = normalized.split(" ")
+    kept = [t for t in tokens if t not in STOPWORDS]
+    return " ".join(kept or tokens)
+
+
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[List[Dict[str, Any]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class SearchResultCache:
+    """Single-flight, stale-while-revalidate cache in front of the search pipeline."""
+
+    def __init__(
+        self,
+        prefix: str,
+        ttl: int,
+        stale_ttl: int,
+        lock_ttl: int = 30,
+        wait_timeout: float = 3.0,
+        poll_interval: float = 0.05,
+    ):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: Dict[str, asyncio.Future] = {}
+        self._flights_lock = threading.Lock()
+        self._background: Set[asyncio.Task] = set()
+
+    # ---------- Keys / entries ----------
+    def make_key(self, query_text: str, filters: Dict[str, Any], limit: int, boolean_mode: bool) -> str:
+        cache_data = {
+            'query': normalize_query(query_text),
+            'filters': sorted(filters.items()) if filters else [],
+            'limit': limit,
+            'boolean_mode': boolean_mode,
+        }
+        cache_hash = hashlib.md5(json.dumps(cache_data, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.prefix}{cache_hash}"
+
+    def _entry(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"results": results, "fresh_until": time.time() + self.ttl}
+
+    @staticmethod
+    def _is_fresh(entry: Dict[str, Any]) -> bool:
+        return entry.get("fresh_until", 0) > time.time()
+
+    # ---------- Sync API ----------
+    def get_or_compute(
+        self, key: str, compute: Callable[[], List[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Return ``(results, status)`` where status is hit / stale / miss / coalesced."""
+        entry = cache.get(key)
+        if entry is not None:
+            if self._is_fresh(entry):
+                return entry["results"], HIT
+            if cache.add(f"{key}:lock", 1, self.lock_ttl):
+                threading.Thread(
+                    target=self._refresh, args=(key, compute), name="search-cache-refresh", daemon=True
+                ).start()
+            return entry["results"], STALE
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.event.wait(self.wait_timeout) and flight.error is None:
+                return flight.result, COALESCED
+            return compute(), MISS
+
+        try:
+            flight.result, status = self._fill(key, compute)
+            return flight.result, status
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            flight.event.set()
+            with self._flights_lock:
+                self._flights.pop(key, None)
+
+    def _fill(self, key: str, compute: Callable[[], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], str]:
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, self.lock_ttl):
+            # Another process is computing this key — wait for its result
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry["results"], COALESCED
+            return compute(), MISS
+
+        try:
+            results = compute()
+            cache.set(key, self._entry(results), self.ttl + self.stale_ttl)
+            return results, MISS
+        finally:
+            cache.delete(lock_key)
+
+    def _refresh(self, key: str, compute: Callable[[], List[Dict[str, Any]]]) -> None:
+        try:
+            cache.set(key, self._entry(compute()), self.ttl + self.stale_ttl)
+        except Exception as exc:
+            logger.warning("Search cache background refresh failed for %s: %s", key, exc)
+        finally:
+            cache.delete(f"{key}:lock")
+            close_old_connections()
+
+    # ---------- Async API ----------
+    async def aget_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Async ``get_or_compute``; ``compute`` is a coroutine function."""
+        entry = await cache.aget(key)
+        if entry is not None:
+            if self._is_fresh(entry):
+                return entry["results"], HIT
+            if await cache.aadd(f"{key}:lock", 1, self.lock_ttl):
+                task = asyncio.create_task(self._arefresh(key, compute))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return entry["results"], STALE
+
+        loop = asyncio.get_running_loop()
+        future = self._aflights.get(key)
+        if future is not None and future.get_loop() is loop:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.wait_timeout), COALESCED
+            except Exception:
+                return await compute(), MISS
+
+        future = loop.create_future()
+        self._aflights[key] = future
+        try:
+            results, status = await self._afill(key, compute)
+            future.set_result(results)
+            return results, status
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; mark retrieved so an unawaited future does not warn
+            future.exception()
+            raise
+        finally:
+            if self._aflights.get(key) is future:
+                del self._aflights[key]
+
+    async def _afill(
+        self, key: str, compute: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        lock_key = f"{key}:lock"
+        if not await cache.aadd(lock_key, 1, self.lock_ttl):
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return entry["results"], COALESCED
+            return await compute(), MISS
+
+        try:
+            results = await compute()
+            await cache.aset(key, self._entry(results), self.ttl + self.stale_ttl)
+            return results, MISS
+        finally:
+            await cache.adelete(lock_key)
+
+    async def _arefresh(self, key: str, compute: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> None:
+        try:
+            await cache.aset(key, self._entry(await compute()), self.ttl + self.stale_ttl)
+        except Exception as exc:
+            logger.warning("Search cache background refresh failed for %s: %s", key, exc)
+        finally:
+            await cache.adelete(f"{key}:lock")
+
+
+_caches: Dict[str, SearchResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_result_cache(prefix: str, ttl: int, stale_ttl: int) -> SearchResultCache:
+    """Process-wide result cache singleton per key prefix (shares in-flight computations)."""
+    result_cache = _caches.get(prefix)
+    if result_cache is None:
+        with _caches_lock:
+            result_cache = _caches.get(prefix)
+            if result_cache is None:
+                result_cache = SearchResultCache(
+                    prefix=prefix,
+                    ttl=ttl,
+                    stale_ttl=stale_ttl,
+                    lock_ttl=getattr(settings, 'SEARCH_CACHE_LOCK_TTL', 30),
+                    wait_timeout=getattr(settings, 'SEARCH_CACHE_WAIT_TIMEOUT', 3.0),
+                )
+                _caches[prefix] = result_cache
+    return result_cache
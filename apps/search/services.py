@@ -10,16 +10,19 @@ import time
 import math
 import logging
 import hashlib
-import json
 from typing import List, Dict, Any, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.db.models.expressions import RawSQL
-from django.db.models import Q
+from django.db.models import BooleanField, FloatField, Q
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.core.cache import cache
 
-from .models import SearchableContent, SearchQuery as SearchQueryModel, SearchResult
+from .analytics_writer import search_analytics_writer
+from .models import SearchableContent
+from .result_cache import MISS, get_search_result_cache
+from .vector_index import get_semantic_index
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -44,14 +47,22 @@ class HybridSearchService:
         self.semantic_weight = getattr(settings, 'SEARCH_SEMANTIC_WEIGHT', 0.4)
         # Cache TTL in seconds (default 5 minutes)
         self.cache_ttl = getattr(settings, 'SEARCH_CACHE_TTL', 300)
-        # Cache key prefix
-        self.cache_prefix = 'search:v1:'
+        # Cache key prefix (v2: {"results", "fresh_until"} entries keyed by normalized query)
+        self.cache_prefix = 'search:v2:'
+        # Extra window after cache_ttl during which stale results are served while one refresh runs
+        self.cache_stale_ttl = getattr(settings, 'SEARCH_CACHE_STALE_TTL', 600)
         # Embedding cache TTL (default 24 hours)
         self.embedding_cache_ttl = getattr(settings, 'SEARCH_EMBEDDING_CACHE_TTL', 86400)
         # Embedding cache prefix
         self.embedding_cache_prefix = 'search:embed:v1:'
         # Enable semantic search (can be disabled if embedding service not available)
         self.semantic_enabled = getattr(settings, 'SEARCH_SEMANTIC_ENABLED', False)
+        # Postgres text search config (must match the fts_document column in migration 0002)
+        self.pg_text_search_config = 'english'
+        # Process-wide float32 embedding matrix shared by every service instance
+        self.vector_index = get_semantic_index(self.embedding_cache_prefix, self.embedding_cache_ttl)
+        # Process-wide so concurrent requests share in-flight computations (single-flight)
+        self.result_cache = get_search_result_cache(self.cache_prefix, self.cache_ttl, self.cache_stale_ttl)
 
     # ---------- Public Sync API ----------
     def search(
@@ -64,10 +75,10 @@ class HybridSearchService:
         candidate_limit: int = 300,
     ) -> Dict[str, Any]:
         """
-        1) FULLTEXT on SearchableContent (candidates)
-        2) Rerank candidates with embeddings (cosine similarity)
-        3) Combine scores
-        4) Check cache first
+        1) Check cache first (normalized key, single-flight, stale-while-revalidate)
+        2) FULLTEXT on SearchableContent (candidates)
+        3) Rerank candidates with embeddings (cosine similarity)
+        4) Combine scores
         """
         start_time = time.time()
         if not query_text or not query_text.strip():
@@ -75,75 +86,21 @@ class HybridSearchService:
 
         filters = filters or {}
 
-        # Generate cache key
-        cache_key = self._generate_cache_key(query_text, filters, limit, boolean_mode)
-        
-        # Try cache first
-        cached_results = cache.get(cache_key)
-        if cached_results:
-            exec_ms = int((time.time() - start_time) * 1000)
-            return {
-                "results": cached_results,
-                "total_count": len(cached_results),
-                "execution_time_ms": exec_ms,
-                "query": query_text,
-                "filters": filters,
-                "search_id": None,
-                "cache_hit": True,
-            }
-
-        # 1) FULLTEXT candidates or fallback on SQLite
-        fts_candidates = self._full_text_candidates(query_text, filters, candidate_limit, boolean_mode)
-
-        # If there are no candidates, return empty results
-        if not fts_candidates:
-            exec_ms = int((time.time() - start_time) * 1000)
-            sq = SearchQueryModel.objects.create(
-                query_text=query_text, filters=filters, user=user, results_count=0, execution_time_ms=exec_ms
-            )
-            return {
-                "results": [],
-                "total_count": 0,
-                "execution_time_ms": exec_ms,
-                "query": query_text,
-                "filters": filters,
-                "search_id": sq.id,
-                "cache_hit": False,
-            }
-
-        # 2) Semantic rerank on these candidates (currently without hard embedding dependency)
-        semantic_scored = self._semantic_rerank(query_text, fts_candidates)
-
-        # 3) Combine scores
-        combined_results = self._combine_results(fts_candidates, semantic_scored, limit)
-
-        # Execution time
-        execution_time_ms = int((time.time() - start_time) * 1000)
-
-        # Save query for analytics
-        search_query_obj = SearchQueryModel.objects.create(
-            query_text=query_text,
-            filters=filters,
-            user=user,
-            results_count=len(combined_results),
-            execution_time_ms=execution_time_ms,
+        cache_key = self.result_cache.make_key(query_text, filters, limit, boolean_mode)
+        results, cache_status = self.result_cache.get_or_compute(
+            cache_key,
+            lambda: self._compute_results(query_text, filters, limit, boolean_mode, candidate_limit),
         )
-
-        # Cache results
-        cache.set(cache_key, combined_results, self.cache_ttl)
-
-        # Cache results in database
-        self._cache_search_results(search_query_obj, combined_results)
-
-        return {
-            "results": combined_results,
-            "total_count": len(combined_results),
-            "execution_time_ms": execution_time_ms,
-            "query": query_text,
-            "filters": filters,
-            "search_id": search_query_obj.id,
-            "cache_hit": False,
-        }
+        response = self._build_response(query_text, filters, results, cache_status, start_time)
+        if cache_status == MISS or not results:
+            # Only the request that actually ran the pipeline records analytics;
+            # zero-result searches are always recorded (they drive catalogue gaps).
+            # Rows are buffered and persisted off the request path, the id is
+            # assigned up front.
+            response["search_id"] = search_analytics_writer.record(
+                query_text, filters, user, len(results), response["execution_time_ms"], results
+            )
+        return response
 
     # ---------- Public Async API ----------
     async def asearch(
@@ -156,11 +113,11 @@ class HybridSearchService:
         candidate_limit: int = 300,
     ) -> Dict[str, Any]:
         """
-        Async version of hybrid search using native Django 6.0 async ORM with Redis caching.
-        1) FULLTEXT on SearchableContent (candidates)
-        2) Rerank candidates with embeddings (cosine)
-        3) Combine scores
-        4) Check cache first
+        Async version of hybrid search using native Django 6.0 async ORM and async cache I/O.
+        1) Check cache first (normalized key, single-flight, stale-while-revalidate)
+        2) FULLTEXT on SearchableContent (candidates)
+        3) Rerank candidates with embeddings (cosine)
+        4) Combine scores
         """
         start_time = time.time()
         if not query_text or not query_text.strip():
@@ -168,72 +125,63 @@ class HybridSearchService:
 
         filters = filters or {}
 
-        # Generate cache key
-        cache_key = self._generate_cache_key(query_text, filters, limit, boolean_mode)
-        
-        # Try cache first (async cache get)
-        cached_results = cache.get(cache_key)
-        if cached_results:
-            exec_ms = int((time.time() - start_time) * 1000)
-            return {
-                "results": cached_results,
-                "total_count": len(cached_results),
-                "execution_time_ms": exec_ms,
-                "query": query_text,
-                "filters": filters,
-                "search_id": None,
-                "cache_hit": True,
-            }
-
-        # 1) FULLTEXT candidates using native async ORM
-        fts_candidates = await self._afull_text_candidates(query_text, filters, candidate_limit, boolean_mode)
+        async def compute() -> List[Dict[str, Any]]:
+            return await self._acompute_results(query_text, filters, limit, boolean_mode, candidate_limit)
+
+        cache_key = self.result_cache.make_key(query_text, filters, limit, boolean_mode)
+        results, cache_status = await self.result_cache.aget_or_compute(cache_key, compute)
+        response = self._build_response(query_text, filters, results, cache_status, start_time)
+        if cache_status == MISS or not results:
+            # Only the request that actually ran the pipeline records analytics;
+            # zero-result searches are always recorded.
+            response["search_id"] = await search_analytics_writer.arecord(
+                query_text, filters, user, len(results), response["execution_time_ms"], results
+            )
+        return response
 
+    # ---------- Internal: pipeline ----------
+    def _compute_results(
+        self, query_text: str, filters: Dict[str, Any], limit: int, boolean_mode: bool, candidate_limit: int
+    ) -> List[Dict[str, Any]]:
+        # 1) FULLTEXT candidates or fallback on SQLite
+        fts_candidates = self._full_text_candidates(query_text, filters, candidate_limit, boolean_mode)
         if not fts_candidates:
-            exec_ms = int((time.time() - start_time) * 1000)
-            sq = await SearchQueryModel.objects.acreate(
-                query_text=query_text, filters=filters, user=user, results_count=0, execution_time_ms=exec_ms
-            )
-            return {
-                "results": [],
-                "total_count": 0,
-                "execution_time_ms": exec_ms,
-                "query": query_text,
-                "filters": filters,
-                "search_id": sq.id,
-                "cache_hit": False,
-            }
-
-        # 2) Semantic rerank
+            return []
+        # 2) Semantic rerank on these candidates
         semantic_scored = self._semantic_rerank(query_text, fts_candidates)
+        # 3) Combine scores
+        return self._combine_results(fts_candidates, semantic_scored, limit)
 
+    async def _acompute_results(
+        self, query_text: str, filters: Dict[str, Any], limit: int, boolean_mode: bool, candidate_limit: int
+    ) -> List[Dict[str, Any]]:
+        # 1) FULLTEXT candidates using native async ORM
+        fts_candidates = await self._afull_text_candidates(query_text, filters, candidate_limit, boolean_mode)
+        if not fts_candidates:
+            return []
+        # 2) Semantic rerank (embedding cache I/O + matmul) off the event loop
+        semantic_scored = await sync_to_async(self._semantic_rerank)(query_text, fts_candidates)
         # 3) Combine scores
-        combined_results = self._combine_results(fts_candidates, semantic_scored, limit)
+        return self._combine_results(fts_candidates, semantic_scored, limit)
 
+    def _build_response(
+        self,
+        query_text: str,
+        filters: Dict[str, Any],
+        results: List[Dict[str, Any]],
+        cache_status: str,
+        start_time: float,
+    ) -> Dict[str, Any]:
         execution_time_ms = int((time.time() - start_time) * 1000)
-
-        # Save query for analytics
-        search_query_obj = await SearchQueryModel.objects.acreate(
-            query_text=query_text,
-            filters=filters,
-            user=user,
-            results_count=len(combined_results),
-            execution_time_ms=execution_time_ms,
-        )
-
-        # Cache results (async cache set)
-        cache.set(cache_key, combined_results, self.cache_ttl)
-
-        # Cache results using native async ORM
-        await self._acache_search_results(search_query_obj, combined_results)
-
         return {
-            "results": combined_results,
-            "total_count": len(combined_results),
+            "results": results,
+            "total_count": len(results),
             "execution_time_ms": execution_time_ms,
             "query": query_text,
             "filters": filters,
-            "search_id": search_query_obj.id,
-            "cache_hit": False,
+            "search_id": None,  # set when the search is recorded
+            "cache_hit": cache_status != MISS,
+            "cache_status": cache_status,
         }
 
     # ---------- Internal: FULLTEXT or fallback (Async) ----------
@@ -244,62 +192,18 @@ class HybridSearchService:
         candidate_limit: int,
         boolean_mode: bool,
     ) -> List[Dict[str, Any]]:
-        """Async FULLTEXT with MATCH ... AGAINST if MySQL; otherwise fallback to contains/icontains."""
+        """Async FULLTEXT: MATCH ... AGAINST on MySQL, tsvector + trigram on Postgres, icontains otherwise."""
         try:
-            qs = SearchableContent.objects.all()
-
-            # Apply filters
-            if filters.get("encounter_id"):
-                qs = qs.filter(encounter_id=filters["encounter_id"])
-            if filters.get("content_type"):
-                cts = filters["content_type"]
-                if isinstance(cts, str):
-                    cts = [cts]
-                qs = qs.filter(content_type__in=cts)
-            if filters.get("date_from"):
-                qs = qs.filter(created_at__gte=filters["date_from"])
-            if filters.get("date_to"):
-                qs = qs.filter(created_at__lte=filters["date_to"])
-
-            engine = settings.DATABASES.get('default', {}).get('ENGINE', '')
-            is_mysql = 'mysql' in engine or 'mariadb' in engine
-
-            if is_mysql:
-                mode_sql = "IN BOOLEAN MODE" if boolean_mode else "IN NATURAL LANGUAGE MODE"
-                raw = RawSQL(f"MATCH(fulltext_all) AGAINST (%s {mode_sql})", (query_text,))
-                results = (
-                    qs.annotate(relevance=raw)
-                      .filter(relevance__gt=0)
-                      .only("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                      .order_by("-relevance", "-created_at")[:candidate_limit]
-                      .values("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata", "relevance")
-                )
-            else:
-                # SQLite/Postgres fallback: simple icontains with basic weighting
-                text_q = Q(title__icontains=query_text) | Q(content__icontains=query_text) | Q(metadata_text__icontains=query_text)
-                results = (
-                    qs.filter(text_q)
-                      .only("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                      .order_by("-created_at")[:candidate_limit]
-                      .values("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                )
-                # Add simple relevance (length of matched text as approximation)
-                for r in results:
-                    r["relevance"] = float(len(query_text))
-
-            formatted: List[Dict[str, Any]] = []
-            for r in results:
-                formatted.append({
-                    "id": r["id"],
-                    "encounter_id": r.get("encounter_id"),
-                    "content_type": r["content_type"],
-                    "content_id": r["content_id"],
-                    "title": r["title"],
-                    "content": r["content"],
-                    "metadata": r.get("metadata") or {},
-                    "keyword_relevance": float(r.get("relevance", 1.0)),
-                })
-            return formatted
+            engine = self._fts_engine()
+            qs = self._candidate_queryset(engine, query_text, filters, candidate_limit, boolean_mode)
+            rows = [r async for r in qs]
+
+            if not rows and engine == "postgres":
+                # Nothing matched the tsquery: retry tolerant of typos via pg_trgm
+                qs = self._trigram_candidate_queryset(query_text, filters, candidate_limit)
+                rows = [r async for r in qs]
+
+            return self._format_candidates(rows, query_text)
 
         except Exception as e:
             logger.error(f"Async FULLTEXT/fallback search failed: {e}")
@@ -313,73 +217,135 @@ class HybridSearchService:
         candidate_limit: int,
         boolean_mode: bool,
     ) -> List[Dict[str, Any]]:
-        """FULLTEXT with MATCH ... AGAINST if MySQL; otherwise fallback to contains/icontains."""
+        """FULLTEXT: MATCH ... AGAINST on MySQL, tsvector + trigram on Postgres, icontains otherwise."""
         try:
-            qs = SearchableContent.objects.all()
-
-            # Apply filters
-            if filters.get("encounter_id"):
-                qs = qs.filter(encounter_id=filters["encounter_id"])
-            if filters.get("content_type"):
-                cts = filters["content_type"]
-                if isinstance(cts, str):
-                    cts = [cts]
-                qs = qs.filter(content_type__in=cts)
-            if filters.get("date_from"):
-                qs = qs.filter(created_at__gte=filters["date_from"])
-            if filters.get("date_to"):
-                qs = qs.filter(created_at__lte=filters["date_to"])
-
-            engine = settings.DATABASES.get('default', {}).get('ENGINE', '')
-            is_mysql = 'mysql' in engine or 'mariadb' in engine
-
-            if is_mysql:
-                mode_sql = "IN BOOLEAN MODE" if boolean_mode else "IN NATURAL LANGUAGE MODE"
-                raw = RawSQL(f"MATCH(fulltext_all) AGAINST (%s {mode_sql})", (query_text,))
-                results = (
-                    qs.annotate(relevance=raw)
-                      .filter(relevance__gt=0)
-                      .only("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                      .order_by("-relevance", "-created_at")[:candidate_limit]
-                      .values("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata", "relevance")
-                )
-            else:
-                # SQLite/Postgres fallback: simple icontains with basic weighting
-                text_q = Q(title__icontains=query_text) | Q(content__icontains=query_text) | Q(metadata_text__icontains=query_text)
-                results = (
-                    qs.filter(text_q)
-                      .only("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                      .order_by("-created_at")[:candidate_limit]
-                      .values("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
-                )
-                # Add simple relevance (length of matched text as approximation)
-                for r in results:
-                    r["relevance"] = float(len(query_text))
-
-            formatted: List[Dict[str, Any]] = []
-            for r in results:
-                formatted.append({
-                    "id": r["id"],
-                    "encounter_id": r.get("encounter_id"),
-                    "content_type": r["content_type"],
-                    "content_id": r["content_id"],
-                    "title": r["title"],
-                    "content": r["content"],
-                    "metadata": r.get("metadata") or {},
-                    "keyword_relevance": float(r.get("relevance", 1.0)),
-                })
-            return formatted
+            engine = self._fts_engine()
+            qs = self._candidate_queryset(engine, query_text, filters, candidate_limit, boolean_mode)
+            rows = list(qs)
+
+            if not rows and engine == "postgres":
+                # Nothing matched the tsquery: retry tolerant of typos via pg_trgm
+                qs = self._trigram_candidate_queryset(query_text, filters, candidate_limit)
+                rows = list(qs)
+
+            return self._format_candidates(rows, query_text)
 
         except Exception as e:
             logger.error(f"FULLTEXT/fallback search failed: {e}")
             return []
 
-    # ---------- Internal: Semantic rerank (placeholder with embedding cache) ----------
+    # ---------- Internal: candidate query builders ----------
+    _CANDIDATE_FIELDS = ("id", "encounter_id", "content_type", "content_id", "title", "content", "metadata")
+
+    def _fts_engine(self) -> str:
+        """Pick the candidate engine for the configured database backend."""
+        engine = settings.DATABASES.get('default', {}).get('ENGINE', '')
+        if 'mysql' in engine or 'mariadb' in engine:
+            return "mysql"
+        if 'postgresql' in engine or 'postgis' in engine:
+            return "postgres"
+        return "fallback"
+
+    def _filtered_queryset(self, filters: Dict[str, Any]):
+        qs = SearchableContent.objects.all()
+
+        if filters.get("encounter_id"):
+            qs = qs.filter(encounter_id=filters["encounter_id"])
+        if filters.get("content_type"):
+            cts = filters["content_type"]
+            if isinstance(cts, str):
+                cts = [cts]
+            qs = qs.filter(content_type__in=cts)
+        if filters.get("date_from"):
+            qs = qs.filter(created_at__gte=filters["date_from"])
+        if filters.get("date_to"):
+            qs = qs.filter(created_at__lte=filters["date_to"])
+        return qs
+
+    def _candidate_queryset(
+        self,
+        engine: str,
+        query_text: str,
+        filters: Dict[str, Any],
+        candidate_limit: int,
+        boolean_mode: bool,
+    ):
+        qs = self._filtered_queryset(filters)
+
+        if engine == "mysql":
+            mode_sql = "IN BOOLEAN MODE" if boolean_mode else "IN NATURAL LANGUAGE MODE"
+            raw = RawSQL(f"MATCH(fulltext_all) AGAINST (%s {mode_sql})", (query_text,))
+            return (
+                qs.annotate(relevance=raw)
+                  .filter(relevance__gt=0)
+                  .order_by("-relevance", "-created_at")[:candidate_limit]
+                  .values(*self._CANDIDATE_FIELDS, "relevance")
+            )
+
+        if engine == "postgres":
+            # fts_document is the generated tsvector column from migration 0002 (GIN indexed).
+            # boolean_mode -> websearch syntax ("quoted phrases", OR, -exclude); else plain AND of terms.
+            parser = "websearch_to_tsquery" if boolean_mode else "plainto_tsquery"
+            tsquery = f"{parser}(%s::regconfig, %s)"
+            params = (self.pg_text_search_config, query_text)
+            return (
+                qs.annotate(
+                    fts_match=RawSQL(f"fts_document @@ {tsquery}", params, output_field=BooleanField()),
+                    # normalization 32 => rank / (rank + 1), bounded to [0, 1)
+                    relevance=RawSQL(f"ts_rank_cd(fts_document, {tsquery}, 32)", params, output_field=FloatField()),
+                )
+                  .filter(fts_match=True)
+                  .order_by("-relevance", "-created_at")[:candidate_limit]
+                  .values(*self._CANDIDATE_FIELDS, "relevance")
+            )
+
+        # SQLite fallback: simple icontains with basic weighting
+        text_q = Q(title__icontains=query_text) | Q(content__icontains=query_text) | Q(metadata_text__icontains=query_text)
+        return (
+            qs.filter(text_q)
+              .order_by("-created_at")[:candidate_limit]
+              .values(*self._CANDIDATE_FIELDS)
+        )
+
+    def _trigram_candidate_queryset(self, query_text: str, filters: Dict[str, Any], candidate_limit: int):
+        """Typo-tolerant title match (pg_trgm ``<%`` uses the title GIN trigram index)."""
+        return (
+            self._filtered_queryset(filters)
+              .annotate(
+                  trgm_match=RawSQL("%s <%% title", (query_text,), output_field=BooleanField()),
+                  relevance=RawSQL("word_similarity(%s, title)", (query_text,), output_field=FloatField()),
+              )
+              .filter(trgm_match=True)
+              .order_by("-relevance", "-created_at")[:candidate_limit]
+              .values(*self._CANDIDATE_FIELDS, "relevance")
+        )
+
+    def _format_candidates(self, rows: List[Dict[str, Any]], query_text: str) -> List[Dict[str, Any]]:
+        formatted: List[Dict[str, Any]] = []
+        for r in rows:
+            # icontains fallback has no relevance: length of matched text as approximation
+            relevance = r.get("relevance", float(len(query_text)))
+            formatted.append({
+                "id": r["id"],
+                "encounter_id": r.get("encounter_id"),
+                "content_type": r["content_type"],
+                "content_id": r["content_id"],
+                "title": r["title"],
+                "content": r["content"],
+                "metadata": r.get("metadata") or {},
+                "keyword_relevance": float(relevance if relevance is not None else 1.0),
+            })
+        return formatted
+
+    # ---------- Internal: Semantic rerank (vectorized, embedding cache) ----------
     def _semantic_rerank(self, query_text: str, candidates: List[Dict[str, Any]]) -> Dict[Tuple[int, str, int], float]:
         """
-        Rerank based on embedding distance (smaller is better). 
+        Rerank based on embedding distance (smaller is better).
         Returns empty dict if embedding service is not available or disabled.
-        Implements embedding caching to reduce API calls.
+
+        Candidate embeddings come from the process-wide SemanticVectorIndex:
+        non-resident vectors are loaded with one cache multi-get and all
+        candidates are scored in a single float32 matmul.
         """
         if not self.semantic_enabled:
             return {}
@@ -388,33 +354,23 @@ class HybridSearchService:
             # Try to get cached query embedding
             query_cache_key = f"{self.embedding_cache_prefix}query:{hashlib.md5(query_text.encode()).hexdigest()}"
             query_vec = cache.get(query_cache_key)
-            
+
             if query_vec is None:
                 query_vec = self._make_query_embedding(query_text)
                 cache.set(query_cache_key, query_vec, self.embedding_cache_ttl)
-            
+
+            self.vector_index.ensure(
+                {c["id"]: f"{c.get('title', '')} {c.get('content', '')}" for c in candidates},
+                self._make_query_embedding,
+            )
+            similarities = self.vector_index.similarities(query_vec, [c["id"] for c in candidates])
+
             distances: Dict[Tuple[int, str, int], float] = {}
-            
-            for c in candidates:
+            for c, similarity in zip(candidates, similarities.tolist()):
                 key = (c.get("encounter_id") or 0, c["content_type"], c["content_id"])
-                
-                # Try to get cached content embedding
-                content_cache_key = f"{self.embedding_cache_prefix}content:{c['id']}"
-                content_vec = cache.get(content_cache_key)
-                
-                if content_vec is None:
-                    # Generate content embedding from title + content
-                    content_text = f"{c.get('title', '')} {c.get('content', '')}"
-                    content_vec = self._make_query_embedding(content_text)
-                    cache.set(content_cache_key, content_vec, self.embedding_cache_ttl)
-                
-                # Calculate cosine similarity (1 - distance)
-                if query_vec and content_vec:
-                    similarity = self._cosine_similarity(query_vec, content_vec)
-                    distances[key] = 1.0 - similarity  # Convert to distance (smaller is better)
-                else:
-                    distances[key] = 0.5  # Fallback static value
-            
+                # NaN = no usable vector for this candidate -> fallback static value
+                distances[key] = 0.5 if math.isnan(similarity) else 1.0 - similarity
+
             return distances
         except Exception as e:
             logger.warning(f"Semantic rerank failed: {e}")
@@ -465,17 +421,6 @@ class HybridSearchService:
         return results[:limit]
 
     # ---------- Helpers ----------
-    def _generate_cache_key(self, query_text: str, filters: Dict[str, Any], limit: int, boolean_mode: bool) -> str:
-        """Generate a unique cache key for search parameters."""
-        cache_data = {
-            'query': query_text.lower().strip(),
-            'filters': sorted(filters.items()) if filters else [],
-            'limit': limit,
-            'boolean_mode': boolean_mode,
-        }
-        cache_hash = hashlib.md5(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()
-        return f"{self.cache_prefix}{cache_hash}"
-
     def _generate_snippet(self, content: str, query_text: str, max_length: int = 200) -> str:
         if not content:
             return ""
@@ -484,50 +429,6 @@ class HybridSearchService:
             snippet += "..."
         return snippet
 
-    async def _acache_search_results(self, search_query_obj: SearchQueryModel, results: List[Dict[str, Any]]):
-        """Async version of cache search results using native Django 6.0 async ORM."""
-        try:
-            await SearchResult.objects.filter(query=search_query_obj).adelete()
-            bulk = []
-            for rank, r in enumerate(results, 1):
-                try:
-                    sc = await SearchableContent.objects.aget(id=r["id"])
-                except SearchableContent.DoesNotExist:
-                    continue
-                bulk.append(SearchResult(
-                    query=search_query_obj,
-                    content=sc,
-                    relevance_score=r["combined_score"],
-                    rank=rank,
-                    snippet=r["snippet"],
-                ))
-            if bulk:
-                await SearchResult.objects.abulk_create(bulk)
-        except Exception as e:
-            logger.error(f"Failed to cache search results (async): {e}")
-
-    def _cache_search_results(self, search_query_obj: SearchQueryModel, results: List[Dict[str, Any]]):
-        """Sync version of cache search results."""
-        try:
-            SearchResult.objects.filter(query=search_query_obj).delete()
-            bulk = []
-            for rank, r in enumerate(results, 1):
-                try:
-                    sc = SearchableContent.objects.get(id=r["id"])
-                except SearchableContent.DoesNotExist:
-                    continue
-                bulk.append(SearchResult(
-                    query=search_query_obj,
-                    content=sc,
-                    relevance_score=r["combined_score"],
-                    rank=rank,
-                    snippet=r["snippet"],
-                ))
-            if bulk:
-                SearchResult.objects.bulk_create(bulk)
-        except Exception as e:
-            logger.error(f"Failed to cache search results: {e}")
-
     def _make_query_embedding(self, text: str) -> List[float]:
         """Generate embedding for text (placeholder for actual embedding service integration)."""
         # TODO: Integrate with actual embedding service (OpenAI, SentenceTransformers, etc.)
@@ -537,17 +438,3 @@ class HybridSearchService:
         vec = [random.random() for _ in range(64)]  # Placeholder dimensions until integration
         s = math.sqrt(sum(x*x for x in vec)) or 1.0
         return [x / s for x in vec]
-
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
-            return 0.0
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(b * b for b in vec2))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        return dot_product / (magnitude1 * magnitude2)
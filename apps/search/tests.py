@@ -1,8 +1,16 @@
-from django.test import TestCase
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 
-from .models import SearchableContent
+from .analytics_writer import SearchAnalyticsWriter, SearchQueryIdAllocator
+from .models import SearchableContent, SearchQuery, SearchResult
+from .result_cache import (
+    COALESCED, HIT, MISS, STALE, SearchResultCache, get_search_result_cache, normalize_query,
+)
+from .vector_index import SemanticVectorIndex
 
 
 class SearchAPITest(TestCase):
@@ -32,3 +40,201 @@ class SearchAPITest(TestCase):
         res = self.client.get(url)
         self.assertIn(res.status_code, [200, 400])
 
+
+class SemanticVectorIndexTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = SemanticVectorIndex(cache_prefix='search:embed:test:', cache_ttl=60, initial_capacity=2)
+
+    def test_similarities_match_cosine_and_keep_input_order(self):
+        self.index.add_many({1: [1.0, 0.0], 2: [0.0, 2.0], 3: [1.0, 1.0]})
+        sims = self.index.similarities([1.0, 0.0], [3, 1, 2, 99])
+        self.assertAlmostEqual(float(sims[0]), 2 ** -0.5, places=5)
+        self.assertAlmostEqual(float(sims[1]), 1.0, places=5)
+        self.assertAlmostEqual(float(sims[2]), 0.0, places=5)
+        self.assertTrue(sims[3] != sims[3])  # NaN for non-resident id
+
+    def test_ensure_uses_cache_then_embeds_only_misses(self):
+        cache.set('search:embed:test:content:1', [1.0, 0.0])
+        embedded = []
+
+        def embed(text):
+            embedded.append(text)
+            return [0.0, 1.0]
+
+        self.index.ensure({1: 'cached', 2: 'fresh'}, embed)
+        self.assertEqual(embedded, ['fresh'])
+        self.assertEqual(cache.get('search:embed:test:content:2'), [0.0, 1.0])
+        self.assertIn(1, self.index)
+        self.assertIn(2, self.index)
+
+    def test_discard_and_top_k(self):
+        self.index.add_many({1: [1.0, 0.0], 2: [0.0, 1.0], 3: [0.9, 0.1]})
+        self.index.discard([1])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual([cid for cid, _ in self.index.top_k([1.0, 0.0], 2)], [3, 2])
+
+
+class _ReservedIds(SearchQueryIdAllocator):
+    """Sequence-backed allocation stand-in for the SQLite test database."""
+
+    supported = True
+
+    def __init__(self):
+        super().__init__()
+        self._next = 1000
+        self.reserved_on = []
+
+    def next_id(self):
+        self.reserved_on.append(threading.get_ident())
+        self._next += 1
+        return self._next
+
+
+class SearchAnalyticsWriterTest(TestCase):
+    def test_flush_bulk_writes_queries_and_results_skipping_deleted_content(self):
+        live = SearchableContent.objects.create(content_type='notes', content_id=1, title='a', content='a')
+        writer = SearchAnalyticsWriter(batch_size=10, ids=_ReservedIds())
+        writer._ensure_flusher = lambda: None  # flush explicitly below
+        results = [
+            {'id': live.id, 'combined_score': 0.9, 'snippet': 'a'},
+            {'id': live.id + 999, 'combined_score': 0.5, 'snippet': 'gone'},
+        ]
+        search_id = writer.record('a', {}, None, 2, 5, results)
+        writer.record('b', {}, None, 0, 3)
+
+        self.assertEqual(SearchQuery.objects.count(), 0)
+        self.assertEqual(writer.flush(), 2)
+
+        query = SearchQuery.objects.get(query_text='a')
+        self.assertEqual(query.pk, search_id)
+        self.assertEqual(list(query.cached_results.values_list('content_id', 'rank')), [(live.id, 1)])
+        self.assertEqual(SearchResult.objects.count(), 1)
+
+    def test_without_sequences_query_row_is_written_on_record(self):
+        live = SearchableContent.objects.create(content_type='notes', content_id=1, title='a', content='a')
+        writer = SearchAnalyticsWriter(batch_size=10)  # SQLite: no sequence to reserve from
+        writer._ensure_flusher = lambda: None
+        search_id = writer.record('a', {}, None, 1, 5, [{'id': live.id, 'combined_score': 0.9, 'snippet': 'a'}])
+
+        self.assertEqual(SearchQuery.objects.get(pk=search_id).query_text, 'a')
+        self.assertEqual(SearchResult.objects.count(), 0)
+        writer.flush()
+        self.assertEqual(list(SearchResult.objects.values_list('query_id', flat=True)), [search_id])
+
+    def test_search_response_carries_the_recorded_search_id(self):
+        from unittest import mock
+
+        from .services import HybridSearchService
+
+        cache.clear()
+        live = SearchableContent.objects.create(content_type='notes', content_id=1, title='linen', content='linen shirt')
+        hit = {'id': live.id, 'combined_score': 0.9, 'snippet': 'linen'}
+        with mock.patch.object(HybridSearchService, '_compute_results', return_value=[hit]):
+            response = HybridSearchService().search('linen')  # SEARCH_ANALYTICS_EAGER in tests
+
+        self.assertIsNotNone(response['search_id'])
+        self.assertEqual(SearchQuery.objects.get(pk=response['search_id']).query_text, 'linen')
+
+    def test_cached_zero_result_searches_are_still_recorded(self):
+        from unittest import mock
+
+        from .services import HybridSearchService
+
+        cache.clear()
+        with mock.patch.object(HybridSearchService, '_compute_results', return_value=[]) as compute:
+            first = HybridSearchService().search('velvet cape')
+            second = HybridSearchService().search('velvet cape')
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertTrue(second['cache_hit'])
+        self.assertNotEqual(first['search_id'], second['search_id'])
+        self.assertEqual(SearchQuery.objects.filter(query_text='velvet cape', results_count=0).count(), 2)
+
+    def test_arecord_reserves_ids_off_the_event_loop(self):
+        import asyncio
+
+        ids = _ReservedIds()
+        writer = SearchAnalyticsWriter(batch_size=10, ids=ids)
+        writer._ensure_flusher = lambda: None
+
+        async def run():
+            return threading.get_ident(), await writer.arecord('a', {}, None, 0, 1)
+
+        loop_thread, search_id = asyncio.run(run())
+        self.assertEqual(search_id, 1001)
+        self.assertEqual(len(ids.reserved_on), 1)
+        self.assertNotEqual(ids.reserved_on[0], loop_thread)
+
+    def test_buffer_overflow_drops_oldest(self):
+        writer = SearchAnalyticsWriter(batch_size=10, max_buffer=2, ids=_ReservedIds())
+        writer._ensure_flusher = lambda: None
+        for text in ('x', 'y', 'z'):
+            writer.record(text, {}, None, 0, 1)
+        self.assertEqual(writer.dropped, 1)
+        writer.flush()
+        self.assertEqual(sorted(SearchQuery.objects.values_list('query_text', flat=True)), ['y', 'z'])
+
+
+class SearchResultCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.result_cache = SearchResultCache(prefix='search:test:', ttl=60, stale_ttl=60, wait_timeout=1.0)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  The Red   DRESS for me '), 'red dress')
+        self.assertEqual(normalize_query('the'), 'the')
+        self.assertEqual(normalize_query('"The Red" -dress'), '"the red" -dress')
+        self.assertEqual(
+            self.result_cache.make_key('Red dress', {}, 20, True),
+            self.result_cache.make_key('a  red DRESS', {}, 20, True),
+        )
+
+    def test_miss_then_hit(self):
+        calls = []
+        compute = lambda: calls.append(1) or [{'id': 1}]
+        self.assertEqual(self.result_cache.get_or_compute('k', compute), ([{'id': 1}], MISS))
+        self.assertEqual(self.result_cache.get_or_compute('k', compute), ([{'id': 1}], HIT))
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        cache.set('k', {'results': [{'id': 'old'}], 'fresh_until': 0})
+        refreshed = []
+        results, status = self.result_cache.get_or_compute('k', lambda: refreshed.append(1) or [{'id': 'new'}])
+        self.assertEqual((results, status), ([{'id': 'old'}], STALE))
+
+        for thread in threading.enumerate():
+            if thread.name == 'search-cache-refresh':
+                thread.join(timeout=2)
+        self.assertEqual(refreshed, [1])
+        self.assertEqual(self.result_cache.get_or_compute('k', lambda: []), ([{'id': 'new'}], HIT))
+
+    def test_services_share_one_cache_per_prefix(self):
+        from .services import HybridSearchService
+
+        self.assertIs(HybridSearchService().result_cache, HybridSearchService().result_cache)
+        self.assertIs(get_search_result_cache('search:test:', 60, 60), get_search_result_cache('search:test:', 60, 60))
+
+    def test_concurrent_misses_compute_once(self):
+        import threading
+        import time as _time
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            _time.sleep(0.2)
+            return [{'id': 1}]
+
+        statuses = []
+        threads = [
+            threading.Thread(target=lambda: statuses.append(self.result_cache.get_or_compute('k', compute)[1]))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(statuses.count(MISS), 1)
+        self.assertEqual(statuses.count(COALESCED), 4)
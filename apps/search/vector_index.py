@@ -0,0 +1,252 @@
+# apps/search/vector_index.py
+"""
+In-process vector index for the semantic rerank stage.
+
+Every SearchableContent embedding a worker has seen lives in one contiguous
+float32 matrix (rows L2-normalised), so scoring N candidates is a single
+``(N x D) @ (D,)`` matmul instead of N pure-Python cosine loops.
+
+Vectors that are not resident yet are pulled from the shared Redis embedding
+cache with ONE ``cache.get_many`` round-trip; only true misses are embedded
+and written back with ONE ``cache.set_many``.  The cache keys and value
+format (plain float lists under ``search:embed:v1:content:<id>``) are the
+same ones the per-candidate implementation used, so warm Redis entries are
+reused as-is.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticVectorIndex:
+    """
+    Growable row-major float32 embedding matrix keyed by SearchableContent id.
+
+    Thread-safe: ASGI thread-pool workers share one index per process.
+    Rows are never rewritten in place — a content row that changes is
+    re-embedded when the whole index ages out (``cache_ttl`` seconds, the same
+    TTL as the Redis embedding cache) or when ``discard()`` is called for its id.
+    """
+
+    def __init__(
+        self,
+        cache_prefix: str,
+        cache_ttl: int,
+        max_rows: int = 200_000,
+        initial_capacity: int = 1024,
+    ):
+        self.cache_prefix = cache_prefix
+        self.cache_ttl = cache_ttl
+        self.max_rows = max_rows
+        self._initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._reset()
+
+    # ---------- Introspection ----------
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, content_id: int) -> bool:
+        return content_id in self._row_of
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    # ---------- Mutation ----------
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def add_many(self, vectors: Mapping[int, Sequence[float]]) -> None:
+        """Insert or overwrite rows. Vectors of the wrong dimension are skipped."""
+        if not vectors:
+            return
+        with self._lock:
+            for content_id, vec in vectors.items():
+                arr = np.asarray(vec, dtype=np.float32)
+                if arr.ndim != 1 or arr.size == 0:
+                    continue
+                if self._matrix is None:
+                    self._matrix = np.zeros((self._initial_capacity, arr.size), dtype=np.float32)
+                elif arr.size != self._matrix.shape[1]:
+                    logger.warning(
+                        "SemanticVectorIndex: dimension mismatch for content %s (%d != %d)",
+                        content_id, arr.size, self._matrix.shape[1],
+                    )
+                    continue
+
+                norm = float(np.linalg.norm(arr))
+                if norm > 0:
+                    arr = arr / norm
+
+                row = self._row_of.get(content_id)
+                if row is None:
+                    if self._size >= self._matrix.shape[0]:
+                        self._grow()
+                    row = self._size
+                    self._row_of[content_id] = row
+                    self._ids.append(content_id)
+                    self._size += 1
+                self._matrix[row] = arr
+
+    def discard(self, content_ids: Iterable[int]) -> None:
+        """Drop rows (swap-with-last keeps the matrix dense)."""
+        with self._lock:
+            for content_id in content_ids:
+                row = self._row_of.pop(content_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved_id
+                    self._row_of[moved_id] = row
+                self._ids.pop()
+                self._size -= 1
+
+    def ensure(self, texts: Mapping[int, str], embed_fn: Callable[[str], List[float]]) -> None:
+        """
+        Make sure every id in ``texts`` is resident.
+
+        Missing ids are fetched from Redis in one multi-get; anything still
+        missing is embedded from its text and written back in one multi-set.
+        """
+        self._expire_if_stale()
+
+        with self._lock:
+            missing = [cid for cid in texts if cid not in self._row_of]
+        if not missing:
+            return
+
+        keys = {f"{self.cache_prefix}content:{cid}": cid for cid in missing}
+        try:
+            found = cache.get_many(list(keys))
+        except Exception as exc:
+            logger.warning("SemanticVectorIndex: embedding multi-get failed: %s", exc)
+            found = {}
+
+        vectors: Dict[int, Sequence[float]] = {keys[k]: v for k, v in found.items() if v}
+
+        computed: Dict[str, List[float]] = {}
+        for cid in missing:
+            if cid in vectors:
+                continue
+            vec = embed_fn(texts[cid])
+            if vec:
+                vectors[cid] = vec
+                computed[f"{self.cache_prefix}content:{cid}"] = vec
+
+        if computed:
+            try:
+                cache.set_many(computed, self.cache_ttl)
+            except Exception as exc:
+                logger.warning("SemanticVectorIndex: embedding multi-set failed: %s", exc)
+
+        self.add_many(vectors)
+
+    # ---------- Scoring ----------
+    def similarities(self, query_vec: Sequence[float], content_ids: Sequence[int]) -> np.ndarray:
+        """
+        Cosine similarity of ``query_vec`` against each id, in input order.
+
+        Ids that are not resident get NaN so callers can apply their own fallback.
+        """
+        out = np.full(len(content_ids), np.nan, dtype=np.float32)
+        q = self._normalise_query(query_vec)
+        if q is None or len(content_ids) == 0:
+            return out
+
+        with self._lock:
+            rows = np.fromiter(
+                (self._row_of.get(cid, -1) for cid in content_ids),
+                dtype=np.intp,
+                count=len(content_ids),
+            )
+            present = rows >= 0
+            if present.any():
+                out[present] = self._matrix[rows[present]] @ q
+        return out
+
+    def top_k(self, query_vec: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """
+        Exact nearest neighbours over every resident row (one matmul + argpartition).
+
+        Returns ``[(content_id, similarity), ...]`` best first.
+        """
+        q = self._normalise_query(query_vec)
+        if q is None or k <= 0:
+            return []
+
+        with self._lock:
+            if self._size == 0:
+                return []
+            scores = self._matrix[: self._size] @ q
+            k = min(k, self._size)
+            idx = np.argpartition(-scores, k - 1)[:k]
+            idx = idx[np.argsort(-scores[idx])]
+            return [(self._ids[i], float(scores[i])) for i in idx]
+
+    # ---------- Internals ----------
+    def _reset(self) -> None:
+        self._matrix: Optional[np.ndarray] = None
+        self._row_of: Dict[int, int] = {}
+        self._ids: List[int] = []
+        self._size = 0
+        self._built_at = time.monotonic()
+
+    def _grow(self) -> None:
+        capacity = self._matrix.shape[0] * 2
+        grown = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+
+    def _expire_if_stale(self) -> None:
+        with self._lock:
+            if (
+                time.monotonic() - self._built_at > self.cache_ttl
+                or self._size >= self.max_rows
+            ):
+                self._reset()
+
+    def _normalise_query(self, query_vec: Sequence[float]) -> Optional[np.ndarray]:
+        if self._matrix is None or query_vec is None or len(query_vec) == 0:
+            return None
+        q = np.asarray(query_vec, dtype=np.float32)
+        if q.ndim != 1 or q.size != self._matrix.shape[1]:
+            return None
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return None
+        return q / norm
+
+
+_indexes: Dict[str, SemanticVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_semantic_index(cache_prefix: str, cache_ttl: int) -> SemanticVectorIndex:
+    """Process-wide index singleton per embedding cache namespace."""
+    index = _indexes.get(cache_prefix)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(cache_prefix)
+            if index is None:
+                index = SemanticVectorIndex(
+                    cache_prefix=cache_prefix,
+                    cache_ttl=cache_ttl,
+                    max_rows=getattr(settings, 'SEARCH_VECTOR_INDEX_MAX_ROWS', 200_000),
+                )
+                _indexes[cache_prefix] = index
+    return index
@@ -4,7 +4,9 @@ backend/asgi.py
 ASGI application entrypoint for Fashionistar.
 
 HTTP requests stay on Django's standard ASGI app. WebSocket traffic is routed
-through the modular app registry with JWT query-string authentication.
+through the modular app registry with JWT query-string authentication. The
+lifespan protocol registers the server loop for pooled provider HTTP clients
+on startup and closes them on shutdown.
 
 Settings module priority:
   1. DJANGO_SETTINGS_MODULE environment variable (set by Dockerfile in prod).
@@ -23,12 +25,33 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.config.development")
 
 django_asgi_app = get_asgi_application()
 
+from apps.common.http.pool import (  # noqa: E402
+    aclose_provider_clients,
+    close_provider_clients,
+    register_long_lived_loop,
+)
 from backend.websocket_auth import JWTQueryAuthMiddleware  # noqa: E402
 from backend.websocket_routes import websocket_urlpatterns  # noqa: E402
 
+
+async def lifespan_app(scope, receive, send):
+    """ASGI lifespan: pool provider connections on the server loop, release them on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            register_long_lived_loop()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await aclose_provider_clients()
+            close_provider_clients()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
+        "lifespan": lifespan_app,
         "websocket": JWTQueryAuthMiddleware(URLRouter(websocket_urlpatterns)),
     }
 )
@@ -256,13 +256,16 @@ app.conf.task_default_routing_key = "default"
 app.conf.task_routes = {
     # ── Cloudinary Webhooks — highest priority (sub-second latency needed) ────
     "process_cloudinary_upload_webhook": {"queue": "webhooks"},
+    "drain_cloudinary_webhook_buffer":   {"queue": "webhooks"},
 
     # ── Audit Logging — compliance-critical; dedicated worker pool ────────────
     "write_audit_event":   {"queue": "audit"},
+    "drain_audit_buffer":  {"queue": "audit"},
     "audit_log_cleanup":   {"queue": "audit"},
 
     # ── Image / Video Transforms — CPU/IO heavy; separate workers ─────────────
-    "generate_eager_transformations": {"queue": "transforms"},
+    "generate_eager_transformations":       {"queue": "transforms"},
+    "generate_eager_transformations_batch": {"queue": "transforms"},
 
     # ── Cleanup / CDN Invalidation — low priority; no SLA ────────────────────
     "delete_cloudinary_asset_task": {"queue": "cleanup"},
@@ -271,6 +274,10 @@ app.conf.task_routes = {
     # ── Bulk / Batch operations — background; no SLA ──────────────────────────
     "bulk_sync_cloudinary_urls": {"queue": "bulk"},
 
+    # ── Product search-as-you-type suggest index ──────────────────────────────
+    "product.refresh_suggest_index": {"queue": "default"},
+    "product.rebuild_suggest_index": {"queue": "bulk"},
+
     # ── Notification tasks — transactional; high priority ────────────────────
     "apps.common.tasks.send_account_status_email": {"queue": "emails"},
     "apps.common.tasks.send_account_status_sms":   {"queue": "emails"},
@@ -290,8 +297,11 @@ app.conf.task_routes = {
     "apps.devops.tasks.check_deployment_status": {"queue": "devops"},
     "apps.devops.tasks.backup_deployment_logs": {"queue": "devops"},
 
-    # ── Payment tasks (future — pre-wire so no code change needed) ────────────
-    # "process_payment_webhook": {"queue": "payments"},
+    # ── Payment webhook inbox — drained per payment reference ─────────────────
+    # On "webhooks": every deployed worker consumes it (see CELERY_QUEUES in
+    # entrypoint.sh / Dockerfile.celery); no worker listens on "payments".
+    "process_payment_webhook":     {"queue": "webhooks"},
+    "sweep_payment_webhook_inbox": {"queue": "webhooks"},
     # "send_payment_receipt":    {"queue": "emails"},
 
     # ── AI / ML tasks — routed to dedicated `ai` queue ────────────────────────
@@ -328,6 +338,7 @@ app.conf.task_routes = {
     "apps.analytics.tasks.cache_warming_tasks.warm_query_builder_cache":        {"queue": "analytics"},
     "apps.analytics.tasks.cache_warming_tasks.warm_capacity_cache":             {"queue": "analytics"},
     # DB ingestion — triggered by Django signals on model saves
+    "apps.ai.tasks.ingestion_tasks.ingest_db_changes":                  {"queue": "ai_ingestion"},
     "apps.ai.tasks.ingestion_tasks.ingest_db_change":                   {"queue": "ai_ingestion"},
     "apps.ai.tasks.ingestion_tasks.refresh_trending_cache":             {"queue": "ai_ingestion"},
     "apps.ai.tasks.ingestion_tasks.cleanup_old_events":                 {"queue": "ai_ingestion"},
@@ -336,6 +347,7 @@ app.conf.task_routes = {
     "apps.ai.tasks.recommendation_tasks.run_profile_recommendations":   {"queue": "ai"},
     "apps.ai.tasks.recommendation_tasks.embed_product":                 {"queue": "ai"},
     "apps.ai.tasks.recommendation_tasks.embed_unembedded_products":     {"queue": "ai"},
+    "apps.ai.tasks.recommendation_tasks.refresh_product_feature_store": {"queue": "ai"},
 }
 
 
@@ -355,6 +367,33 @@ app.conf.beat_schedule = {
         "options":  {"queue": "default"},
     },
 
+    # ── Audit buffer safety-net drain (every 10 seconds) ──────────────────────
+    # Producers schedule their own drain per flush window; this catches any
+    # buffered events whose drain was never scheduled (broker blip, crash).
+    "audit-buffer-drain": {
+        "task":     "drain_audit_buffer",
+        "schedule": 10.0,
+        "options":  {"queue": "audit"},
+    },
+
+    # ── Cloudinary webhook buffer safety-net drain (every 10 seconds) ─────────
+    # The webhook view schedules a drain per flush window; this catches any
+    # buffered notifications whose drain was never scheduled.
+    "cloudinary-webhook-buffer-drain": {
+        "task":     "drain_cloudinary_webhook_buffer",
+        "schedule": 10.0,
+        "options":  {"queue": "webhooks"},
+    },
+
+    # ── Payment webhook inbox safety-net sweep (every minute) ─────────────────
+    # Receivers enqueue each partition on commit; this catches events whose
+    # enqueue was lost (broker blip) so nothing stays unprocessed.
+    "payment-webhook-inbox-sweep": {
+        "task":     "sweep_payment_webhook_inbox",
+        "schedule": 60.0,
+        "options":  {"queue": "webhooks"},
+    },
+
     # ── Audit log data-retention cleanup (daily at 2 AM UTC) ─────────────────
     # Purges expired non-compliance AuditEventLog rows (90-day default) and
     # old CloudinaryProcessedWebhook records (90-day default).
@@ -394,6 +433,28 @@ app.conf.beat_schedule = {
         "options": {"queue": "devops"},
     },
 
+    # ── Notification unread badge counters ────────────────────────────────────
+    # Re-seed Redis counters for recently active recipients from the DB.
+    "notification-reconcile-unread-counters": {
+        "task":     "notification.reconcile_unread_counters",
+        "schedule": crontab(minute="*/10"),
+        "options":  {"queue": "default"},
+    },
+
+    # ── Product suggest index ─────────────────────────────────────────────────
+    # Incremental merge every minute (catches soft deletes, which send no
+    # signal); full rebuild + re-score hourly (tags, categories, brands).
+    "product-suggest-index-refresh": {
+        "task":     "product.refresh_suggest_index",
+        "schedule": crontab(minute="*"),
+        "options":  {"queue": "default"},
+    },
+    "product-suggest-index-rebuild": {
+        "task":     "product.rebuild_suggest_index",
+        "schedule": crontab(minute=20),
+        "options":  {"queue": "bulk"},
+    },
+
     # ── Future periodic tasks (pre-register; activate by uncommenting) ────────
     # "nightly-bulk-cloudinary-sync": {
     #     "task":     "bulk_sync_cloudinary_urls",
@@ -439,11 +500,20 @@ app.conf.beat_schedule = {
     },
 
     # Weekly embedding backfill — Sunday 03:00 UTC
-    # Finds all active products without ProductEmbedding and generates them
+    # Keyset-pages published products with a missing or stale ProductEmbedding
+    # (NOT EXISTS anti-join) and enqueues them in batch_generate_embeddings chunks
     "ai-weekly-embedding-backfill": {
-        "task":     "apps.ai.tasks.recommendation_tasks.embed_unembedded_products",
+        "task":     "apps.ai.tasks.embedding_tasks.backfill_missing_embeddings",
         "schedule": crontab(hour=3, minute=0, day_of_week=0),   # Sunday
         "options":  {"queue": "ai"},
+        "kwargs":   {"limit": None},
+    },
+
+    # Contextual-rerank feature store (trending, newness, vendor, stock, conversion)
+    "ai-refresh-product-feature-store": {
+        "task":     "apps.ai.tasks.recommendation_tasks.refresh_product_feature_store",
+        "schedule": crontab(minute="*/15"),
+        "options":  {"queue": "ai"},
     },
 
     # Hourly trending products cache rebuild
@@ -601,6 +671,15 @@ def on_worker_ready(sender=None, **kwargs):
     )
 
 
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def on_worker_shutdown(sender=None, **kwargs):
+    """Close pooled provider HTTP clients (prefork children and solo/thread pools)."""
+    from apps.common.http.pool import close_provider_clients
+
+    close_provider_clients()
+
+
 @signals.celeryd_after_setup.connect
 def on_worker_setup(sender=None, instance=None, **kwargs):
     """
@@ -41,6 +41,9 @@ else:
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True   # Propagate exceptions from tasks
 
+# ─── Search analytics — flush buffered SearchQuery/SearchResult rows inline ──
+SEARCH_ANALYTICS_EAGER = True
+
 # ─── Email — console backend so no SMTP needed ──────────────────────────────
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -158,6 +158,19 @@ run_collectstatic() {
     log_info "Static files collected"
 }
 
+# ── Offline GeoIP Table ───────────────────────────────────────────────────────
+compile_geoip() {
+    # Compile a GEOIP_DB_PATH CSV ahead of time so request paths only read the
+    # memory-mapped table. Non-fatal: audit geo enrichment degrades to {}.
+    case "${GEOIP_DB_PATH:-}" in
+        *.csv)
+            log_section "Compiling GeoIP Range Table"
+            python manage.py compile_geoip --if-stale || \
+                log_warn "GeoIP compile failed — offline geo lookups disabled"
+            ;;
+    esac
+}
+
 # ── Ollama Server Startup + Model Pull ───────────────────────────────────────
 start_ollama() {
     if [ "${OLLAMA_ENABLED:-True}" = "True" ] && command -v ollama >/dev/null 2>&1; then
@@ -241,6 +254,8 @@ case "$COMMAND" in
         # Start Ollama service if enabled
         start_ollama
 
+        compile_geoip
+
         export CELERY_CONCURRENCY="${CELERY_CONCURRENCY:-4}"
         export CELERY_QUEUES="${CELERY_QUEUES:-default,ai_tasks,measurements,analytics,notifications,webhooks}"
         exec celery -A backend worker \
@@ -269,6 +284,7 @@ case "$COMMAND" in
     # ── Celery Worker + Beat Combined (for small free tiers) ─────────────────
     celery-all)
         log_section "Starting Celery Worker + Beat (${PLATFORM})"
+        compile_geoip
         exec celery -A backend worker \
             --beat \
             --loglevel="${CELERY_LOG_LEVEL:-info}" \
@@ -317,6 +333,8 @@ case "$COMMAND" in
         # Start Ollama service if enabled
         start_ollama
 
+        compile_geoip
+
         # Run migrations before starting (idempotent — safe to run each deploy)
         run_migrations
 
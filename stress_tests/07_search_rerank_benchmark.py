@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# stress_tests/07_search_rerank_benchmark.py
+"""
+FASHIONISTAR — Semantic Rerank Benchmark (per-candidate vs vectorized)
+======================================================================
+Seeds content embeddings into the Django cache (Redis) then compares:
+
+  A — Legacy rerank      one cache.get per candidate + pure-Python cosine
+  B — Vectorized (cold)  fresh SemanticVectorIndex: one get_many + one matmul
+  C — Vectorized (warm)  vectors already resident: one matmul only
+
+at 300, 3,000 and 30,000 candidates.
+
+Run:
+    cd fashionistar_backend
+    venv/Scripts/python stress_tests/07_search_rerank_benchmark.py
+"""
+
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.development')
+
+import django
+django.setup()
+
+from django.core.cache import cache
+
+from apps.search.vector_index import SemanticVectorIndex
+
+CACHE_PREFIX    = 'search:embed:bench:'   # isolated from live search:embed:v1:
+CACHE_TTL       = 600
+DIM             = 64                      # matches HybridSearchService placeholder embeddings
+CANDIDATE_SIZES = (300, 3_000, 30_000)
+ROUNDS          = 5
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+
+    @property
+    def mean(self):
+        return statistics.mean(self.latencies_ms) if self.latencies_ms else 0
+
+    @property
+    def p50(self):
+        return statistics.median(self.latencies_ms) if self.latencies_ms else 0
+
+
+def _unit_vector(rng: random.Random) -> List[float]:
+    vec = [rng.random() for _ in range(DIM)]
+    s = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / s for x in vec]
+
+
+def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+    """Verbatim copy of the legacy HybridSearchService._cosine_similarity."""
+    if not vec1 or not vec2 or len(vec1) != len(vec2):
+        return 0.0
+    dot_product = sum(a * b for a, b in zip(vec1, vec2))
+    magnitude1 = math.sqrt(sum(a * a for a in vec1))
+    magnitude2 = math.sqrt(sum(b * b for b in vec2))
+    if magnitude1 == 0 or magnitude2 == 0:
+        return 0.0
+    return dot_product / (magnitude1 * magnitude2)
+
+
+def _embed_miss(text: str) -> List[float]:
+    raise AssertionError(f"benchmark embeddings are pre-seeded; unexpected miss for {text!r}")
+
+
+def seed_embeddings(n: int) -> Dict[int, str]:
+    print(f"\n🌱  Seeding {n:,} content embeddings …", flush=True)
+    rng = random.Random(42)
+    payload = {f"{CACHE_PREFIX}content:{i}": _unit_vector(rng) for i in range(1, n + 1)}
+    keys = list(payload)
+    for start in range(0, len(keys), 5_000):
+        chunk = keys[start:start + 5_000]
+        cache.set_many({k: payload[k] for k in chunk}, CACHE_TTL)
+    return {i: f"title {i} content {i}" for i in range(1, n + 1)}
+
+
+def legacy_rerank(query_vec: List[float], ids: List[int]) -> Dict[int, float]:
+    distances = {}
+    for cid in ids:
+        content_vec = cache.get(f"{CACHE_PREFIX}content:{cid}")
+        if query_vec and content_vec:
+            distances[cid] = 1.0 - _cosine_similarity(query_vec, content_vec)
+        else:
+            distances[cid] = 0.5
+    return distances
+
+
+def vectorized_rerank(index: SemanticVectorIndex, query_vec: List[float], texts: Dict[int, str]) -> Dict[int, float]:
+    index.ensure(texts, _embed_miss)
+    ids = list(texts)
+    sims = index.similarities(query_vec, ids)
+    return {cid: 1.0 - s for cid, s in zip(ids, sims.tolist())}
+
+
+def run_size(n: int, texts: Dict[int, str], query_vec: List[float]) -> None:
+    subset = dict(list(texts.items())[:n])
+    ids = list(subset)
+
+    legacy = BenchmarkResult(f"A — Legacy per-candidate ({n:,})")
+    cold = BenchmarkResult(f"B — Vectorized cold ({n:,})")
+    warm = BenchmarkResult(f"C — Vectorized warm ({n:,})")
+
+    warm_index = SemanticVectorIndex(CACHE_PREFIX, CACHE_TTL)
+    warm_index.ensure(subset, _embed_miss)
+
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        expected = legacy_rerank(query_vec, ids)
+        legacy.latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        got = vectorized_rerank(SemanticVectorIndex(CACHE_PREFIX, CACHE_TTL), query_vec, subset)
+        cold.latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        vectorized_rerank(warm_index, query_vec, subset)
+        warm.latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+    max_err = max(abs(expected[cid] - got[cid]) for cid in ids)
+
+    print(f"\n{'─'*60}")
+    print(f"  {n:,} candidates  ({ROUNDS} rounds, max |Δdistance| = {max_err:.2e})")
+    print(f"{'─'*60}")
+    for res in (legacy, cold, warm):
+        print(f"  {res.name:<38} mean {res.mean:9.2f} ms   p50 {res.p50:9.2f} ms")
+    if cold.mean > 0 and warm.mean > 0:
+        print(f"  Speedup legacy/cold : {legacy.mean / cold.mean:7.1f}×")
+        print(f"  Speedup legacy/warm : {legacy.mean / warm.mean:7.1f}×")
+
+
+def main():
+    print("=" * 60)
+    print("  FASHIONISTAR — Semantic Rerank Benchmark")
+    print("=" * 60)
+
+    texts = seed_embeddings(max(CANDIDATE_SIZES))
+    query_vec = _unit_vector(random.Random(7))
+
+    try:
+        for n in CANDIDATE_SIZES:
+            run_size(n, texts, query_vec)
+    finally:
+        cache.delete_many([f"{CACHE_PREFIX}content:{cid}" for cid in texts])
+        print("\n🧹  Benchmark embeddings removed from cache.")
+
+
+if __name__ == '__main__':
+    main()